@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevFlow - Benchmark das estatísticas do dashboard
+Compara as cinco consultas antigas com o DashboardStatsService (uma única ida ao banco)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem DATABASE_URL o benchmark usa um SQLite em memória
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database.connection import Base, db_manager
+from src.database.models import User, Client, Project, Transaction, TimeEntry, TransactionType, ProjectStatus
+from src.services.dashboard_stats import DashboardStatsService
+from src.services.rollups import RollupService
+
+def build_engine(url):
+    """Cria o engine usado no benchmark"""
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    return create_engine(url, pool_pre_ping=False)
+
+def seed(session, transactions, time_entries):
+    """Popula o banco com um usuário e dados sintéticos"""
+    user = User(username='bench', email='bench@devflow.local', password_hash='x', full_name='Bench')
+    session.add(user)
+    session.flush()
+
+    client = Client(user_id=user.id, name='Cliente Bench')
+    session.add(client)
+    session.flush()
+
+    projects = []
+    for i in range(10):
+        project = Project(
+            user_id=user.id,
+            client_id=client.id,
+            name=f'Projeto {i}',
+            budget=Decimal(random.randint(1000, 20000)),
+            status=random.choice([ProjectStatus.ATIVO, ProjectStatus.PROPOSTA, ProjectStatus.CONCLUIDO])
+        )
+        session.add(project)
+        projects.append(project)
+    session.flush()
+
+    now = datetime.now()
+    session.bulk_save_objects([
+        Transaction(
+            user_id=user.id,
+            project_id=random.choice(projects).id,
+            type=random.choice([TransactionType.RECEITA, TransactionType.DESPESA]),
+            amount=Decimal(random.randint(10, 5000)),
+            description=f'Transação {i}',
+            date=now - timedelta(days=random.randint(0, 730))
+        )
+        for i in range(transactions)
+    ])
+
+    session.bulk_save_objects([
+        TimeEntry(
+            user_id=user.id,
+            project_id=random.choice(projects).id,
+            description=f'Entrada {i}',
+            start_time=now,
+            end_time=now,
+            duration_minutes=random.randint(15, 240),
+            date=now - timedelta(days=random.randint(0, 730))
+        )
+        for i in range(time_entries)
+    ])
+    session.commit()
+    return user.id
+
+def legacy_stats(session, user_id):
+    """Reproduz o caminho antigo do Dashboard com cinco consultas"""
+    now = datetime.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    total_budget = session.query(func.sum(Project.budget)).filter(
+        Project.user_id == user_id,
+        Project.status.in_([ProjectStatus.ATIVO, ProjectStatus.PROPOSTA])
+    ).scalar() or 0
+
+    total_received = session.query(func.sum(Transaction.amount)).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == TransactionType.RECEITA
+    ).scalar() or 0
+
+    monthly_income = session.query(func.sum(Transaction.amount)).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == TransactionType.RECEITA,
+        Transaction.date >= month_start
+    ).scalar() or 0
+
+    monthly_expenses = session.query(func.sum(Transaction.amount)).filter(
+        Transaction.user_id == user_id,
+        Transaction.type == TransactionType.DESPESA,
+        Transaction.date >= month_start
+    ).scalar() or 0
+
+    monthly_minutes = session.query(func.sum(TimeEntry.duration_minutes)).filter(
+        TimeEntry.user_id == user_id,
+        TimeEntry.date >= month_start
+    ).scalar() or 0
+
+    return total_budget - total_received, monthly_income, monthly_expenses, monthly_minutes
+
+def measure(label, func_, runs):
+    """Executa a função várias vezes e retorna a média em milissegundos"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func_()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    average = sum(timings) / len(timings)
+    print(f"  {label:<28} média {average:8.1f} ms | mín {min(timings):8.1f} ms | máx {max(timings):8.1f} ms")
+    return average
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark das estatísticas do dashboard")
+    parser.add_argument('--url', default='sqlite://', help='URL do banco (padrão: SQLite em memória)')
+    parser.add_argument('--latency-ms', type=float, default=80, help='Latência simulada por ida ao banco')
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--time-entries', type=int, default=20000)
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    engine = build_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    session = SessionLocal()
+    try:
+        user_id = seed(session, args.transactions, args.time_entries)
+    finally:
+        session.close()
+
+    # A carga em massa não passa pelos eventos da sessão; os rollups são reconstruídos
+    RollupService(SessionLocal).rebuild()
+
+    # Simula a latência de rede em cada ida ao banco (só depois da carga inicial)
+    if args.latency_ms:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _simulate_latency(conn, cursor, statement, parameters, context, executemany):
+            time.sleep(args.latency_ms / 1000)
+
+    service = DashboardStatsService(SessionLocal)
+
+    def run_legacy():
+        session = SessionLocal()
+        try:
+            legacy_stats(session, user_id)
+        finally:
+            session.close()
+
+    print(f"\n📊 Dashboard: {args.transactions} transações, {args.time_entries} registros de tempo, "
+          f"latência simulada {args.latency_ms:.0f} ms")
+    legacy = measure("Caminho antigo (5 consultas)", run_legacy, args.runs)
+    def run_service():
+        # Mede a ida ao banco, não o cache de consultas
+        db_manager.query_cache.clear()
+        service.get_stats(user_id)
+
+    single = measure("DashboardStatsService", run_service, args.runs)
+    print(f"\n  Redução de latência: {legacy - single:.1f} ms ({(1 - single / legacy) * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
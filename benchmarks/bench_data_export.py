@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevFlow - Benchmark da exportação de dados (CSV, Parquet e XLSX)
+Mede o tempo de cada formato e o pico de memória (tracemalloc) exportando 10% e
+100% dos registros de tempo: em streaming o pico não acompanha o número de linhas
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem DATABASE_URL o benchmark usa um SQLite em memória
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database.connection import Base
+from src.database.models import User, Client, Project, TimeEntry
+from src.services.data_export import DataExportService, EXPORT_FORMATS, dependency_available
+
+# Um registro a cada 15 minutos a partir desta data
+FIRST_ENTRY = datetime(2020, 1, 1)
+
+def build_engine(url):
+    """Cria o engine usado no benchmark"""
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    return create_engine(url, pool_pre_ping=False)
+
+def seed(SessionLocal, rows):
+    """Cria um usuário com um projeto e `rows` registros de tempo; retorna o id do usuário"""
+    session = SessionLocal()
+    try:
+        user = User(username=f'bench{time.time_ns()}', email=f'bench{time.time_ns()}@devflow.local', password_hash='x', full_name='Bench')
+        client = Client(user=user, name='Cliente')
+        project = Project(user=user, client=client, name='Projeto')
+        session.add_all([user, client, project])
+        session.flush()
+
+        for offset in range(0, rows, 10000):
+            session.execute(insert(TimeEntry), [
+                {
+                    'user_id': user.id,
+                    'project_id': project.id,
+                    'description': f'Tarefa {i % 1000}',
+                    'start_time': FIRST_ENTRY + timedelta(minutes=15 * i),
+                    'end_time': FIRST_ENTRY + timedelta(minutes=15 * i + 10),
+                    'duration_minutes': 10,
+                    'hourly_rate': random.randint(5000, 20000) / 100,
+                    'date': FIRST_ENTRY + timedelta(minutes=15 * i)
+                }
+                for i in range(offset, min(offset + 10000, rows))
+            ])
+        session.commit()
+        return user.id
+    finally:
+        session.close()
+
+def traced_peak(func):
+    """Pico de memória alocada pelo Python durante func()"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da exportação de dados")
+    parser.add_argument('--url', default='sqlite://', help='URL do banco (padrão: SQLite em memória)')
+    parser.add_argument('--rows', type=int, default=50000, help='Registros de tempo gerados')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Linhas lidas por vez (menor que 10%% das linhas)')
+    args = parser.parse_args()
+
+    engine = build_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    user_id = seed(SessionLocal, args.rows)
+
+    # Período com 10% dos registros (um a cada 15 minutos)
+    last_day = FIRST_ENTRY + timedelta(minutes=15 * (args.rows // 10 - 1))
+
+    service = DataExportService(SessionLocal, chunk_size=args.chunk_size)
+    print(f"\n📤 Exportação de {args.rows} registros de tempo em blocos de {args.chunk_size}\n")
+    print(f"  {'Formato':<10} {'segundos':>10} {'linhas/s':>10} {'pico 10% (MB)':>14} {'pico 100% (MB)':>15}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for extension, (name, module) in EXPORT_FORMATS.items():
+            if not dependency_available(module):
+                print(f"  {name:<10} {module} não instalado")
+                continue
+
+            filename = os.path.join(folder, f'horas{extension}')
+            start = time.perf_counter()
+            result = service.export(filename, 'time_entries', user_id)
+            elapsed = time.perf_counter() - start
+
+            partial = traced_peak(lambda: service.export(filename, 'time_entries', user_id, FIRST_ENTRY, last_day))
+            full = traced_peak(lambda: service.export(filename, 'time_entries', user_id))
+            print(f"  {name:<10} {elapsed:>10.2f} {result.rows / elapsed:>10.0f} {partial / 1e6:>14.1f} {full / 1e6:>15.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevFlow - Benchmark da importação de extratos bancários
+Compara a importação em blocos do StatementImportService (COPY/executemany com
+deduplicação por hash) com a gravação de uma transação por commit pelo ORM
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem DATABASE_URL o benchmark usa um SQLite em memória
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database.connection import Base
+from src.database.models import User, Transaction, TransactionType
+from src.services.statement_import import StatementImportService
+
+def build_engine(url):
+    """Cria o engine usado no benchmark"""
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    return create_engine(url, pool_pre_ping=False)
+
+def write_statement(path, lines):
+    """Gera um extrato CSV no formato dos bancos brasileiros (separador ';' e vírgula decimal)"""
+    start = datetime(2024, 1, 1)
+    with open(path, 'w', encoding='utf-8') as statement:
+        statement.write("Data;Histórico;Valor\n")
+        for i in range(lines):
+            amount = random.randint(-500000, 500000) / 100 or 1
+            day = (start + timedelta(days=i % 730)).strftime('%d/%m/%Y')
+            statement.write(f"{day};Lançamento {i % 5000};{amount:.2f}\n".replace('.', ','))
+
+def orm_import(SessionLocal, user_id, service, path, limit):
+    """Caminho ingênuo: uma transação do ORM por linha do extrato (medido só nas primeiras `limit` linhas)"""
+    rows = 0
+    for line in service.read_lines(path):
+        session = SessionLocal()
+        try:
+            session.add(Transaction(
+                user_id=user_id,
+                type=TransactionType.RECEITA if line.amount > 0 else TransactionType.DESPESA,
+                amount=abs(line.amount),
+                description=line.description,
+                date=line.date
+            ))
+            session.commit()
+        finally:
+            session.close()
+        rows += 1
+        if rows >= limit:
+            break
+    return rows
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da importação de extratos bancários")
+    parser.add_argument('--url', default='sqlite://', help='URL do banco (padrão: SQLite em memória)')
+    parser.add_argument('--lines', type=int, default=50000, help='Linhas do extrato gerado')
+    parser.add_argument('--orm-lines', type=int, default=2000, help='Linhas medidas no caminho do ORM (o total é extrapolado)')
+    args = parser.parse_args()
+
+    engine = build_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    session = SessionLocal()
+    try:
+        user = User(username=f'bench{time.time_ns()}', email=f'bench{time.time_ns()}@devflow.local', password_hash='x', full_name='Bench')
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    finally:
+        session.close()
+
+    service = StatementImportService(SessionLocal)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'extrato.csv')
+        write_statement(path, args.lines)
+
+        print(f"\n📥 Importação de um extrato com {args.lines} linhas\n")
+        print(f"  {'Caminho':<32} {'segundos':>10} {'linhas/s':>10} {'inseridas':>10}")
+
+        start = time.perf_counter()
+        result = service.import_file(user_id, path)
+        elapsed = time.perf_counter() - start
+        print(f"  {'Em blocos (StatementImport)':<32} {elapsed:>10.2f} {result.read / elapsed:>10.0f} {result.inserted:>10}")
+
+        start = time.perf_counter()
+        result = service.import_file(user_id, path)
+        elapsed = time.perf_counter() - start
+        print(f"  {'Reimportação (tudo duplicado)':<32} {elapsed:>10.2f} {result.read / elapsed:>10.0f} {result.inserted:>10}")
+
+        start = time.perf_counter()
+        rows = orm_import(SessionLocal, user_id, service, path, args.orm_lines)
+        elapsed = time.perf_counter() - start
+        estimate = elapsed / rows * args.lines
+        print(f"  {'ORM, um commit por linha (est.)':<32} {estimate:>10.2f} {rows / elapsed:>10.0f} {'-':>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevFlow - Benchmark de movimentação de tarefas no kanban
+Compara a renumeração densa (desloca todas as tarefas abaixo) com as posições
+esparsas do KanbanService (uma única linha alterada por movimento)
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem DATABASE_URL o benchmark usa um SQLite em memória
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database.connection import Base
+from src.database.models import User, Client, Project, Board, BoardColumn, Task
+from src.services.kanban import KanbanService, POSITION_GAP
+
+def build_engine(url):
+    """Cria o engine usado no benchmark"""
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    return create_engine(url, pool_pre_ping=False)
+
+def seed(session, tasks, gap):
+    """Cria um quadro com duas colunas: origem com as tarefas a mover e destino com `tasks` tarefas"""
+    user = User(username=f'bench{tasks}{gap}', email=f'bench{tasks}{gap}@devflow.local', password_hash='x', full_name='Bench')
+    session.add(user)
+    session.flush()
+
+    client = Client(user_id=user.id, name='Cliente Bench')
+    session.add(client)
+    session.flush()
+
+    project = Project(user_id=user.id, client_id=client.id, name='Projeto Bench')
+    session.add(project)
+    session.flush()
+
+    board = Board(user_id=user.id, project_id=project.id, name='Quadro Bench')
+    session.add(board)
+    session.flush()
+
+    source = BoardColumn(board_id=board.id, name='Origem', position=0)
+    target = BoardColumn(board_id=board.id, name='Destino', position=1)
+    session.add_all([source, target])
+    session.flush()
+
+    session.bulk_insert_mappings(Task, [
+        {'column_id': target.id, 'title': f'Tarefa {i}', 'position': i * gap}
+        for i in range(tasks)
+    ])
+    session.commit()
+    return source.id, target.id
+
+class RowCounter:
+    """Soma as linhas alteradas pelos UPDATEs executados no engine"""
+
+    def __init__(self, engine):
+        self.rows = 0
+        event.listen(engine, "after_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('UPDATE'):
+            self.rows += max(cursor.rowcount, 0)
+
+def dense_move(SessionLocal, column_id, task_id, index):
+    """Caminho antigo: abre espaço deslocando todas as tarefas a partir do índice"""
+    session = SessionLocal()
+    try:
+        session.query(Task).filter(
+            Task.column_id == column_id,
+            Task.position >= index
+        ).update({Task.position: Task.position + 1}, synchronize_session=False)
+
+        session.query(Task).filter(Task.id == task_id).update(
+            {Task.column_id: column_id, Task.position: index},
+            synchronize_session=False
+        )
+        session.commit()
+    finally:
+        session.close()
+
+def random_neighbors(SessionLocal, column_id):
+    """Sorteia dois vizinhos consecutivos da coluna (fora da medição)"""
+    session = SessionLocal()
+    try:
+        count = session.query(func.count(Task.id)).filter(Task.column_id == column_id).scalar()
+        index = random.randint(1, count - 1)
+        above, below = session.query(Task.id).filter(
+            Task.column_id == column_id
+        ).order_by(Task.position, Task.id).offset(index - 1).limit(2).all()
+        return index, above[0], below[0]
+    finally:
+        session.close()
+
+def run_size(SessionLocal, counter, size, moves):
+    """Mede os dois caminhos para uma coluna com `size` tarefas"""
+    results = {}
+
+    for label, gap in (("Densa (renumeração)", 1), ("Esparsa (KanbanService)", POSITION_GAP)):
+        session = SessionLocal()
+        try:
+            source_id, target_id = seed(session, size, gap)
+            session.bulk_insert_mappings(Task, [
+                {'column_id': source_id, 'title': f'Movida {i}', 'position': i * gap}
+                for i in range(moves)
+            ])
+            session.commit()
+            moving = [task_id for (task_id,) in session.query(Task.id).filter(Task.column_id == source_id)]
+        finally:
+            session.close()
+
+        service = KanbanService(SessionLocal)
+        timings, rows, rebalances = [], [], 0
+
+        for task_id in moving:
+            index, above_id, below_id = random_neighbors(SessionLocal, target_id)
+            counter.rows = 0
+            start = time.perf_counter()
+
+            if gap == 1:
+                dense_move(SessionLocal, target_id, task_id, index)
+            else:
+                rebalances += service.move_task(task_id, target_id, above_id=above_id, below_id=below_id).rebalanced
+
+            timings.append((time.perf_counter() - start) * 1000)
+            rows.append(counter.rows)
+
+        results[label] = (sum(timings) / len(timings), sum(rows) / len(rows), rebalances)
+
+    return results
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de movimentação de tarefas no kanban")
+    parser.add_argument('--url', default='sqlite://', help='URL do banco (padrão: SQLite em memória)')
+    parser.add_argument('--sizes', default='100,1000,10000,50000', help='Tamanhos da coluna de destino')
+    parser.add_argument('--moves', type=int, default=50, help='Movimentos medidos por tamanho')
+    args = parser.parse_args()
+
+    engine = build_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    counter = RowCounter(engine)
+
+    print(f"\n📋 Movimentação de tarefas: {args.moves} movimentos para posições aleatórias por tamanho de coluna\n")
+    print(f"  {'Tarefas':>8}  {'Estratégia':<26} {'ms/mov.':>9} {'linhas/mov.':>12} {'rebalanceamentos':>17}")
+
+    for size in (int(value) for value in args.sizes.split(',')):
+        for label, (average_ms, average_rows, rebalances) in run_size(SessionLocal, counter, size, args.moves).items():
+            print(f"  {size:>8}  {label:<26} {average_ms:>9.2f} {average_rows:>12.1f} {rebalances:>17}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DevFlow - Benchmark da importação de entradas de tempo (Toggl/Clockify)
+Mede a importação em blocos do TimeEntryImportService em um CSV no formato da
+exportação detalhada do Toggl Track e compara com uma entrada por commit pelo ORM
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sem DATABASE_URL o benchmark usa um SQLite em memória
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from src.database.connection import Base
+from src.database.models import User, TimeEntry
+from src.services.time_entry_import import TimeEntryImportService, ProjectLookup, read_time_entries
+
+def build_engine(url):
+    """Cria o engine usado no benchmark"""
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    return create_engine(url, pool_pre_ping=False)
+
+def write_export(path, rows, projects):
+    """Gera um CSV no formato da exportação detalhada do Toggl Track"""
+    start = datetime(2020, 1, 1, 8)
+    with open(path, 'w', encoding='utf-8') as export:
+        export.write("User,Email,Client,Project,Task,Description,Billable,Start date,Start time,End date,End time,Duration,Tags,Amount (USD)\n")
+        for i in range(rows):
+            begin = start + timedelta(minutes=15 * i)
+            end = begin + timedelta(minutes=random.randint(5, 240))
+            project = i % projects
+            export.write(
+                f"Bench,bench@devflow.local,Cliente {project % 20},Projeto {project},,Tarefa {i % 1000},Yes,"
+                f"{begin:%Y-%m-%d},{begin:%H:%M:%S},{end:%Y-%m-%d},{end:%H:%M:%S},,,\n"
+            )
+
+class QueryCounter:
+    """Conta os SELECTs na tabela de projetos (consultas do cache de nomes)"""
+
+    def __init__(self, engine):
+        self.project_selects = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM projects' in statement:
+            self.project_selects += 1
+
+def orm_import(SessionLocal, user_id, path, limit):
+    """Caminho ingênuo: uma entrada do ORM por linha (medido só nas primeiras `limit` linhas)"""
+    projects = ProjectLookup(SessionLocal, user_id)
+    rows = 0
+    for line in read_time_entries(path):
+        session = SessionLocal()
+        try:
+            session.add(TimeEntry(
+                user_id=user_id,
+                project_id=projects(line.project, line.client),
+                description=line.description,
+                start_time=line.start,
+                end_time=line.end,
+                duration_minutes=int((line.end - line.start).total_seconds() // 60),
+                date=line.start
+            ))
+            session.commit()
+        finally:
+            session.close()
+        rows += 1
+        if rows >= limit:
+            break
+    return rows
+
+def main():
+    """Função principal do benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark da importação de entradas de tempo")
+    parser.add_argument('--url', default='sqlite://', help='URL do banco (padrão: SQLite em memória)')
+    parser.add_argument('--rows', type=int, default=500000, help='Linhas do CSV gerado')
+    parser.add_argument('--projects', type=int, default=200, help='Projetos distintos no arquivo')
+    parser.add_argument('--orm-rows', type=int, default=2000, help='Linhas medidas no caminho do ORM (o total é extrapolado)')
+    args = parser.parse_args()
+
+    engine = build_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+    counter = QueryCounter(engine)
+
+    session = SessionLocal()
+    try:
+        user = User(username=f'bench{time.time_ns()}', email=f'bench{time.time_ns()}@devflow.local', password_hash='x', full_name='Bench')
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    finally:
+        session.close()
+
+    service = TimeEntryImportService(SessionLocal)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'toggl.csv')
+        write_export(path, args.rows, args.projects)
+
+        print(f"\n⏱️  Importação de {args.rows} entradas de tempo ({args.projects} projetos)\n")
+        print(f"  {'Caminho':<34} {'segundos':>10} {'linhas/s':>10} {'inseridas':>10} {'SELECTs projetos':>17}")
+
+        for label in ("Em blocos (TimeEntryImport)", "Reimportação (tudo duplicado)"):
+            counter.project_selects = 0
+            start = time.perf_counter()
+            # Progresso no stderr: a tabela do stdout fica limpa quando redirecionada para um arquivo
+            result = service.import_file(
+                user_id, path,
+                progress=lambda read, inserted: print(f"  {read} linhas...", end="\r", file=sys.stderr, flush=True)
+            )
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<34} {elapsed:>10.2f} {result.read / elapsed:>10.0f} {result.inserted:>10} {counter.project_selects:>17}")
+
+        start = time.perf_counter()
+        rows = orm_import(SessionLocal, user_id, path, args.orm_rows)
+        elapsed = time.perf_counter() - start
+        estimate = elapsed / rows * args.rows
+        print(f"  {'ORM, um commit por linha (est.)':<34} {estimate:>10.2f} {rows / elapsed:>10.0f} {'-':>10} {'-':>17}")
+
+if __name__ == "__main__":
+    main()
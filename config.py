@@ -10,6 +10,21 @@ class Config:
     # Configurações do banco de dados
     DATABASE_URL = os.getenv('DATABASE_URL')
     
+    # Pool de conexões (PostgreSQL); no Neon o pre-ping custa uma ida ao banco a cada checkout
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))  # Segundos esperando uma conexão livre
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 300))  # Segundos; abaixo do timeout de inatividade do servidor
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    DB_POOL_WARMUP = int(os.getenv('DB_POOL_WARMUP', 0))  # Conexões abertas na inicialização
+    # Teto de conexões do processo somando todos os engines (a versão web tem um síncrono e um assíncrono);
+    # mantenha abaixo do max_connections do servidor dividido pelo número de processos
+    DB_MAX_CONNECTIONS = int(os.getenv('DB_MAX_CONNECTIONS', DB_POOL_SIZE + DB_MAX_OVERFLOW))
+    
+    # Cache de resultados de consultas (invalidado a cada commit nas tabelas lidas)
+    QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', 256))
+    QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', 300))  # Segundos; protege contra escritas de outros processos
+    
     # Configurações de autenticação
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     JWT_ALGORITHM = 'HS256'
@@ -24,6 +39,11 @@ class Config:
     WINDOW_HEIGHT = 800
     THEME_MODE = "dark"  # "light" ou "dark"
     COLOR_THEME = "blue"  # "blue", "green", "dark-blue"
+    GUI_WORKER_THREADS = int(os.getenv('GUI_WORKER_THREADS', 3))  # Consultas da interface em paralelo
+    
+    # Cache de dados por usuário da versão web (Streamlit)
+    WEB_CACHE_TTL = int(os.getenv('WEB_CACHE_TTL', 60))  # Segundos; escritas na própria sessão invalidam na hora
+    WEB_CACHE_ENTRIES = int(os.getenv('WEB_CACHE_ENTRIES', 1000))  # Entradas por função de carga
     
     # Configurações de arquivos
     UPLOAD_FOLDER = "uploads"
@@ -33,6 +53,30 @@ class Config:
     # Configurações de relatórios
     REPORTS_FOLDER = "reports"
     
+    # Dados locais da máquina (cache da revisão do esquema, réplica local e fila de gravações)
+    LOCAL_DATA_FOLDER = os.getenv('DEVFLOW_DATA_FOLDER', os.path.join(os.path.expanduser('~'), '.devflow'))
+    SCHEMA_CACHE_FILE = os.path.join(LOCAL_DATA_FOLDER, 'schema_cache.json')
+    
+    # Réplica local (desktop): a interface lê e grava em um SQLite local sincronizado em segundo plano
+    LOCAL_REPLICA = os.getenv('LOCAL_REPLICA', 'false').lower() in ('1', 'true', 'yes')
+    REPLICA_SYNC_INTERVAL = int(os.getenv('REPLICA_SYNC_INTERVAL', 60))  # Segundos entre sincronizações
+    REPLICA_PULL_OVERLAP = int(os.getenv('REPLICA_PULL_OVERLAP', 300))  # Segundos relidos antes da marca d'água
+    
+    # Fila local de gravações (write-behind): salvamentos da interface gravam primeiro em um SQLite local
+    OUTBOX_FILE = os.path.join(LOCAL_DATA_FOLDER, 'outbox.db')
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))  # Gravações por transação no banco
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))  # Tentativas antes de marcar como falha
+    OUTBOX_RETRY_SECONDS = int(os.getenv('OUTBOX_RETRY_SECONDS', 2))  # Espera inicial entre tentativas (dobra a cada falha)
+    
+    # Timers em andamento (sobrevivem ao fechamento do aplicativo)
+    TIMERS_FILE = os.path.join(LOCAL_DATA_FOLDER, 'timers.json')
+    
+    # Importação em massa (extratos e entradas de tempo): linhas gravadas por transação no banco
+    IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', 5000))
+    
+    # Exportação de dados (CSV/Parquet/XLSX): linhas lidas do cursor por vez (um row group no Parquet)
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 10000))
+    
     @classmethod
     def validate_config(cls):
         """Valida se as configurações essenciais estão definidas"""
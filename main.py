@@ -5,16 +5,43 @@ DevFlow - Sistema de Gestão para Freelancers
 Aplicação principal
 """
 
+import time
+_STARTED = time.perf_counter()
+
 import sys
 import os
 import customtkinter as ctk
 from config import config
 from src.gui.main_window import MainWindow
-from src.database.connection import DatabaseManager
+from src.database.connection import db_manager
+from src.services.write_behind import write_queue
 from src.utils.logger import setup_logger
+from src.utils.startup_profiler import StartupProfiler, import_times
+
+def print_startup_profile(profiler):
+    """Imprime o tempo de cada fase e o tempo de importação por pacote (medido em um processo novo)"""
+    print(f"\n⏱️  Inicialização do {config.APP_NAME} até a tela de login\n")
+    print("\n".join(profiler.report()))
+    
+    try:
+        total_ms, packages, modules = import_times('main')
+    except Exception as e:
+        print(f"\n❌ Erro ao medir as importações: {e}")
+        return
+    
+    print(f"\n📦 Importações por pacote (self, total {total_ms:.1f} ms)\n")
+    for name, ms in packages:
+        print(f"  {name:<32} {ms:>9.1f}")
+    
+    print("\n📁 Módulos do projeto (cumulativo)\n")
+    for name, ms in modules:
+        print(f"  {name:<32} {ms:>9.1f}")
 
-def main():
+def main(profile=False):
     """Função principal da aplicação"""
+    profiler = StartupProfiler(_STARTED)
+    profiler.mark("Importações")
+    
     try:
         # Configura o logger
         logger = setup_logger()
@@ -26,25 +53,58 @@ def main():
         # Configura o CustomTkinter
         ctk.set_appearance_mode(config.THEME_MODE)
         ctk.set_default_color_theme(config.COLOR_THEME)
+        profiler.mark("Logger e configuração")
         
-        # Inicializa o gerenciador de banco de dados
-        db_manager = DatabaseManager()
+        # Réplica local: a interface lê e grava no SQLite e funciona sem o banco remoto
+        if config.LOCAL_REPLICA:
+            db_manager.enable_replica()
+            profiler.mark("Réplica local")
         
-        # Verifica conexão com o banco
-        if not db_manager.test_connection():
+        # Verifica conexão com o banco (o engine é criado aqui, no primeiro uso)
+        online = db_manager.test_connection()
+        if not online and db_manager.replica is None:
             logger.error("Falha na conexão com o banco de dados")
             sys.exit(1)
+        profiler.mark("Engine e conexão com o banco")
         
-        # Executa migrações se necessário
-        db_manager.run_migrations()
+        if online:
+            # Executa migrações se necessário
+            db_manager.run_migrations()
+            profiler.mark("Migrações")
+            
+            # Abre DB_POOL_WARMUP conexões antes da primeira tela
+            db_manager.warm_up()
+            profiler.mark("Aquecimento do pool")
+        else:
+            logger.warning("Banco remoto indisponível; iniciando com a réplica local")
+        
+        # Aplica em segundo plano as gravações deixadas na fila local por uma execução anterior;
+        # a medição da inicialização não grava nada no banco (nem limpa chaves de idempotência)
+        if not profile:
+            write_queue.start()
+            profiler.mark("Fila de gravações")
         
         # Cria e executa a janela principal
         app = MainWindow()
-        app.run()
+        profiler.mark("Janela principal")
         
+        if profile:
+            # Mede até a tela de login ser desenhada e encerra
+            app.root.withdraw()
+            app.show_login()
+            app.root.update()
+            profiler.mark("Tela de login")
+            app.root.destroy()
+            print_startup_profile(profiler)
+            return
+        
+        app.run()
+    
     except Exception as e:
         print(f"Erro fatal: {e}")
+        if profile:
+            print_startup_profile(profiler)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(profile='--profile-startup' in sys.argv[1:])
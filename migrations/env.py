@@ -66,6 +66,17 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # A aplicação passa a própria conexão (src/database/schema.py); pela linha de comando cria um engine
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     configuration = config.get_section(config.config_ini_section)
     configuration["sqlalchemy.url"] = get_url()
     
@@ -0,0 +1,49 @@
+"""Índices compostos para consultas por usuário e período
+
+Revision ID: 4c1e9a7b2d30
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c1e9a7b2d30'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (nome, tabela, colunas, colunas incluídas no índice do PostgreSQL)
+INDEXES = [
+    ("ix_clients_user_active", "clients", ["user_id", "is_active"], None),
+    ("ix_projects_user_status", "projects", ["user_id", "status"], None),
+    ("ix_projects_client", "projects", ["client_id"], None),
+    ("ix_transactions_user_type_date", "transactions", ["user_id", "type", "date"], ["amount"]),
+    ("ix_transactions_user_date", "transactions", ["user_id", "date"], None),
+    ("ix_transactions_project_date", "transactions", ["project_id", "date"], None),
+    ("ix_time_entries_user_date", "time_entries", ["user_id", "date"], ["duration_minutes"]),
+    ("ix_time_entries_user_project_date", "time_entries", ["user_id", "project_id", "date"], ["duration_minutes"]),
+    ("ix_boards_project", "boards", ["project_id"], None),
+    ("ix_board_columns_board_position", "board_columns", ["board_id", "position"], None),
+    ("ix_tasks_column_position", "tasks", ["column_id", "position"], None),
+]
+
+
+def upgrade() -> None:
+    # Bancos criados antes desta migração já têm as tabelas (create_all); em um banco
+    # vazio as tabelas ainda não existem e os índices são criados junto com elas
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    for name, table, columns, include in INDEXES:
+        if table not in existing_tables:
+            continue
+        kwargs = {"postgresql_include": include} if include else {}
+        op.create_index(name, table, columns, if_not_exists=True, **kwargs)
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,42 @@
+"""Posições esparsas para as tarefas do kanban
+
+Revision ID: 8b3d5f2e1a47
+Revises: 4c1e9a7b2d30
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3d5f2e1a47'
+down_revision = '4c1e9a7b2d30'
+branch_labels = None
+depends_on = None
+
+
+POSITION_GAP = 1024
+
+
+def _renumber(step, offset):
+    """Renumera as tarefas de cada coluna como rank * step + offset, mantendo a ordem"""
+    if 'tasks' not in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.execute(sa.text(
+        "UPDATE tasks SET position = ranked.rank * :step + :offset "
+        "FROM (SELECT id, ROW_NUMBER() OVER (PARTITION BY column_id ORDER BY position, id) AS rank "
+        "FROM tasks) AS ranked "
+        "WHERE tasks.id = ranked.id"
+    ).bindparams(step=step, offset=offset))
+
+
+def upgrade() -> None:
+    # Espaço entre posições consecutivas permite mover uma tarefa alterando uma única linha
+    _renumber(POSITION_GAP, 0)
+
+
+def downgrade() -> None:
+    # Volta para posições densas a partir de zero
+    _renumber(1, -1)
@@ -0,0 +1,42 @@
+"""Carga inicial dos rollups de transações e tempo em bancos existentes
+
+Revision ID: a9d2e6c4f713
+Revises: b6e1f47c3a28
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.models import Transaction, TimeEntry, TransactionMonthlyRollup, TimeEntryDailyRollup
+from src.services.rollups import RollupService
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d2e6c4f713'
+down_revision = 'b6e1f47c3a28'
+branch_labels = None
+depends_on = None
+
+
+ROLLUP_MODELS = (TransactionMonthlyRollup, TimeEntryDailyRollup)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing_tables = set(sa.inspect(bind).get_table_names())
+    if not {Transaction.__tablename__, TimeEntry.__tablename__} <= existing_tables:
+        return
+
+    # Pela aplicação o create_all já criou as tabelas (vazias); pela linha de comando do Alembic não
+    for model in ROLLUP_MODELS:
+        model.__table__.create(bind, checkfirst=True)
+
+    # Recalcula tudo com os mesmos agregados do --rebuild-rollups: as tabelas podem estar vazias
+    # ou conter só as variações gravadas pelos eventos da sessão desde que foram criadas
+    RollupService().rebuild_with(bind)
+
+
+def downgrade() -> None:
+    # As tabelas de rollup ficam: o código das revisões anteriores também as lê
+    pass
@@ -0,0 +1,34 @@
+"""updated_at nas colunas do kanban (sincronização por delta da réplica local)
+
+Revision ID: d41f7c2a9e58
+Revises: 8b3d5f2e1a47
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd41f7c2a9e58'
+down_revision = '8b3d5f2e1a47'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return None
+    return column in {info['name'] for info in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    # Bancos novos já recebem a coluna pelo create_all
+    if _has_column('board_columns', 'updated_at') is False:
+        op.add_column('board_columns', sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    if _has_column('board_columns', 'updated_at'):
+        op.drop_column('board_columns', 'updated_at')
@@ -0,0 +1,34 @@
+"""Chaves de idempotência da fila de gravações local
+
+Revision ID: e7a2c95b1f04
+Revises: d41f7c2a9e58
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c95b1f04'
+down_revision = 'd41f7c2a9e58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bancos novos já recebem a tabela pelo create_all
+    if 'applied_writes' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'applied_writes',
+        sa.Column('key', sa.String(36), primary_key=True),
+        sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.func.now())
+    )
+    op.create_index('ix_applied_writes_applied_at', 'applied_writes', ['applied_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_applied_writes_applied_at', table_name='applied_writes', if_exists=True)
+    op.drop_table('applied_writes')
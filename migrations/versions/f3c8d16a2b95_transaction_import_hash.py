@@ -0,0 +1,43 @@
+"""Hash de importação nas transações (deduplicação dos extratos)
+
+Revision ID: f3c8d16a2b95
+Revises: e7a2c95b1f04
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c8d16a2b95'
+down_revision = 'e7a2c95b1f04'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return None
+    return column in {info['name'] for info in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    # Bancos novos já recebem a coluna e o índice pelo create_all
+    has_column = _has_column('transactions', 'import_hash')
+    if has_column is None:
+        return
+
+    if has_column is False:
+        op.add_column('transactions', sa.Column('import_hash', sa.String(64), nullable=True))
+    op.create_index(
+        'ux_transactions_user_import_hash', 'transactions', ['user_id', 'import_hash'],
+        unique=True, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_transactions_user_import_hash', table_name='transactions', if_exists=True)
+    if _has_column('transactions', 'import_hash'):
+        op.drop_column('transactions', 'import_hash')
@@ -11,11 +11,11 @@ import subprocess
 import argparse
 from pathlib import Path
 
-def run_desktop():
-    """Executa a versão desktop do DevFlow"""
+def run_desktop(profile=False):
+    """Executa a versão desktop do DevFlow (profile: mede a inicialização até a tela de login e sai)"""
     print("🖥️  Iniciando DevFlow - Versão Desktop...")
     try:
-        subprocess.run([sys.executable, "main.py"], check=True)
+        subprocess.run([sys.executable, "main.py"] + (["--profile-startup"] if profile else []), check=True)
     except KeyboardInterrupt:
         print("\n👋 DevFlow Desktop encerrado pelo usuário")
     except Exception as e:
@@ -44,6 +44,367 @@ def run_web():
     except Exception as e:
         print(f"❌ Erro ao executar DevFlow Web: {e}")
 
+def run_rollups(verify_only=False):
+    """Reconstrói ou verifica as tabelas de rollup de transações e tempo"""
+    from src.database.connection import db_manager
+    from src.services.rollups import rollup_service
+    
+    db_manager.create_tables()
+    
+    if not verify_only:
+        print("🔄 Reconstruindo rollups...")
+        counts = rollup_service.rebuild()
+        print(f"✅ {counts['transactions']} linhas de transações e {counts['time_entries']} linhas de tempo")
+    
+    print("🔎 Verificando rollups...")
+    mismatches = rollup_service.verify()
+    if not mismatches:
+        print("✅ Rollups consistentes com as tabelas de origem")
+        return True
+    
+    for mismatch in mismatches[:20]:
+        print(f"   ❌ {mismatch['table']} {mismatch['key']}: esperado {mismatch['expected']}, armazenado {mismatch['stored']}")
+    print(f"❌ {len(mismatches)} divergências encontradas")
+    print("💡 Execute: python run_devflow.py --rebuild-rollups")
+    return False
+
+def run_schema_upgrade():
+    """Confere a revisão do banco ignorando o cache local e aplica as migrações pendentes"""
+    from src.database.connection import db_manager
+    from src.database.schema import code_head
+    
+    print(f"🗄️  Conferindo o esquema (head do código: {code_head()})...")
+    try:
+        db_manager.run_migrations(force=True)
+    except Exception as e:
+        print(f"❌ Erro ao migrar o banco: {e}")
+        return False
+    
+    print("✅ Banco na revisão head")
+    return True
+
+def run_index_check(username=None):
+    """Verifica com EXPLAIN se as consultas principais usam índices (com os ids do usuário informado)"""
+    from src.database.connection import db_manager
+    from src.database.models import User
+    from src.database.index_check import check_indexes
+    
+    user_id = None
+    if username:
+        session = db_manager.get_session()
+        try:
+            user = session.query(User).filter(User.username == username).first()
+        finally:
+            session.close()
+        
+        if not user:
+            print(f"❌ Usuário não encontrado: {username}")
+            return False
+        user_id = user.id
+    
+    print("🔎 Verificando planos das consultas principais...")
+    try:
+        failures = check_indexes(db_manager.engine, user_id)
+    except Exception as e:
+        print(f"❌ Erro ao verificar índices: {e}")
+        return False
+    
+    if not failures:
+        print("✅ Todas as consultas usam índices")
+        return True
+    
+    for name, tables in failures.items():
+        print(f"   ❌ {name}: Seq Scan em {', '.join(tables)}")
+    print("💡 Execute: alembic upgrade head")
+    return False
+
+def run_batch_invoices(username, month=None):
+    """Gera as faturas de todos os projetos com horas no mês (padrão: mês anterior)"""
+    from datetime import date
+    from src.database.connection import db_manager
+    from src.database.models import User
+    from src.services.listings import month_range
+    from src.services.batch_invoices import batch_invoice_service
+    
+    if not username:
+        print("❌ Informe o usuário: --user USUARIO")
+        return False
+    
+    if month:
+        try:
+            year, month_number = (int(part) for part in month.split('-'))
+            start, end = month_range(year, month_number)
+        except ValueError:
+            print("❌ Mês inválido. Use o formato AAAA-MM")
+            return False
+    else:
+        today = date.today()
+        start, end = month_range(today.year - (today.month == 1), (today.month - 2) % 12 + 1)
+    
+    session = db_manager.get_session()
+    try:
+        user = session.query(User).filter(User.username == username).first()
+    finally:
+        session.close()
+    
+    if not user:
+        print(f"❌ Usuário não encontrado: {username}")
+        return False
+    
+    print(f"🧾 Gerando faturas de {start.strftime('%d/%m/%Y')} a {end.strftime('%d/%m/%Y')}...")
+    result = batch_invoice_service.generate(
+        user.id, start, end,
+        progress=lambda done, total: print(f"   {done}/{total} faturas", end="\r", flush=True)
+    )
+    print()
+    
+    print(f"✅ {len(result.invoices) - len(result.failed)} faturas geradas em {result.folder}")
+    for entry in result.failed:
+        print(f"   ❌ {entry['project']}: {entry['error']}")
+    print(f"📋 Manifesto: {result.manifest_path}")
+    return not result.failed
+
+def run_replica_sync(username):
+    """Sincroniza uma vez a réplica local do usuário com o banco remoto"""
+    from src.database.connection import db_manager
+    from src.database.models import User
+    from src.services.replica_sync import replica_sync_service
+    
+    if not username:
+        print("❌ Informe o usuário: --user USUARIO")
+        return False
+    
+    replica = db_manager.enable_replica()
+    print(f"🔄 Sincronizando a réplica {replica.path}...")
+    try:
+        if not replica_sync_service.pull_user(username):
+            print(f"❌ Usuário não encontrado: {username}")
+            return False
+        
+        session = db_manager.get_session()
+        try:
+            user_id = session.query(User.id).filter(User.username == username).scalar()
+        finally:
+            session.close()
+        
+        result = replica_sync_service.sync(user_id)
+    except Exception as e:
+        print(f"❌ Erro ao sincronizar: {e}")
+        return False
+    
+    print(f"✅ {result.pushed} alterações enviadas, {result.pulled} linhas recebidas, {result.deleted} removidas")
+    if result.conflicts:
+        print(f"⚠️  {result.conflicts} conflitos: o banco remoto prevaleceu (versões locais em replica_conflicts)")
+    if result.failed:
+        print(f"❌ {result.failed} alterações não puderam ser enviadas (ficam pendentes)")
+    return not result.failed
+
+def run_write_queue(retry_failed=False):
+    """Aplica as gravações pendentes da fila local da versão desktop e lista as que falharam"""
+    from config import config
+    from src.database.connection import db_manager
+    from src.services.write_behind import write_queue
+    
+    # Com a réplica ativa, a interface grava nela (ids locais ainda não enviados só existem lá)
+    if config.LOCAL_REPLICA:
+        db_manager.enable_replica()
+    
+    if retry_failed:
+        print(f"🔁 {write_queue.retry_failed()} gravações com erro devolvidas à fila")
+    
+    counts = write_queue.outbox.counts()
+    print(f"💾 Fila local {write_queue.outbox.path}: {counts['pending']} pendentes, {counts['failed']} com erro")
+    try:
+        applied = write_queue.flush()
+    except Exception as e:
+        print(f"❌ Banco indisponível, gravações mantidas na fila: {e}")
+        return False
+    print(f"✅ {applied} gravações aplicadas")
+    
+    failures = write_queue.outbox.failures()
+    for failure in failures:
+        print(f"   ❌ {failure['operation']} {failure['table_name']} {failure['row_id'] or ''}: {failure['last_error']}")
+    if failures:
+        print("💡 Corrija o problema e execute: python run_devflow.py --flush-writes --retry-failed")
+    return not failures
+
+def run_statement_import(filename, username):
+    """Importa um extrato bancário (CSV ou OFX) para as transações do usuário"""
+    import time
+    from src.database.connection import db_manager
+    from src.database.models import User
+    from src.services.statement_import import statement_import_service
+    
+    if not username:
+        print("❌ Informe o usuário: --user USUARIO")
+        return False
+    
+    if not Path(filename).is_file():
+        print(f"❌ Arquivo não encontrado: {filename}")
+        return False
+    
+    session = db_manager.get_remote_session()
+    try:
+        user = session.query(User).filter(User.username == username).first()
+    finally:
+        session.close()
+    
+    if not user:
+        print(f"❌ Usuário não encontrado: {username}")
+        return False
+    
+    print(f"📥 Importando {filename}...")
+    started = time.perf_counter()
+    try:
+        result = statement_import_service.import_file(
+            user.id, filename,
+            progress=lambda read, inserted: print(f"   {read} linhas lidas, {inserted} inseridas", end="\r", flush=True)
+        )
+    except Exception as e:
+        print(f"\n❌ Erro ao importar extrato: {e}")
+        return False
+    print()
+    
+    print(f"✅ {result.inserted} transações importadas em {time.perf_counter() - started:.1f}s, "
+          f"{result.duplicates} já existentes ignoradas")
+    if result.invalid:
+        print(f"⚠️  {result.invalid} linhas inválidas:")
+        for error in result.errors:
+            print(f"   {error}")
+    return True
+
+def run_time_entry_import(filename, username, date_format=None):
+    """Importa as entradas de tempo de um CSV exportado do Toggl ou do Clockify"""
+    import time
+    from src.database.connection import db_manager
+    from src.database.models import User
+    from src.services.time_entry_import import time_entry_import_service
+    
+    if not username:
+        print("❌ Informe o usuário: --user USUARIO")
+        return False
+    
+    if not Path(filename).is_file():
+        print(f"❌ Arquivo não encontrado: {filename}")
+        return False
+    
+    session = db_manager.get_remote_session()
+    try:
+        user = session.query(User).filter(User.username == username).first()
+    finally:
+        session.close()
+    
+    if not user:
+        print(f"❌ Usuário não encontrado: {username}")
+        return False
+    
+    print(f"📥 Importando {filename}...")
+    started = time.perf_counter()
+    try:
+        result = time_entry_import_service.import_file(
+            user.id, filename, date_format=date_format,
+            progress=lambda read, inserted: print(f"   {read} linhas lidas, {inserted} inseridas", end="\r", flush=True)
+        )
+    except Exception as e:
+        print(f"\n❌ Erro ao importar entradas: {e}")
+        return False
+    print()
+    
+    print(f"✅ {result.inserted} entradas importadas em {time.perf_counter() - started:.1f}s, "
+          f"{result.duplicates} já existentes ignoradas, {result.created} projetos criados")
+    if result.invalid:
+        print(f"⚠️  {result.invalid} linhas inválidas:")
+        for error in result.errors:
+            print(f"   {error}")
+    return True
+
+def run_data_export(dataset, filename, username, start=None, end=None):
+    """Exporta transações, registros de tempo ou tarefas para CSV, Parquet ou XLSX (pela extensão)"""
+    import time
+    from datetime import datetime
+    from src.database.connection import db_manager
+    from src.database.models import User
+    from src.services.data_export import data_export_service
+    
+    if not username:
+        print("❌ Informe o usuário: --user USUARIO")
+        return False
+    
+    try:
+        start_date = datetime.strptime(start, '%Y-%m-%d') if start else None
+        end_date = datetime.strptime(end, '%Y-%m-%d') if end else None
+    except ValueError:
+        print("❌ Data inválida. Use o formato AAAA-MM-DD")
+        return False
+    if (start_date is None) != (end_date is None):
+        print("❌ Informe o período completo: --start AAAA-MM-DD --end AAAA-MM-DD")
+        return False
+    
+    session = db_manager.get_session()
+    try:
+        user = session.query(User).filter(User.username == username).first()
+    finally:
+        session.close()
+    
+    if not user:
+        print(f"❌ Usuário não encontrado: {username}")
+        return False
+    
+    print(f"📤 Exportando {dataset} para {filename}...")
+    started = time.perf_counter()
+    try:
+        result = data_export_service.export(
+            filename, dataset, user.id, start_date, end_date,
+            progress=lambda done, total: print(f"   {done}/{total} linhas", end="\r", flush=True)
+        )
+    except Exception as e:
+        print(f"\n❌ Erro ao exportar: {e}")
+        return False
+    print()
+    
+    print(f"✅ {result.rows} linhas exportadas em {time.perf_counter() - started:.1f}s: {result.filename}")
+    return True
+
+def run_pool_probe(checkouts=200):
+    """Mede o pool com a configuração atual: aquecimento e checkouts concorrentes de SELECT 1"""
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import text
+    from config import config
+    from src.database.connection import db_manager
+    from src.database.pool_metrics import pool_limits
+    
+    pool_size, max_overflow = pool_limits(db_manager.pool_engines)
+    workers = max(pool_size + max_overflow, 1)
+    print(f"🔌 Pool: size={pool_size} overflow={max_overflow} "
+          f"recycle={config.DB_POOL_RECYCLE}s pre_ping={config.DB_POOL_PRE_PING} warmup={config.DB_POOL_WARMUP}")
+    
+    def _select(_):
+        with db_manager.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    
+    try:
+        warmed = db_manager.warm_up()
+        print(f"   Aquecimento: {warmed} conexões")
+        db_manager.pool_metrics.reset()
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_select, range(checkouts)))
+    except Exception as e:
+        print(f"❌ Erro ao medir o pool: {e}")
+        return False
+    
+    stats = db_manager.pool_stats()
+    print(f"\n   {checkouts} checkouts com {workers} threads")
+    print(f"   Latência (ms): média {stats['checkout_ms_avg']:.1f}  p50 ≤{stats['checkout_ms_p50']}  "
+          f"p95 ≤{stats['checkout_ms_p95']}  p99 ≤{stats['checkout_ms_p99']}  máx {stats['checkout_ms_max']:.1f}")
+    for label, count in db_manager.pool_metrics.histogram().items():
+        if count:
+            print(f"   {label:>12}: {count}")
+    print(f"   Overflow: {stats['overflow_checkouts']} checkouts, pico de {stats['peak_overflow']} conexões extras")
+    print(f"   Conexões abertas: {stats['connections_opened']}  reconexões: {stats['reconnects']}  "
+          f"invalidações: {stats['invalidations']}  falhas: {stats['failed_checkouts']}")
+    return True
+
 def check_dependencies():
     """Verifica se as dependências estão instaladas"""
     try:
@@ -71,12 +432,41 @@ Exemplos de uso:
   python run_devflow.py --desktop    # Executa versão desktop
   python run_devflow.py --web        # Executa versão web
   python run_devflow.py --install    # Instala dependências
+  python run_devflow.py --rebuild-rollups  # Reconstrói os rollups
+  python run_devflow.py --verify-rollups   # Verifica os rollups
+  python run_devflow.py --check-indexes    # Verifica o uso de índices (PostgreSQL)
+  python run_devflow.py --migrate          # Confere a revisão do banco e aplica as migrações
+  python run_devflow.py --batch-invoices 2025-09 --user joao  # Faturas de todos os projetos do mês
+  python run_devflow.py --pool-stats       # Mede a latência do pool de conexões
+  python run_devflow.py --sync-replica --user joao  # Sincroniza a réplica local uma vez
+  python run_devflow.py --flush-writes     # Aplica a fila local de gravações e lista as falhas
+  python run_devflow.py --import-statement extrato.ofx --user joao  # Importa um extrato (CSV ou OFX)
+  python run_devflow.py --import-time-entries toggl.csv --user joao  # Importa horas do Toggl/Clockify
+  python run_devflow.py --export time_entries horas.parquet --user joao  # Exporta dados (CSV, Parquet ou XLSX)
+  python run_devflow.py --profile-startup  # Tempo de importação e de cada fase até a tela de login
         """
     )
     
     parser.add_argument('--desktop', action='store_true', help='Executa a versão desktop')
     parser.add_argument('--web', action='store_true', help='Executa a versão web')
     parser.add_argument('--install', action='store_true', help='Instala dependências')
+    parser.add_argument('--rebuild-rollups', action='store_true', help='Reconstrói as tabelas de rollup')
+    parser.add_argument('--verify-rollups', action='store_true', help='Verifica as tabelas de rollup')
+    parser.add_argument('--migrate', action='store_true', help='Confere a revisão do banco (sem o cache local) e aplica as migrações')
+    parser.add_argument('--check-indexes', action='store_true', help='Verifica com EXPLAIN se as consultas usam índices')
+    parser.add_argument('--batch-invoices', nargs='?', const='', metavar='AAAA-MM', help='Gera as faturas de todos os projetos do mês (padrão: mês anterior)')
+    parser.add_argument('--user', metavar='USUARIO', help='Usuário das faturas em lote, da réplica, da importação, da exportação ou da verificação de índices')
+    parser.add_argument('--sync-replica', action='store_true', help='Sincroniza a réplica local com o banco remoto')
+    parser.add_argument('--flush-writes', action='store_true', help='Aplica as gravações pendentes da fila local')
+    parser.add_argument('--retry-failed', action='store_true', help='Com --flush-writes, tenta de novo as gravações com erro')
+    parser.add_argument('--import-statement', metavar='ARQUIVO', help='Importa um extrato bancário (CSV ou OFX) para as transações')
+    parser.add_argument('--import-time-entries', metavar='ARQUIVO', help='Importa entradas de tempo de um CSV do Toggl ou do Clockify')
+    parser.add_argument('--date-format', metavar='FORMATO', help="Com --import-time-entries, formato das datas (ex.: '%%m/%%d/%%Y')")
+    parser.add_argument('--export', nargs=2, metavar=('DADOS', 'ARQUIVO'), help='Exporta transactions, time_entries ou tasks (formato pela extensão: .csv, .parquet ou .xlsx)')
+    parser.add_argument('--start', metavar='AAAA-MM-DD', help='Com --export, início do período (inclusivo)')
+    parser.add_argument('--end', metavar='AAAA-MM-DD', help='Com --export, fim do período (inclusivo)')
+    parser.add_argument('--profile-startup', action='store_true', help='Mede a inicialização da versão desktop')
+    parser.add_argument('--pool-stats', nargs='?', type=int, const=200, metavar='CHECKOUTS', help='Mede o pool de conexões com checkouts concorrentes')
     
     args = parser.parse_args()
     
@@ -100,16 +490,76 @@ Exemplos de uso:
             print(f"❌ Erro ao instalar dependências: {e}")
         return
     
+    # Manutenção dos rollups
+    if args.rebuild_rollups or args.verify_rollups:
+        if not run_rollups(verify_only=not args.rebuild_rollups):
+            sys.exit(1)
+        return
+    
+    # Migrações do esquema
+    if args.migrate:
+        if not run_schema_upgrade():
+            sys.exit(1)
+        return
+    
+    # Verificação de índices
+    if args.check_indexes:
+        if not run_index_check(args.user):
+            sys.exit(1)
+        return
+    
+    # Faturas em lote
+    if args.batch_invoices is not None:
+        if not run_batch_invoices(args.user, args.batch_invoices or None):
+            sys.exit(1)
+        return
+    
+    # Sincronização da réplica local
+    if args.sync_replica:
+        if not run_replica_sync(args.user):
+            sys.exit(1)
+        return
+    
+    # Fila local de gravações
+    if args.flush_writes:
+        if not run_write_queue(retry_failed=args.retry_failed):
+            sys.exit(1)
+        return
+    
+    # Importação de extrato bancário
+    if args.import_statement:
+        if not run_statement_import(args.import_statement, args.user):
+            sys.exit(1)
+        return
+    
+    # Importação de entradas de tempo
+    if args.import_time_entries:
+        if not run_time_entry_import(args.import_time_entries, args.user, args.date_format):
+            sys.exit(1)
+        return
+    
+    # Exportação de dados
+    if args.export:
+        if not run_data_export(args.export[0], args.export[1], args.user, args.start, args.end):
+            sys.exit(1)
+        return
+    
+    # Medição do pool de conexões
+    if args.pool_stats is not None:
+        if not run_pool_probe(args.pool_stats):
+            sys.exit(1)
+        return
+    
     # Verifica dependências
     desktop_ok, web_ok = check_dependencies()
     
     # Execução direta via argumentos
-    if args.desktop:
+    if args.desktop or args.profile_startup:
         if not desktop_ok:
             print("❌ Dependências da versão desktop não encontradas.")
             print("💡 Execute: python run_devflow.py --install")
             sys.exit(1)
-        run_desktop()
+        run_desktop(profile=args.profile_startup)
         return
     
     if args.web:
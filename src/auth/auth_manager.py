@@ -80,14 +80,25 @@ class AuthManager:
         finally:
             session.close()
     
+    @staticmethod
+    def _find_user(session, username: str) -> Optional[User]:
+        """Busca um usuário ativo pelo nome de usuário ou e-mail"""
+        return session.query(User).filter(
+            (User.username == username) | (User.email == username)
+        ).filter(User.is_active == True).first()
+    
     def login(self, username: str, password: str) -> Optional[str]:
         """Autentica usuário e retorna token JWT"""
         session = db_manager.get_session()
         try:
             # Busca usuário
-            user = session.query(User).filter(
-                (User.username == username) | (User.email == username)
-            ).filter(User.is_active == True).first()
+            user = self._find_user(session, username)
+            
+            if not user and db_manager.replica is not None:
+                # Primeiro login nesta máquina: copia o usuário do banco remoto para a réplica
+                from ..services.replica_sync import replica_sync_service
+                if replica_sync_service.pull_user(username):
+                    user = self._find_user(session, username)
             
             if not user:
                 self.logger.warning(f"Tentativa de login com usuário inexistente: {username}")
@@ -121,30 +132,33 @@ class AuthManager:
         """Retorna o usuário atualmente logado"""
         return self.current_user
     
-    def load_user_from_token(self, token: str) -> bool:
-        """Carrega usuário a partir de um token válido"""
+    def user_from_token(self, token: str) -> Optional[User]:
+        """Retorna o usuário de um token válido sem alterar o usuário atual (seguro entre sessões)"""
         user_id = self.verify_token(token)
         if not user_id:
-            return False
+            return None
         
         session = db_manager.get_session()
         try:
-            user = session.query(User).filter(
+            return session.query(User).filter(
                 User.id == user_id,
                 User.is_active == True
             ).first()
             
-            if user:
-                self.current_user = user
-                return True
-            return False
-            
         except Exception as e:
             self.logger.error(f"Erro ao carregar usuário do token: {e}")
-            return False
+            return None
         finally:
             session.close()
     
+    def load_user_from_token(self, token: str) -> bool:
+        """Carrega usuário a partir de um token válido"""
+        user = self.user_from_token(token)
+        if user:
+            self.current_user = user
+            return True
+        return False
+    
     def is_authenticated(self) -> bool:
         """Verifica se há um usuário autenticado"""
         return self.current_user is not None
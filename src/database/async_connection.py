@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import threading
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from config import config
+from .pool_metrics import PoolMetrics, pool_options
+
+# Driver assíncrono equivalente a cada backend da DATABASE_URL
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+def async_database_url(url):
+    """Converte a DATABASE_URL síncrona para o driver assíncrono; retorna (url, connect_args)"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {backend}")
+
+    connect_args = {}
+    query = dict(url.query)
+    if backend == 'postgresql':
+        # O asyncpg não aceita os parâmetros da libpq na URL (Neon usa sslmode e channel_binding)
+        sslmode = query.pop('sslmode', None)
+        query.pop('channel_binding', None)
+        if sslmode:
+            connect_args['ssl'] = sslmode
+
+    return url.set(drivername=ASYNC_DRIVERS[backend], query=query), connect_args
+
+class AsyncDatabaseManager:
+    """Engine assíncrono com um event loop próprio em uma thread, para consultas concorrentes"""
+
+    def __init__(self, database_url=None):
+        self.logger = logging.getLogger('devflow.database.async')
+        self.database_url = database_url or config.DATABASE_URL
+        self.engine = None
+        self.SessionLocal = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.pool_metrics = PoolMetrics()
+        self.pool_engines = 2  # Sempre roda ao lado do engine síncrono: os dois dividem DB_MAX_CONNECTIONS
+
+    def _initialize_engine(self):
+        """Cria o engine assíncrono (as conexões só são abertas dentro do loop)"""
+        url, connect_args = async_database_url(self.database_url)
+        self.engine = create_async_engine(
+            url,
+            echo=False,
+            connect_args=connect_args,
+            **pool_options(self.database_url, is_async=True, engines=self.pool_engines)
+        )
+        self.pool_metrics.attach(self.engine.sync_engine)
+        self.SessionLocal = async_sessionmaker(self.engine, expire_on_commit=False, autoflush=False)
+        self.logger.info(f"Engine assíncrono inicializado ({url.drivername})")
+
+    def _ensure_started(self):
+        """Inicia o loop e o engine no primeiro uso; as conexões do pool ficam presas a este loop"""
+        with self._lock:
+            if self._loop is None:
+                self._initialize_engine()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='devflow-async-db', daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def get_session(self):
+        """Retorna uma nova AsyncSession (uma por consulta concorrente)"""
+        self._ensure_started()
+        return self.SessionLocal()
+
+    def run(self, coroutine, timeout=None):
+        """Executa uma coroutine no loop do gerenciador e espera o resultado (seguro entre threads)"""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
+
+    def gather(self, *coroutines, timeout=None):
+        """Executa as coroutines concorrentemente e retorna os resultados na mesma ordem"""
+        async def _gather():
+            return await asyncio.gather(*coroutines)
+        return self.run(_gather(), timeout)
+
+    def dispose(self):
+        """Fecha as conexões do pool e encerra o loop"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self.engine.dispose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+        self.engine = self.SessionLocal = None
+
+# Instância global do gerenciador assíncrono (engine criado no primeiro uso)
+async_db_manager = AsyncDatabaseManager()
@@ -0,0 +1,101 @@
+import enum
+import io
+from datetime import datetime, date
+from sqlalchemy import insert, select, table, column, text, tuple_
+
+def _copy_value(value):
+    """Valor no formato CSV do COPY: NULL sem aspas, o resto entre aspas"""
+    if value is None:
+        return ''
+    if isinstance(value, enum.Enum):
+        # O tipo Enum do SQLAlchemy grava o nome do membro
+        value = value.name
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _copy_insert(connection, target, rows, columns, conflict_columns, returning):
+    """PostgreSQL/psycopg2: COPY para uma tabela temporária e INSERT ... SELECT no destino"""
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    staging_name = f"{target.name}_bulk"
+    connection.execute(text(
+        f"CREATE TEMP TABLE {staging_name} ON COMMIT DROP AS "
+        f"SELECT {', '.join(columns)} FROM {target.name} WITH NO DATA"
+    ))
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_value(row[name]) for name in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {staging_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    staging = table(staging_name, *[column(name) for name in columns])
+    statement = pg_insert(target).from_select(columns, select(*staging.c))
+    if conflict_columns:
+        statement = statement.on_conflict_do_nothing(index_elements=list(conflict_columns))
+    if returning:
+        statement = statement.returning(*[target.c[name] for name in returning])
+
+    result = connection.execute(statement)
+    inserted = result.all() if returning else []
+    connection.execute(text(f"DROP TABLE {staging_name}"))
+    return inserted
+
+def _executemany_insert(connection, target, rows, conflict_columns, returning):
+    """SQLite: executemany (o SQLAlchemy agrupa as linhas em INSERTs de vários VALUES)"""
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+    statement = sqlite_insert(target)
+    if conflict_columns:
+        statement = statement.on_conflict_do_nothing(index_elements=list(conflict_columns))
+    if returning:
+        statement = statement.returning(*[target.c[name] for name in returning])
+        return connection.execute(statement, rows).all()
+
+    connection.execute(statement, rows)
+    return []
+
+def _generic_insert(connection, target, rows, conflict_columns, returning):
+    """Outros bancos: descarta as chaves já existentes antes do executemany"""
+    if conflict_columns:
+        keys = [target.c[name] for name in conflict_columns]
+        existing = set(connection.execute(
+            select(*keys).where(tuple_(*keys).in_([tuple(row[name] for name in conflict_columns) for row in rows]))
+        ).all())
+
+        unique_rows = []
+        for row in rows:
+            key = tuple(row[name] for name in conflict_columns)
+            if key not in existing:
+                existing.add(key)
+                unique_rows.append(row)
+        rows = unique_rows
+
+    if rows:
+        connection.execute(insert(target), rows)
+    return [tuple(row[name] for name in returning) for row in rows] if returning else []
+
+def bulk_insert(connection, target, rows, conflict_columns=None, returning=()):
+    """Insere as linhas (dicts com as mesmas chaves) na transação da conexão
+
+    Com conflict_columns, linhas que violariam esse índice único são ignoradas.
+    Retorna as colunas de returning das linhas efetivamente inseridas.
+    """
+    if not rows:
+        return []
+
+    dialect = connection.dialect
+    if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+        return _copy_insert(connection, target, rows, list(rows[0].keys()), conflict_columns, returning)
+    if dialect.name == 'sqlite':
+        return _executemany_insert(connection, target, rows, conflict_columns, returning)
+    return _generic_insert(connection, target, rows, conflict_columns, returning)
@@ -1,8 +1,13 @@
 import logging
-from sqlalchemy import create_engine, text
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, text, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 from config import config
+from .query_cache import QueryCache, statement_tables, written_tables, freeze
+from .pool_metrics import PoolMetrics, pool_options, pool_limits
 
 # Base para os modelos
 Base = declarative_base()
@@ -12,31 +17,110 @@ class DatabaseManager:
     
     def __init__(self):
         self.logger = logging.getLogger('devflow.database')
-        self.engine = None
-        self.SessionLocal = None
-        self._initialize_engine()
+        self._engine = None
+        self._session_local = None
+        self._engine_lock = threading.Lock()
+        self.query_cache = QueryCache(max_entries=config.QUERY_CACHE_SIZE, ttl=config.QUERY_CACHE_TTL)
+        self.pool_metrics = PoolMetrics()
+        self.replica = None  # Réplica local (LocalReplica) quando o modo offline-first está ativo
+        self.pool_engines = 1  # Engines do processo que dividem DB_MAX_CONNECTIONS (2 na versão web)
+    
+    @property
+    def engine(self):
+        """Engine do SQLAlchemy, criado no primeiro uso (importar o módulo não cria conexões nem pool)"""
+        if self._engine is None:
+            self._initialize_engine()
+        return self._engine
+    
+    @property
+    def SessionLocal(self):
+        if self._session_local is None:
+            self._initialize_engine()
+        return self._session_local
     
     def _initialize_engine(self):
         """Inicializa o engine do SQLAlchemy"""
-        try:
-            self.engine = create_engine(
-                config.DATABASE_URL,
-                echo=False,  # Set to True for SQL debugging
-                pool_pre_ping=True,
-                pool_recycle=300
-            )
-            
-            self.SessionLocal = sessionmaker(
-                autocommit=False,
-                autoflush=False,
-                bind=self.engine
-            )
-            
-            self.logger.info("Engine do banco de dados inicializado com sucesso")
+        with self._engine_lock:
+            if self._engine is not None:
+                return
             
-        except Exception as e:
-            self.logger.error(f"Erro ao inicializar engine do banco: {e}")
-            raise
+            try:
+                engine = create_engine(
+                    config.DATABASE_URL,
+                    echo=False,  # Set to True for SQL debugging
+                    **pool_options(config.DATABASE_URL, engines=self.pool_engines)
+                )
+                
+                self._register_cache_events(engine)
+                self.pool_metrics.attach(engine)
+                
+                self._session_local = sessionmaker(
+                    autocommit=False,
+                    autoflush=False,
+                    bind=engine
+                )
+                self._engine = engine
+                
+                self.logger.info("Engine do banco de dados inicializado com sucesso")
+                
+            except Exception as e:
+                self.logger.error(f"Erro ao inicializar engine do banco: {e}")
+                raise
+    
+    def _register_cache_events(self, engine):
+        """Registra os eventos que invalidam o cache de consultas após cada commit"""
+        @event.listens_for(engine, "after_cursor_execute")
+        def _track_writes(conn, cursor, statement, parameters, context, executemany):
+            tables = written_tables(statement, context)
+            if tables:
+                conn.info.setdefault('devflow_written_tables', set()).update(tables)
+        
+        @event.listens_for(engine, "commit")
+        def _invalidate_on_commit(conn):
+            tables = conn.info.pop('devflow_written_tables', None)
+            if tables:
+                self.query_cache.invalidate_tables(tables)
+                conn.info['devflow_committed_tables'] = tables
+        
+        @event.listens_for(engine, "rollback")
+        def _discard_on_rollback(conn):
+            conn.info.pop('devflow_written_tables', None)
+        
+        # O evento de commit dispara antes do COMMIT no banco; uma leitura concorrente nesse
+        # intervalo ainda veria os dados antigos, então invalida de novo ao devolver a conexão
+        @event.listens_for(engine, "checkin")
+        def _invalidate_on_checkin(dbapi_connection, connection_record):
+            tables = connection_record.info.pop('devflow_committed_tables', None)
+            if tables:
+                self.query_cache.invalidate_tables(tables)
+    
+    def _cached(self, compiled, bind, loader, ttl=None):
+        """Retorna o resultado em cache ou executa o loader e armazena o resultado"""
+        key = (id(bind), QueryCache.make_key(compiled))
+        found, result = self.query_cache.get(key)
+        if found:
+            return result
+        
+        # Um commit nas tabelas durante o loader torna o resultado possivelmente antigo: não é guardado
+        tables = statement_tables(compiled)
+        generation = self.query_cache.generation(tables)
+        result = loader()
+        self.query_cache.set(key, result, tables, ttl, generation=generation)
+        return result
+    
+    def cached_all(self, query, ttl=None):
+        """Executa query.all() de uma consulta ORM usando o cache de resultados"""
+        bind = query.session.get_bind()
+        compiled = query.statement.compile(dialect=bind.dialect)
+        # O resultado é compartilhado entre chamadas e threads: guarda cópias somente leitura
+        # (colunas e relacionamentos carregados), não os objetos presos à sessão que será fechada
+        return self._cached(compiled, bind, lambda: list(freeze(query.all())), ttl)
+    
+    def cached_execute(self, session, statement, ttl=None):
+        """Executa um SELECT e retorna as linhas usando o cache de resultados"""
+        bind = session.get_bind()
+        compiled = statement.compile(dialect=bind.dialect)
+        return self._cached(compiled, bind, lambda: session.execute(statement).all(), ttl)
     
     def test_connection(self):
         """Testa a conexão com o banco de dados"""
@@ -49,8 +133,60 @@ class DatabaseManager:
             self.logger.error(f"Erro na conexão com banco de dados: {e}")
             return False
     
+    def warm_up(self, connections=None):
+        """Abre conexões em paralelo e as devolve ao pool, para as primeiras consultas não pagarem o connect"""
+        connections = config.DB_POOL_WARMUP if connections is None else connections
+        if connections <= 0 or not isinstance(self.engine.pool, QueuePool):
+            return 0
+        
+        # Conexões além do pool_size seriam fechadas ao voltar para o pool
+        connections = min(connections, self.engine.pool.size())
+        
+        def _open(_):
+            connection = self.engine.connect()
+            connection.execute(text("SELECT 1"))
+            return connection
+        
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            opened = list(executor.map(_open, range(connections)))
+        for connection in opened:
+            connection.close()
+        
+        self.logger.info(f"Pool aquecido com {connections} conexões")
+        return connections
+    
+    def pool_stats(self):
+        """Estado atual do pool e métricas acumuladas de checkout, overflow, invalidações e reconexões"""
+        pool = self.engine.pool
+        stats = {'pool_class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            stats.update(
+                pool_size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool_limits(self.pool_engines)[1]
+            )
+        stats.update(self.pool_metrics.stats())
+        return stats
+    
+    def enable_replica(self, path=None):
+        """Passa a atender get_session() com a réplica local em SQLite (modo offline-first do desktop)"""
+        from .replica import LocalReplica
+        
+        replica = LocalReplica(config.DATABASE_URL, path).open()
+        self._register_cache_events(replica.engine)
+        self.replica = replica
+        return replica
+    
     def get_session(self):
-        """Retorna uma nova sessão do banco de dados"""
+        """Retorna uma nova sessão do banco de dados (da réplica local, se ativada)"""
+        if self.replica is not None:
+            return self.replica.get_session()
+        return self.SessionLocal()
+    
+    def get_remote_session(self):
+        """Retorna uma sessão do banco remoto, mesmo com a réplica ativada"""
         return self.SessionLocal()
     
     def create_tables(self):
@@ -64,13 +200,18 @@ class DatabaseManager:
             self.logger.error(f"Erro ao criar tabelas: {e}")
             raise
     
-    def run_migrations(self):
-        """Executa migrações do banco de dados"""
+    def run_migrations(self, force=False):
+        """Atualiza o esquema com o Alembic só quando a revisão do banco difere do head do código"""
+        # Importado só pelo efeito: define as classes dos modelos, que registram suas tabelas em
+        # Base.metadata; sem isso o create_all do ensure_schema não teria tabelas a criar
+        from . import models  # noqa: F401
+        from .schema import ensure_schema
+        
         try:
-            # Por enquanto, apenas cria as tabelas
-            # Em uma versão futura, pode usar Alembic para migrações mais complexas
-            self.create_tables()
-            self.logger.info("Migrações executadas com sucesso")
+            # Com a revisão em cache (chaveada pelo head), a inicialização não consulta o esquema
+            upgraded_from = ensure_schema(self.engine, Base.metadata, force=force)
+            if upgraded_from:
+                self.logger.info(f"Migrações executadas com sucesso (a partir de {upgraded_from})")
             
         except Exception as e:
             self.logger.error(f"Erro ao executar migrações: {e}")
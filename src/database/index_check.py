@@ -0,0 +1,138 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, text
+from .models import (
+    User, Transaction, TimeEntry, Task, Board, BoardColumn, Project, TransactionType, ProjectStatus
+)
+
+logger = logging.getLogger('devflow.database.index_check')
+
+def hot_queries(user_id, project_id=0, column_id=0, board_id=0, now=None):
+    """Consultas mais frequentes da aplicação, que devem usar índices
+
+    Além das consultas diretas, inclui os SELECTs reais dos serviços: leituras dos rollups,
+    páginas das listagens por keyset (date, id) e o pull de deltas da réplica local.
+    """
+    # Importados aqui: os serviços dependem do pacote de banco de dados
+    from ..services.dashboard_stats import DashboardStatsService
+    from ..services.listings import ListingService
+    from ..services.rollups import RollupService
+    from ..services.time_stats import TimeStats, TimeStatsService
+    from .replica import pull_statement
+
+    period_end = now or datetime.now()
+    period_start = period_end - timedelta(days=30)
+    dashboard = DashboardStatsService()
+    listings = ListingService()
+
+    return {
+        "Somas de transações por tipo e período": select(
+            func.sum(Transaction.amount)
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.type == TransactionType.RECEITA,
+            Transaction.date.between(period_start, period_end)
+        ),
+        "Transações recentes": select(Transaction).where(
+            Transaction.user_id == user_id
+        ).order_by(Transaction.date.desc()).limit(20),
+        "Transações do projeto no período": select(Transaction).where(
+            Transaction.project_id == project_id,
+            Transaction.date.between(period_start, period_end)
+        ),
+        "Horas do usuário no período": select(
+            func.sum(TimeEntry.duration_minutes)
+        ).where(
+            TimeEntry.user_id == user_id,
+            TimeEntry.date.between(period_start, period_end)
+        ),
+        "Horas do projeto no período": select(TimeEntry).where(
+            TimeEntry.user_id == user_id,
+            TimeEntry.project_id == project_id,
+            TimeEntry.date.between(period_start, period_end)
+        ),
+        "Projetos por status": select(Project).where(
+            Project.user_id == user_id,
+            Project.status == ProjectStatus.ATIVO
+        ),
+        "Colunas do quadro": select(BoardColumn).where(
+            BoardColumn.board_id == board_id
+        ).order_by(BoardColumn.position),
+        "Tarefas da coluna": select(Task).where(
+            Task.column_id == column_id
+        ).order_by(Task.position),
+        "Métricas do dashboard (rollups)": dashboard.build_statement(
+            user_id, dashboard.month_start(period_end)
+        ),
+        "Fluxo de caixa mensal do dashboard": dashboard.monthly_cashflow_statement(user_id, now=period_end),
+        "Horas semanais do dashboard": dashboard.weekly_hours_statement(user_id, now=period_end),
+        "Totais de horas do período (rollup diário)": RollupService().time_totals_statement(
+            user_id, period_start, period_end
+        ),
+        "Totais da timesheet (rollup diário)": TimeStatsService().build_statement(
+            user_id, TimeStats(period_end.date())
+        ),
+        "Página de transações (keyset)": listings.transactions_statement(
+            user_id, cursor=(period_end, 2 ** 31 - 1)
+        ),
+        "Página de registros de tempo (keyset)": listings.time_entries_statement(
+            user_id, cursor=(period_end, 2 ** 31 - 1)
+        ),
+        "Pull de transações da réplica": pull_statement(Transaction, user_id, period_start),
+        "Pull de registros de tempo da réplica": pull_statement(TimeEntry, user_id, period_start),
+        "Ids de transações da réplica (exclusões remotas)": select(Transaction.id).where(
+            Transaction.user_id == user_id
+        ),
+        "Ids de registros de tempo da réplica (exclusões remotas)": select(TimeEntry.id).where(
+            TimeEntry.user_id == user_id
+        ),
+    }
+
+def _seq_scans(plan):
+    """Retorna as tabelas lidas com Seq Scan em um plano do EXPLAIN (FORMAT JSON)"""
+    tables = []
+    if plan.get("Node Type") == "Seq Scan":
+        tables.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        tables.extend(_seq_scans(child))
+    return tables
+
+def seq_scans(connection, statement):
+    """Tabelas lidas com Seq Scan no plano de um SELECT (PostgreSQL)"""
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled)).scalar()
+    return _seq_scans(result[0]["Plan"])
+
+def sample_ids(connection, user_id=None):
+    """Usuário (o primeiro, se não informado) e um projeto, quadro e coluna dele para montar as consultas"""
+    if user_id is None:
+        user_id = connection.execute(select(func.min(User.id))).scalar() or 0
+
+    project_id = connection.execute(select(func.min(Project.id)).where(Project.user_id == user_id)).scalar()
+    board_id = connection.execute(select(func.min(Board.id)).where(Board.user_id == user_id)).scalar()
+    column_id = connection.execute(select(func.min(BoardColumn.id)).where(BoardColumn.board_id == board_id)).scalar()
+    return {'user_id': user_id, 'project_id': project_id or 0, 'board_id': board_id or 0, 'column_id': column_id or 0}
+
+def check_indexes(engine, user_id=None):
+    """Executa EXPLAIN nas consultas principais e retorna as que caem em Seq Scan"""
+    if engine.dialect.name != 'postgresql':
+        raise RuntimeError("A verificação de índices requer PostgreSQL")
+
+    failures = {}
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            ids = sample_ids(connection, user_id)
+
+            # Sem seq scan disponível, o planejador só volta a ele se não houver índice utilizável
+            connection.execute(text("SET LOCAL enable_seqscan = off"))
+
+            for name, statement in hot_queries(**ids).items():
+                scans = seq_scans(connection, statement)
+                if scans:
+                    failures[name] = scans
+                    logger.warning(f"Seq Scan em {', '.join(scans)}: {name}")
+        finally:
+            transaction.rollback()
+
+    return failures
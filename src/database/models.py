@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -54,6 +54,9 @@ class User(Base):
 class Client(Base):
     """Modelo para clientes"""
     __tablename__ = "clients"
+    __table_args__ = (
+        Index("ix_clients_user_active", "user_id", "is_active"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -74,6 +77,10 @@ class Client(Base):
 class Project(Base):
     """Modelo para projetos"""
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_user_status", "user_id", "status"),
+        Index("ix_projects_client", "client_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -101,6 +108,15 @@ class Project(Base):
 class Transaction(Base):
     """Modelo para transações financeiras (receitas e despesas)"""
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Somas por tipo e período (INCLUDE permite index-only scan no PostgreSQL)
+        Index("ix_transactions_user_type_date", "user_id", "type", "date", postgresql_include=["amount"]),
+        # Listagens ordenadas por data
+        Index("ix_transactions_user_date", "user_id", "date"),
+        Index("ix_transactions_project_date", "project_id", "date"),
+        # Deduplicação dos extratos importados (NULL nas transações digitadas)
+        Index("ux_transactions_user_import_hash", "user_id", "import_hash", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -111,6 +127,7 @@ class Transaction(Base):
     date = Column(DateTime(timezone=True), nullable=False)
     category = Column(String(50))  # Ex: "Software", "Hardware", "Pagamento Cliente"
     notes = Column(Text)
+    import_hash = Column(String(64))  # Hash do conteúdo da linha do extrato de origem
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -121,6 +138,12 @@ class Transaction(Base):
 class TimeEntry(Base):
     """Modelo para controle de tempo trabalhado"""
     __tablename__ = "time_entries"
+    __table_args__ = (
+        Index("ix_time_entries_user_date", "user_id", "date", postgresql_include=["duration_minutes"]),
+        Index("ix_time_entries_user_project_date", "user_id", "project_id", "date", postgresql_include=["duration_minutes"]),
+        # Deduplicação das entradas importadas de outros controles de tempo (NULL nas digitadas)
+        Index("ux_time_entries_user_import_hash", "user_id", "import_hash", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -131,6 +154,7 @@ class TimeEntry(Base):
     duration_minutes = Column(Integer)  # Duração em minutos
     hourly_rate = Column(DECIMAL(8, 2))  # Taxa por hora para este trabalho
     date = Column(DateTime(timezone=True), nullable=False)
+    import_hash = Column(String(64))  # Hash do conteúdo da linha do arquivo de origem
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -158,6 +182,9 @@ class Contract(Base):
 class Board(Base):
     """Modelo para quadros kanban"""
     __tablename__ = "boards"
+    __table_args__ = (
+        Index("ix_boards_project", "project_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -175,6 +202,9 @@ class Board(Base):
 class BoardColumn(Base):
     """Modelo para colunas do quadro kanban"""
     __tablename__ = "board_columns"
+    __table_args__ = (
+        Index("ix_board_columns_board_position", "board_id", "position"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     board_id = Column(Integer, ForeignKey("boards.id"), nullable=False)
@@ -182,6 +212,7 @@ class BoardColumn(Base):
     position = Column(Integer, nullable=False)
     color = Column(String(7), default="#2196F3")  # Cor em hexadecimal
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relacionamentos
     board = relationship("Board", back_populates="columns")
@@ -190,6 +221,9 @@ class BoardColumn(Base):
 class Task(Base):
     """Modelo para tarefas do quadro kanban"""
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_column_position", "column_id", "position"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     column_id = Column(Integer, ForeignKey("board_columns.id"), nullable=False)
@@ -204,4 +238,35 @@ class Task(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relacionamentos
-    column = relationship("BoardColumn", back_populates="tasks")
\ No newline at end of file
+    column = relationship("BoardColumn", back_populates="tasks")
+
+class TransactionMonthlyRollup(Base):
+    """Totais mensais de transações por usuário, projeto e tipo (mantidos pelos eventos da sessão)"""
+    __tablename__ = "transaction_monthly_rollups"
+    
+    user_id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, primary_key=True)  # 0 para transações sem projeto
+    type = Column(Enum(TransactionType), primary_key=True)
+    month = Column(Date, primary_key=True)  # Primeiro dia do mês
+    total_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+class TimeEntryDailyRollup(Base):
+    """Totais diários de tempo por usuário e projeto (mantidos pelos eventos da sessão)"""
+    __tablename__ = "time_entry_daily_rollups"
+    
+    user_id = Column(Integer, primary_key=True)
+    project_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    total_minutes = Column(Integer, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+class AppliedWrite(Base):
+    """Chaves de idempotência das gravações já aplicadas pela fila local (write-behind)"""
+    __tablename__ = "applied_writes"
+    
+    key = Column(String(36), primary_key=True)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+# Registra os eventos que mantêm as tabelas de rollup atualizadas
+from . import rollups  # noqa: E402,F401
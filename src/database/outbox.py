@@ -0,0 +1,180 @@
+import enum
+import json
+import os
+import threading
+import uuid
+from collections import namedtuple
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, DateTime, Date, Text, Numeric, Enum, Index,
+    create_engine, event, select, insert, update, delete, func
+)
+from config import config
+
+# Espera máxima entre tentativas de uma gravação com erro
+MAX_RETRY_SECONDS = 300
+
+outbox_metadata = MetaData()
+
+# Gravações aceitas pela interface e ainda não aplicadas no banco, em ordem de chegada
+outbox_writes = Table(
+    'outbox_writes', outbox_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('key', String(36), nullable=False, unique=True),  # Chave de idempotência (uuid4)
+    Column('operation', String(20), nullable=False),
+    Column('table_name', String(50), nullable=False),
+    Column('row_id', Integer),
+    Column('payload', Text, nullable=False),  # Valores das colunas em JSON
+    Column('status', String(10), nullable=False, default='pending'),  # pending ou failed
+    Column('attempts', Integer, nullable=False, default=0),
+    Column('next_attempt_at', DateTime, nullable=False),
+    Column('last_error', Text),
+    Column('created_at', DateTime, nullable=False),
+    Index('ix_outbox_writes_status_next', 'status', 'next_attempt_at', 'id')
+)
+
+# Gravação lida da fila; values já convertidos para os tipos das colunas
+PendingWrite = namedtuple('PendingWrite', ['id', 'key', 'operation', 'table_name', 'row_id', 'values', 'attempts'])
+
+def _encode(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+def encode_values(values):
+    """Serializa os valores das colunas para o JSON da fila"""
+    return json.dumps({key: _encode(value) for key, value in (values or {}).items()})
+
+def decode_values(table, payload):
+    """Converte o JSON da fila de volta para os tipos das colunas da tabela"""
+    values = {}
+    for key, value in json.loads(payload).items():
+        # Parâmetros que não são colunas (ex.: vizinhos do move_task) ficam como no JSON
+        if key not in table.c:
+            values[key] = value
+            continue
+        column_type = table.c[key].type
+        if value is not None:
+            if isinstance(column_type, Enum) and column_type.enum_class is not None:
+                value = column_type.enum_class(value)
+            elif isinstance(column_type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column_type, Date):
+                value = date.fromisoformat(value)
+            elif isinstance(column_type, Numeric):
+                value = Decimal(str(value))
+        values[key] = value
+    return values
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL com synchronous=FULL: cada gravação aceita já está no disco ao retornar
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=FULL")
+    cursor.close()
+
+class WriteOutbox:
+    """Fila persistente (SQLite com journal) das gravações da interface; sobrevive a quedas do aplicativo"""
+
+    def __init__(self, path=None):
+        self.path = path or config.OUTBOX_FILE
+        self.engine = None
+        self._open_lock = threading.Lock()
+
+    def open(self):
+        """Cria ou abre o arquivo da fila (a interface e o flusher usam a mesma instância)"""
+        with self._open_lock:
+            if self.engine is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                engine = create_engine(f"sqlite:///{self.path}", echo=False, connect_args={'timeout': 30})
+                event.listen(engine, "connect", _sqlite_pragmas)
+                outbox_metadata.create_all(engine)
+                self.engine = engine
+        return self
+
+    def append(self, operation, table_name, row_id=None, values=None):
+        """Grava a operação na fila e retorna a sua chave de idempotência"""
+        key = str(uuid.uuid4())
+        now = datetime.now()
+        with self.open().engine.begin() as connection:
+            connection.execute(insert(outbox_writes).values(
+                key=key, operation=operation, table_name=table_name, row_id=row_id,
+                payload=encode_values(values), status='pending', attempts=0,
+                next_attempt_at=now, created_at=now
+            ))
+        return key
+
+    def due(self, tables, limit, now=None):
+        """Próximas gravações pendentes prontas para envio, na ordem de chegada"""
+        now = now or datetime.now()
+        with self.open().engine.connect() as connection:
+            rows = connection.execute(
+                select(outbox_writes).where(
+                    outbox_writes.c.status == 'pending',
+                    outbox_writes.c.next_attempt_at <= now
+                ).order_by(outbox_writes.c.id).limit(limit)
+            ).all()
+
+        return [
+            PendingWrite(row.id, row.key, row.operation, row.table_name, row.row_id,
+                         decode_values(tables[row.table_name], row.payload), row.attempts)
+            for row in rows
+        ]
+
+    def complete(self, ids):
+        """Remove da fila as gravações aplicadas"""
+        if not ids:
+            return
+        with self.open().engine.begin() as connection:
+            connection.execute(delete(outbox_writes).where(outbox_writes.c.id.in_(ids)))
+
+    def reject(self, write, error, now=None):
+        """Adia uma gravação que falhou (espera dobrando); após OUTBOX_MAX_ATTEMPTS ela fica como falha"""
+        now = now or datetime.now()
+        attempts = write.attempts + 1
+        delay = min(config.OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1), MAX_RETRY_SECONDS)
+        with self.open().engine.begin() as connection:
+            connection.execute(update(outbox_writes).where(outbox_writes.c.id == write.id).values(
+                attempts=attempts,
+                status='failed' if attempts >= config.OUTBOX_MAX_ATTEMPTS else 'pending',
+                next_attempt_at=now + timedelta(seconds=delay),
+                last_error=str(error)[:1000]
+            ))
+        return attempts
+
+    def retry_failed(self):
+        """Devolve à fila as gravações marcadas como falha; retorna quantas"""
+        with self.open().engine.begin() as connection:
+            return connection.execute(update(outbox_writes).where(outbox_writes.c.status == 'failed').values(
+                status='pending', attempts=0, next_attempt_at=datetime.now()
+            )).rowcount
+
+    def counts(self):
+        """Quantidade de gravações por estado: {'pending': n, 'failed': n}"""
+        with self.open().engine.connect() as connection:
+            rows = connection.execute(
+                select(outbox_writes.c.status, func.count()).group_by(outbox_writes.c.status)
+            ).all()
+        counts = {'pending': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def next_attempt_at(self):
+        """Horário da próxima gravação pendente (None com a fila vazia)"""
+        with self.open().engine.connect() as connection:
+            return connection.execute(
+                select(func.min(outbox_writes.c.next_attempt_at)).where(outbox_writes.c.status == 'pending')
+            ).scalar()
+
+    def failures(self, limit=20):
+        """Gravações marcadas como falha, com o último erro"""
+        with self.open().engine.connect() as connection:
+            return connection.execute(
+                select(outbox_writes).where(outbox_writes.c.status == 'failed')
+                .order_by(outbox_writes.c.id).limit(limit)
+            ).mappings().all()
@@ -0,0 +1,170 @@
+import bisect
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from config import config
+
+# Limites superiores (ms) dos baldes do histograma de latência de checkout; o último balde é "acima"
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class _TimedCheckout:
+    """Mede o tempo de cada checkout do pool (espera na fila, conexão nova e pre-ping)"""
+
+    metrics = None
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception:
+            if self.metrics:
+                self.metrics.record_failed_checkout(time.perf_counter() - start)
+            raise
+
+        if self.metrics:
+            self.metrics.record_checkout(time.perf_counter() - start, self)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() recria o pool; os eventos são copiados pelo SQLAlchemy, as métricas aqui
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+def pool_limits(engines=1):
+    """pool_size e max_overflow de cada engine quando `engines` engines dividem DB_MAX_CONNECTIONS"""
+    share = max(config.DB_MAX_CONNECTIONS // max(engines, 1), 1)
+    pool_size = min(config.DB_POOL_SIZE, share)
+    return pool_size, min(config.DB_MAX_OVERFLOW, share - pool_size)
+
+def pool_options(url, is_async=False, engines=1):
+    """Argumentos de pool do create_engine a partir do Config (SQLite em memória mantém o pool padrão)"""
+    options = {
+        'pool_pre_ping': config.DB_POOL_PRE_PING,
+        'pool_recycle': config.DB_POOL_RECYCLE
+    }
+
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+
+    pool_size, max_overflow = pool_limits(engines)
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=config.DB_POOL_TIMEOUT
+    )
+    return options
+
+class PoolMetrics:
+    """Histograma de latência de checkout e contadores de overflow, invalidações e reconexões"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Zera os contadores (por exemplo, antes de medir uma configuração nova)"""
+        with self._lock:
+            self.checkouts = 0
+            self.failed_checkouts = 0
+            self.checkout_seconds = 0.0
+            self.checkout_max_seconds = 0.0
+            self.buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+            self.overflow_checkouts = 0
+            self.peak_checked_out = 0
+            self.peak_overflow = 0
+            self.connections_opened = 0
+            self.reconnects = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+
+    def attach(self, engine):
+        """Registra os eventos do pool do engine (síncrono; para o assíncrono use engine.sync_engine)"""
+        if isinstance(engine.pool, _TimedCheckout):
+            engine.pool.metrics = self
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "soft_invalidate", self._on_soft_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        # record_info sobrevive à troca da conexão DBAPI: uma segunda conexão no mesmo registro é reconexão
+        reconnect = connection_record.record_info.get('devflow_connected', False)
+        connection_record.record_info['devflow_connected'] = True
+        with self._lock:
+            self.connections_opened += 1
+            if reconnect:
+                self.reconnects += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.soft_invalidations += 1
+
+    def record_checkout(self, seconds, pool):
+        checked_out = pool.checkedout()
+        overflow = max(pool.overflow(), 0)
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.checkout_max_seconds = max(self.checkout_max_seconds, seconds)
+            self.buckets[bisect.bisect_left(CHECKOUT_BUCKETS_MS, seconds * 1000)] += 1
+            if checked_out > pool.size():
+                self.overflow_checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+            self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_failed_checkout(self, seconds):
+        """Checkout que falhou (timeout do pool cheio ou erro ao conectar)"""
+        with self._lock:
+            self.failed_checkouts += 1
+            self.checkout_max_seconds = max(self.checkout_max_seconds, seconds)
+
+    def _percentile_ms(self, fraction):
+        """Limite superior do balde que contém o percentil (o máximo observado no último balde)"""
+        target = fraction * self.checkouts
+        seen = 0
+        for bound, count in zip(CHECKOUT_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.checkout_max_seconds * 1000
+
+    def histogram(self):
+        """Contagem de checkouts por faixa de latência"""
+        with self._lock:
+            labels = [f"<= {bound} ms" for bound in CHECKOUT_BUCKETS_MS] + [f"> {CHECKOUT_BUCKETS_MS[-1]} ms"]
+            return dict(zip(labels, self.buckets))
+
+    def stats(self):
+        """Retorna os contadores e o resumo da latência de checkout"""
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'failed_checkouts': self.failed_checkouts,
+                'checkout_ms_avg': self.checkout_seconds * 1000 / self.checkouts if self.checkouts else 0.0,
+                'checkout_ms_max': self.checkout_max_seconds * 1000,
+                'checkout_ms_p50': self._percentile_ms(0.50) if self.checkouts else None,
+                'checkout_ms_p95': self._percentile_ms(0.95) if self.checkouts else None,
+                'checkout_ms_p99': self._percentile_ms(0.99) if self.checkouts else None,
+                'overflow_checkouts': self.overflow_checkouts,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_overflow': self.peak_overflow,
+                'connections_opened': self.connections_opened,
+                'reconnects': self.reconnects,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations
+            }
@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from sqlalchemy import Table, inspect
+from sqlalchemy.orm.base import instance_state
+from sqlalchemy.orm.exc import UnmappedInstanceError
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.util import find_tables
+
+# Marcador usado quando não é possível saber quais tabelas foram alteradas
+ALL_TABLES = '*'
+
+_DML_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'TRUNCATE', 'COPY', 'MERGE')
+
+def _freeze(value):
+    """Converte parâmetros em valores hasheáveis para compor a chave do cache"""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+def statement_tables(compiled):
+    """Retorna os nomes das tabelas lidas por um statement compilado (inclui joins de eager loading)"""
+    compile_state = getattr(compiled, 'compile_state', None)
+    statement = getattr(compile_state, 'statement', None)
+    if statement is None:
+        statement = compiled.statement
+
+    return frozenset(
+        table.name
+        for table in find_tables(statement, include_joins=True, include_aliases=True, include_crud=True)
+        if isinstance(table, Table)
+    )
+
+def written_tables(statement, context):
+    """Retorna as tabelas alteradas por uma execução (ou ALL_TABLES se for SQL textual)"""
+    compiled = getattr(context, 'compiled', None)
+    compiled_statement = getattr(compiled, 'statement', None)
+
+    if isinstance(compiled_statement, UpdateBase):
+        return {compiled_statement.table.name}
+
+    if statement.lstrip().upper().startswith(_DML_PREFIXES):
+        return {ALL_TABLES}
+    return set()
+
+class CachedObject:
+    """Cópia somente leitura de um objeto ORM guardada no cache
+
+    Contém as colunas e os relacionamentos que já estavam carregados; não depende da sessão
+    (que é fechada) e pode ser compartilhada entre chamadas e threads sem risco de alteração.
+    """
+
+    __slots__ = ('_model', '_values')
+
+    def __init__(self, model, values):
+        object.__setattr__(self, '_model', model)
+        object.__setattr__(self, '_values', values)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(
+                f"{self._model.__name__}.{name} não foi carregado pela consulta em cache (use joinedload)"
+            ) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Resultado em cache é somente leitura ({self._model.__name__}.{name})")
+
+    def __repr__(self):
+        return f"<{self._model.__name__} em cache id={self._values.get('id')}>"
+
+    # Pickle (st.cache_data da versão web): o __setattr__ bloquearia a restauração padrão
+    def __reduce__(self):
+        return (CachedObject, (self._model, {}), self._values)
+
+    def __setstate__(self, values):
+        self._values.update(values)
+
+def freeze(value, _copies=None):
+    """Converte objetos ORM (e listas deles) em CachedObject; outros valores voltam inalterados"""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item, _copies) for item in value)
+
+    try:
+        state = instance_state(value)
+    except (AttributeError, UnmappedInstanceError):
+        return value
+
+    # Relacionamentos de ida e volta apontam para a mesma cópia
+    _copies = {} if _copies is None else _copies
+    if id(value) in _copies:
+        return _copies[id(value)]
+
+    values = {}
+    copy = CachedObject(type(value), values)
+    _copies[id(value)] = copy
+
+    mapper = inspect(type(value))
+    loaded = state.dict
+    for attribute in mapper.column_attrs:
+        if attribute.key in loaded:
+            values[attribute.key] = loaded[attribute.key]
+    for relationship in mapper.relationships:
+        if relationship.key in loaded:
+            values[relationship.key] = freeze(loaded[relationship.key], _copies)
+    return copy
+
+class QueryCache:
+    """Cache LRU de resultados de consultas com invalidação por tabela"""
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.logger = logging.getLogger('devflow.database.cache')
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # chave -> (resultado, tabelas, expira_em)
+        self._keys_by_table = defaultdict(set)
+        self._generations = defaultdict(int)  # tabela -> invalidações
+        self._generation = 0  # invalidações de todas as tabelas (SQL textual)
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(compiled):
+        """Chave do cache: SQL compilado mais parâmetros"""
+        return (str(compiled), _freeze(compiled.params))
+
+    def get(self, key):
+        """Retorna (encontrado, resultado) e atualiza a ordem LRU"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            result, tables, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, result
+
+    def generation(self, tables):
+        """Marca das invalidações das tabelas; tirada antes de executar a consulta que será guardada"""
+        with self._lock:
+            return (self._generation, tuple(self._generations[table] for table in sorted(tables)))
+
+    def set(self, key, result, tables, ttl=None, generation=None):
+        """Armazena um resultado marcado com as tabelas que ele leu
+
+        Com generation (de generation() antes da consulta), o resultado é descartado se alguma
+        das tabelas foi invalidada enquanto a consulta rodava: ele pode ser anterior ao commit.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        with self._lock:
+            if generation is not None and generation != self.generation(tables):
+                self.logger.debug("Resultado lido durante uma invalidação; não armazenado")
+                return False
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (result, tables, expires_at)
+            for table in tables:
+                self._keys_by_table[table].add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+            return True
+
+    def _remove(self, key):
+        result, tables, expires_at = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def invalidate_tables(self, tables):
+        """Remove as entradas que leram alguma das tabelas alteradas"""
+        if not tables:
+            return 0
+
+        with self._lock:
+            if ALL_TABLES in tables:
+                self._generation += 1
+                removed = len(self._entries)
+                self._entries.clear()
+                self._keys_by_table.clear()
+            else:
+                keys = set()
+                for table in tables:
+                    self._generations[table] += 1
+                    keys.update(self._keys_by_table.get(table, ()))
+                for key in keys:
+                    self._remove(key)
+                removed = len(keys)
+
+            self.invalidations += removed
+
+        if removed:
+            self.logger.debug(f"Cache invalidado para {', '.join(sorted(tables))}: {removed} entradas")
+        return removed
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        """Retorna os contadores do cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
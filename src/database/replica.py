@@ -0,0 +1,262 @@
+import logging
+import os
+from collections.abc import Mapping
+from datetime import datetime
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, String, DateTime, Text, UniqueConstraint,
+    create_engine, event, select, insert, update, delete, func
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from config import config
+from .connection import Base
+from .models import User, Client, Project, Transaction, TimeEntry, Contract, Board, BoardColumn, Task
+from .schema import code_head, database_key
+
+logger = logging.getLogger('devflow.database.replica')
+
+# Tabelas sincronizadas, de pais para filhos (inserções seguem esta ordem; exclusões, a inversa)
+SYNCED_MODELS = (User, Client, Project, Transaction, TimeEntry, Contract, Board, BoardColumn, Task)
+MODELS_BY_TABLE = {model.__tablename__: model for model in SYNCED_MODELS}
+
+# Colunas preenchidas pelo banco remoto (nunca enviadas pela réplica)
+SERVER_COLUMNS = ('id', 'created_at', 'updated_at', 'uploaded_at')
+
+# Controle da réplica: metadata próprio, essas tabelas não existem no banco remoto
+replica_metadata = MetaData()
+
+replica_info = Table(
+    'replica_info', replica_metadata,
+    Column('key', String(50), primary_key=True),
+    Column('value', String(100))
+)
+
+# Alterações locais ainda não enviadas; uma linha por registro alterado
+replica_changes = Table(
+    'replica_changes', replica_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('table_name', String(50), nullable=False),
+    Column('row_id', Integer, nullable=False),
+    Column('operation', String(10), nullable=False),  # insert, update ou delete
+    Column('base_version', DateTime),  # Versão remota sobre a qual a alteração foi feita
+    Column('revision', Integer, nullable=False, default=1),  # Incrementa a cada nova edição do registro
+    Column('changed_at', DateTime, nullable=False, default=datetime.now),
+    UniqueConstraint('table_name', 'row_id')
+)
+
+# Marca d'água do pull por usuário e tabela (maior versão remota já recebida)
+replica_state = Table(
+    'replica_state', replica_metadata,
+    Column('user_id', Integer, primary_key=True),
+    Column('table_name', String(50), primary_key=True),
+    Column('pulled_until', DateTime)
+)
+
+# Alterações locais descartadas porque o registro mudou no banco remoto (o remoto prevalece)
+replica_conflicts = Table(
+    'replica_conflicts', replica_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('table_name', String(50), nullable=False),
+    Column('row_id', Integer, nullable=False),
+    Column('operation', String(10), nullable=False),
+    Column('local_values', Text),  # JSON da versão local descartada
+    Column('remote_version', DateTime),
+    Column('detected_at', DateTime, nullable=False, default=datetime.now)
+)
+
+def user_scope(model, user_id):
+    """Filtro das linhas do usuário em uma tabela sincronizada (vale no banco remoto e na réplica)"""
+    if model is User:
+        return User.id == user_id
+    if model is Contract:
+        return Contract.project_id.in_(select(Project.id).where(Project.user_id == user_id))
+    if model is BoardColumn:
+        return BoardColumn.board_id.in_(select(Board.id).where(Board.user_id == user_id))
+    if model is Task:
+        return Task.column_id.in_(
+            select(BoardColumn.id).join(Board, BoardColumn.board_id == Board.id).where(Board.user_id == user_id)
+        )
+    return model.user_id == user_id
+
+def version_column(model):
+    """Versão da linha no SQL: última alteração ou, se nunca alterada, a criação"""
+    if model is Contract:
+        return Contract.uploaded_at
+    return func.coalesce(model.updated_at, model.created_at)
+
+def pull_statement(model, user_id, since=None):
+    """SELECT das linhas do usuário alteradas depois de since (todas se None), em ordem de id"""
+    table = model.__table__
+    statement = select(table).where(user_scope(model, user_id)).order_by(table.c.id)
+    if since is not None:
+        statement = statement.where(version_column(model) > since)
+    return statement
+
+def row_version(model, row):
+    """Versão de uma linha (objeto ou mapping), sem fuso para comparar valores lidos dos dois bancos"""
+    keys = ('uploaded_at',) if model is Contract else ('updated_at', 'created_at')
+    for key in keys:
+        value = row[key] if isinstance(row, Mapping) else getattr(row, key)
+        if value is not None:
+            return value.replace(tzinfo=None)
+    return None
+
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL: a sincronização grava enquanto a interface lê
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+class LocalReplica:
+    """Cópia local em SQLite das linhas do usuário, com o registro das alterações ainda não enviadas
+
+    Registros criados na réplica recebem ids negativos até serem enviados; o id remoto
+    os substitui (e as chaves estrangeiras que apontam para eles) no envio.
+    """
+
+    def __init__(self, database_url=None, path=None):
+        database_url = make_url(database_url or config.DATABASE_URL)
+        self.path = path or os.path.join(config.LOCAL_DATA_FOLDER, f"replica-{database_key(database_url)}.db")
+        self.engine = None
+        self.SessionLocal = None
+
+    def open(self):
+        """Cria ou abre o arquivo da réplica e registra o rastreamento das alterações"""
+        if self.engine is not None:
+            return self
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        engine = create_engine(f"sqlite:///{self.path}", echo=False, connect_args={'timeout': 30})
+        event.listen(engine, "connect", _sqlite_pragmas)
+        self._prepare_schema(engine)
+
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        event.listen(self.SessionLocal, "before_flush", self._track_flush)
+        event.listen(self.SessionLocal, "do_orm_execute", self._track_bulk)
+        self.engine = engine
+
+        logger.info(f"Réplica local aberta em {self.path}")
+        return self
+
+    def _prepare_schema(self, engine):
+        """Cria as tabelas; se o head das migrações mudou e nada está pendente, recria a cópia"""
+        head = code_head()
+        with engine.begin() as connection:
+            replica_metadata.create_all(connection)
+            stored = connection.execute(
+                select(replica_info.c.value).where(replica_info.c.key == 'schema_revision')
+            ).scalar()
+
+            if stored is not None and stored != head:
+                pending = connection.execute(select(func.count()).select_from(replica_changes)).scalar()
+                if pending:
+                    logger.warning(f"Réplica na revisão {stored} com {pending} alterações pendentes; mantida até o envio")
+                    head = stored
+                else:
+                    # A cópia é descartável: o próximo pull traz tudo de novo no esquema atual
+                    Base.metadata.drop_all(connection)
+                    connection.execute(delete(replica_state))
+                    logger.info(f"Réplica recriada da revisão {stored} para {head}")
+
+            Base.metadata.create_all(connection)
+            connection.execute(delete(replica_info).where(replica_info.c.key == 'schema_revision'))
+            connection.execute(insert(replica_info).values(key='schema_revision', value=head))
+
+    def get_session(self):
+        """Retorna uma nova sessão da réplica"""
+        return self.open().SessionLocal()
+
+    # Rastreamento das alterações feitas pela interface
+
+    def _track_flush(self, session, flush_context, instances):
+        next_ids = {}
+        with session.no_autoflush:
+            for obj in list(session.new):
+                model = type(obj)
+                if model not in SYNCED_MODELS:
+                    continue
+                if obj.id is None:
+                    obj.id = self._next_local_id(session, model, next_ids)
+                self._record(session, model.__tablename__, obj.id, 'insert', None)
+
+            for obj in list(session.dirty):
+                model = type(obj)
+                if model in SYNCED_MODELS and session.is_modified(obj, include_collections=False):
+                    self._record(session, model.__tablename__, obj.id, 'update', row_version(model, obj))
+
+            for obj in list(session.deleted):
+                model = type(obj)
+                if model in SYNCED_MODELS:
+                    self._record(session, model.__tablename__, obj.id, 'delete', row_version(model, obj))
+
+    def _track_bulk(self, orm_execute_state):
+        # UPDATE/DELETE em massa (ex.: rebalanceamento do kanban) não passam pelo flush
+        if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+            return
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.class_ not in SYNCED_MODELS:
+            return
+
+        model = mapper.class_
+        table = model.__table__
+        columns = [table.c[key] for key in ('id',) + SERVER_COLUMNS[1:] if key in table.c]
+        statement = select(*columns)
+        if orm_execute_state.statement.whereclause is not None:
+            statement = statement.where(orm_execute_state.statement.whereclause)
+
+        session = orm_execute_state.session
+        operation = 'delete' if orm_execute_state.is_delete else 'update'
+        for row in session.execute(statement).mappings().all():
+            self._record(session, model.__tablename__, row['id'], operation, row_version(model, row))
+
+    @staticmethod
+    def _next_local_id(session, model, next_ids):
+        """Próximo id negativo livre da tabela (ids positivos pertencem ao banco remoto)"""
+        if model not in next_ids:
+            lowest = session.execute(select(func.min(model.id))).scalar()
+            next_ids[model] = min(lowest or 0, 0)
+        next_ids[model] -= 1
+        return next_ids[model]
+
+    @staticmethod
+    def _record(session, table_name, row_id, operation, base_version):
+        """Registra a alteração na mesma transação da escrita (a primeira versão base é mantida)"""
+        existing = session.execute(
+            select(replica_changes.c.id, replica_changes.c.operation).where(
+                replica_changes.c.table_name == table_name,
+                replica_changes.c.row_id == row_id
+            )
+        ).first()
+
+        if existing is None:
+            session.execute(insert(replica_changes).values(
+                table_name=table_name, row_id=row_id, operation=operation,
+                base_version=base_version, revision=1, changed_at=datetime.now()
+            ))
+            return
+
+        if operation == 'delete' and existing.operation == 'insert':
+            # Nunca chegou ao banco remoto: basta esquecer a inserção
+            session.execute(delete(replica_changes).where(replica_changes.c.id == existing.id))
+            return
+
+        session.execute(update(replica_changes).where(replica_changes.c.id == existing.id).values(
+            operation='delete' if operation == 'delete' else existing.operation,
+            revision=replica_changes.c.revision + 1,
+            changed_at=datetime.now()
+        ))
+
+    # Consultas do estado da réplica
+
+    def pending_count(self):
+        """Quantidade de registros alterados localmente ainda não enviados"""
+        with self.open().engine.connect() as connection:
+            return connection.execute(select(func.count()).select_from(replica_changes)).scalar()
+
+    def conflicts(self, limit=50):
+        """Últimos conflitos registrados (alterações locais descartadas)"""
+        with self.open().engine.connect() as connection:
+            return connection.execute(
+                select(replica_conflicts).order_by(replica_conflicts.c.id.desc()).limit(limit)
+            ).mappings().all()
@@ -0,0 +1,231 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import event, update, insert, Date
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from .models import Transaction, TimeEntry, TransactionMonthlyRollup, TimeEntryDailyRollup
+
+logger = logging.getLogger('devflow.database.rollups')
+
+# Projeto usado na chave do rollup para transações sem projeto
+NO_PROJECT = 0
+
+class month_of(FunctionElement):
+    """Primeiro dia do mês de uma coluna de data (portável entre PostgreSQL e SQLite)"""
+    type = Date()
+    name = 'month_of'
+    inherit_cache = True
+
+class week_of(FunctionElement):
+    """Segunda-feira da semana de uma coluna de data (portável entre PostgreSQL e SQLite)"""
+    type = Date()
+    name = 'week_of'
+    inherit_cache = True
+
+class day_of(FunctionElement):
+    """Dia de uma coluna de data/hora (portável entre PostgreSQL e SQLite)"""
+    type = Date()
+    name = 'day_of'
+    inherit_cache = True
+
+@compiles(month_of)
+def _compile_month_of(element, compiler, **kw):
+    return "CAST(date_trunc('month', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+@compiles(month_of, 'sqlite')
+def _compile_month_of_sqlite(element, compiler, **kw):
+    return "date(%s, 'start of month')" % compiler.process(element.clauses, **kw)
+
+@compiles(week_of)
+def _compile_week_of(element, compiler, **kw):
+    return "CAST(date_trunc('week', %s) AS DATE)" % compiler.process(element.clauses, **kw)
+
+@compiles(week_of, 'sqlite')
+def _compile_week_of_sqlite(element, compiler, **kw):
+    # 'weekday 0' avança até o domingo da semana; seis dias antes é a segunda-feira
+    return "date(%s, 'weekday 0', '-6 days')" % compiler.process(element.clauses, **kw)
+
+@compiles(day_of)
+def _compile_day_of(element, compiler, **kw):
+    return "CAST(%s AS DATE)" % compiler.process(element.clauses, **kw)
+
+@compiles(day_of, 'sqlite')
+def _compile_day_of_sqlite(element, compiler, **kw):
+    return "date(%s)" % compiler.process(element.clauses, **kw)
+
+def to_day(value):
+    """Converte datetime/date para date"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def to_month(value):
+    """Retorna o primeiro dia do mês de um datetime/date"""
+    day = to_day(value)
+    return day.replace(day=1) if day else None
+
+def _old_value(obj, key):
+    """Valor do atributo antes das alterações pendentes"""
+    history = attributes.get_history(obj, key)
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, key)
+
+def _transaction_key(user_id, project_id, type_, value):
+    return (user_id, project_id or NO_PROJECT, type_, to_month(value))
+
+def _time_entry_key(user_id, project_id, value):
+    return (user_id, project_id, to_day(value))
+
+class RollupDeltas:
+    """Acumula as variações dos rollups geradas por um flush"""
+
+    def __init__(self):
+        self.transactions = defaultdict(lambda: [Decimal('0'), 0])
+        self.time_entries = defaultdict(lambda: [0, 0])
+
+    def add_transaction(self, user_id, project_id, type_, value, amount, sign):
+        if user_id is None or type_ is None or value is None:
+            return
+        totals = self.transactions[_transaction_key(user_id, project_id, type_, value)]
+        totals[0] += Decimal(str(amount or 0)) * sign
+        totals[1] += sign
+
+    def add_time_entry(self, user_id, project_id, value, minutes, sign):
+        if user_id is None or project_id is None or value is None:
+            return
+        totals = self.time_entries[_time_entry_key(user_id, project_id, value)]
+        totals[0] += (minutes or 0) * sign
+        totals[1] += sign
+
+    def __bool__(self):
+        return bool(self.transactions or self.time_entries)
+
+def _collect_transaction(deltas, obj, sign, old=False):
+    read = (lambda key: _old_value(obj, key)) if old else (lambda key: getattr(obj, key))
+    deltas.add_transaction(read('user_id'), read('project_id'), read('type'), read('date'), read('amount'), sign)
+
+def _collect_time_entry(deltas, obj, sign, old=False):
+    read = (lambda key: _old_value(obj, key)) if old else (lambda key: getattr(obj, key))
+    deltas.add_time_entry(read('user_id'), read('project_id'), read('date'), read('duration_minutes'), sign)
+
+_TRANSACTION_FIELDS = ('user_id', 'project_id', 'type', 'date', 'amount')
+_TIME_ENTRY_FIELDS = ('user_id', 'project_id', 'date', 'duration_minutes')
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+# Alterar um desses campos em um objeto expirado (ex.: após um commit) carrega antes o valor
+# antigo; sem isso o histórico fica sem ele e a variação do rollup se perde
+for _model, _fields in ((Transaction, _TRANSACTION_FIELDS), (TimeEntry, _TIME_ENTRY_FIELDS)):
+    for _key in _fields:
+        event.listen(getattr(_model, _key), 'set', _keep_old_value, active_history=True)
+
+def collect_deltas(session):
+    """Calcula as variações dos rollups a partir dos objetos pendentes na sessão"""
+    deltas = RollupDeltas()
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            _collect_transaction(deltas, obj, 1)
+        elif isinstance(obj, TimeEntry):
+            _collect_time_entry(deltas, obj, 1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Transaction):
+            fields, collect = _TRANSACTION_FIELDS, _collect_transaction
+        elif isinstance(obj, TimeEntry):
+            fields, collect = _TIME_ENTRY_FIELDS, _collect_time_entry
+        else:
+            continue
+
+        if any(attributes.get_history(obj, key).has_changes() for key in fields):
+            collect(deltas, obj, -1, old=True)
+            collect(deltas, obj, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            _collect_transaction(deltas, obj, -1, old=True)
+        elif isinstance(obj, TimeEntry):
+            _collect_time_entry(deltas, obj, -1, old=True)
+
+    return deltas
+
+def collect_row_deltas(deltas, model, rows, sign):
+    """Soma às variações as linhas (mappings) de Transaction/TimeEntry gravadas em Core, fora da sessão"""
+    for row in rows:
+        if model is Transaction:
+            deltas.add_transaction(row['user_id'], row['project_id'], row['type'], row['date'], row['amount'], sign)
+        elif model is TimeEntry:
+            deltas.add_time_entry(row['user_id'], row['project_id'], row['date'], row['duration_minutes'], sign)
+
+def _upsert(connection, model, key_names, value_names, rows):
+    """Soma os valores nas linhas do rollup, criando as que ainda não existem (um executemany por tabela)"""
+    if not rows:
+        return
+
+    table = model.__table__
+    dialect = connection.dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        statement = dialect_insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key_names),
+            set_={name: table.c[name] + statement.excluded[name] for name in value_names}
+        )
+        connection.execute(statement, rows)
+        return
+
+    # Outros bancos: atualiza e insere se a linha ainda não existir
+    for row in rows:
+        conditions = [table.c[name] == row[name] for name in key_names]
+        result = connection.execute(
+            update(table).where(*conditions).values(
+                **{name: table.c[name] + row[name] for name in value_names}
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+def apply_deltas(connection, deltas):
+    """Aplica as variações acumuladas nas tabelas de rollup"""
+    _upsert(
+        connection, TransactionMonthlyRollup,
+        ('user_id', 'project_id', 'type', 'month'), ('total_amount', 'entry_count'),
+        [
+            {'user_id': user_id, 'project_id': project_id, 'type': type_, 'month': month,
+             'total_amount': amount, 'entry_count': count}
+            for (user_id, project_id, type_, month), (amount, count) in deltas.transactions.items()
+            if amount or count
+        ]
+    )
+
+    _upsert(
+        connection, TimeEntryDailyRollup,
+        ('user_id', 'project_id', 'day'), ('total_minutes', 'entry_count'),
+        [
+            {'user_id': user_id, 'project_id': project_id, 'day': day,
+             'total_minutes': minutes, 'entry_count': count}
+            for (user_id, project_id, day), (minutes, count) in deltas.time_entries.items()
+            if minutes or count
+        ]
+    )
+
+@event.listens_for(Session, "after_flush")
+def _maintain_rollups(session, flush_context):
+    """Mantém os rollups na mesma transação das alterações de Transaction/TimeEntry"""
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
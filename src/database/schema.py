@@ -0,0 +1,81 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from config import config
+
+logger = logging.getLogger('devflow.database.schema')
+
+# Raiz do projeto (onde ficam o alembic.ini e a pasta migrations)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def alembic_config(connection=None):
+    """Config do Alembic sem o alembic.ini (o fileConfig dele reconfiguraria os loggers da aplicação)"""
+    alembic_cfg = AlembicConfig()
+    alembic_cfg.set_main_option('script_location', os.path.join(PROJECT_ROOT, 'migrations'))
+    if connection is not None:
+        alembic_cfg.attributes['connection'] = connection
+    return alembic_cfg
+
+def code_head():
+    """Revisão head das migrações do código (lida dos arquivos, sem acessar o banco)"""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def database_key(url):
+    """Identifica o banco no cache local sem guardar a senha"""
+    return hashlib.sha256(url.render_as_string(hide_password=True).encode('utf-8')).hexdigest()[:16]
+
+def _load_cache():
+    try:
+        with open(config.SCHEMA_CACHE_FILE, encoding='utf-8') as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+def _save_cache(cache):
+    # Grava em um arquivo temporário e troca, para nunca deixar um JSON pela metade
+    os.makedirs(os.path.dirname(config.SCHEMA_CACHE_FILE) or '.', exist_ok=True)
+    temporary = f"{config.SCHEMA_CACHE_FILE}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as cache_file:
+        json.dump(cache, cache_file, indent=2)
+    os.replace(temporary, config.SCHEMA_CACHE_FILE)
+
+def forget_schema(engine):
+    """Remove o banco do cache (a próxima inicialização volta a conferir a revisão)"""
+    cache = _load_cache()
+    if cache.pop(database_key(engine.url), None) is not None:
+        _save_cache(cache)
+
+def ensure_schema(engine, metadata, force=False):
+    """Atualiza o banco até o head das migrações; retorna a revisão anterior se houve upgrade, senão None
+
+    Se o cache local já registra este banco no head do código, nenhuma consulta é feita.
+    """
+    head = code_head()
+    key = database_key(engine.url)
+    cache = _load_cache()
+
+    if not force and cache.get(key, {}).get('revision') == head:
+        logger.debug(f"Esquema em cache na revisão {head}; verificação pulada")
+        return None
+
+    upgraded_from = None
+    with engine.begin() as connection:
+        current = MigrationContext.configure(connection).get_current_revision()
+
+        if current != head:
+            # Tabelas ainda não cobertas por migrações (banco novo ou modelos novos) vêm do metadata;
+            # as migrações são idempotentes e também rodam em bancos criados antes do Alembic
+            metadata.create_all(connection)
+            command.upgrade(alembic_config(connection), 'head')
+            upgraded_from = current or 'base'
+            logger.info(f"Esquema atualizado de {upgraded_from} para {head}")
+
+    cache[key] = {'revision': head, 'checked_at': datetime.now().isoformat(timespec='seconds')}
+    _save_cache(cache)
+    return upgraded_from
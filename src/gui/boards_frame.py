@@ -6,6 +6,13 @@ from sqlalchemy.orm import Session
 from ..database.connection import db_manager
 from ..database.models import Project, Board, BoardColumn, Task, TaskPriority
 from ..auth.auth_manager import auth_manager
+from ..services.kanban import kanban_service
+from ..services.write_behind import write_queue
+from .task_runner import task_runner
+
+# Distância mínima (px) para um clique virar arraste
+DRAG_THRESHOLD = 6
+DRAG_COLOR = "#2196F3"
 
 class BoardsFrame:
     """Frame para gestão de quadros kanban"""
@@ -16,8 +23,16 @@ class BoardsFrame:
         self.boards_list = None
         self.kanban_frame = None
         self.selected_board = None
-        self.columns_frames = {}
+        
+        # Widgets do kanban indexados por id, para atualizar só o que mudou
+        self.board_header = None
+        self.column_widgets = {}
         self.task_widgets = {}
+        self.columns_by_id = {}
+        self.tasks_by_id = {}
+        
+        # Estado do arraste de um card (None quando não há arraste)
+        self.drag_state = None
         
         self._create_widgets()
     
@@ -272,69 +287,123 @@ class BoardsFrame:
         self._load_kanban()
     
     def _load_kanban(self):
-        """Carrega o quadro kanban"""
-        # Limpa a área do kanban
-        for widget in self.kanban_frame.winfo_children():
-            widget.destroy()
-        
+        """Carrega o quadro kanban e sincroniza os widgets com o estado atual"""
         if not self.selected_board:
             return
         
-        session = db_manager.get_session()
         try:
-            # Carrega o board com suas colunas
-            board = session.query(Board).filter(Board.id == self.selected_board.id).first()
-            
-            if not board:
-                return
-            
-            # Título do quadro
+            # Quadro, colunas e tarefas em uma única consulta
+            board = kanban_service.load_board(self.selected_board.id)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar quadro: {e}")
+            return
+        
+        # Outro quadro (ou quadro removido): recomeça do zero
+        if not board or self.board_header is None or self.board_header["board_id"] != board.id:
+            self._clear_kanban()
+        
+        if board:
+            self._sync_board(board)
+    
+    def _clear_kanban(self):
+        """Remove todos os widgets da área do kanban"""
+        for widget in self.kanban_frame.winfo_children():
+            widget.destroy()
+        
+        self.board_header = None
+        self.column_widgets = {}
+        self.task_widgets = {}
+        self.columns_by_id = {}
+        self.tasks_by_id = {}
+    
+    def _sync_board(self, board):
+        """Cria, atualiza ou remove apenas os widgets que mudaram"""
+        self._sync_header(board)
+        
+        # Colunas
+        self.columns_by_id = {column.id: column for column in board.columns}
+        for position, column in enumerate(board.columns):
+            self._sync_column(column, position + 1)  # +1 porque a coluna 0 do grid fica vazia
+        
+        for column_id in set(self.column_widgets) - set(self.columns_by_id):
+            self.column_widgets.pop(column_id)["frame"].destroy()
+        
+        # Tarefas
+        self.tasks_by_id = {}
+        for column in board.columns:
+            tasks_frame = self.column_widgets[column.id]["tasks_frame"]
+            for row, task in enumerate(column.tasks):
+                self.tasks_by_id[task.id] = task
+                self._sync_task(task, tasks_frame, row)
+        
+        for task_id in set(self.task_widgets) - set(self.tasks_by_id):
+            self.task_widgets.pop(task_id)["frame"].destroy()
+    
+    def _sync_header(self, board):
+        """Cria ou atualiza o título do quadro"""
+        if self.board_header is None:
             title_frame = ctk.CTkFrame(self.kanban_frame, fg_color="transparent")
-            title_frame.grid(row=0, column=0, columnspan=len(board.columns), sticky="ew", padx=10, pady=(10, 20))
             
             title_label = ctk.CTkLabel(
                 title_frame,
-                text=f"📋 {board.name}",
+                text="",
                 font=ctk.CTkFont(size=18, weight="bold")
             )
             title_label.grid(row=0, column=0, sticky="w")
             
             project_label = ctk.CTkLabel(
                 title_frame,
-                text=f"Projeto: {board.project.name}",
+                text="",
                 font=ctk.CTkFont(size=12),
                 text_color="gray"
             )
             project_label.grid(row=1, column=0, sticky="w")
             
-            # Colunas do kanban
-            self.columns_frames = {}
-            self.task_widgets = {}
-            
-            for i, column in enumerate(board.columns):
-                self._create_column(column, i + 1)  # +1 porque row 0 é o título
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao carregar quadro: {e}")
-        finally:
-            session.close()
+            self.board_header = {
+                "board_id": board.id,
+                "frame": title_frame,
+                "title_label": title_label,
+                "project_label": project_label
+            }
+        
+        header = self.board_header
+        header["frame"].grid(row=0, column=0, columnspan=max(len(board.columns), 1) + 1, sticky="ew", padx=10, pady=(10, 20))
+        header["title_label"].configure(text=f"📋 {board.name}")
+        header["project_label"].configure(text=f"Projeto: {board.project.name}")
+    
+    def _sync_column(self, column, col_position):
+        """Cria a coluna se necessário e atualiza cabeçalho e posição"""
+        widgets = self.column_widgets.get(column.id)
+        if widgets is None:
+            widgets = self._create_column(column)
+            self.column_widgets[column.id] = widgets
+        
+        signature = (column.name, column.color)
+        if widgets["signature"] != signature:
+            widgets["header"].configure(fg_color=column.color)
+            widgets["title"].configure(text=column.name)
+            widgets["add_btn"].configure(border_color=column.color)
+            widgets["signature"] = signature
+        
+        if widgets["position"] != col_position:
+            widgets["frame"].grid(row=1, column=col_position, sticky="nsew", padx=5, pady=10)
+            widgets["position"] = col_position
     
-    def _create_column(self, column, col_position):
-        """Cria uma coluna do kanban"""
+    def _create_column(self, column):
+        """Cria os widgets de uma coluna do kanban"""
         # Frame da coluna
         column_frame = ctk.CTkFrame(self.kanban_frame, width=300)
-        column_frame.grid(row=1, column=col_position, sticky="nsew", padx=5, pady=10)
         column_frame.grid_rowconfigure(2, weight=1)
         column_frame.grid_propagate(False)
         
         # Header da coluna
-        header_frame = ctk.CTkFrame(column_frame, fg_color=column.color, height=40)
+        header_frame = ctk.CTkFrame(column_frame, height=40)
         header_frame.grid(row=0, column=0, sticky="ew", padx=5, pady=(5, 0))
         header_frame.grid_propagate(False)
         
         column_title = ctk.CTkLabel(
             header_frame,
-            text=column.name,
+            text="",
             font=ctk.CTkFont(size=14, weight="bold"),
             text_color="white"
         )
@@ -344,11 +413,10 @@ class BoardsFrame:
         add_task_btn = ctk.CTkButton(
             column_frame,
             text="+ Adicionar Tarefa",
-            command=lambda c=column: self._add_task_dialog(c),
+            command=lambda column_id=column.id: self._add_task_dialog(self.columns_by_id[column_id]),
             height=30,
             fg_color="transparent",
-            border_width=2,
-            border_color=column.color
+            border_width=2
         )
         add_task_btn.grid(row=1, column=0, sticky="ew", padx=5, pady=5)
         
@@ -357,36 +425,45 @@ class BoardsFrame:
         tasks_frame.grid(row=2, column=0, sticky="nsew", padx=5, pady=(0, 5))
         tasks_frame.grid_columnconfigure(0, weight=1)
         
-        self.columns_frames[column.id] = tasks_frame
-        self.task_widgets[column.id] = []
-        
-        # Carrega as tarefas
-        self._load_tasks(column)
+        return {
+            "frame": column_frame,
+            "header": header_frame,
+            "title": column_title,
+            "add_btn": add_task_btn,
+            "tasks_frame": tasks_frame,
+            "signature": None,
+            "position": None
+        }
     
-    def _load_tasks(self, column):
-        """Carrega as tarefas de uma coluna"""
-        tasks_frame = self.columns_frames[column.id]
-        
-        # Limpa tarefas existentes
-        for widget in tasks_frame.winfo_children():
-            widget.destroy()
-        
-        session = db_manager.get_session()
-        try:
-            tasks = session.query(Task).filter(
-                Task.column_id == column.id
-            ).order_by(Task.position).all()
-            
-            for i, task in enumerate(tasks):
-                self._create_task_widget(task, tasks_frame, i)
-                
-        except Exception as e:
-            print(f"Erro ao carregar tarefas: {e}")
-        finally:
-            session.close()
+    @staticmethod
+    def _task_signature(task):
+        """Campos exibidos no card; se algum mudar o card é recriado"""
+        return (task.title, task.description, task.priority, task.estimated_hours)
+    
+    def _sync_task(self, task, tasks_frame, row):
+        """Cria, recria ou reposiciona o card de uma tarefa"""
+        widgets = self.task_widgets.get(task.id)
+        signature = self._task_signature(task)
+        
+        if widgets is not None and (widgets["column_id"] != task.column_id or widgets["signature"] != signature):
+            widgets["frame"].destroy()
+            widgets = None
+        
+        if widgets is None:
+            widgets = {
+                "frame": self._create_task_widget(task, tasks_frame),
+                "column_id": task.column_id,
+                "signature": signature,
+                "row": None
+            }
+            self.task_widgets[task.id] = widgets
+        
+        if widgets["row"] != row:
+            widgets["frame"].grid(row=row, column=0, sticky="ew", pady=2)
+            widgets["row"] = row
     
-    def _create_task_widget(self, task, parent, row):
-        """Cria o widget de uma tarefa"""
+    def _create_task_widget(self, task, parent):
+        """Cria o card de uma tarefa (o posicionamento fica com _sync_task)"""
         # Cores de prioridade
         priority_colors = {
             TaskPriority.LOW: "#4CAF50",
@@ -395,7 +472,6 @@ class BoardsFrame:
         }
         
         task_frame = ctk.CTkFrame(parent, fg_color="#333333")
-        task_frame.grid(row=row, column=0, sticky="ew", pady=2)
         task_frame.grid_columnconfigure(0, weight=1)
         
         # Barra de prioridade
@@ -453,13 +529,127 @@ class BoardsFrame:
             )
             hours_label.grid(row=0, column=1, sticky="e")
         
-        # Bind para editar tarefa
-        def on_task_click(event, t=task):
-            self._edit_task_dialog(t)
+        # Clique abre a edição; arrastar move o card (busca a tarefa pelo id na hora do evento)
+        self._bind_card_events(task_frame, task.id)
         
-        task_frame.bind("<Button-1>", on_task_click)
-        for child in task_frame.winfo_children():
-            child.bind("<Button-1>", on_task_click)
+        return task_frame
+    
+    def _bind_card_events(self, widget, task_id):
+        """Liga os eventos de clique e arraste ao card e a todos os seus filhos"""
+        widget.bind("<ButtonPress-1>", lambda event: self._on_card_press(event, task_id))
+        widget.bind("<B1-Motion>", self._on_card_motion)
+        widget.bind("<ButtonRelease-1>", self._on_card_release)
+        for child in widget.winfo_children():
+            self._bind_card_events(child, task_id)
+    
+    # Arrastar e soltar
+    
+    def _on_card_press(self, event, task_id):
+        """Início de um clique ou arraste sobre um card"""
+        self.drag_state = {
+            "task_id": task_id,
+            "x": event.x_root,
+            "y": event.y_root,
+            "active": False,
+            "target": None
+        }
+    
+    def _on_card_motion(self, event):
+        """Acompanha o arraste e destaca a coluna de destino"""
+        state = self.drag_state
+        if not state:
+            return
+        
+        if not state["active"]:
+            if abs(event.x_root - state["x"]) + abs(event.y_root - state["y"]) < DRAG_THRESHOLD:
+                return
+            state["active"] = True
+            self.task_widgets[state["task_id"]]["frame"].configure(border_width=2, border_color=DRAG_COLOR)
+        
+        target = self._column_at(event.x_root, event.y_root)
+        if target != state["target"]:
+            self._highlight_column(state["target"], False)
+            self._highlight_column(target, True)
+            state["target"] = target
+    
+    def _on_card_release(self, event):
+        """Fim do clique (abre a edição) ou do arraste (move a tarefa)"""
+        state, self.drag_state = self.drag_state, None
+        if not state:
+            return
+        
+        task_id = state["task_id"]
+        if not state["active"]:
+            self._edit_task_dialog(self.tasks_by_id[task_id])
+            return
+        
+        self._highlight_column(state["target"], False)
+        if task_id in self.task_widgets:
+            self.task_widgets[task_id]["frame"].configure(border_width=0)
+        
+        column_id = self._column_at(event.x_root, event.y_root)
+        if column_id is None:
+            return
+        
+        above_id, below_id = self._drop_neighbors(column_id, task_id, event.y_root)
+        if self._current_neighbors(task_id) == (column_id, above_id, below_id):
+            return
+        
+        # Fila local: o arraste não espera o banco (nem se perde offline); o quadro recarrega ao aplicar
+        try:
+            write_queue.move_task(
+                task_id, column_id, above_id=above_id, below_id=below_id,
+                on_applied=self._on_write_applied
+            )
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao mover tarefa: {e}")
+    
+    def _column_at(self, x_root, y_root):
+        """Retorna o id da coluna sob o ponteiro (ou None)"""
+        widget = self.frame.winfo_containing(x_root, y_root)
+        if widget is None:
+            return None
+        
+        path = str(widget)
+        for column_id, widgets in self.column_widgets.items():
+            column_path = str(widgets["frame"])
+            if path == column_path or path.startswith(column_path + "."):
+                return column_id
+        return None
+    
+    def _column_cards(self, column_id, exclude=None):
+        """Ids e frames dos cards da coluna na ordem exibida"""
+        cards = [
+            (widgets["row"], task_id, widgets["frame"])
+            for task_id, widgets in self.task_widgets.items()
+            if widgets["column_id"] == column_id and task_id != exclude
+        ]
+        return [(task_id, frame) for _, task_id, frame in sorted(cards, key=lambda card: card[0])]
+    
+    def _drop_neighbors(self, column_id, task_id, y_root):
+        """Cards acima e abaixo do ponto de soltura"""
+        above_id = below_id = None
+        for card_id, frame in self._column_cards(column_id, exclude=task_id):
+            if y_root < frame.winfo_rooty() + frame.winfo_height() / 2:
+                below_id = card_id
+                break
+            above_id = card_id
+        return above_id, below_id
+    
+    def _current_neighbors(self, task_id):
+        """Coluna e vizinhos atuais da tarefa, para ignorar arrastes que não mudam nada"""
+        column_id = self.task_widgets[task_id]["column_id"]
+        ids = [card_id for card_id, _ in self._column_cards(column_id)]
+        index = ids.index(task_id)
+        above_id = ids[index - 1] if index > 0 else None
+        below_id = ids[index + 1] if index + 1 < len(ids) else None
+        return column_id, above_id, below_id
+    
+    def _highlight_column(self, column_id, active):
+        """Destaca a coluna que receberá o card"""
+        widgets = self.column_widgets.get(column_id)
+        if widgets:
+            widgets["frame"].configure(border_width=2 if active else 0, border_color=DRAG_COLOR)
     
     def _add_task_dialog(self, column):
         """Abre diálogo para adicionar nova tarefa"""
@@ -467,12 +657,7 @@ class BoardsFrame:
     
     def _edit_task_dialog(self, task):
         """Abre diálogo para editar tarefa"""
-        session = db_manager.get_session()
-        try:
-            column = session.query(BoardColumn).filter(BoardColumn.id == task.column_id).first()
-            self._task_dialog(column, task)
-        finally:
-            session.close()
+        self._task_dialog(self.columns_by_id.get(task.column_id), task)
     
     def _task_dialog(self, column, task=None):
         """Diálogo para criar/editar tarefa"""
@@ -610,46 +795,27 @@ class BoardsFrame:
                 messagebox.showerror("Erro", "Valor de horas inválido.")
                 return
         
-        session = db_manager.get_session()
+        values = {
+            'title': title,
+            'description': description if description else None,
+            'priority': priority,
+            'estimated_hours': estimated_hours,
+            'assigned_to': assigned if assigned else None
+        }
+        
         try:
             if task:
                 # Edita tarefa existente
-                task_obj = session.query(Task).filter(Task.id == task.id).first()
-                if not task_obj:
-                    messagebox.showerror("Erro", "Tarefa não encontrada.")
-                    return
+                write_queue.update(Task, task.id, values, on_applied=self._on_write_applied)
             else:
-                # Cria nova tarefa
-                # Obtém a próxima posição
-                max_position = session.query(Task.position).filter(
-                    Task.column_id == column.id
-                ).order_by(Task.position.desc()).first()
-                
-                next_position = (max_position[0] + 1) if max_position and max_position[0] else 0
-                
-                task_obj = Task(
-                    column_id=column.id,
-                    position=next_position
-                )
-                session.add(task_obj)
+                # Cria nova tarefa no fim da coluna (posição calculada ao aplicar a gravação)
+                write_queue.append_task(dict(values, column_id=column.id), on_applied=self._on_write_applied)
             
-            # Atualiza dados
-            task_obj.title = title
-            task_obj.description = description if description else None
-            task_obj.priority = priority
-            task_obj.estimated_hours = estimated_hours
-            task_obj.assigned_to = assigned if assigned else None
-            
-            session.commit()
             messagebox.showinfo("Sucesso", "Tarefa salva com sucesso!")
             dialog.destroy()
-            self._load_kanban()  # Recarrega o quadro
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao salvar tarefa: {e}")
-        finally:
-            session.close()
     
     def _delete_task(self, task, dialog):
         """Exclui uma tarefa"""
@@ -661,21 +827,17 @@ class BoardsFrame:
         if not result:
             return
         
-        session = db_manager.get_session()
         try:
-            task_obj = session.query(Task).filter(Task.id == task.id).first()
-            if task_obj:
-                session.delete(task_obj)
-                session.commit()
-                messagebox.showinfo("Sucesso", "Tarefa excluída com sucesso!")
-                dialog.destroy()
-                self._load_kanban()
+            write_queue.delete(Task, task.id, on_applied=self._on_write_applied)
+            messagebox.showinfo("Sucesso", "Tarefa excluída com sucesso!")
+            dialog.destroy()
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao excluir tarefa: {e}")
-        finally:
-            session.close()
+    
+    def _on_write_applied(self, row_id=None):
+        """Chamado pela fila de gravações (thread do flusher) quando a gravação chega ao banco"""
+        task_runner.post(self.frame, self._load_kanban)
     
     def show(self):
         """Exibe o frame de quadros"""
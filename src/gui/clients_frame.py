@@ -1,10 +1,12 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
-import threading
 from sqlalchemy.orm import Session
 from ..database.connection import db_manager
 from ..database.models import Client
+from ..services.write_behind import write_queue
 from ..auth.auth_manager import auth_manager
+from .virtual_list import VirtualList
+from .task_runner import task_runner
 
 class ClientsFrame:
     """Frame para gestão de clientes"""
@@ -24,17 +26,9 @@ class ClientsFrame:
         self.address_text = None
         self.notes_text = None
         
-        # Indicadores de carregamento
-        self.loading_indicator = None
+        # Indicador de carregamento
         self.is_loading = False
         
-        # Cache de dados
-        self.clients_cache = {
-            "data": None,
-            "timestamp": None,
-            "valid_time": 300  # 5 minutos em segundos
-        }
-        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -74,18 +68,16 @@ class ClientsFrame:
         )
         new_btn.grid(row=1, column=0, pady=(0, 10), padx=15)
         
-        # Lista scrollável
-        self.clients_list = ctk.CTkScrollableFrame(list_frame, width=250)
-        self.clients_list.grid(row=2, column=0, sticky="nsew", padx=15, pady=(0, 15))
-        self.clients_list.grid_columnconfigure(0, weight=1)
-        
-        # Indicador de carregamento
-        self.loading_indicator = ctk.CTkLabel(
-            self.clients_list,
-            text="Carregando clientes...",
-            text_color="gray"
+        # Lista virtualizada (só cria botões para as linhas visíveis)
+        self.clients_list = VirtualList(
+            list_frame,
+            render_row=self._render_client_row,
+            on_select=self._select_client,
+            row_height=60,
+            empty_text="Nenhum cliente cadastrado",
+            width=250
         )
-        # Não adicionamos ao grid ainda - será adicionado quando necessário
+        self.clients_list.grid(row=2, column=0, sticky="nsew", padx=15, pady=(0, 15))
     
     def _create_form(self):
         """Cria o formulário de cliente"""
@@ -197,112 +189,55 @@ class ClientsFrame:
     def _show_loading(self):
         """Exibe o indicador de carregamento"""
         if not self.is_loading:
-            # Limpa a lista atual
-            for widget in self.clients_list.winfo_children():
-                widget.destroy()
-            
-            self.loading_indicator = ctk.CTkLabel(
-                self.clients_list,
-                text="Carregando clientes...",
-                text_color="gray"
-            )
-            self.loading_indicator.grid(row=0, column=0, pady=20)
+            self.clients_list.show_message("Carregando clientes...")
             self.is_loading = True
     
     def _hide_loading(self):
         """Esconde o indicador de carregamento"""
-        if self.is_loading:
-            try:
-                if self.loading_indicator.winfo_exists():
-                    self.loading_indicator.grid_forget()
-            except tk.TclError:
-                pass  # Widget já foi destruído
-            self.is_loading = False
-    
-    def _is_cache_valid(self, cache_key):
-        """Verifica se o cache é válido"""
-        import time
-        
-        cache = self.clients_cache
-        if not cache["data"] or not cache["timestamp"]:
-            return False
-        
-        # Verifica se o cache ainda é válido
-        current_time = time.time()
-        return (current_time - cache["timestamp"]) < cache["valid_time"]
-    
-    def _update_cache(self, data):
-        """Atualiza o cache com novos dados"""
-        import time
-        
-        self.clients_cache["data"] = data
-        self.clients_cache["timestamp"] = time.time()
+        self.is_loading = False
     
     def _load_clients(self):
         """Carrega a lista de clientes de forma assíncrona"""
-        self._show_loading()
-        
-        # Inicia o carregamento em uma thread separada
-        load_thread = threading.Thread(target=self._load_clients_async)
-        load_thread.daemon = True
-        load_thread.start()
-    
-    def _load_clients_async(self):
-        """Carrega a lista de clientes em uma thread separada"""
         user = auth_manager.get_current_user()
         if not user:
-            self.frame.after(0, self._hide_loading)
             return
         
-        # Verifica se o cache é válido
-        if self._is_cache_valid("data"):
-            self.frame.after(0, lambda: self._update_clients_ui(self.clients_cache["data"]))
-            return
+        self._show_loading()
         
+        # Executa no pool da interface; só o resultado do pedido mais recente é exibido
+        task_runner.submit(
+            self.frame, "clients",
+            lambda: self._fetch_clients(user.id),
+            on_success=self._update_clients_ui,
+            on_error=self._on_load_error
+        )
+    
+    def _fetch_clients(self, user_id):
+        """Busca os clientes ativos (executado em um worker)"""
         session = db_manager.get_session()
         try:
-            clients = session.query(Client).filter(
-                Client.user_id == user.id,
+            # Resultado em cache até um commit alterar a tabela de clientes
+            return db_manager.cached_all(session.query(Client).filter(
+                Client.user_id == user_id,
                 Client.is_active == True
-            ).order_by(Client.name).all()
-            
-            # Atualiza o cache
-            self._update_cache(clients)
-            
-            # Atualiza a UI na thread principal
-            self.frame.after(0, lambda: self._update_clients_ui(clients))
-                
-        except Exception as e:
-            self.frame.after(0, lambda: messagebox.showerror("Erro", f"Erro ao carregar clientes: {e}"))
+            ).order_by(Client.name))
         finally:
             session.close()
     
+    def _on_load_error(self, error):
+        """Exibe o erro de carregamento da lista"""
+        self._hide_loading()
+        messagebox.showerror("Erro", f"Erro ao carregar clientes: {error}")
+    
     def _update_clients_ui(self, clients):
         """Atualiza a UI com os clientes carregados"""
-        # Limpa a lista atual
-        for widget in self.clients_list.winfo_children():
-            widget.destroy()
-        
-        for i, client in enumerate(clients):
-            client_btn = ctk.CTkButton(
-                self.clients_list,
-                text=f"{client.name}\n{client.company or 'Sem empresa'}",
-                command=lambda c=client: self._select_client(c),
-                height=60,
-                anchor="w"
-            )
-            client_btn.grid(row=i, column=0, sticky="ew", pady=2)
-        
-        if not clients:
-            no_clients_label = ctk.CTkLabel(
-                self.clients_list,
-                text="Nenhum cliente cadastrado",
-                text_color="gray"
-            )
-            no_clients_label.grid(row=0, column=0, pady=20)
-        
+        self.clients_list.set_items(clients)
         self._hide_loading()
     
+    def _render_client_row(self, client):
+        """Opções do botão que representa um cliente na lista"""
+        return {"text": f"{client.name}\n{client.company or 'Sem empresa'}"}
+    
     def _select_client(self, client):
         """Seleciona um cliente e carrega seus dados no formulário"""
         self.selected_client = client
@@ -364,43 +299,30 @@ class ClientsFrame:
         if not user:
             return
         
-        session = db_manager.get_session()
+        values = {
+            'name': name,
+            'email': self.email_entry.get().strip() or None,
+            'phone': self.phone_entry.get().strip() or None,
+            'company': self.company_entry.get().strip() or None,
+            'address': self.address_text.get("1.0", 'end').strip() or None,
+            'notes': self.notes_text.get("1.0", 'end').strip() or None
+        }
+        
         try:
             if self.selected_client:
                 # Atualiza cliente existente
-                client = session.query(Client).filter(
-                    Client.id == self.selected_client.id
-                ).first()
-                
-                if not client:
-                    messagebox.showerror("Erro", "Cliente não encontrado.")
-                    return
+                write_queue.update(Client, self.selected_client.id, values, on_applied=self._on_write_applied)
             else:
                 # Cria novo cliente
-                client = Client(user_id=user.id)
-                session.add(client)
-            
-            # Atualiza dados
-            client.name = name
-            client.email = self.email_entry.get().strip() or None
-            client.phone = self.phone_entry.get().strip() or None
-            client.company = self.company_entry.get().strip() or None
-            client.address = self.address_text.get("1.0", 'end').strip() or None
-            client.notes = self.notes_text.get("1.0", 'end').strip() or None
-            
-            session.commit()
+                write_queue.insert(Client, dict(values, user_id=user.id), on_applied=self._on_write_applied)
             
             messagebox.showinfo("Sucesso", "Cliente salvo com sucesso!")
-            self._load_clients()
             
             if not self.selected_client:
                 self._clear_form()
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao salvar cliente: {e}")
-        finally:
-            session.close()
     
     def _delete_client(self):
         """Exclui o cliente selecionado"""
@@ -417,29 +339,22 @@ class ClientsFrame:
         if not result:
             return
         
-        session = db_manager.get_session()
         try:
-            client = session.query(Client).filter(
-                Client.id == self.selected_client.id
-            ).first()
+            # Marca como inativo ao invés de deletar
+            write_queue.update(Client, self.selected_client.id, {'is_active': False}, on_applied=self._on_write_applied)
             
-            if client:
-                # Marca como inativo ao invés de deletar
-                client.is_active = False
-                session.commit()
-                
-                messagebox.showinfo("Sucesso", "Cliente excluído com sucesso!")
-                self._load_clients()
-                self._clear_form()
-                self.selected_client = None
-                self.form_title.configure(text="Dados do Cliente")
-                self.delete_btn.configure(state="disabled")
+            messagebox.showinfo("Sucesso", "Cliente excluído com sucesso!")
+            self._clear_form()
+            self.selected_client = None
+            self.form_title.configure(text="Dados do Cliente")
+            self.delete_btn.configure(state="disabled")
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao excluir cliente: {e}")
-        finally:
-            session.close()
+    
+    def _on_write_applied(self, row_id=None):
+        """Chamado pela fila de gravações (thread do flusher) quando a gravação chega ao banco"""
+        task_runner.post(self.frame, self._load_clients)
     
     def show(self):
         """Exibe o frame de clientes"""
@@ -448,6 +363,8 @@ class ClientsFrame:
     def hide(self):
         """Esconde o frame de clientes"""
         self.frame.pack_forget()
+        task_runner.cancel(self.frame)
+        self._hide_loading()
     
     def refresh(self):
         """Atualiza os dados do frame"""
@@ -455,9 +372,8 @@ class ClientsFrame:
     
     def force_refresh(self):
         """Força a atualização dos dados, ignorando o cache"""
-        # Limpa o cache
-        self.clients_cache["data"] = None
-        self.clients_cache["timestamp"] = None
+        # Limpa o cache de consultas
+        db_manager.query_cache.clear()
         
         # Recarrega os dados
         self._load_clients()
\ No newline at end of file
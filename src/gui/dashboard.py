@@ -1,10 +1,9 @@
 import customtkinter as ctk
-import threading
-from datetime import datetime, timedelta
-from sqlalchemy import func, and_
 from ..database.connection import db_manager
 from ..database.models import Project, Transaction, TimeEntry, TransactionType, ProjectStatus
 from ..auth.auth_manager import auth_manager
+from ..services.dashboard_stats import dashboard_stats_service
+from .task_runner import task_runner
 
 class Dashboard:
     """Dashboard principal da aplicação"""
@@ -17,25 +16,6 @@ class Dashboard:
         self.recent_frame = None
         self.loading_indicators = {}
         
-        # Sistema de cache para dados
-        self.cache = {
-            "stats": {
-                "data": None,
-                "timestamp": None,
-                "valid_time": 300  # 5 minutos em segundos
-            },
-            "activities": {
-                "data": None,
-                "timestamp": None,
-                "valid_time": 300  # 5 minutos em segundos
-            },
-            "projects": {
-                "data": None,
-                "timestamp": None,
-                "valid_time": 300  # 5 minutos em segundos
-            }
-        }
-        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -224,74 +204,18 @@ class Dashboard:
         elif section in self.loading_indicators:
             self.loading_indicators[section].grid_remove()  # Esconde o indicador
     
-    def _update_statistics_async(self):
-        """Atualiza as estatísticas do dashboard de forma assíncrona"""
-        # Verifica se há dados em cache válidos
-        if self._is_cache_valid("stats"):
-            # Usa dados do cache
-            self.frame.after(0, lambda: self._update_stats_ui(*self.cache["stats"]["data"]))
-            return
-        
-        user = auth_manager.get_current_user()
-        if not user:
-            return
-        
-        session = db_manager.get_session()
-        try:
-            # Data atual e início do mês
-            now = datetime.now()
-            month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            # Total a receber (projetos ativos - total recebido)
-            total_budget = session.query(func.sum(Project.budget)).filter(
-                Project.user_id == user.id,
-                Project.status.in_([ProjectStatus.ATIVO, ProjectStatus.PROPOSTA])
-            ).scalar() or 0
-            
-            total_received = session.query(func.sum(Transaction.amount)).filter(
-                Transaction.user_id == user.id,
-                Transaction.type == TransactionType.RECEITA
-            ).scalar() or 0
-            
-            total_receivable = total_budget - total_received
-            
-            # Recebido no mês
-            monthly_income = session.query(func.sum(Transaction.amount)).filter(
-                Transaction.user_id == user.id,
-                Transaction.type == TransactionType.RECEITA,
-                Transaction.date >= month_start
-            ).scalar() or 0
-            
-            # Despesas no mês
-            monthly_expenses = session.query(func.sum(Transaction.amount)).filter(
-                Transaction.user_id == user.id,
-                Transaction.type == TransactionType.DESPESA,
-                Transaction.date >= month_start
-            ).scalar() or 0
-            
-            # Horas trabalhadas no mês
-            monthly_minutes = session.query(func.sum(TimeEntry.duration_minutes)).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date >= month_start
-            ).scalar() or 0
-            
-            monthly_hours = monthly_minutes / 60 if monthly_minutes else 0
-            
-            # Armazena os dados no cache
-            self._update_cache("stats", (total_receivable, monthly_income, monthly_expenses, monthly_hours))
-            
-            # Atualiza os cards na thread principal
-            self.frame.after(0, lambda: self._update_stats_ui(
-                total_receivable, monthly_income, monthly_expenses, monthly_hours
-            ))
-            
-        except Exception as e:
-            print(f"Erro ao carregar estatísticas: {e}")
-        finally:
-            session.close()
+    def _fetch_statistics(self, user_id):
+        """Busca as estatísticas do dashboard (executado em um worker)"""
+        # Todas as métricas vêm de um único SELECT (em cache até o próximo commit)
+        return dashboard_stats_service.get_stats(user_id)
     
-    def _update_stats_ui(self, total_receivable, monthly_income, monthly_expenses, monthly_hours):
+    def _update_stats_ui(self, stats):
         """Atualiza a UI com as estatísticas carregadas"""
+        total_receivable = stats["total_receivable"]
+        monthly_income = stats["monthly_income"]
+        monthly_expenses = stats["monthly_expenses"]
+        monthly_hours = stats["monthly_hours"]
+        
         self.total_receivable_card.value_label.configure(
             text=f"R$ {total_receivable:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
         )
@@ -311,45 +235,28 @@ class Dashboard:
         # Esconde o indicador de carregamento
         self._hide_loading("stats")
     
-    def _update_recent_activities_async(self):
-        """Atualiza as atividades recentes de forma assíncrona"""
-        # Verifica se há dados em cache válidos
-        if self._is_cache_valid("activities"):
-            # Usa dados do cache
-            self.frame.after(0, lambda: self._update_activities_ui(*self.cache["activities"]["data"]))
-            return
-        
-        user = auth_manager.get_current_user()
-        if not user:
-            return
-        
+    def _fetch_recent_activities(self, user_id):
+        """Busca as atividades recentes (executado em um worker)"""
         session = db_manager.get_session()
         try:
             # Busca as transações mais recentes
-            recent_transactions = session.query(Transaction).filter(
-                Transaction.user_id == user.id
-            ).order_by(Transaction.date.desc()).limit(5).all()
+            recent_transactions = db_manager.cached_all(session.query(Transaction).filter(
+                Transaction.user_id == user_id
+            ).order_by(Transaction.date.desc()).limit(5))
             
             # Busca os registros de tempo mais recentes
-            recent_time_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id
-            ).order_by(TimeEntry.date.desc()).limit(5).all()
-            
-            # Armazena os dados no cache
-            self._update_cache("activities", (recent_transactions, recent_time_entries))
-            
-            # Atualiza a UI na thread principal
-            self.frame.after(0, lambda: self._update_activities_ui(
-                recent_transactions, recent_time_entries
-            ))
+            recent_time_entries = db_manager.cached_all(session.query(TimeEntry).filter(
+                TimeEntry.user_id == user_id
+            ).order_by(TimeEntry.date.desc()).limit(5))
             
-        except Exception as e:
-            print(f"Erro ao carregar atividades recentes: {e}")
+            return recent_transactions, recent_time_entries
         finally:
             session.close()
     
-    def _update_activities_ui(self, recent_transactions, recent_time_entries):
+    def _update_activities_ui(self, activities):
         """Atualiza a UI com as atividades recentes carregadas"""
+        recent_transactions, recent_time_entries = activities
+        
         # Limpa a lista de atividades
         for widget in self.activities_list.winfo_children():
             if widget != self.loading_indicators["activities"]:
@@ -429,37 +336,18 @@ class Dashboard:
         # Esconde o indicador de carregamento
         self._hide_loading("activities")
     
-    def _update_active_projects_async(self):
-        """Atualiza os projetos ativos de forma assíncrona"""
-        # Verifica se há dados em cache válidos
-        if self._is_cache_valid("projects"):
-            # Usa dados do cache
-            self.frame.after(0, lambda: self._update_projects_ui(self.cache["projects"]["data"]))
-            return
-        
-        user = auth_manager.get_current_user()
-        if not user:
-            return
-        
+    def _fetch_active_projects(self, user_id):
+        """Busca os projetos ativos (executado em um worker)"""
         session = db_manager.get_session()
         try:
             # Busca projetos ativos com relacionamentos carregados
             from sqlalchemy.orm import joinedload
-            active_projects = session.query(Project).options(
+            return db_manager.cached_all(session.query(Project).options(
                 joinedload(Project.client)
             ).filter(
-                Project.user_id == user.id,
+                Project.user_id == user_id,
                 Project.status == ProjectStatus.ATIVO
-            ).all()
-            
-            # Armazena os dados no cache
-            self._update_cache("projects", active_projects)
-            
-            # Atualiza a UI na thread principal
-            self.frame.after(0, lambda: self._update_projects_ui(active_projects))
-            
-        except Exception as e:
-            print(f"Erro ao carregar projetos ativos: {e}")
+            ))
         finally:
             session.close()
     
@@ -523,51 +411,45 @@ class Dashboard:
     def hide(self):
         """Esconde o dashboard"""
         self.frame.pack_forget()
+        
+        # Resultados que chegarem com o dashboard escondido são descartados
+        task_runner.cancel(self.frame)
     
     def refresh(self):
         """Atualiza os dados do dashboard de forma assíncrona"""
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+        
         # Exibe os indicadores de carregamento
         self._show_loading("stats")
         self._show_loading("activities")
         self._show_loading("projects")
         
-        # Atualiza as estatísticas em uma thread separada
-        stats_thread = threading.Thread(target=self._update_statistics_async)
-        stats_thread.daemon = True
-        stats_thread.start()
-        
-        # Atualiza as atividades recentes em uma thread separada
-        activities_thread = threading.Thread(target=self._update_recent_activities_async)
-        activities_thread.daemon = True
-        activities_thread.start()
-        
-        # Atualiza os projetos ativos em uma thread separada
-        projects_thread = threading.Thread(target=self._update_active_projects_async)
-        projects_thread.daemon = True
-        projects_thread.start()
-    
-    def _is_cache_valid(self, cache_key):
-        """Verifica se o cache para a chave especificada é válido"""
-        cache_entry = self.cache.get(cache_key)
-        if not cache_entry or cache_entry["data"] is None or cache_entry["timestamp"] is None:
-            return False
-        
-        # Verifica se o cache ainda é válido com base no tempo
-        now = datetime.now().timestamp()
-        return (now - cache_entry["timestamp"]) < cache_entry["valid_time"]
-    
-    def _update_cache(self, cache_key, data):
-        """Atualiza o cache com novos dados"""
-        if cache_key in self.cache:
-            self.cache[cache_key]["data"] = data
-            self.cache[cache_key]["timestamp"] = datetime.now().timestamp()
+        # Cada seção é uma tarefa do executor compartilhado; refreshes repetidos são agrupados
+        task_runner.submit(
+            self.frame, "stats",
+            lambda: self._fetch_statistics(user.id),
+            on_success=self._update_stats_ui,
+            on_error=lambda e: print(f"Erro ao carregar estatísticas: {e}")
+        )
+        task_runner.submit(
+            self.frame, "activities",
+            lambda: self._fetch_recent_activities(user.id),
+            on_success=self._update_activities_ui,
+            on_error=lambda e: print(f"Erro ao carregar atividades recentes: {e}")
+        )
+        task_runner.submit(
+            self.frame, "projects",
+            lambda: self._fetch_active_projects(user.id),
+            on_success=self._update_projects_ui,
+            on_error=lambda e: print(f"Erro ao carregar projetos ativos: {e}")
+        )
     
     def force_refresh(self):
         """Força a atualização dos dados, ignorando o cache"""
-        # Limpa o cache
-        for key in self.cache:
-            self.cache[key]["data"] = None
-            self.cache[key]["timestamp"] = None
+        # Limpa o cache de consultas
+        db_manager.query_cache.clear()
         
         # Atualiza os dados
         self.refresh()
\ No newline at end of file
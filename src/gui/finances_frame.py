@@ -1,10 +1,19 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
-from datetime import datetime, date
+import tkinter.filedialog as filedialog
+from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
 from ..database.connection import db_manager
 from ..database.models import Transaction, Project, TransactionType
+from ..services.rollups import rollup_service
+from ..services.listings import listing_service, month_range
+from ..services.write_behind import write_queue
+from ..services.statement_import import statement_import_service
+from ..services.replica_sync import replica_sync_service
+from ..database.rollups import NO_PROJECT
 from ..auth.auth_manager import auth_manager
+from .virtual_list import VirtualList
+from .task_runner import task_runner
 
 class FinancesFrame:
     """Frame para gestão financeira"""
@@ -29,6 +38,10 @@ class FinancesFrame:
         self.filter_project_combo = None
         self.filter_month_combo = None
         
+        # Paginação da lista
+        self.current_filters = {}
+        self.next_cursor = None
+        
         # Estatísticas
         self.stats_frame = None
         
@@ -156,19 +169,45 @@ class FinancesFrame:
         self.filter_month_combo.set(current_month)
         self.filter_month_combo.grid(row=0, column=2, padx=(5, 0), sticky="ew")
         
-        # Botão nova transação
+        # Botões nova transação e importação de extrato
+        actions_frame = ctk.CTkFrame(list_frame, fg_color="transparent")
+        actions_frame.grid(row=2, column=0, pady=(0, 10), padx=15)
+        
         new_btn = ctk.CTkButton(
-            list_frame,
+            actions_frame,
             text="+ Nova Transação",
             command=self._new_transaction,
-            width=200
+            width=140
+        )
+        new_btn.grid(row=0, column=0, padx=(0, 5))
+        
+        self.import_btn = ctk.CTkButton(
+            actions_frame,
+            text="📥 Importar Extrato",
+            command=self._import_statement,
+            width=140
         )
-        new_btn.grid(row=2, column=0, pady=(0, 10), padx=15)
+        self.import_btn.grid(row=0, column=1, padx=(5, 0))
         
-        # Lista scrollável
-        self.transactions_list = ctk.CTkScrollableFrame(list_frame, width=300)
-        self.transactions_list.grid(row=3, column=0, sticky="nsew", padx=15, pady=(0, 15))
-        self.transactions_list.grid_columnconfigure(0, weight=1)
+        # Lista virtualizada (só cria botões para as linhas visíveis)
+        self.transactions_list = VirtualList(
+            list_frame,
+            render_row=self._render_transaction_row,
+            on_select=self._select_transaction,
+            empty_text="Nenhuma transação encontrada",
+            width=300
+        )
+        self.transactions_list.grid(row=3, column=0, sticky="nsew", padx=15, pady=(0, 10))
+        
+        # Paginação incremental (keyset)
+        self.load_more_btn = ctk.CTkButton(
+            list_frame,
+            text="Carregar mais",
+            command=self._load_more_transactions,
+            width=200
+        )
+        self.load_more_btn.grid(row=4, column=0, pady=(0, 15), padx=15)
+        self.load_more_btn.grid_remove()
     
     def _create_form(self):
         """Cria o formulário de transação"""
@@ -318,84 +357,84 @@ class FinancesFrame:
         finally:
             session.close()
     
-    def _load_transactions(self):
-        """Carrega a lista de transações"""
-        # Limpa a lista atual
-        for widget in self.transactions_list.winfo_children():
-            widget.destroy()
+    def _listing_filters(self):
+        """Converte os filtros da tela em parâmetros da listagem paginada"""
+        filters = {}
+        
+        filter_type = self.filter_type_combo.get()
+        if filter_type != "Todos":
+            filters["transaction_type"] = TransactionType.RECEITA if filter_type == "Receita" else TransactionType.DESPESA
+        
+        filter_project = self.filter_project_combo.get()
+        if filter_project != "Todos os Projetos":
+            if filter_project in self.projects_data:
+                filters["project_id"] = self.projects_data[filter_project].id
+            else:
+                filters["project_id"] = NO_PROJECT
         
+        filter_month = self.filter_month_combo.get()
+        if filter_month != "Todos os Meses":
+            try:
+                month, year = filter_month.split('/')
+                filters["start"], filters["end"] = month_range(int(year), int(month))
+            except:
+                pass
+        
+        return filters
+    
+    def _load_transactions(self):
+        """Carrega a primeira página da lista de transações"""
         user = auth_manager.get_current_user()
         if not user:
             return
         
-        session = db_manager.get_session()
         try:
-            query = session.query(Transaction).filter(
-                Transaction.user_id == user.id
-            )
-            
-            # Aplica filtros
-            filter_type = self.filter_type_combo.get()
-            if filter_type != "Todos":
-                transaction_type = TransactionType.RECEITA if filter_type == "Receita" else TransactionType.DESPESA
-                query = query.filter(Transaction.type == transaction_type)
-            
-            filter_project = self.filter_project_combo.get()
-            if filter_project != "Todos os Projetos":
-                if filter_project in self.projects_data:
-                    query = query.filter(Transaction.project_id == self.projects_data[filter_project].id)
-                else:
-                    query = query.filter(Transaction.project_id.is_(None))
-            
-            filter_month = self.filter_month_combo.get()
-            if filter_month != "Todos os Meses":
-                try:
-                    month, year = filter_month.split('/')
-                    query = query.filter(
-                        Transaction.date.between(
-                            date(int(year), int(month), 1),
-                            date(int(year), int(month), 31)
-                        )
-                    )
-                except:
-                    pass
-            
-            transactions = query.order_by(Transaction.date.desc()).all()
-            
-            for i, transaction in enumerate(transactions):
-                # Cor baseada no tipo
-                color = "#4CAF50" if transaction.type == TransactionType.RECEITA else "#F44336"
-                
-                # Texto da transação
-                project_text = transaction.project.name if transaction.project else "Geral"
-                amount_text = f"R$ {transaction.amount:.2f}".replace('.', ',')
-                date_text = transaction.date.strftime("%d/%m/%Y")
-                
-                transaction_btn = ctk.CTkButton(
-                    self.transactions_list,
-                    text=f"{transaction.description}\n{project_text}\n{amount_text} - {date_text}",
-                    command=lambda t=transaction: self._select_transaction(t),
-                    height=80,
-                    anchor="w",
-                    fg_color=color
-                )
-                transaction_btn.grid(row=i, column=0, sticky="ew", pady=2)
-            
-            if not transactions:
-                no_transactions_label = ctk.CTkLabel(
-                    self.transactions_list,
-                    text="Nenhuma transação encontrada",
-                    text_color="gray"
-                )
-                no_transactions_label.grid(row=0, column=0, pady=20)
+            self.current_filters = self._listing_filters()
+            page = listing_service.transactions_page(user.id, **self.current_filters)
+            self.transactions_list.set_items(page.items)
+            self._update_load_more(page)
             
             # Atualiza estatísticas
             self._update_stats()
                 
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar transações: {e}")
-        finally:
-            session.close()
+    
+    def _load_more_transactions(self):
+        """Carrega a próxima página e acrescenta ao final da lista"""
+        user = auth_manager.get_current_user()
+        if not user or self.next_cursor is None:
+            return
+        
+        try:
+            page = listing_service.transactions_page(user.id, cursor=self.next_cursor, **self.current_filters)
+            self.transactions_list.append_items(page.items)
+            self._update_load_more(page)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar transações: {e}")
+    
+    def _update_load_more(self, page):
+        """Guarda o cursor da próxima página e mostra o botão se houver mais itens"""
+        self.next_cursor = page.next_cursor
+        if page.has_more:
+            self.load_more_btn.grid()
+        else:
+            self.load_more_btn.grid_remove()
+    
+    def _render_transaction_row(self, transaction):
+        """Opções do botão que representa uma transação na lista"""
+        # Cor baseada no tipo
+        color = "#4CAF50" if transaction.type == TransactionType.RECEITA else "#F44336"
+        
+        # Texto da transação
+        project_text = transaction.project.name if transaction.project else "Geral"
+        amount_text = f"R$ {transaction.amount:.2f}".replace('.', ',')
+        date_text = transaction.date.strftime("%d/%m/%Y")
+        
+        return {
+            "text": f"{transaction.description}\n{project_text}\n{amount_text} - {date_text}",
+            "fg_color": color
+        }
     
     def _update_stats(self):
         """Atualiza as estatísticas financeiras"""
@@ -403,35 +442,14 @@ class FinancesFrame:
         if not user:
             return
         
-        session = db_manager.get_session()
         try:
-            # Filtro de mês atual
-            current_month = datetime.now().month
-            current_year = datetime.now().year
-            
-            # Receitas do mês
-            total_income = session.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.type == TransactionType.RECEITA,
-                Transaction.date.between(
-                    date(current_year, current_month, 1),
-                    date(current_year, current_month, 31)
-                )
-            ).with_entities(Transaction.amount).all()
-            
-            income_sum = sum(t.amount for t in total_income if t.amount)
+            # Totais do mês atual a partir do rollup mensal
+            month_start = date.today().replace(day=1)
+            month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+            totals = rollup_service.transaction_totals(user.id, start=month_start, end=month_end)
             
-            # Despesas do mês
-            total_expense = session.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.type == TransactionType.DESPESA,
-                Transaction.date.between(
-                    date(current_year, current_month, 1),
-                    date(current_year, current_month, 31)
-                )
-            ).with_entities(Transaction.amount).all()
-            
-            expense_sum = sum(t.amount for t in total_expense if t.amount)
+            income_sum = totals[TransactionType.RECEITA]
+            expense_sum = totals[TransactionType.DESPESA]
             
             # Saldo
             balance = income_sum - expense_sum
@@ -460,8 +478,6 @@ class FinancesFrame:
             
         except Exception as e:
             print(f"Erro ao atualizar estatísticas: {e}")
-        finally:
-            session.close()
     
     def _apply_filters(self, value=None):
         """Aplica os filtros selecionados"""
@@ -553,49 +569,36 @@ class FinancesFrame:
         if not user:
             return
         
-        session = db_manager.get_session()
+        values = {
+            'type': TransactionType.RECEITA if self.type_combo.get() == "Receita" else TransactionType.DESPESA,
+            'description': description,
+            'amount': amount,
+            'date': transaction_date,
+            'category': self.category_entry.get().strip() or None
+        }
+        
+        # Projeto
+        project_name = self.project_combo.get()
+        if project_name != "Geral (sem projeto)" and hasattr(self, 'projects_data') and project_name in self.projects_data:
+            values['project_id'] = self.projects_data[project_name].id
+        else:
+            values['project_id'] = None
+        
         try:
             if self.selected_transaction:
                 # Atualiza transação existente
-                transaction = session.query(Transaction).filter(
-                    Transaction.id == self.selected_transaction.id
-                ).first()
-                
-                if not transaction:
-                    messagebox.showerror("Erro", "Transação não encontrada.")
-                    return
+                write_queue.update(Transaction, self.selected_transaction.id, values, on_applied=self._on_write_applied)
             else:
                 # Cria nova transação
-                transaction = Transaction(user_id=user.id)
-                session.add(transaction)
-            
-            # Atualiza dados
-            transaction.type = TransactionType.RECEITA if self.type_combo.get() == "Receita" else TransactionType.DESPESA
-            transaction.description = description
-            transaction.amount = amount
-            transaction.date = transaction_date
-            transaction.category = self.category_entry.get().strip() or None
-            
-            # Projeto
-            project_name = self.project_combo.get()
-            if project_name != "Geral (sem projeto)" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                transaction.project_id = self.projects_data[project_name].id
-            else:
-                transaction.project_id = None
-            
-            session.commit()
+                write_queue.insert(Transaction, dict(values, user_id=user.id), on_applied=self._on_write_applied)
             
             messagebox.showinfo("Sucesso", "Transação salva com sucesso!")
-            self._load_transactions()
             
             if not self.selected_transaction:
                 self._clear_form()
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao salvar transação: {e}")
-        finally:
-            session.close()
     
     def _delete_transaction(self):
         """Exclui a transação selecionada"""
@@ -612,28 +615,73 @@ class FinancesFrame:
         if not result:
             return
         
-        session = db_manager.get_session()
         try:
-            transaction = session.query(Transaction).filter(
-                Transaction.id == self.selected_transaction.id
-            ).first()
+            write_queue.delete(Transaction, self.selected_transaction.id, on_applied=self._on_write_applied)
             
-            if transaction:
-                session.delete(transaction)
-                session.commit()
-                
-                messagebox.showinfo("Sucesso", "Transação excluída com sucesso!")
-                self._load_transactions()
-                self._clear_form()
-                self.selected_transaction = None
-                self.form_title.configure(text="Nova Transação")
-                self.delete_btn.configure(state="disabled")
+            messagebox.showinfo("Sucesso", "Transação excluída com sucesso!")
+            self._clear_form()
+            self.selected_transaction = None
+            self.form_title.configure(text="Nova Transação")
+            self.delete_btn.configure(state="disabled")
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao excluir transação: {e}")
-        finally:
-            session.close()
+    
+    def _import_statement(self):
+        """Importa em segundo plano um extrato bancário (CSV ou OFX)"""
+        if task_runner.is_busy(self.frame, "import_statement"):
+            return
+        
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+        
+        filename = filedialog.askopenfilename(
+            filetypes=[("Extratos", "*.csv *.ofx *.qfx"), ("All files", "*.*")],
+            title="Importar Extrato Bancário"
+        )
+        
+        if not filename:
+            return
+        
+        # O progresso chega do worker pela fila do task_runner
+        def progress(read, inserted):
+            task_runner.post(self.frame, self._update_import_progress, read)
+        
+        self.import_btn.configure(state="disabled", text="⏳ Importando...")
+        task_runner.submit(
+            self.frame, "import_statement",
+            lambda: statement_import_service.import_file(user.id, filename, progress=progress),
+            on_success=self._on_import_done,
+            on_error=self._on_import_error
+        )
+    
+    def _update_import_progress(self, read):
+        self.import_btn.configure(text=f"⏳ {read} linhas...")
+    
+    def _on_import_done(self, result):
+        self.import_btn.configure(state="normal", text="📥 Importar Extrato")
+        
+        message = (
+            f"{result.inserted} transações importadas.\n"
+            f"{result.duplicates} já existiam e foram ignoradas."
+        )
+        if result.invalid:
+            message += f"\n\n{result.invalid} linhas inválidas:\n" + "\n".join(result.errors)
+        messagebox.showinfo("Importação Concluída", message)
+        
+        # A importação grava direto no banco remoto; com a réplica ativa, as linhas chegam no próximo pull
+        if result.inserted and db_manager.replica is not None:
+            replica_sync_service.sync_soon()
+        self._load_transactions()
+    
+    def _on_import_error(self, error):
+        self.import_btn.configure(state="normal", text="📥 Importar Extrato")
+        messagebox.showerror("Erro", f"Erro ao importar extrato: {error}")
+    
+    def _on_write_applied(self, row_id=None):
+        """Chamado pela fila de gravações (thread do flusher) quando a gravação chega ao banco"""
+        task_runner.post(self.frame, self._load_transactions)
     
     def show(self):
         """Exibe o frame de finanças"""
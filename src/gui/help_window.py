@@ -706,8 +706,10 @@ class HelpWindow:
             "Ou digite uma descrição manual da atividade",
             "Clique em '▶️ Iniciar' para começar a contar",
             "O cronômetro mostrará o tempo em tempo real",
-            "Clique em '⏹️ Parar' para finalizar e salvar",
-            "O registro será salvo automaticamente"
+            "Clique em '⏹️ Parar' para finalizar e salvar o timer mais recente (ou no ⏹️ ao lado de cada timer)",
+            "O registro será salvo automaticamente",
+            "Vários projetos podem ter timers ao mesmo tempo (um por projeto)",
+            "Timers em andamento continuam contando se você fechar o aplicativo"
         ]
         
         row = self._add_step_list(timer_steps, row)
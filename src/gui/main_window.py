@@ -1,20 +1,35 @@
 import customtkinter as ctk
+import importlib
 import logging
 from typing import Optional
 from config import config
 from ..auth.auth_manager import auth_manager
+from ..database.connection import db_manager
 from .login_window import LoginWindow
-from .dashboard import Dashboard
-from .clients_frame import ClientsFrame
-from .projects_frame import ProjectsFrame
-from .finances_frame import FinancesFrame
-from .timesheet_frame import TimesheetFrame
-from .reports_frame import ReportsFrame
-from .boards_frame import BoardsFrame
-from .help_window import HelpWindow
+from .task_runner import task_runner
 import tkinter as tk
 from datetime import datetime
 
+# Módulo e classe de cada tela; importados só quando a tela é aberta pela primeira vez
+# (relatórios carregam o ReportLab, por exemplo)
+FRAME_CLASSES = {
+    "dashboard": (".dashboard", "Dashboard"),
+    "clients": (".clients_frame", "ClientsFrame"),
+    "projects": (".projects_frame", "ProjectsFrame"),
+    "boards": (".boards_frame", "BoardsFrame"),
+    "finances": (".finances_frame", "FinancesFrame"),
+    "timesheet": (".timesheet_frame", "TimesheetFrame"),
+    "reports": (".reports_frame", "ReportsFrame")
+}
+
+# Intervalo da reconsulta da barra de status enquanto há trabalho em andamento
+STATUS_POLL_MS = 2000
+
+def frame_class(frame_name):
+    """Importa o módulo da tela e retorna a sua classe"""
+    module_name, class_name = FRAME_CLASSES[frame_name]
+    return getattr(importlib.import_module(module_name, __package__), class_name)
+
 class MainWindow:
     """Janela principal da aplicação DevFlow - Interface Modernizada"""
     
@@ -26,6 +41,10 @@ class MainWindow:
         self.main_frame = None
         self.header_frame = None
         self.status_bar = None
+        self.write_queue_label = None
+        self.replica_label = None
+        self._status_job = None
+        self._status_listening = False
         
         # Frames da aplicação
         self.dashboard_frame = None
@@ -85,6 +104,9 @@ class MainWindow:
         self.root.geometry("1600x900")
         self.root.minsize(1400, 800)
         
+        # Callbacks postados pelas threads de fundo (fila de gravações, réplica) chegam por esta janela
+        task_runner.attach(self.root)
+        
         # Configurar ícone da janela (se disponível)
         try:
             self.root.iconbitmap("assets/icon.ico")
@@ -227,6 +249,25 @@ class MainWindow:
         )
         status_label.pack(side="left", padx=10, pady=5)
         
+        # Gravações ainda na fila local (atualizado após o login)
+        self.write_queue_label = ctk.CTkLabel(
+            self.status_bar,
+            text="💾 Tudo salvo",
+            font=ctk.CTkFont(size=10),
+            text_color=theme["text_secondary"]
+        )
+        self.write_queue_label.pack(side="left", padx=10, pady=5)
+        
+        # Estado da sincronização da réplica local (atualizado após o login)
+        if db_manager.replica is not None:
+            self.replica_label = ctk.CTkLabel(
+                self.status_bar,
+                text="🔄 Réplica local",
+                font=ctk.CTkFont(size=10),
+                text_color=theme["text_secondary"]
+            )
+            self.replica_label.pack(side="left", padx=10, pady=5)
+        
         # Informações adicionais
         info_label = ctk.CTkLabel(
             self.status_bar,
@@ -458,6 +499,10 @@ class MainWindow:
     
     def show_frame(self, frame_name):
         """Exibe o frame especificado"""
+        # Esconde o frame anterior (descarta as cargas que ele ainda tiver em andamento)
+        if self.current_frame and hasattr(self.current_frame, 'hide'):
+            self.current_frame.hide()
+        
         # Limpa o container atual
         for widget in self.content_container.winfo_children():
             widget.pack_forget()
@@ -476,37 +521,14 @@ class MainWindow:
         # Atualiza a UI para mostrar o indicador de carregamento
         self.content_container.update()
         
-        # Inicializa o frame se ainda não existir
-        if frame_name == "dashboard" and self.dashboard_frame is None:
-            self.dashboard_frame = Dashboard(self.content_container)
-        elif frame_name == "clients" and self.clients_frame is None:
-            self.clients_frame = ClientsFrame(self.content_container)
-        elif frame_name == "projects" and self.projects_frame is None:
-            self.projects_frame = ProjectsFrame(self.content_container)
-        elif frame_name == "boards" and self.boards_frame is None:
-            self.boards_frame = BoardsFrame(self.content_container)
-        elif frame_name == "finances" and self.finances_frame is None:
-            self.finances_frame = FinancesFrame(self.content_container)
-        elif frame_name == "timesheet" and self.timesheet_frame is None:
-            self.timesheet_frame = TimesheetFrame(self.content_container)
-        elif frame_name == "reports" and self.reports_frame is None:
-            self.reports_frame = ReportsFrame(self.content_container)
-        
-        # Define o frame atual
-        if frame_name == "dashboard":
-            self.current_frame = self.dashboard_frame
-        elif frame_name == "clients":
-            self.current_frame = self.clients_frame
-        elif frame_name == "projects":
-            self.current_frame = self.projects_frame
-        elif frame_name == "boards":
-            self.current_frame = self.boards_frame
-        elif frame_name == "finances":
-            self.current_frame = self.finances_frame
-        elif frame_name == "timesheet":
-            self.current_frame = self.timesheet_frame
-        elif frame_name == "reports":
-            self.current_frame = self.reports_frame
+        # Inicializa o frame se ainda não existir (o módulo da tela é importado aqui)
+        if frame_name in FRAME_CLASSES:
+            attribute = f"{frame_name}_frame"
+            if getattr(self, attribute) is None:
+                setattr(self, attribute, frame_class(frame_name)(self.content_container))
+            
+            # Define o frame atual
+            self.current_frame = getattr(self, attribute)
         
         # Atualiza os botões de navegação
         self._update_nav_buttons(frame_name)
@@ -525,11 +547,114 @@ class MainWindow:
     def _show_help(self):
         """Exibe a janela de ajuda"""
         if self.help_window is None:
+            from .help_window import HelpWindow
             self.help_window = HelpWindow(self.root)
         self.help_window.show()
     
+    def _start_background_status(self):
+        """Inicia a sincronização da réplica (se ativa) e o acompanhamento na barra de status"""
+        from ..services.write_behind import write_queue
+        
+        # A barra só é atualizada quando a fila ou a réplica avisam de uma mudança de estado
+        if not self._status_listening:
+            write_queue.add_listener(self._on_background_change)
+            if db_manager.replica is not None:
+                from ..services.replica_sync import replica_sync_service
+                replica_sync_service.add_listener(self._on_background_change)
+            self._status_listening = True
+        
+        if db_manager.replica is not None:
+            from ..services.replica_sync import replica_sync_service
+            replica_sync_service.start(auth_manager.get_current_user().id)
+        self._refresh_status()
+    
+    @staticmethod
+    def _background_status():
+        """Estado da fila de gravações e da réplica (roda em um worker: consulta os SQLite locais)"""
+        from ..services.write_behind import write_queue
+        
+        replica_status = None
+        if db_manager.replica is not None:
+            from ..services.replica_sync import replica_sync_service
+            replica_status = replica_sync_service.status()
+        return write_queue.status(), replica_status
+    
+    def _on_background_change(self):
+        """Aviso da fila de gravações ou da réplica (chamado na thread delas)"""
+        task_runner.post(self.status_bar, self._refresh_status)
+    
+    def _refresh_status(self):
+        """Consulta o estado em segundo plano em um worker"""
+        task_runner.submit(
+            self.status_bar, "background_status", self._background_status,
+            on_success=self._show_status
+        )
+    
+    def _poll_status(self):
+        self._status_job = None
+        self._refresh_status()
+    
+    def _schedule_status_poll(self, active):
+        """Reconsulta a cada STATUS_POLL_MS só enquanto há gravações pendentes ou sincronização em andamento"""
+        if self._status_job is not None:
+            self.root.after_cancel(self._status_job)
+            self._status_job = None
+        if active:
+            self._status_job = self.root.after(STATUS_POLL_MS, self._poll_status)
+    
+    def _show_status(self, statuses):
+        """Mostra gravações pendentes e o estado da réplica na barra de status"""
+        write_status, replica_status = statuses
+        theme = self.themes[self.current_theme]
+        
+        if write_status.failed:
+            text, color = f"⚠️ {write_status.failed} gravações com erro", theme["danger"]
+        elif write_status.pending and write_status.last_error:
+            text, color = f"⏳ {write_status.pending} gravações aguardando o banco", theme["warning"]
+        elif write_status.pending:
+            text, color = f"⏳ Salvando {write_status.pending} gravações...", theme["text_secondary"]
+        else:
+            text, color = "💾 Tudo salvo", theme["success"]
+        self.write_queue_label.configure(text=text, text_color=color)
+        
+        if replica_status is not None:
+            self._show_replica_status(replica_status)
+        
+        # A espera do backoff e o andamento do envio não geram avisos: acompanha enquanto durarem
+        self._schedule_status_poll(
+            bool(write_status.pending) or (replica_status is not None and replica_status.syncing)
+        )
+    
+    def _show_replica_status(self, status):
+        """Mostra na barra de status se a réplica está sincronizada, offline ou com pendências"""
+        theme = self.themes[self.current_theme]
+        synced_at = status.last_sync_at.strftime('%H:%M') if status.last_sync_at else "—"
+        
+        if status.online is False:
+            text, color = f"📴 Offline (última sincronização {synced_at})", theme["warning"]
+        elif status.online is None:
+            text, color = "🔄 Sincronizando réplica...", theme["text_secondary"]
+        else:
+            text, color = f"🔄 Sincronizado às {synced_at}", theme["success"]
+        
+        if status.pending:
+            text += f" | {status.pending} alterações pendentes"
+        if status.conflicts:
+            text += f" | {status.conflicts} conflitos"
+            color = theme["warning"]
+        self.replica_label.configure(text=text, text_color=color)
+    
+    def _stop_replica_sync(self):
+        """Encerra a sincronização em segundo plano (logout ou fechamento)"""
+        if db_manager.replica is None:
+            return
+        from ..services.replica_sync import replica_sync_service
+        
+        replica_sync_service.stop()
+    
     def _logout(self):
         """Realiza logout e volta para a tela de login"""
+        self._stop_replica_sync()
         auth_manager.logout()
         self.root.destroy()
         self.show_login()
@@ -537,7 +662,13 @@ class MainWindow:
     def _on_closing(self):
         """Chamado quando a janela é fechada"""
         self.logger.info("Aplicação sendo fechada")
+        self._stop_replica_sync()
+        
+        # Última tentativa de aplicar a fila; o que sobrar é aplicado na próxima execução
+        from ..services.write_behind import write_queue
+        write_queue.stop()
         auth_manager.logout()
+        task_runner.shutdown()
         self.root.destroy()
     
     def show_login(self):
@@ -548,31 +679,33 @@ class MainWindow:
     def _on_login_success(self):
         """Chamado quando o login é realizado com sucesso"""
         # Pré-inicializa o dashboard em segundo plano
-        self.dashboard_frame = Dashboard(self.content_container)
+        self.dashboard_frame = frame_class("dashboard")(self.content_container)
         
         # Inicia o pré-carregamento dos frames mais utilizados em segundo plano
         self._preload_common_frames()
         
         self.root.deiconify()  # Mostra a janela principal
         self.show_frame("dashboard")  # Mostra o dashboard por padrão
+        
+        # Fila de gravações e réplica: estado na barra de status
+        self._start_background_status()
     
     def _preload_common_frames(self):
-        """Pré-carrega os frames mais utilizados em segundo plano"""
-        import threading
-        
+        """Pré-carrega os frames mais utilizados quando o loop do Tk estiver ocioso"""
         def preload():
-            # Pré-carrega os frames mais comuns em segundo plano
-            # para melhorar a experiência do usuário
+            # Widgets do Tk só podem ser criados na thread principal;
+            # as consultas de cada frame rodam depois no task_runner
             try:
-                self.clients_frame = ClientsFrame(self.content_container)
-                self.projects_frame = ProjectsFrame(self.content_container)
+                if self.clients_frame is None:
+                    self.clients_frame = frame_class("clients")(self.content_container)
+                    self.clients_frame.hide()
+                if self.projects_frame is None:
+                    self.projects_frame = frame_class("projects")(self.content_container)
+                    self.projects_frame.hide()
             except Exception as e:
                 self.logger.error(f"Erro ao pré-carregar frames: {e}")
         
-        # Inicia o pré-carregamento em uma thread separada
-        preload_thread = threading.Thread(target=preload)
-        preload_thread.daemon = True
-        preload_thread.start()
+        self.root.after_idle(preload)
     
     def run(self):
         """Inicia a aplicação"""
@@ -1,13 +1,14 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
 import webbrowser
-import threading
-import time
 from datetime import datetime
 from sqlalchemy.orm import Session
 from ..database.connection import db_manager
 from ..database.models import Project, Client, ProjectStatus
+from ..services.write_behind import write_queue
 from ..auth.auth_manager import auth_manager
+from .virtual_list import VirtualList
+from .task_runner import task_runner
 
 class ProjectsFrame:
     """Frame para gestão de projetos"""
@@ -29,25 +30,10 @@ class ProjectsFrame:
         self.end_date_entry = None
         
         # Indicadores de carregamento
-        self.projects_loading_indicator = None
         self.clients_loading_indicator = None
         self.is_projects_loading = False
         self.is_clients_loading = False
         
-        # Cache de dados
-        self.cache = {
-            "projects": {
-                "data": None,
-                "timestamp": None,
-                "valid_time": 300  # 5 minutos em segundos
-            },
-            "clients": {
-                "data": None,
-                "timestamp": None,
-                "valid_time": 300  # 5 minutos em segundos
-            }
-        }
-        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -87,17 +73,15 @@ class ProjectsFrame:
         )
         new_btn.grid(row=1, column=0, pady=(0, 10), padx=15)
         
-        # Lista scrollável
-        self.projects_list = ctk.CTkScrollableFrame(list_frame, width=250)
-        self.projects_list.grid(row=2, column=0, sticky="nsew", padx=15, pady=(0, 15))
-        self.projects_list.grid_columnconfigure(0, weight=1)
-        
-        # Indicador de carregamento (não adicionado ao grid ainda)
-        self.projects_loading_indicator = ctk.CTkLabel(
-            self.projects_list,
-            text="Carregando projetos...",
-            text_color="gray"
+        # Lista virtualizada (só cria botões para as linhas visíveis)
+        self.projects_list = VirtualList(
+            list_frame,
+            render_row=self._render_project_row,
+            on_select=self._select_project,
+            empty_text="Nenhum projeto cadastrado",
+            width=250
         )
+        self.projects_list.grid(row=2, column=0, sticky="nsew", padx=15, pady=(0, 15))
     
     def _create_form(self):
         """Cria o formulário de projeto"""
@@ -257,21 +241,6 @@ class ProjectsFrame:
         # Inicialmente desabilita botão de excluir
         self.delete_btn.configure(state="disabled")
     
-    def _is_cache_valid(self, cache_key):
-        """Verifica se o cache é válido"""
-        cache = self.cache[cache_key]
-        if not cache["data"] or not cache["timestamp"]:
-            return False
-        
-        # Verifica se o cache ainda é válido
-        current_time = time.time()
-        return (current_time - cache["timestamp"]) < cache["valid_time"]
-    
-    def _update_cache(self, cache_key, data):
-        """Atualiza o cache com novos dados"""
-        self.cache[cache_key]["data"] = data
-        self.cache[cache_key]["timestamp"] = time.time()
-    
     def _show_clients_loading(self):
         """Exibe o indicador de carregamento de clientes"""
         if not self.is_clients_loading:
@@ -285,43 +254,35 @@ class ProjectsFrame:
     
     def _load_clients_combo(self):
         """Carrega os clientes no combobox de forma assíncrona"""
-        self._show_clients_loading()
-        
-        # Inicia o carregamento em uma thread separada
-        load_thread = threading.Thread(target=self._load_clients_async)
-        load_thread.daemon = True
-        load_thread.start()
-    
-    def _load_clients_async(self):
-        """Carrega os clientes em uma thread separada"""
         user = auth_manager.get_current_user()
         if not user:
-            self.frame.after(0, self._hide_clients_loading)
             return
         
-        # Verifica se o cache é válido
-        if self._is_cache_valid("clients"):
-            self.frame.after(0, lambda: self._update_clients_ui(self.cache["clients"]["data"]))
-            return
+        self._show_clients_loading()
         
+        task_runner.submit(
+            self.frame, "clients",
+            lambda: self._fetch_clients(user.id),
+            on_success=self._update_clients_ui,
+            on_error=self._on_clients_error
+        )
+    
+    def _fetch_clients(self, user_id):
+        """Busca os clientes ativos (executado em um worker)"""
         session = db_manager.get_session()
         try:
-            clients = session.query(Client).filter(
-                Client.user_id == user.id,
+            return db_manager.cached_all(session.query(Client).filter(
+                Client.user_id == user_id,
                 Client.is_active == True
-            ).order_by(Client.name).all()
-            
-            # Atualiza o cache
-            self._update_cache("clients", clients)
-            
-            # Atualiza a UI na thread principal
-            self.frame.after(0, lambda: self._update_clients_ui(clients))
-            
-        except Exception as e:
-            self.frame.after(0, lambda: print(f"Erro ao carregar clientes: {e}"))
+            ).order_by(Client.name))
         finally:
             session.close()
     
+    def _on_clients_error(self, error):
+        """Registra o erro de carregamento dos clientes"""
+        self._hide_clients_loading()
+        print(f"Erro ao carregar clientes: {error}")
+    
     def _update_clients_ui(self, clients):
         """Atualiza a UI com os clientes carregados"""
         client_names = [client.name for client in clients]
@@ -341,107 +302,69 @@ class ProjectsFrame:
     def _show_projects_loading(self):
         """Exibe o indicador de carregamento de projetos"""
         if not self.is_projects_loading:
-            # Limpa a lista atual
-            for widget in self.projects_list.winfo_children():
-                widget.destroy()
-            
-            self.projects_loading_indicator = ctk.CTkLabel(
-                self.projects_list,
-                text="Carregando projetos...",
-                text_color="gray"
-            )
-            self.projects_loading_indicator.grid(row=0, column=0, pady=20)
+            self.projects_list.show_message("Carregando projetos...")
             self.is_projects_loading = True
     
     def _hide_projects_loading(self):
         """Esconde o indicador de carregamento de projetos"""
-        if self.is_projects_loading:
-            try:
-                if self.projects_loading_indicator.winfo_exists():
-                    self.projects_loading_indicator.grid_forget()
-            except tk.TclError:
-                pass  # Widget já foi destruído
-            self.is_projects_loading = False
+        self.is_projects_loading = False
     
     def _load_projects(self):
         """Carrega a lista de projetos de forma assíncrona"""
-        self._show_projects_loading()
-        
-        # Inicia o carregamento em uma thread separada
-        load_thread = threading.Thread(target=self._load_projects_async)
-        load_thread.daemon = True
-        load_thread.start()
-    
-    def _load_projects_async(self):
-        """Carrega a lista de projetos em uma thread separada"""
         user = auth_manager.get_current_user()
         if not user:
-            self.frame.after(0, self._hide_projects_loading)
             return
         
-        # Verifica se o cache é válido
-        if self._is_cache_valid("projects"):
-            self.frame.after(0, lambda: self._update_projects_ui(self.cache["projects"]["data"]))
-            return
+        self._show_projects_loading()
         
+        # Executa no pool da interface; só o resultado do pedido mais recente é exibido
+        task_runner.submit(
+            self.frame, "projects",
+            lambda: self._fetch_projects(user.id),
+            on_success=self._update_projects_ui,
+            on_error=self._on_projects_error
+        )
+    
+    def _fetch_projects(self, user_id):
+        """Busca os projetos do usuário (executado em um worker)"""
         session = db_manager.get_session()
         try:
             from sqlalchemy.orm import joinedload
-            projects = session.query(Project).options(
+            # Resultado em cache até um commit alterar projetos ou clientes
+            return db_manager.cached_all(session.query(Project).options(
                 joinedload(Project.client)
             ).filter(
-                Project.user_id == user.id
-            ).order_by(Project.created_at.desc()).all()
-            
-            # Atualiza o cache
-            self._update_cache("projects", projects)
-            
-            # Atualiza a UI na thread principal
-            self.frame.after(0, lambda: self._update_projects_ui(projects))
-                
-        except Exception as e:
-            self.frame.after(0, lambda: messagebox.showerror("Erro", f"Erro ao carregar projetos: {e}"))
+                Project.user_id == user_id
+            ).order_by(Project.created_at.desc()))
         finally:
             session.close()
     
+    def _on_projects_error(self, error):
+        """Exibe o erro de carregamento da lista"""
+        self._hide_projects_loading()
+        messagebox.showerror("Erro", f"Erro ao carregar projetos: {error}")
+    
     def _update_projects_ui(self, projects):
         """Atualiza a UI com os projetos carregados"""
-        # Limpa a lista atual
-        for widget in self.projects_list.winfo_children():
-            widget.destroy()
-        
-        for i, project in enumerate(projects):
-            # Cor baseada no status
-            status_colors = {
-                ProjectStatus.PROPOSTA: "#FF9800",
-                ProjectStatus.ATIVO: "#4CAF50",
-                ProjectStatus.CONCLUIDO: "#2196F3",
-                ProjectStatus.CANCELADO: "#F44336",
-                ProjectStatus.PAUSADO: "#9E9E9E"
-            }
-            
-            color = status_colors.get(project.status, "#2196F3")
-            
-            project_btn = ctk.CTkButton(
-                self.projects_list,
-                text=f"{project.name}\n{project.client.name}\n{project.status.value.title()}",
-                command=lambda p=project: self._select_project(p),
-                height=80,
-                anchor="w",
-                fg_color=color
-            )
-            project_btn.grid(row=i, column=0, sticky="ew", pady=2)
-        
-        if not projects:
-            no_projects_label = ctk.CTkLabel(
-                self.projects_list,
-                text="Nenhum projeto cadastrado",
-                text_color="gray"
-            )
-            no_projects_label.grid(row=0, column=0, pady=20)
-        
+        self.projects_list.set_items(projects)
         self._hide_projects_loading()
     
+    def _render_project_row(self, project):
+        """Opções do botão que representa um projeto na lista"""
+        # Cor baseada no status
+        status_colors = {
+            ProjectStatus.PROPOSTA: "#FF9800",
+            ProjectStatus.ATIVO: "#4CAF50",
+            ProjectStatus.CONCLUIDO: "#2196F3",
+            ProjectStatus.CANCELADO: "#F44336",
+            ProjectStatus.PAUSADO: "#9E9E9E"
+        }
+        
+        return {
+            "text": f"{project.name}\n{project.client.name}\n{project.status.value.title()}",
+            "fg_color": status_colors.get(project.status, "#2196F3")
+        }
+    
     def _select_project(self, project):
         """Seleciona um projeto e carrega seus dados no formulário"""
         self.selected_project = project
@@ -532,79 +455,66 @@ class ProjectsFrame:
         if not user:
             return
         
-        session = db_manager.get_session()
+        values = {
+            'name': name,
+            'client_id': self.clients_data[client_name].id,
+            'description': self.description_text.get("1.0", 'end').strip() or None
+        }
+        
+        # Orçamento
+        budget_str = self.budget_entry.get().strip().replace(',', '.')
+        if budget_str:
+            try:
+                values['budget'] = float(budget_str)
+            except ValueError:
+                messagebox.showerror("Erro", "Valor do orçamento inválido.")
+                return
+        else:
+            values['budget'] = None
+        
+        # Status
+        status_map = {
+            "Proposta": ProjectStatus.PROPOSTA,
+            "Ativo": ProjectStatus.ATIVO,
+            "Concluído": ProjectStatus.CONCLUIDO,
+            "Cancelado": ProjectStatus.CANCELADO,
+            "Pausado": ProjectStatus.PAUSADO
+        }
+        values['status'] = status_map[self.status_combo.get()]
+        
+        # Datas
+        values['start_date'] = self._parse_date(self.start_date_entry.get())
+        values['end_date'] = self._parse_date(self.end_date_entry.get())
+        
+        # Contrato
+        contract_name = self.contract_name_entry.get().strip()
+        contract_link = self.contract_link_entry.get().strip()
+        
+        if contract_name and contract_link:
+            values['contract_file_name'] = contract_name
+            values['contract_drive_link'] = contract_link
+            if not self.selected_project:  # Novo projeto
+                values['contract_uploaded_at'] = datetime.now()
+        elif not contract_name and not contract_link:
+            values['contract_file_name'] = None
+            values['contract_drive_link'] = None
+            values['contract_uploaded_at'] = None
+        
         try:
             if self.selected_project:
                 # Atualiza projeto existente
-                project = session.query(Project).filter(
-                    Project.id == self.selected_project.id
-                ).first()
-                
-                if not project:
-                    messagebox.showerror("Erro", "Projeto não encontrado.")
-                    return
+                write_queue.update(Project, self.selected_project.id, values, on_applied=self._on_write_applied)
             else:
                 # Cria novo projeto
-                project = Project(user_id=user.id)
-                session.add(project)
-            
-            # Atualiza dados
-            project.name = name
-            project.client_id = self.clients_data[client_name].id
-            project.description = self.description_text.get("1.0", 'end').strip() or None
-            
-            # Orçamento
-            budget_str = self.budget_entry.get().strip().replace(',', '.')
-            if budget_str:
-                try:
-                    project.budget = float(budget_str)
-                except ValueError:
-                    messagebox.showerror("Erro", "Valor do orçamento inválido.")
-                    return
-            else:
-                project.budget = None
-            
-            # Status
-            status_map = {
-                "Proposta": ProjectStatus.PROPOSTA,
-                "Ativo": ProjectStatus.ATIVO,
-                "Concluído": ProjectStatus.CONCLUIDO,
-                "Cancelado": ProjectStatus.CANCELADO,
-                "Pausado": ProjectStatus.PAUSADO
-            }
-            project.status = status_map[self.status_combo.get()]
-            
-            # Datas
-            project.start_date = self._parse_date(self.start_date_entry.get())
-            project.end_date = self._parse_date(self.end_date_entry.get())
-            
-            # Contrato
-            contract_name = self.contract_name_entry.get().strip()
-            contract_link = self.contract_link_entry.get().strip()
-            
-            if contract_name and contract_link:
-                project.contract_file_name = contract_name
-                project.contract_drive_link = contract_link
-                if not self.selected_project:  # Novo projeto
-                    project.contract_uploaded_at = datetime.now()
-            elif not contract_name and not contract_link:
-                project.contract_file_name = None
-                project.contract_drive_link = None
-                project.contract_uploaded_at = None
-            
-            session.commit()
+                write_queue.insert(Project, dict(values, user_id=user.id), on_applied=self._on_write_applied)
             
             messagebox.showinfo("Sucesso", "Projeto salvo com sucesso!")
-            self._load_projects()
             
             if not self.selected_project:
                 self._clear_form()
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao salvar projeto: {e}")
-        finally:
-            session.close()
     
     def _delete_project(self):
         """Exclui o projeto selecionado"""
@@ -622,28 +532,21 @@ class ProjectsFrame:
         if not result:
             return
         
-        session = db_manager.get_session()
         try:
-            project = session.query(Project).filter(
-                Project.id == self.selected_project.id
-            ).first()
+            write_queue.delete(Project, self.selected_project.id, on_applied=self._on_write_applied)
             
-            if project:
-                session.delete(project)
-                session.commit()
-                
-                messagebox.showinfo("Sucesso", "Projeto excluído com sucesso!")
-                self._load_projects()
-                self._clear_form()
-                self.selected_project = None
-                self.form_title.configure(text="Dados do Projeto")
-                self.delete_btn.configure(state="disabled")
+            messagebox.showinfo("Sucesso", "Projeto excluído com sucesso!")
+            self._clear_form()
+            self.selected_project = None
+            self.form_title.configure(text="Dados do Projeto")
+            self.delete_btn.configure(state="disabled")
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao excluir projeto: {e}")
-        finally:
-            session.close()
+    
+    def _on_write_applied(self, row_id=None):
+        """Chamado pela fila de gravações (thread do flusher) quando a gravação chega ao banco"""
+        task_runner.post(self.frame, self._load_projects)
     
     def _open_contract(self):
         """Abre o link do contrato no navegador"""
@@ -669,6 +572,9 @@ class ProjectsFrame:
     def hide(self):
         """Esconde o frame de projetos"""
         self.frame.pack_forget()
+        task_runner.cancel(self.frame)
+        self._hide_clients_loading()
+        self._hide_projects_loading()
     
     def refresh(self):
         """Atualiza os dados do frame"""
@@ -677,11 +583,8 @@ class ProjectsFrame:
     
     def force_refresh(self):
         """Força a atualização dos dados, ignorando o cache"""
-        # Limpa o cache
-        self.cache["projects"]["data"] = None
-        self.cache["projects"]["timestamp"] = None
-        self.cache["clients"]["data"] = None
-        self.cache["clients"]["timestamp"] = None
+        # Limpa o cache de consultas
+        db_manager.query_cache.clear()
         
         # Recarrega os dados
         self.refresh()
\ No newline at end of file
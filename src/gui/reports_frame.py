@@ -4,22 +4,16 @@ import tkinter.filedialog as filedialog
 from datetime import datetime, date
 import os
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from ..database.connection import db_manager
-from ..database.models import Project, Transaction, TimeEntry, TransactionType, ProjectStatus
+from ..database.models import Project, TransactionType, ProjectStatus
+from ..services.report_data import report_data_service
+from ..services.report_pdf import pdf_report_renderer, REPORT_TYPES, REPORTLAB_AVAILABLE
+from ..services.batch_invoices import batch_invoice_service
+from ..services.data_export import data_export_service, dependency_available, EXPORT_DATASETS
 from ..auth.auth_manager import auth_manager
+from .task_runner import task_runner
 from config import Config
 
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-
 class ReportsFrame:
     """Frame para geração de relatórios"""
     
@@ -36,6 +30,12 @@ class ReportsFrame:
         # Preview
         self.preview_text = None
         
+        # Exportação em segundo plano
+        self.export_btn = None
+        self.batch_btn = None
+        self.export_progress = None
+        self.export_status_label = None
+        
         self._create_widgets()
     
     def _create_widgets(self):
@@ -150,7 +150,7 @@ class ReportsFrame:
         preview_btn.grid(row=0, column=0, sticky="ew", pady=(0, 10))
         
         if REPORTLAB_AVAILABLE:
-            export_btn = ctk.CTkButton(
+            self.export_btn = ctk.CTkButton(
                 buttons_frame,
                 text="📄 Exportar PDF",
                 command=self._export_pdf,
@@ -158,7 +158,33 @@ class ReportsFrame:
                 fg_color="#4CAF50",
                 hover_color="#45a049"
             )
-            export_btn.grid(row=1, column=0, sticky="ew", pady=(0, 10))
+            self.export_btn.grid(row=1, column=0, sticky="ew", pady=(0, 10))
+            
+            # Faturas de todos os projetos com horas no período
+            self.batch_btn = ctk.CTkButton(
+                buttons_frame,
+                text="🧾 Faturas em Lote",
+                command=self._export_batch_invoices,
+                height=40,
+                fg_color="gray",
+                hover_color="darkgray"
+            )
+            self.batch_btn.grid(row=2, column=0, sticky="ew", pady=(0, 10))
+            
+            # Progresso da exportação (visível apenas durante a geração)
+            self.export_progress = ctk.CTkProgressBar(buttons_frame, mode="determinate")
+            self.export_progress.set(0)
+            self.export_progress.grid(row=3, column=0, sticky="ew", pady=(0, 5))
+            self.export_progress.grid_remove()
+            
+            self.export_status_label = ctk.CTkLabel(
+                buttons_frame,
+                text="",
+                font=ctk.CTkFont(size=11),
+                text_color="gray"
+            )
+            self.export_status_label.grid(row=4, column=0, sticky="w")
+            self.export_status_label.grid_remove()
         else:
             no_pdf_label = ctk.CTkLabel(
                 buttons_frame,
@@ -168,6 +194,45 @@ class ReportsFrame:
             )
             no_pdf_label.grid(row=1, column=0, pady=(0, 10))
         
+        # Exportação dos dados brutos (formato pela extensão do arquivo escolhido)
+        data_frame = ctk.CTkFrame(controls_frame, fg_color="transparent")
+        data_frame.grid(row=8, column=0, sticky="new", padx=15, pady=(20, 0))
+        data_frame.grid_columnconfigure(0, weight=1)
+        
+        data_label = ctk.CTkLabel(
+            data_frame,
+            text="📤 Exportar Dados",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        data_label.grid(row=0, column=0, sticky="w", pady=(0, 10))
+        
+        self.export_dataset_combo = ctk.CTkComboBox(
+            data_frame,
+            values=list(EXPORT_DATASETS.values()),
+            width=250
+        )
+        self.export_dataset_combo.set(EXPORT_DATASETS['transactions'])
+        self.export_dataset_combo.grid(row=1, column=0, sticky="ew", pady=(0, 10))
+        
+        self.export_data_btn = ctk.CTkButton(
+            data_frame,
+            text="💾 CSV / Parquet / XLSX",
+            command=self._export_data,
+            height=35,
+            fg_color="gray",
+            hover_color="darkgray"
+        )
+        self.export_data_btn.grid(row=2, column=0, sticky="ew", pady=(0, 5))
+        
+        self.export_data_label = ctk.CTkLabel(
+            data_frame,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color="gray"
+        )
+        self.export_data_label.grid(row=3, column=0, sticky="w")
+        self.export_data_label.grid_remove()
+        
         # Atalhos rápidos
         shortcuts_label = ctk.CTkLabel(
             controls_frame,
@@ -314,20 +379,30 @@ class ReportsFrame:
         
         self._generate_preview()
     
-    def _generate_preview(self):
-        """Gera a visualização do relatório"""
-        report_type = self.report_type_combo.get()
-        project_name = self.project_combo.get()
+    def _selected_period(self):
+        """Período informado nos filtros (None, com aviso, se inválido)"""
         start_date = self._parse_date(self.start_date_entry.get())
         end_date = self._parse_date(self.end_date_entry.get())
         
         if not start_date or not end_date:
             messagebox.showerror("Erro", "Datas inválidas. Use o formato DD/MM/AAAA.")
-            return
+            return None
         
         if start_date > end_date:
             messagebox.showerror("Erro", "A data de início deve ser anterior à data de fim.")
+            return None
+        
+        return start_date, end_date
+    
+    def _generate_preview(self):
+        """Gera a visualização do relatório"""
+        report_type = self.report_type_combo.get()
+        project_name = self.project_combo.get()
+        
+        period = self._selected_period()
+        if not period:
             return
+        start_date, end_date = period
         
         user = auth_manager.get_current_user()
         if not user:
@@ -356,465 +431,350 @@ class ReportsFrame:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar relatório: {e}")
     
+    def _selected_project_id(self, project_name):
+        """Id do projeto selecionado no filtro (None para todos)"""
+        if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
+            return self.projects_data[project_name].id
+        return None
+    
     def _generate_project_report(self, user, project_name, start_date, end_date):
         """Gera relatório de projeto"""
-        session = db_manager.get_session()
-        try:
-            content = []
-            content.append("📊 RELATÓRIO DE PROJETO")
-            content.append("=" * 50)
-            content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
-            content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
-            content.append("")
+        content = []
+        content.append("📊 RELATÓRIO DE PROJETO")
+        content.append("=" * 50)
+        content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
+        content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+        content.append("")
+        
+        # Projetos, transações e horas do período em consultas agrupadas
+        project_id = self._selected_project_id(project_name)
+        data = report_data_service.load(user.id, start_date, end_date, project_id=project_id)
+        
+        content.append(f"Projeto: {project_name if project_id else 'Todos os Projetos'}")
+        content.append("")
+        
+        for item in data.projects:
+            project = item.project
+            content.append(f"📁 {project.name}")
+            content.append("-" * 30)
+            content.append(f"Cliente: {item.client.name}")
+            content.append(f"Status: {project.status.value.title()}")
+            
+            if project.description:
+                content.append(f"Descrição: {project.description}")
             
-            # Filtro de projetos
-            query = session.query(Project).filter(Project.user_id == user.id)
+            if project.budget:
+                content.append(f"Orçamento: R$ {project.budget:.2f}".replace('.', ','))
             
-            if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                projects = [self.projects_data[project_name]]
-                content.append(f"Projeto: {project_name}")
-            else:
-                projects = query.all()
-                content.append("Projeto: Todos os Projetos")
+            if project.start_date:
+                content.append(f"Data de Início: {project.start_date.strftime('%d/%m/%Y')}")
             
-            content.append("")
+            if project.end_date:
+                content.append(f"Data de Fim: {project.end_date.strftime('%d/%m/%Y')}")
             
-            for project in projects:
-                content.append(f"📁 {project.name}")
-                content.append("-" * 30)
-                content.append(f"Cliente: {project.client.name}")
-                content.append(f"Status: {project.status.value.title()}")
-                
-                if project.description:
-                    content.append(f"Descrição: {project.description}")
-                
-                if project.budget:
-                    content.append(f"Orçamento: R$ {project.budget:.2f}".replace('.', ','))
+            # Transações do projeto no período
+            if item.transactions:
+                content.append("\n💰 Transações:")
                 
-                if project.start_date:
-                    content.append(f"Data de Início: {project.start_date.strftime('%d/%m/%Y')}")
-                
-                if project.end_date:
-                    content.append(f"Data de Fim: {project.end_date.strftime('%d/%m/%Y')}")
-                
-                # Transações do projeto no período
-                transactions = session.query(Transaction).filter(
-                    Transaction.user_id == user.id,
-                    Transaction.project_id == project.id,
-                    Transaction.date.between(start_date, end_date)
-                ).all()
-                
-                if transactions:
-                    content.append("\n💰 Transações:")
-                    total_income = 0
-                    total_expense = 0
-                    
-                    for trans in transactions:
-                        type_symbol = "📈" if trans.type == TransactionType.RECEITA else "📉"
-                        amount_text = f"R$ {trans.amount:.2f}".replace('.', ',')
-                        content.append(f"  {type_symbol} {trans.description} - {amount_text} ({trans.date.strftime('%d/%m/%Y')})")
-                        
-                        if trans.type == TransactionType.RECEITA:
-                            total_income += trans.amount
-                        else:
-                            total_expense += trans.amount
-                    
-                    content.append(f"\n  Total Receitas: R$ {total_income:.2f}".replace('.', ','))
-                    content.append(f"  Total Despesas: R$ {total_expense:.2f}".replace('.', ','))
-                    content.append(f"  Saldo: R$ {(total_income - total_expense):.2f}".replace('.', ','))
+                for trans in item.transactions:
+                    type_symbol = "📈" if trans.type == TransactionType.RECEITA else "📉"
+                    amount_text = f"R$ {trans.amount:.2f}".replace('.', ',')
+                    content.append(f"  {type_symbol} {trans.description} - {amount_text} ({trans.date.strftime('%d/%m/%Y')})")
                 
-                # Horas trabalhadas no período
-                time_entries = session.query(TimeEntry).filter(
-                    TimeEntry.user_id == user.id,
-                    TimeEntry.project_id == project.id,
-                    TimeEntry.date.between(start_date, end_date)
-                ).all()
+                content.append(f"\n  Total Receitas: R$ {item.income:.2f}".replace('.', ','))
+                content.append(f"  Total Despesas: R$ {item.expenses:.2f}".replace('.', ','))
+                content.append(f"  Saldo: R$ {item.balance:.2f}".replace('.', ','))
+            
+            # Horas trabalhadas no período
+            if item.time_entries:
+                content.append("\n⏰ Horas Trabalhadas:")
                 
-                if time_entries:
-                    content.append("\n⏰ Horas Trabalhadas:")
-                    total_minutes = 0
-                    
-                    for entry in time_entries:
-                        hours = entry.duration_minutes // 60
-                        minutes = entry.duration_minutes % 60
-                        content.append(f"  📝 {entry.description} - {hours}h {minutes}m ({entry.date.strftime('%d/%m/%Y')})")
-                        total_minutes += entry.duration_minutes
-                    
-                    total_hours = total_minutes // 60
-                    total_mins = total_minutes % 60
-                    content.append(f"\n  Total de Horas: {total_hours}h {total_mins}m")
+                for entry in item.time_entries:
+                    hours = entry.duration_minutes // 60
+                    minutes = entry.duration_minutes % 60
+                    content.append(f"  📝 {entry.description} - {hours}h {minutes}m ({entry.date.strftime('%d/%m/%Y')})")
                 
-                content.append("\n" + "=" * 50 + "\n")
+                content.append(f"\n  Total de Horas: {item.minutes // 60}h {item.minutes % 60}m")
             
-            return "\n".join(content)
-            
-        finally:
-            session.close()
+            content.append("\n" + "=" * 50 + "\n")
+        
+        return "\n".join(content)
     
     def _generate_financial_report(self, user, project_name, start_date, end_date):
         """Gera relatório financeiro"""
-        session = db_manager.get_session()
-        try:
-            content = []
-            content.append("💰 RELATÓRIO FINANCEIRO")
-            content.append("=" * 50)
-            content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
-            content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
-            content.append("")
-            
-            # Query base
-            query = session.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.date.between(start_date, end_date)
-            )
-            
-            # Filtro de projeto
-            if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                query = query.filter(Transaction.project_id == self.projects_data[project_name].id)
-                content.append(f"Projeto: {project_name}")
-            else:
-                content.append("Projeto: Todos os Projetos")
-            
-            content.append("")
-            
-            # Receitas
-            income_transactions = query.filter(Transaction.type == TransactionType.RECEITA).all()
-            content.append("📈 RECEITAS")
+        content = []
+        content.append("💰 RELATÓRIO FINANCEIRO")
+        content.append("=" * 50)
+        content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
+        content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+        content.append("")
+        
+        project_id = self._selected_project_id(project_name)
+        data = report_data_service.load(user.id, start_date, end_date, project_id=project_id, time_entries=False)
+        
+        content.append(f"Projeto: {project_name if project_id else 'Todos os Projetos'}")
+        content.append("")
+        
+        sections = [
+            ("📈 RECEITAS", TransactionType.RECEITA, "Nenhuma receita no período", "Total de Receitas"),
+            ("📉 DESPESAS", TransactionType.DESPESA, "Nenhuma despesa no período", "Total de Despesas")
+        ]
+        
+        for title, transaction_type, empty_text, total_label in sections:
+            content.append(title)
             content.append("-" * 20)
             
-            total_income = 0
-            if income_transactions:
-                for trans in income_transactions:
+            transactions = data.transactions_of(transaction_type)
+            total = 0
+            if transactions:
+                for trans in transactions:
                     amount_text = f"R$ {trans.amount:.2f}".replace('.', ',')
-                    project_text = trans.project.name if trans.project else "Geral"
+                    project_text = data.project_name(trans.project_id)
                     content.append(f"  {trans.description} - {amount_text} ({project_text}) - {trans.date.strftime('%d/%m/%Y')}")
-                    total_income += trans.amount
+                    total += trans.amount
             else:
-                content.append("  Nenhuma receita no período")
+                content.append(f"  {empty_text}")
             
-            content.append(f"\nTotal de Receitas: R$ {total_income:.2f}".replace('.', ','))
+            content.append(f"\n{total_label}: R$ {total:.2f}".replace('.', ','))
             content.append("")
-            
-            # Despesas
-            expense_transactions = query.filter(Transaction.type == TransactionType.DESPESA).all()
-            content.append("📉 DESPESAS")
-            content.append("-" * 20)
-            
-            total_expense = 0
-            if expense_transactions:
-                for trans in expense_transactions:
-                    amount_text = f"R$ {trans.amount:.2f}".replace('.', ',')
-                    project_text = trans.project.name if trans.project else "Geral"
-                    content.append(f"  {trans.description} - {amount_text} ({project_text}) - {trans.date.strftime('%d/%m/%Y')}")
-                    total_expense += trans.amount
-            else:
-                content.append("  Nenhuma despesa no período")
-            
-            content.append(f"\nTotal de Despesas: R$ {total_expense:.2f}".replace('.', ','))
-            content.append("")
-            
-            # Resumo
-            balance = total_income - total_expense
-            content.append("📊 RESUMO")
-            content.append("-" * 20)
-            content.append(f"Total de Receitas: R$ {total_income:.2f}".replace('.', ','))
-            content.append(f"Total de Despesas: R$ {total_expense:.2f}".replace('.', ','))
-            content.append(f"Saldo do Período: R$ {balance:.2f}".replace('.', ','))
-            
-            return "\n".join(content)
-            
-        finally:
-            session.close()
+        
+        # Resumo
+        total_income, total_expense = data.income, data.expenses
+        content.append("📊 RESUMO")
+        content.append("-" * 20)
+        content.append(f"Total de Receitas: R$ {total_income:.2f}".replace('.', ','))
+        content.append(f"Total de Despesas: R$ {total_expense:.2f}".replace('.', ','))
+        content.append(f"Saldo do Período: R$ {(total_income - total_expense):.2f}".replace('.', ','))
+        
+        return "\n".join(content)
     
     def _generate_hours_report(self, user, project_name, start_date, end_date):
         """Gera relatório de horas"""
-        session = db_manager.get_session()
-        try:
-            content = []
-            content.append("⏰ RELATÓRIO DE HORAS")
-            content.append("=" * 50)
-            content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
-            content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
-            content.append("")
-            
-            # Query base
-            query = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date.between(start_date, end_date)
-            )
-            
-            # Filtro de projeto
-            if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                query = query.filter(TimeEntry.project_id == self.projects_data[project_name].id)
-                content.append(f"Projeto: {project_name}")
-            else:
-                content.append("Projeto: Todos os Projetos")
-            
-            content.append("")
-            
-            # Entradas de tempo
-            time_entries = query.order_by(TimeEntry.date.desc(), TimeEntry.start_time.desc()).all()
-            
-            if time_entries:
-                # Agrupa por projeto
-                projects_hours = {}
-                total_minutes = 0
-                
-                for entry in time_entries:
-                    project_name_key = entry.project.name
-                    if project_name_key not in projects_hours:
-                        projects_hours[project_name_key] = []
-                    projects_hours[project_name_key].append(entry)
-                    total_minutes += entry.duration_minutes
-                
-                # Exibe por projeto
-                for proj_name, entries in projects_hours.items():
-                    content.append(f"📁 {proj_name}")
-                    content.append("-" * 30)
-                    
-                    project_minutes = 0
-                    for entry in entries:
-                        hours = entry.duration_minutes // 60
-                        minutes = entry.duration_minutes % 60
-                        time_range = f"{entry.start_time.strftime('%H:%M')} - {entry.end_time.strftime('%H:%M')}"
-                        content.append(f"  📝 {entry.description} - {hours}h {minutes}m ({entry.date.strftime('%d/%m/%Y')} | {time_range})")
-                        project_minutes += entry.duration_minutes
-                    
-                    proj_hours = project_minutes // 60
-                    proj_mins = project_minutes % 60
-                    content.append(f"\n  Subtotal: {proj_hours}h {proj_mins}m")
-                    content.append("")
+        content = []
+        content.append("⏰ RELATÓRIO DE HORAS")
+        content.append("=" * 50)
+        content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
+        content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+        content.append("")
+        
+        project_id = self._selected_project_id(project_name)
+        data = report_data_service.load(user.id, start_date, end_date, project_id=project_id, transactions=False)
+        
+        content.append(f"Projeto: {project_name if project_id else 'Todos os Projetos'}")
+        content.append("")
+        
+        if data.time_entries:
+            # Registros já agrupados por projeto; os mais recentes primeiro
+            groups = [(item.project.name, item.time_entries) for item in data.projects if item.time_entries]
+            if data.general_time_entries:
+                groups.append(("Sem projeto", data.general_time_entries))
+            
+            for proj_name, entries in groups:
+                content.append(f"📁 {proj_name}")
+                content.append("-" * 30)
                 
-                # Total geral
-                total_hours = total_minutes // 60
-                total_mins = total_minutes % 60
-                content.append("📊 RESUMO")
-                content.append("-" * 20)
-                content.append(f"Total de Horas Trabalhadas: {total_hours}h {total_mins}m")
-                content.append(f"Número de Registros: {len(time_entries)}")
+                project_minutes = 0
+                for entry in reversed(entries):
+                    hours = entry.duration_minutes // 60
+                    minutes = entry.duration_minutes % 60
+                    details = entry.date.strftime('%d/%m/%Y')
+                    if entry.start_time and entry.end_time:
+                        details += f" | {entry.start_time.strftime('%H:%M')} - {entry.end_time.strftime('%H:%M')}"
+                    content.append(f"  📝 {entry.description} - {hours}h {minutes}m ({details})")
+                    project_minutes += entry.duration_minutes
                 
-                if total_minutes > 0:
-                    avg_per_day = total_minutes / max(1, (end_date - start_date).days + 1)
-                    avg_hours = int(avg_per_day // 60)
-                    avg_mins = int(avg_per_day % 60)
-                    content.append(f"Média por Dia: {avg_hours}h {avg_mins}m")
-            else:
-                content.append("Nenhuma entrada de tempo encontrada no período.")
+                content.append(f"\n  Subtotal: {project_minutes // 60}h {project_minutes % 60}m")
+                content.append("")
             
-            return "\n".join(content)
+            # Total geral
+            total_minutes = data.minutes
+            content.append("📊 RESUMO")
+            content.append("-" * 20)
+            content.append(f"Total de Horas Trabalhadas: {total_minutes // 60}h {total_minutes % 60}m")
+            content.append(f"Número de Registros: {len(data.time_entries)}")
             
-        finally:
-            session.close()
+            if total_minutes > 0:
+                avg_per_day = total_minutes / max(1, (end_date - start_date).days + 1)
+                avg_hours = int(avg_per_day // 60)
+                avg_mins = int(avg_per_day % 60)
+                content.append(f"Média por Dia: {avg_hours}h {avg_mins}m")
+        else:
+            content.append("Nenhuma entrada de tempo encontrada no período.")
+        
+        return "\n".join(content)
     
     def _generate_invoice(self, user, project_name, start_date, end_date):
         """Gera fatura de projeto"""
         if project_name == "Todos os Projetos":
-            return "❌ ERRO: Para gerar uma fatura, selecione um projeto específico."
+            return "❌ ERRO: Para gerar uma fatura, selecione um projeto específico.\n\nPara faturar todos os projetos do período, use \"Faturas em Lote\"."
         
-        if not hasattr(self, 'projects_data') or project_name not in self.projects_data:
+        project_id = self._selected_project_id(project_name)
+        if project_id is None:
             return "❌ ERRO: Projeto não encontrado."
         
-        project = self.projects_data[project_name]
+        data = report_data_service.load(user.id, start_date, end_date, project_id=project_id, transactions=False)
+        if not data.projects:
+            return "❌ ERRO: Projeto não encontrado."
         
-        session = db_manager.get_session()
-        try:
-            content = []
-            content.append("🧾 FATURA")
-            content.append("=" * 50)
-            content.append(f"Data de Emissão: {datetime.now().strftime('%d/%m/%Y')}")
-            content.append(f"Período de Serviços: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
-            content.append("")
-            
-            # Dados do projeto
-            content.append("📋 DADOS DO PROJETO")
-            content.append("-" * 25)
-            content.append(f"Projeto: {project.name}")
-            content.append(f"Cliente: {project.client.name}")
-            
-            if project.client.email:
-                content.append(f"Email: {project.client.email}")
-            
-            if project.client.phone:
-                content.append(f"Telefone: {project.client.phone}")
-            
-            content.append("")
-            
-            # Serviços prestados (horas trabalhadas)
-            time_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.project_id == project.id,
-                TimeEntry.date.between(start_date, end_date)
-            ).order_by(TimeEntry.date).all()
-            
-            content.append("🔧 SERVIÇOS PRESTADOS")
-            content.append("-" * 25)
-            
-            total_minutes = 0
-            if time_entries:
-                for entry in time_entries:
-                    hours = entry.duration_minutes // 60
-                    minutes = entry.duration_minutes % 60
-                    content.append(f"  {entry.date.strftime('%d/%m/%Y')} - {entry.description} ({hours}h {minutes}m)")
-                    total_minutes += entry.duration_minutes
-            else:
-                content.append("  Nenhum serviço registrado no período")
-            
-            total_hours = total_minutes // 60
-            total_mins = total_minutes % 60
-            content.append(f"\nTotal de Horas: {total_hours}h {total_mins}m")
-            content.append("")
-            
-            # Valores
-            content.append("💰 VALORES")
-            content.append("-" * 15)
+        item = data.projects[0]
+        project, client = item.project, item.client
+        
+        content = []
+        content.append("🧾 FATURA")
+        content.append("=" * 50)
+        content.append(f"Data de Emissão: {datetime.now().strftime('%d/%m/%Y')}")
+        content.append(f"Período de Serviços: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
+        content.append("")
+        
+        # Dados do projeto
+        content.append("📋 DADOS DO PROJETO")
+        content.append("-" * 25)
+        content.append(f"Projeto: {project.name}")
+        content.append(f"Cliente: {client.name}")
+        
+        if client.email:
+            content.append(f"Email: {client.email}")
+        
+        if client.phone:
+            content.append(f"Telefone: {client.phone}")
+        
+        content.append("")
+        
+        # Serviços prestados (horas trabalhadas)
+        content.append("🔧 SERVIÇOS PRESTADOS")
+        content.append("-" * 25)
+        
+        if item.time_entries:
+            for entry in item.time_entries:
+                hours = entry.duration_minutes // 60
+                minutes = entry.duration_minutes % 60
+                content.append(f"  {entry.date.strftime('%d/%m/%Y')} - {entry.description} ({hours}h {minutes}m)")
+        else:
+            content.append("  Nenhum serviço registrado no período")
+        
+        total_minutes = item.minutes
+        content.append(f"\nTotal de Horas: {total_minutes // 60}h {total_minutes % 60}m")
+        content.append("")
+        
+        # Valores
+        content.append("💰 VALORES")
+        content.append("-" * 15)
+        
+        if project.budget:
+            content.append(f"Valor do Projeto: R$ {project.budget:.2f}".replace('.', ','))
             
-            if project.budget:
-                content.append(f"Valor do Projeto: R$ {project.budget:.2f}".replace('.', ','))
+            # Calcula valor por hora se houver horas trabalhadas
+            if total_minutes > 0:
+                hourly_rate = float(project.budget) / (total_minutes / 60)
+                content.append(f"Valor por Hora: R$ {hourly_rate:.2f}".replace('.', ','))
                 
-                # Calcula valor por hora se houver horas trabalhadas
-                if total_minutes > 0:
-                    hourly_rate = project.budget / (total_minutes / 60)
-                    content.append(f"Valor por Hora: R$ {hourly_rate:.2f}".replace('.', ','))
-                    
-                    # Valor proporcional às horas trabalhadas
-                    proportional_value = (total_minutes / 60) * hourly_rate
-                    content.append(f"Valor Proporcional: R$ {proportional_value:.2f}".replace('.', ','))
-            else:
-                content.append("Valor do projeto não definido")
-            
-            content.append("")
-            
-            # Observações
-            content.append("📝 OBSERVAÇÕES")
-            content.append("-" * 15)
-            content.append("Esta fatura refere-se aos serviços de desenvolvimento")
-            content.append("prestados no período especificado.")
-            content.append("")
-            content.append("Prazo de pagamento: 30 dias")
-            content.append("")
-            content.append("Obrigado pela preferência!")
-            
-            return "\n".join(content)
-            
-        finally:
-            session.close()
+                # Valor proporcional às horas trabalhadas
+                proportional_value = (total_minutes / 60) * hourly_rate
+                content.append(f"Valor Proporcional: R$ {proportional_value:.2f}".replace('.', ','))
+        else:
+            content.append("Valor do projeto não definido")
+        
+        content.append("")
+        
+        # Observações
+        content.append("📝 OBSERVAÇÕES")
+        content.append("-" * 15)
+        content.append("Esta fatura refere-se aos serviços de desenvolvimento")
+        content.append("prestados no período especificado.")
+        content.append("")
+        content.append("Prazo de pagamento: 30 dias")
+        content.append("")
+        content.append("Obrigado pela preferência!")
+        
+        return "\n".join(content)
     
     def _generate_summary_report(self, user, project_name, start_date, end_date):
         """Gera resumo geral"""
-        session = db_manager.get_session()
-        try:
-            content = []
-            content.append("📊 RESUMO GERAL")
-            content.append("=" * 50)
-            content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
-            content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
-            content.append("")
-            
-            # Projetos
-            projects_query = session.query(Project).filter(Project.user_id == user.id)
-            if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                projects = [self.projects_data[project_name]]
-            else:
-                projects = projects_query.all()
-            
-            content.append("📁 PROJETOS")
-            content.append("-" * 15)
-            content.append(f"Total de Projetos: {len(projects)}")
-            
-            # Status dos projetos
-            status_count = {}
-            for project in projects:
-                status = project.status.value.title()
-                status_count[status] = status_count.get(status, 0) + 1
-            
-            for status, count in status_count.items():
-                content.append(f"  {status}: {count}")
-            
-            content.append("")
-            
-            # Finanças
-            transactions_query = session.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.date.between(start_date, end_date)
-            )
-            
-            if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                transactions_query = transactions_query.filter(Transaction.project_id == self.projects_data[project_name].id)
-            
-            income_total = transactions_query.filter(Transaction.type == TransactionType.RECEITA).with_entities(func.sum(Transaction.amount)).scalar() or 0
-            expense_total = transactions_query.filter(Transaction.type == TransactionType.DESPESA).with_entities(func.sum(Transaction.amount)).scalar() or 0
-            
-            content.append("💰 FINANCEIRO")
-            content.append("-" * 15)
-            content.append(f"Total de Receitas: R$ {income_total:.2f}".replace('.', ','))
-            content.append(f"Total de Despesas: R$ {expense_total:.2f}".replace('.', ','))
-            content.append(f"Saldo: R$ {(income_total - expense_total):.2f}".replace('.', ','))
-            content.append("")
-            
-            # Horas
-            time_query = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date.between(start_date, end_date)
-            )
-            
-            if project_name != "Todos os Projetos" and hasattr(self, 'projects_data') and project_name in self.projects_data:
-                time_query = time_query.filter(TimeEntry.project_id == self.projects_data[project_name].id)
-            
-            total_minutes = time_query.with_entities(func.sum(TimeEntry.duration_minutes)).scalar() or 0
-            total_entries = time_query.count()
-            
-            total_hours = total_minutes // 60
-            total_mins = total_minutes % 60
-            
-            content.append("⏰ TEMPO")
-            content.append("-" * 10)
-            content.append(f"Total de Horas: {total_hours}h {total_mins}m")
-            content.append(f"Número de Registros: {total_entries}")
-            
-            if total_minutes > 0:
-                days_in_period = (end_date - start_date).days + 1
-                avg_per_day = total_minutes / days_in_period
-                avg_hours = int(avg_per_day // 60)
-                avg_mins = int(avg_per_day % 60)
-                content.append(f"Média por Dia: {avg_hours}h {avg_mins}m")
-            
-            content.append("")
-            
-            # Produtividade
-            content.append("📈 PRODUTIVIDADE")
-            content.append("-" * 20)
-            
-            if total_minutes > 0 and income_total > 0:
-                hourly_income = income_total / (total_minutes / 60)
-                content.append(f"Receita por Hora: R$ {hourly_income:.2f}".replace('.', ','))
-            
-            if total_entries > 0:
-                days_worked = len(set(entry.date for entry in time_query.all()))
-                content.append(f"Dias Trabalhados: {days_worked}")
-                
-                if days_worked > 0:
-                    avg_hours_per_workday = total_minutes / (days_worked * 60)
-                    content.append(f"Média de Horas por Dia Trabalhado: {avg_hours_per_workday:.1f}h")
-            
-            return "\n".join(content)
+        content = []
+        content.append("📊 RESUMO GERAL")
+        content.append("=" * 50)
+        content.append(f"Período: {start_date.strftime('%d/%m/%Y')} a {end_date.strftime('%d/%m/%Y')}")
+        content.append(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+        content.append("")
+        
+        # Projetos por status e totais do período (rollups)
+        project_id = self._selected_project_id(project_name)
+        summary = report_data_service.summary(user.id, start_date, end_date, project_id=project_id)
+        
+        content.append("📁 PROJETOS")
+        content.append("-" * 15)
+        content.append(f"Total de Projetos: {summary['projects_total']}")
+        
+        for status, count in summary['status_count'].items():
+            content.append(f"  {status}: {count}")
+        
+        content.append("")
+        
+        # Finanças (meses completos vêm do rollup mensal)
+        content.append("💰 FINANCEIRO")
+        content.append("-" * 15)
+        content.append(f"Total de Receitas: R$ {summary['income']:.2f}".replace('.', ','))
+        content.append(f"Total de Despesas: R$ {summary['expenses']:.2f}".replace('.', ','))
+        content.append(f"Saldo: R$ {summary['balance']:.2f}".replace('.', ','))
+        content.append("")
+        
+        # Horas (rollup diário)
+        total_minutes = summary['minutes']
+        
+        content.append("⏰ TEMPO")
+        content.append("-" * 10)
+        content.append(f"Total de Horas: {total_minutes // 60}h {total_minutes % 60}m")
+        content.append(f"Número de Registros: {summary['entries']}")
+        
+        if total_minutes > 0:
+            avg_per_day = summary['avg_minutes_per_day']
+            avg_hours = int(avg_per_day // 60)
+            avg_mins = int(avg_per_day % 60)
+            content.append(f"Média por Dia: {avg_hours}h {avg_mins}m")
+        
+        content.append("")
+        
+        # Produtividade
+        content.append("📈 PRODUTIVIDADE")
+        content.append("-" * 20)
+        
+        if summary['hourly_income'] is not None:
+            content.append(f"Receita por Hora: R$ {summary['hourly_income']:.2f}".replace('.', ','))
+        
+        if summary['entries'] > 0:
+            content.append(f"Dias Trabalhados: {summary['days_worked']}")
             
-        finally:
-            session.close()
+            if summary['avg_hours_per_workday'] is not None:
+                content.append(f"Média de Horas por Dia Trabalhado: {summary['avg_hours_per_workday']:.1f}h")
+        
+        return "\n".join(content)
     
     def _export_pdf(self):
-        """Exporta o relatório para PDF"""
+        """Exporta o relatório para PDF em segundo plano"""
         if not REPORTLAB_AVAILABLE:
             messagebox.showerror("Erro", "ReportLab não está instalado. Instale com: pip install reportlab")
             return
         
-        # Gera o conteúdo primeiro
-        self._generate_preview()
+        if task_runner.is_busy(self.frame, "export_pdf"):
+            return
+        
+        report_type = REPORT_TYPES.get(self.report_type_combo.get())
+        if report_type is None:
+            messagebox.showerror("Erro", "Selecione o tipo de relatório.")
+            return
         
-        # Pega o conteúdo do preview
-        content = self.preview_text.get("1.0", 'end').strip()
+        period = self._selected_period()
+        if not period:
+            return
+        start_date, end_date = period
+        
+        user = auth_manager.get_current_user()
+        if not user:
+            return
         
-        if not content or "Selecione o tipo de relatório" in content:
-            messagebox.showerror("Erro", "Gere uma visualização do relatório primeiro.")
+        project_id = self._selected_project_id(self.project_combo.get())
+        if report_type == 'invoice' and project_id is None:
+            messagebox.showerror("Erro", "Para gerar uma fatura, selecione um projeto específico.")
             return
         
         # Diálogo para salvar arquivo
@@ -827,48 +787,162 @@ class ReportsFrame:
         if not filename:
             return
         
-        try:
-            # Cria o PDF
-            doc = SimpleDocTemplate(filename, pagesize=A4)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Estilo personalizado
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=30,
-                alignment=1  # Centralizado
+        # O progresso chega do worker pela fila do task_runner
+        def progress(done, total):
+            task_runner.post(self.frame, self._update_export_progress, done, total)
+        
+        def export():
+            return pdf_report_renderer.render(
+                filename, report_type, user.id, start_date, end_date,
+                project_id=project_id, progress=progress
             )
-            
-            normal_style = ParagraphStyle(
-                'CustomNormal',
-                parent=styles['Normal'],
-                fontSize=10,
-                fontName='Courier'
+        
+        self._set_exporting(True)
+        task_runner.submit(
+            self.frame, "export_pdf", export,
+            on_success=self._on_export_done,
+            on_error=self._on_export_error
+        )
+    
+    def _export_batch_invoices(self):
+        """Gera em segundo plano as faturas de todos os projetos com horas no período"""
+        if task_runner.is_busy(self.frame, "export_pdf"):
+            return
+        
+        period = self._selected_period()
+        if not period:
+            return
+        start_date, end_date = period
+        
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+        
+        def progress(done, total):
+            task_runner.post(self.frame, self._update_export_progress, done, total, "faturas")
+        
+        self._set_exporting(True)
+        task_runner.submit(
+            self.frame, "export_pdf",
+            lambda: batch_invoice_service.generate(user.id, start_date, end_date, progress=progress),
+            on_success=self._on_batch_done,
+            on_error=self._on_export_error
+        )
+    
+    def _export_data(self):
+        """Exporta transações, registros de tempo ou tarefas em segundo plano (CSV, Parquet ou XLSX)"""
+        if task_runner.is_busy(self.frame, "export_data"):
+            return
+    
+        datasets = {label: key for key, label in EXPORT_DATASETS.items()}
+        dataset = datasets.get(self.export_dataset_combo.get())
+        if dataset is None:
+            messagebox.showerror("Erro", "Selecione os dados a exportar.")
+            return
+    
+        period = self._selected_period()
+        if not period:
+            return
+        start_date, end_date = period
+    
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+    
+        project_id = self._selected_project_id(self.project_combo.get())
+    
+        # Parquet e XLSX só aparecem com as bibliotecas opcionais instaladas
+        filetypes = [("CSV", "*.csv")]
+        if dependency_available('pyarrow'):
+            filetypes.append(("Parquet", "*.parquet"))
+        if dependency_available('openpyxl'):
+            filetypes.append(("Excel", "*.xlsx"))
+    
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=filetypes,
+            initialfile=f"{dataset}.csv",
+            title=f"Exportar {self.export_dataset_combo.get()}"
+        )
+    
+        if not filename:
+            return
+    
+        def progress(done, total):
+            task_runner.post(self.frame, self._update_data_export_progress, done, total)
+    
+        def export():
+            return data_export_service.export(
+                filename, dataset, user.id, start_date, end_date,
+                project_id=project_id, progress=progress
             )
-            
-            # Converte o conteúdo
-            lines = content.split('\n')
-            for line in lines:
-                if line.strip():
-                    if line.startswith('📊') or line.startswith('💰') or line.startswith('⏰') or line.startswith('🧾'):
-                        # Títulos
-                        story.append(Paragraph(line, title_style))
-                    else:
-                        # Texto normal
-                        story.append(Paragraph(line.replace('<', '&lt;').replace('>', '&gt;'), normal_style))
-                else:
-                    story.append(Spacer(1, 12))
-            
-            # Gera o PDF
-            doc.build(story)
-            
-            messagebox.showinfo("Sucesso", f"Relatório exportado com sucesso!\n\nArquivo: {filename}")
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao exportar PDF: {e}")
+    
+        self.export_data_btn.configure(state="disabled", text="⏳ Exportando...")
+        self.export_data_label.configure(text="Preparando...")
+        self.export_data_label.grid()
+        task_runner.submit(
+            self.frame, "export_data", export,
+            on_success=self._on_data_export_done,
+            on_error=self._on_data_export_error
+        )
+    
+    def _update_data_export_progress(self, done, total):
+        self.export_data_label.configure(text=f"{done} de {total} linhas")
+    
+    def _finish_data_export(self):
+        self.export_data_btn.configure(state="normal", text="💾 CSV / Parquet / XLSX")
+        self.export_data_label.grid_remove()
+    
+    def _on_data_export_done(self, result):
+        self._finish_data_export()
+        messagebox.showinfo("Sucesso", f"{result.rows} linhas exportadas!\n\nArquivo: {result.filename}")
+    
+    def _on_data_export_error(self, error):
+        self._finish_data_export()
+        messagebox.showerror("Erro", f"Erro ao exportar dados: {error}")
+    
+    def _set_exporting(self, exporting):
+        """Alterna os botões de exportação e a barra de progresso"""
+        if exporting:
+            self.export_btn.configure(state="disabled", text="⏳ Exportando...")
+            self.batch_btn.configure(state="disabled")
+            self.export_progress.set(0)
+            self.export_progress.grid()
+            self.export_status_label.configure(text="Preparando...")
+            self.export_status_label.grid()
+        else:
+            self.export_btn.configure(state="normal", text="📄 Exportar PDF")
+            self.batch_btn.configure(state="normal")
+            self.export_progress.grid_remove()
+            self.export_status_label.grid_remove()
+    
+    def _update_export_progress(self, done, total, unit="registros"):
+        self.export_progress.set(done / total if total else 1)
+        self.export_status_label.configure(text=f"{done} de {total} {unit}")
+    
+    def _on_export_done(self, filename):
+        self._set_exporting(False)
+        messagebox.showinfo("Sucesso", f"Relatório exportado com sucesso!\n\nArquivo: {filename}")
+    
+    def _on_batch_done(self, result):
+        self._set_exporting(False)
+        
+        if not result.invoices:
+            messagebox.showinfo("Faturas em Lote", "Nenhum projeto com horas faturáveis no período.")
+            return
+        
+        generated = len(result.invoices) - len(result.failed)
+        message = f"{generated} faturas geradas.\n\nPasta: {result.folder}\nManifesto: {os.path.basename(result.manifest_path)}"
+        
+        if result.failed:
+            failed_names = ", ".join(entry['project'] for entry in result.failed)
+            messagebox.showwarning("Faturas em Lote", f"{message}\n\n{len(result.failed)} com erro: {failed_names}")
+        else:
+            messagebox.showinfo("Faturas em Lote", message)
+    
+    def _on_export_error(self, error):
+        self._set_exporting(False)
+        messagebox.showerror("Erro", f"Erro ao exportar PDF: {error}")
     
     def show(self):
         """Exibe o frame de relatórios"""
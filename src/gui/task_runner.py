@@ -0,0 +1,245 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import TclError
+from config import config
+
+# Evento virtual que acorda o loop do Tk quando outra thread entrega um callback
+WAKE_EVENT = '<<DevflowTaskResults>>'
+
+class _Slot:
+    """Estado de uma chave de tarefa: geração atual, execução em andamento e pedido em espera"""
+
+    __slots__ = ('generation', 'future', 'pending')
+
+    def __init__(self):
+        self.generation = 0
+        self.future = None
+        self.pending = None
+
+class TaskRunner:
+    """Executor compartilhado da interface: pool fixo de workers e entrega dos resultados no loop do Tk
+
+    Cada tarefa é identificada pelo widget dono mais um nome (ex.: dashboard + "stats").
+    Um novo pedido para a mesma chave incrementa a geração, então resultados antigos
+    são descartados; enquanto uma execução está em andamento, pedidos repetidos são
+    agrupados em uma única execução posterior. Os callbacks sempre rodam na thread
+    principal, a partir de uma fila drenada com after(); callbacks postados por outras
+    threads acordam o loop com um evento virtual na janela principal.
+    """
+
+    def __init__(self, max_workers=None, poll_interval=30):
+        self.logger = logging.getLogger('devflow.gui.tasks')
+        self.max_workers = max_workers or config.GUI_WORKER_THREADS
+        self.poll_interval = poll_interval
+
+        self._executor = None
+        self._slots = {}
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._pump_widget = None
+        self._pump_job = None
+        self._root = None
+        self._wake_pending = False
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='devflow-gui')
+        return self._executor
+
+    @staticmethod
+    def _key(widget, name):
+        # O nome Tcl do widget é único enquanto ele existir
+        return (str(widget), name)
+
+    # API pública (chamar sempre da thread principal, exceto post)
+
+    def attach(self, root):
+        """Liga a entrega dos callbacks postados por outras threads à janela principal"""
+        if root is self._root:
+            return
+        self._root = root
+        root.bind(WAKE_EVENT, self._on_wake, add='+')
+
+    def submit(self, widget, name, func, on_success=None, on_error=None):
+        """Executa func() em um worker e entrega o resultado a on_success no loop do Tk"""
+        key = self._key(widget, name)
+
+        with self._lock:
+            slot = self._slots.setdefault(key, _Slot())
+            slot.generation += 1
+            request = (slot.generation, widget, func, on_success, on_error)
+
+            if slot.future is not None:
+                # Já existe execução para esta chave: guarda apenas o pedido mais recente
+                slot.pending = request
+                self.logger.debug(f"Pedido agrupado: {key}")
+            else:
+                self._start(key, slot, request)
+
+        self._ensure_pump(widget)
+        return request[0]
+
+    def post(self, widget, callback, *args):
+        """Agenda callback(*args) no loop do Tk; pode ser chamado de qualquer thread (workers, flusher da fila)"""
+        self._results.put((None, (widget, callback, args), None))
+        if threading.current_thread() is threading.main_thread():
+            self._ensure_pump(widget)
+        else:
+            self._wake()
+
+    def cancel(self, widget, name=None):
+        """Descarta os resultados pendentes de um widget (ou de uma de suas tarefas)"""
+        widget_name = str(widget)
+
+        with self._lock:
+            for key, slot in self._slots.items():
+                if key[0] != widget_name or (name is not None and key[1] != name):
+                    continue
+
+                slot.generation += 1
+                slot.pending = None
+                if slot.future is not None and slot.future.cancel():
+                    slot.future = None
+
+    def is_busy(self, widget, name):
+        """Indica se há uma execução em andamento ou em espera para a tarefa"""
+        with self._lock:
+            slot = self._slots.get(self._key(widget, name))
+            return slot is not None and (slot.future is not None or slot.pending is not None)
+
+    def shutdown(self):
+        """Encerra o pool sem esperar consultas em andamento"""
+        with self._lock:
+            for slot in self._slots.values():
+                slot.generation += 1
+                slot.pending = None
+                slot.future = None
+            executor, self._executor = self._executor, None
+            self._root = None
+
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # Execução nos workers
+
+    def _start(self, key, slot, request):
+        """Envia o pedido ao pool (chamado com o lock adquirido)"""
+        slot.future = self._get_executor().submit(self._run, key, request)
+
+    def _run(self, key, request):
+        generation, widget, func, on_success, on_error = request
+        try:
+            outcome = (True, func())
+        except Exception as e:
+            outcome = (False, e)
+
+        self._results.put((key, request, outcome))
+
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                return
+            slot.future = None
+            if slot.pending is not None and self._executor is not None:
+                next_request, slot.pending = slot.pending, None
+                self._start(key, slot, next_request)
+
+    # Entrega dos resultados na thread principal
+
+    def _ensure_pump(self, widget):
+        """Agenda a drenagem da fila de resultados no loop do Tk"""
+        if self._pump_job is not None and self._widget_exists(self._pump_widget):
+            return
+
+        self._pump_widget = widget.winfo_toplevel()
+        if not self._widget_exists(self._root):
+            self.attach(self._pump_widget)
+        self._pump_job = self._pump_widget.after(self.poll_interval, self._pump)
+
+    def _wake(self):
+        """Acorda o loop do Tk a partir de outra thread, onde after() não pode ser chamado"""
+        with self._lock:
+            root = self._root
+            if root is None or self._wake_pending:
+                return
+            self._wake_pending = True
+
+        try:
+            # O tkinter repassa a chamada à thread do Tk; o evento entra no fim da fila de eventos
+            root.event_generate(WAKE_EVENT, when='tail')
+        except (TclError, RuntimeError) as e:
+            # Janela fechada ou loop encerrado: não há mais interface para atualizar
+            with self._lock:
+                self._wake_pending = False
+            self.logger.debug(f"Loop do Tk indisponível para entregar callbacks: {e}")
+
+    def _on_wake(self, event=None):
+        with self._lock:
+            self._wake_pending = False
+        self._ensure_pump(self._root)
+
+    @staticmethod
+    def _widget_exists(widget):
+        try:
+            return widget is not None and bool(widget.winfo_exists())
+        except TclError:
+            return False
+
+    def _pump(self):
+        self._pump_job = None
+
+        while True:
+            try:
+                key, request, outcome = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if key is None:
+                self._deliver_posted(*request)
+            else:
+                self._deliver(key, request, outcome)
+
+        with self._lock:
+            busy = any(slot.future is not None or slot.pending is not None for slot in self._slots.values())
+
+        # Sem tarefas em andamento o loop do Tk fica livre até o próximo submit
+        if (busy or not self._results.empty()) and self._widget_exists(self._pump_widget):
+            self._pump_job = self._pump_widget.after(self.poll_interval, self._pump)
+
+    def _deliver(self, key, request, outcome):
+        generation, widget, func, on_success, on_error = request
+
+        with self._lock:
+            slot = self._slots.get(key)
+            current = slot is not None and slot.generation == generation
+
+        if not current:
+            self.logger.debug(f"Resultado descartado (geração {generation}): {key}")
+            return
+        if not self._widget_exists(widget):
+            return
+
+        ok, value = outcome
+        try:
+            if ok:
+                if on_success:
+                    on_success(value)
+            elif on_error:
+                on_error(value)
+            else:
+                self.logger.error(f"Erro na tarefa {key[1]}: {value}")
+        except Exception as e:
+            self.logger.error(f"Erro ao atualizar a interface ({key[1]}): {e}")
+
+    def _deliver_posted(self, widget, callback, args):
+        if not self._widget_exists(widget):
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            self.logger.error(f"Erro ao atualizar a interface: {e}")
+
+# Instância global do executor da interface
+task_runner = TaskRunner()
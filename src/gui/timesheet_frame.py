@@ -1,10 +1,20 @@
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
+import tkinter.filedialog as filedialog
 from datetime import datetime, date, timedelta
 from sqlalchemy.orm import Session
 from ..database.connection import db_manager
 from ..database.models import TimeEntry, Project, Task, Board, BoardColumn
+from ..database.rollups import to_day
+from ..services.listings import listing_service, month_range
+from ..services.write_behind import write_queue
+from ..services.time_entry_import import time_entry_import_service
+from ..services.replica_sync import replica_sync_service
+from ..services.timers import timer_service, format_elapsed, next_tick_delay
+from ..services.time_stats import time_stats_service
 from ..auth.auth_manager import auth_manager
+from .virtual_list import VirtualList
+from .task_runner import task_runner
 
 class TimesheetFrame:
     """Frame para controle de tempo"""
@@ -15,9 +25,6 @@ class TimesheetFrame:
         self.entries_list = None
         self.form_frame = None
         self.selected_entry = None
-        self.timer_running = False
-        self.timer_start_time = None
-        self.timer_project_id = None
         
         # Campos do formulário
         self.project_combo = None
@@ -34,16 +41,24 @@ class TimesheetFrame:
         self.timer_project_combo = None
         self.timer_task_combo = None
         self.timer_description_entry = None
+        self.running_timers_frame = None
+        self.timer_rows = {}
+        self._tick_job = None
+        self.visible = False
         
         # Filtros
         self.filter_project_combo = None
         self.filter_date_combo = None
         
-        # Estatísticas
+        # Paginação da lista
+        self.current_filters = {}
+        self.next_cursor = None
+        
+        # Estatísticas (totais em memória, ajustados a cada gravação)
         self.stats_frame = None
+        self.time_stats = None
         
         self._create_widgets()
-        self._update_timer_display()
     
     def _create_widgets(self):
         """Cria os widgets do frame de timesheet"""
@@ -138,6 +153,11 @@ class TimesheetFrame:
             state="disabled"
         )
         self.stop_btn.grid(row=3, column=1, padx=(5, 0), sticky="ew")
+        
+        # Timers em andamento (um por projeto), com o tempo de cada um
+        self.running_timers_frame = ctk.CTkFrame(self.timer_frame, fg_color="transparent")
+        self.running_timers_frame.grid(row=2, column=0, columnspan=2, sticky="ew", padx=15, pady=(0, 10))
+        self.running_timers_frame.grid_columnconfigure(1, weight=1)
     
     def _create_stats_section(self):
         """Cria a seção de estatísticas"""
@@ -223,7 +243,6 @@ class TimesheetFrame:
         self.filter_project_combo.grid(row=0, column=0, padx=(0, 5), sticky="ew")
         
         # Filtro de data
-        today = date.today()
         date_options = [
             "Hoje",
             "Esta Semana",
@@ -239,19 +258,45 @@ class TimesheetFrame:
         self.filter_date_combo.set("Hoje")
         self.filter_date_combo.grid(row=0, column=1, padx=(5, 0), sticky="ew")
         
-        # Botão nova entrada
+        # Botões nova entrada e importação de outros controles de tempo
+        actions_frame = ctk.CTkFrame(list_frame, fg_color="transparent")
+        actions_frame.grid(row=2, column=0, pady=(0, 10), padx=15)
+        
         new_btn = ctk.CTkButton(
-            list_frame,
+            actions_frame,
             text="+ Nova Entrada",
             command=self._new_entry,
-            width=200
+            width=140
+        )
+        new_btn.grid(row=0, column=0, padx=(0, 5))
+        
+        self.import_btn = ctk.CTkButton(
+            actions_frame,
+            text="📥 Importar CSV",
+            command=self._import_entries,
+            width=140
         )
-        new_btn.grid(row=2, column=0, pady=(0, 10), padx=15)
+        self.import_btn.grid(row=0, column=1, padx=(5, 0))
         
-        # Lista scrollável
-        self.entries_list = ctk.CTkScrollableFrame(list_frame, width=300)
-        self.entries_list.grid(row=3, column=0, sticky="nsew", padx=15, pady=(0, 15))
-        self.entries_list.grid_columnconfigure(0, weight=1)
+        # Lista virtualizada (só cria botões para as linhas visíveis)
+        self.entries_list = VirtualList(
+            list_frame,
+            render_row=self._render_entry_row,
+            on_select=self._select_entry,
+            empty_text="Nenhuma entrada encontrada",
+            width=300
+        )
+        self.entries_list.grid(row=3, column=0, sticky="nsew", padx=15, pady=(0, 10))
+        
+        # Paginação incremental (keyset)
+        self.load_more_btn = ctk.CTkButton(
+            list_frame,
+            text="Carregar mais",
+            command=self._load_more_entries,
+            width=200
+        )
+        self.load_more_btn.grid(row=4, column=0, pady=(0, 15), padx=15)
+        self.load_more_btn.grid_remove()
     
     def _create_form(self):
         """Cria o formulário de entrada de tempo"""
@@ -415,7 +460,7 @@ class TimesheetFrame:
             self.duration_entry.configure(state="disabled")
     
     def _start_timer(self):
-        """Inicia o timer"""
+        """Inicia um timer para o projeto selecionado (outros projetos podem ter timers em andamento)"""
         project_name = self.timer_project_combo.get()
         description = self.timer_description_entry.get().strip()
         
@@ -427,92 +472,109 @@ class TimesheetFrame:
             messagebox.showerror("Erro", "Digite uma descrição para a atividade.")
             return
         
-        self.timer_running = True
-        self.timer_start_time = datetime.now()
-        self.timer_project_id = self.projects_data[project_name].id
-        
-        self.start_btn.configure(state="disabled")
-        self.stop_btn.configure(state="normal")
-        self.timer_project_combo.configure(state="disabled")
-        self.timer_task_combo.configure(state="disabled")
-        self.timer_description_entry.configure(state="disabled")
-        
-        # Inicia a atualização do display
-        self._update_timer_display()
-    
-    def _stop_timer(self):
-        """Para o timer e salva a entrada"""
-        if not self.timer_running:
+        user = auth_manager.get_current_user()
+        if not user:
             return
         
-        end_time = datetime.now()
-        duration = end_time - self.timer_start_time
+        try:
+            timer_service.start(user.id, self.projects_data[project_name].id, description)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao iniciar o timer: {e}")
+            return
         
-        # Salva a entrada automaticamente
+        self.timer_description_entry.delete(0, 'end')
+        self._render_timers()
+    
+    def _stop_timer(self, timer_id=None):
+        """Para o timer (o mais recente, se nenhum for informado) e salva a entrada"""
         user = auth_manager.get_current_user()
         if not user:
             return
         
-        session = db_manager.get_session()
+        # Do mais antigo para o mais recente
+        timers = {timer.id: timer for timer in timer_service.running(user.id)}
+        timer = timers.get(timer_id) if timer_id else next(reversed(timers.values()), None)
+        if timer is None:
+            return
+        
         try:
-            entry = TimeEntry(
-                user_id=user.id,
-                project_id=self.timer_project_id,
-                description=self.timer_description_entry.get().strip(),
-                date=self.timer_start_time,  # Usar datetime completo
-                start_time=self.timer_start_time,  # Usar datetime completo
-                end_time=end_time,  # Usar datetime completo
-                duration_minutes=int(duration.total_seconds() // 60)
+            stopped = timer_service.stop(
+                timer.id,
+                on_applied=self._after_insert
             )
-            
-            session.add(entry)
-            session.commit()
-            
-            hours = duration.seconds // 3600
-            minutes = (duration.seconds % 3600) // 60
-            
             messagebox.showinfo(
                 "Timer Parado",
                 f"Entrada de tempo salva com sucesso!\n\n"
-                f"Duração: {hours}h {minutes}m"
+                f"Duração: {stopped.duration_minutes // 60}h {stopped.duration_minutes % 60}m"
             )
-            
-            self._load_entries()
-            self._update_stats()
-            
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao salvar entrada: {e}")
-        finally:
-            session.close()
-        
-        # Reset do timer
-        self.timer_running = False
-        self.timer_start_time = None
-        self.timer_project_id = None
         
-        self.start_btn.configure(state="normal")
-        self.stop_btn.configure(state="disabled")
-        self.timer_project_combo.configure(state="normal")
-        self.timer_task_combo.configure(state="normal")
-        self.timer_description_entry.configure(state="normal")
-        self.timer_description_entry.delete(0, 'end')
-        
-        self.timer_label.configure(text="00:00:00")
+        self._render_timers()
     
-    def _update_timer_display(self):
-        """Atualiza o display do timer"""
-        if self.timer_running and self.timer_start_time:
-            elapsed = datetime.now() - self.timer_start_time
-            hours = elapsed.seconds // 3600
-            minutes = (elapsed.seconds % 3600) // 60
-            seconds = elapsed.seconds % 60
+    def _render_timers(self):
+        """Recria as linhas dos timers em andamento e agenda o tick se houver algum"""
+        for widget in self.running_timers_frame.winfo_children():
+            widget.destroy()
+        self.timer_rows = {}
+        
+        user = auth_manager.get_current_user()
+        timers = timer_service.running(user.id) if user else []
+        
+        project_names = {project.id: name for name, project in getattr(self, 'projects_data', {}).items()}
+        for row, timer in enumerate(timers):
+            elapsed_label = ctk.CTkLabel(
+                self.running_timers_frame,
+                text="00:00:00",
+                font=ctk.CTkFont(size=14, weight="bold"),
+                width=80
+            )
+            elapsed_label.grid(row=row, column=0, sticky="w", pady=2)
             
-            self.timer_label.configure(text=f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+            name_label = ctk.CTkLabel(
+                self.running_timers_frame,
+                text=f"{project_names.get(timer.project_id, 'Projeto')} - {timer.description}",
+                anchor="w"
+            )
+            name_label.grid(row=row, column=1, sticky="ew", padx=10, pady=2)
+            
+            stop_btn = ctk.CTkButton(
+                self.running_timers_frame,
+                text="⏹️",
+                width=40,
+                command=lambda timer_id=timer.id: self._stop_timer(timer_id),
+                fg_color="#F44336",
+                hover_color="#da190b"
+            )
+            stop_btn.grid(row=row, column=2, pady=2)
+            
+            self.timer_rows[timer.id] = (timer, elapsed_label)
         
-        # Agenda próxima atualização
-        if hasattr(self, 'frame') and self.frame.winfo_exists():
-            self.frame.after(1000, self._update_timer_display)
+        self.stop_btn.configure(state="normal" if timers else "disabled")
+        self._cancel_tick()
+        self._tick()
+    
+    def _tick(self):
+        """Atualiza todos os timers de uma vez; só se reagenda enquanto houver timer correndo"""
+        self._tick_job = None
+        now = datetime.now()
+        
+        latest = None
+        for timer, elapsed_label in self.timer_rows.values():
+            elapsed_label.configure(text=format_elapsed((now - timer.started_at).total_seconds()))
+            if latest is None or timer.started_at > latest.started_at:
+                latest = timer
+        
+        # O display grande mostra o timer mais recente
+        self.timer_label.configure(text=format_elapsed((now - latest.started_at).total_seconds()) if latest else "00:00:00")
+        
+        if self.timer_rows and self.visible:
+            self._tick_job = self.frame.after(next_tick_delay(now), self._tick)
+    
+    def _cancel_tick(self):
+        if self._tick_job is not None:
+            self.frame.after_cancel(self._tick_job)
+            self._tick_job = None
     
     def _load_projects_combo(self):
         """Carrega os projetos nos comboboxes"""
@@ -616,121 +678,85 @@ class TimesheetFrame:
             self.description_entry.delete(0, 'end')
             self.description_entry.insert(0, task.title)
     
-    def _load_entries(self):
-        """Carrega a lista de entradas de tempo"""
-        # Limpa a lista atual
-        for widget in self.entries_list.winfo_children():
-            widget.destroy()
+    def _listing_filters(self):
+        """Converte os filtros da tela em parâmetros da listagem paginada"""
+        filters = {}
         
+        filter_project = self.filter_project_combo.get()
+        if filter_project != "Todos os Projetos" and hasattr(self, 'projects_data') and filter_project in self.projects_data:
+            filters["project_id"] = self.projects_data[filter_project].id
+        
+        filter_date = self.filter_date_combo.get()
+        today = date.today()
+        
+        if filter_date == "Hoje":
+            filters["start"] = filters["end"] = today
+        elif filter_date == "Esta Semana":
+            start_week = today - timedelta(days=today.weekday())
+            filters["start"], filters["end"] = start_week, start_week + timedelta(days=6)
+        elif filter_date == "Este Mês":
+            filters["start"], filters["end"] = month_range(today.year, today.month)
+        
+        return filters
+    
+    def _load_entries(self):
+        """Carrega a primeira página da lista de entradas de tempo"""
         user = auth_manager.get_current_user()
         if not user:
             return
         
-        session = db_manager.get_session()
         try:
-            query = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id
-            )
-            
-            # Aplica filtros
-            filter_project = self.filter_project_combo.get()
-            if filter_project != "Todos os Projetos" and hasattr(self, 'projects_data') and filter_project in self.projects_data:
-                query = query.filter(TimeEntry.project_id == self.projects_data[filter_project].id)
+            self.current_filters = self._listing_filters()
+            page = listing_service.time_entries_page(user.id, **self.current_filters)
+            self.entries_list.set_items(page.items)
+            self._update_load_more(page)
             
-            filter_date = self.filter_date_combo.get()
-            today = date.today()
-            
-            if filter_date == "Hoje":
-                query = query.filter(TimeEntry.date == today)
-            elif filter_date == "Esta Semana":
-                start_week = today - timedelta(days=today.weekday())
-                end_week = start_week + timedelta(days=6)
-                query = query.filter(TimeEntry.date.between(start_week, end_week))
-            elif filter_date == "Este Mês":
-                start_month = today.replace(day=1)
-                if today.month == 12:
-                    end_month = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-                else:
-                    end_month = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-                query = query.filter(TimeEntry.date.between(start_month, end_month))
-            
-            entries = query.order_by(TimeEntry.date.desc(), TimeEntry.start_time.desc()).all()
-            
-            for i, entry in enumerate(entries):
-                # Texto da entrada
-                duration_text = f"{entry.duration_minutes // 60}h {entry.duration_minutes % 60}m"
-                date_text = entry.date.strftime("%d/%m/%Y")
-                time_text = f"{entry.start_time.strftime('%H:%M')} - {entry.end_time.strftime('%H:%M')}"
-                
-                entry_btn = ctk.CTkButton(
-                    self.entries_list,
-                    text=f"{entry.project.name}\n{entry.description}\n{date_text} | {time_text} | {duration_text}",
-                    command=lambda e=entry: self._select_entry(e),
-                    height=80,
-                    anchor="w",
-                    fg_color="#2196F3"
-                )
-                entry_btn.grid(row=i, column=0, sticky="ew", pady=2)
-            
-            if not entries:
-                no_entries_label = ctk.CTkLabel(
-                    self.entries_list,
-                    text="Nenhuma entrada encontrada",
-                    text_color="gray"
-                )
-                no_entries_label.grid(row=0, column=0, pady=20)
-            
-            # Atualiza estatísticas
-            self._update_stats()
-                
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar entradas: {e}")
-        finally:
-            session.close()
+    
+    def _load_more_entries(self):
+        """Carrega a próxima página e acrescenta ao final da lista"""
+        user = auth_manager.get_current_user()
+        if not user or self.next_cursor is None:
+            return
+        
+        try:
+            page = listing_service.time_entries_page(user.id, cursor=self.next_cursor, **self.current_filters)
+            self.entries_list.append_items(page.items)
+            self._update_load_more(page)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar entradas: {e}")
+    
+    def _update_load_more(self, page):
+        """Guarda o cursor da próxima página e mostra o botão se houver mais itens"""
+        self.next_cursor = page.next_cursor
+        if page.has_more:
+            self.load_more_btn.grid()
+        else:
+            self.load_more_btn.grid_remove()
+    
+    def _render_entry_row(self, entry):
+        """Opções do botão que representa um registro de tempo na lista"""
+        duration_text = f"{entry.duration_minutes // 60}h {entry.duration_minutes % 60}m"
+        date_text = entry.date.strftime("%d/%m/%Y")
+        time_text = f"{entry.start_time.strftime('%H:%M')} - {entry.end_time.strftime('%H:%M')}"
+        
+        return {
+            "text": f"{entry.project.name}\n{entry.description}\n{date_text} | {time_text} | {duration_text}",
+            "fg_color": "#2196F3"
+        }
     
     def _update_stats(self):
-        """Atualiza as estatísticas de tempo"""
+        """Exibe os totais de tempo (consultados só na primeira exibição e na virada do dia)"""
         user = auth_manager.get_current_user()
         if not user:
             return
         
-        session = db_manager.get_session()
         try:
-            today = date.today()
-            
-            # Hoje
-            today_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date == today
-            ).all()
-            today_minutes = sum(entry.duration_minutes for entry in today_entries)
-            
-            # Esta semana
-            start_week = today - timedelta(days=today.weekday())
-            end_week = start_week + timedelta(days=6)
-            week_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date.between(start_week, end_week)
-            ).all()
-            week_minutes = sum(entry.duration_minutes for entry in week_entries)
-            
-            # Este mês
-            start_month = today.replace(day=1)
-            if today.month == 12:
-                end_month = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                end_month = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-            month_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date.between(start_month, end_month)
-            ).all()
-            month_minutes = sum(entry.duration_minutes for entry in month_entries)
-            
-            # Total
-            total_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id
-            ).all()
-            total_minutes = sum(entry.duration_minutes for entry in total_entries)
+            if self.time_stats is None or not self.time_stats.is_current():
+                # Hoje, semana, mês e total em uma única consulta agregada
+                self.time_stats = time_stats_service.load(user.id)
+            stats = self.time_stats
             
             # Atualiza labels
             def format_time(minutes):
@@ -738,15 +764,30 @@ class TimesheetFrame:
                 mins = minutes % 60
                 return f"{hours}h {mins}m"
             
-            self.today_hours_label.configure(text=f"Hoje\n{format_time(today_minutes)}")
-            self.week_hours_label.configure(text=f"Esta Semana\n{format_time(week_minutes)}")
-            self.month_hours_label.configure(text=f"Este Mês\n{format_time(month_minutes)}")
-            self.total_hours_label.configure(text=f"Total\n{format_time(total_minutes)}")
+            self.today_hours_label.configure(text=f"Hoje\n{format_time(stats.today_minutes)}")
+            self.week_hours_label.configure(text=f"Esta Semana\n{format_time(stats.week_minutes)}")
+            self.month_hours_label.configure(text=f"Este Mês\n{format_time(stats.month_minutes)}")
+            self.total_hours_label.configure(text=f"Total\n{format_time(stats.total_minutes)}")
             
         except Exception as e:
             print(f"Erro ao atualizar estatísticas: {e}")
-        finally:
-            session.close()
+    
+    def _reload_stats(self):
+        """Descarta os totais em memória e consulta de novo"""
+        self.time_stats = None
+        self._update_stats()
+    
+    def _adjust_stats(self, removed=None, added=None):
+        """Aplica aos totais o delta de uma gravação: (dia, minutos) que saíram e que entraram"""
+        if self.time_stats is not None and self.time_stats.is_current():
+            if removed:
+                self.time_stats.add(removed[0], -(removed[1] or 0))
+            if added:
+                self.time_stats.add(added[0], added[1])
+        else:
+            # Sem totais válidos a próxima consulta já inclui a gravação
+            self.time_stats = None
+        self._update_stats()
     
     def _apply_filters(self, value=None):
         """Aplica os filtros selecionados"""
@@ -864,44 +905,36 @@ class TimesheetFrame:
         if not user:
             return
         
-        session = db_manager.get_session()
+        values = {
+            'project_id': self.projects_data[project_name].id,
+            'description': description,
+            'date': start_datetime,  # Usar datetime completo para o campo date
+            'start_time': start_datetime,  # Usar datetime completo
+            'end_time': end_datetime,  # Usar datetime completo
+            'duration_minutes': duration_minutes
+        }
+        
         try:
             if self.selected_entry:
                 # Atualiza entrada existente
-                entry = session.query(TimeEntry).filter(
-                    TimeEntry.id == self.selected_entry.id
-                ).first()
-                
-                if not entry:
-                    messagebox.showerror("Erro", "Entrada não encontrada.")
-                    return
+                write_queue.update(
+                    TimeEntry, self.selected_entry.id, values,
+                    on_applied=self._after_write(self._on_entry_updated, self.selected_entry)
+                )
             else:
                 # Cria nova entrada
-                entry = TimeEntry(user_id=user.id)
-                session.add(entry)
-            
-            # Atualiza dados - convertendo para datetime com timezone
-            entry.project_id = self.projects_data[project_name].id
-            entry.description = description
-            entry.date = start_datetime  # Usar datetime completo para o campo date
-            entry.start_time = start_datetime  # Usar datetime completo
-            entry.end_time = end_datetime  # Usar datetime completo
-            entry.duration_minutes = duration_minutes
-            
-            session.commit()
+                write_queue.insert(
+                    TimeEntry, dict(values, user_id=user.id),
+                    on_applied=self._after_insert
+                )
             
             messagebox.showinfo("Sucesso", "Entrada de tempo salva com sucesso!")
-            self._load_entries()
-            self._update_statistics()
             
             if not self.selected_entry:
                 self._clear_form()
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao salvar entrada: {e}")
-        finally:
-            session.close()
     
     def _delete_entry(self):
         """Exclui a entrada selecionada"""
@@ -918,38 +951,181 @@ class TimesheetFrame:
         if not result:
             return
         
-        session = db_manager.get_session()
         try:
-            entry = session.query(TimeEntry).filter(
-                TimeEntry.id == self.selected_entry.id
-            ).first()
+            write_queue.delete(
+                TimeEntry, self.selected_entry.id,
+                on_applied=self._after_write(self._on_entry_deleted, self.selected_entry)
+            )
             
-            if entry:
-                session.delete(entry)
-                session.commit()
-                
-                messagebox.showinfo("Sucesso", "Entrada excluída com sucesso!")
-                self._load_entries()
-                self._clear_form()
-                self.selected_entry = None
-                self.form_title.configure(text="Nova Entrada de Tempo")
-                self.delete_btn.configure(state="disabled")
+            messagebox.showinfo("Sucesso", "Entrada excluída com sucesso!")
+            self._clear_form()
+            self.selected_entry = None
+            self.form_title.configure(text="Nova Entrada de Tempo")
+            self.delete_btn.configure(state="disabled")
             
         except Exception as e:
-            session.rollback()
             messagebox.showerror("Erro", f"Erro ao excluir entrada: {e}")
-        finally:
-            session.close()
+    
+    def _after_write(self, callback, *args):
+        """on_applied da fila de gravações: agenda callback(*args) na thread da interface"""
+        return lambda row_id: task_runner.post(self.frame, callback, *args)
+    
+    def _after_insert(self, entry_id):
+        """on_applied das entradas novas: agenda a busca da linha pelo id gerado no banco"""
+        task_runner.post(self.frame, self._on_entry_inserted, entry_id)
+    
+    def _on_entry_inserted(self, entry_id):
+        """Entrada nova gravada: busca só essa linha, soma aos totais e a encaixa na lista"""
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+        
+        if entry_id is None:
+            # Gravação reenviada (o id não é conhecido): recarrega a lista e os totais
+            self._load_entries()
+            self._reload_stats()
+            return
+        
+        try:
+            entry = listing_service.time_entry(user.id, entry_id)
+        except Exception as e:
+            print(f"Erro ao carregar a entrada gravada: {e}")
+            return
+        
+        if entry is not None:
+            self._adjust_stats(added=(entry.date, entry.duration_minutes))
+            self._place_entry(entry)
+    
+    def _on_entry_updated(self, entry):
+        """Entrada alterada gravada: troca a linha pela versão do banco e ajusta os totais pelo delta"""
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+        
+        try:
+            updated = listing_service.time_entry(user.id, entry.id)
+        except Exception as e:
+            print(f"Erro ao carregar a entrada gravada: {e}")
+            return
+        
+        # Os valores anteriores são os da linha exibida (pode já refletir uma gravação anterior)
+        current = self._remove_entry(entry.id) or entry
+        self._adjust_stats(
+            removed=(current.date, current.duration_minutes),
+            added=(updated.date, updated.duration_minutes) if updated else None
+        )
+        
+        if updated is not None:
+            self._place_entry(updated)
+            if self.selected_entry is not None and self.selected_entry.id == updated.id:
+                self.selected_entry = updated
+    
+    def _on_entry_deleted(self, entry):
+        """Entrada excluída: tira a linha da lista e subtrai dos totais"""
+        current = self._remove_entry(entry.id) or entry
+        self._adjust_stats(removed=(current.date, current.duration_minutes))
+    
+    def _remove_entry(self, entry_id):
+        """Remove a linha do registro da lista; retorna o item removido (ou None)"""
+        for index, item in enumerate(self.entries_list.items):
+            if item.id == entry_id:
+                self.entries_list.remove_item(index)
+                return item
+        return None
+    
+    def _place_entry(self, entry):
+        """Insere o registro na lista na ordem (data, id) decrescente, se ele passar nos filtros"""
+        filters = self.current_filters
+        day = to_day(entry.date)
+        
+        if filters.get("project_id") not in (None, entry.project_id):
+            return
+        if (filters.get("start") and day < filters["start"]) or (filters.get("end") and day > filters["end"]):
+            return
+        
+        key = (entry.date, entry.id)
+        if self.next_cursor is not None and key < self.next_cursor:
+            # Fica depois da última linha carregada: aparece ao carregar mais
+            return
+        
+        items = self.entries_list.items
+        index = next((i for i, item in enumerate(items) if (item.date, item.id) < key), len(items))
+        self.entries_list.insert_item(index, entry)
+    
+    def _import_entries(self):
+        """Importa em segundo plano um CSV exportado do Toggl ou do Clockify"""
+        if task_runner.is_busy(self.frame, "import_entries"):
+            return
+        
+        user = auth_manager.get_current_user()
+        if not user:
+            return
+        
+        filename = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Importar Entradas de Tempo (Toggl/Clockify)"
+        )
+        
+        if not filename:
+            return
+        
+        # O progresso chega do worker pela fila do task_runner
+        def progress(read, inserted):
+            task_runner.post(self.frame, self._update_import_progress, read)
+        
+        self.import_btn.configure(state="disabled", text="⏳ Importando...")
+        task_runner.submit(
+            self.frame, "import_entries",
+            lambda: time_entry_import_service.import_file(user.id, filename, progress=progress),
+            on_success=self._on_import_done,
+            on_error=self._on_import_error
+        )
+    
+    def _update_import_progress(self, read):
+        self.import_btn.configure(text=f"⏳ {read} linhas...")
+    
+    def _on_import_done(self, result):
+        self.import_btn.configure(state="normal", text="📥 Importar CSV")
+        
+        message = (
+            f"{result.inserted} entradas importadas.\n"
+            f"{result.duplicates} já existiam e foram ignoradas."
+        )
+        if result.created:
+            message += f"\n{result.created} projetos criados."
+        if result.invalid:
+            message += f"\n\n{result.invalid} linhas inválidas:\n" + "\n".join(result.errors)
+        messagebox.showinfo("Importação Concluída", message)
+        
+        # A importação grava direto no banco remoto; com a réplica ativa, as linhas chegam no próximo pull
+        if result.inserted and db_manager.replica is not None:
+            replica_sync_service.sync_soon()
+        self._load_projects_combo()
+        self._load_entries()
+        self._reload_stats()
+    
+    def _on_import_error(self, error):
+        self.import_btn.configure(state="normal", text="📥 Importar CSV")
+        messagebox.showerror("Erro", f"Erro ao importar entradas: {error}")
     
     def show(self):
         """Exibe o frame de timesheet"""
+        self.visible = True
         self.frame.pack(fill="both", expand=True)
     
     def hide(self):
-        """Esconde o frame de timesheet"""
+        """Esconde o frame de timesheet (os timers continuam contando, só o display para)"""
+        self.visible = False
+        self._cancel_tick()
         self.frame.pack_forget()
     
     def refresh(self):
         """Atualiza os dados do frame"""
         self._load_projects_combo()
-        self._load_entries()
\ No newline at end of file
+        self._load_entries()
+        
+        # Outras telas e a sincronização podem ter alterado registros: uma consulta agregada por exibição
+        self._reload_stats()
+        
+        # Timers em andamento, inclusive os que estavam rodando quando o aplicativo foi fechado
+        self._render_timers()
\ No newline at end of file
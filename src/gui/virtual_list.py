@@ -0,0 +1,181 @@
+import math
+import customtkinter as ctk
+
+class VirtualList(ctk.CTkFrame):
+    """Lista virtualizada: cria widgets apenas para as linhas visíveis e os reaproveita na rolagem"""
+
+    def __init__(self, master, render_row, on_select=None, row_height=80, row_spacing=4,
+                 empty_text="Nenhum item encontrado", **kwargs):
+        kwargs.setdefault("fg_color", "transparent")
+        super().__init__(master, **kwargs)
+
+        # render_row(item) retorna as opções do botão (text, fg_color, ...)
+        self.render_row = render_row
+        self.on_select = on_select
+        self.row_height = row_height
+        self.row_stride = row_height + row_spacing
+        self.empty_text = empty_text
+
+        self.items = []
+        self._message = None
+        self._offset = 0  # Deslocamento da rolagem (em unidades sem escala, como row_height)
+        self._first_index = 0
+        self._pool = []  # Botões reaproveitados entre as linhas
+        self._render_pending = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.message_label = ctk.CTkLabel(self.viewport, text="", text_color="gray")
+
+        self.viewport.bind("<Configure>", lambda event: self._schedule_render())
+        self._bind_wheel(self.viewport)
+        self._bind_wheel(self.message_label)
+
+    # API pública
+
+    def set_items(self, items):
+        """Substitui os itens da lista e volta ao topo"""
+        self.items = list(items)
+        self._message = None
+        self._offset = 0
+        self._schedule_render()
+
+    def append_items(self, items):
+        """Acrescenta itens ao final mantendo a posição da rolagem"""
+        self.items.extend(items)
+        self._schedule_render()
+
+    def insert_item(self, index, item):
+        """Insere um item na posição mantendo a rolagem"""
+        self.items.insert(index, item)
+        self._message = None
+        self._schedule_render()
+
+    def remove_item(self, index):
+        """Remove o item da posição mantendo a rolagem"""
+        del self.items[index]
+        self._schedule_render()
+
+    def refresh_rows(self):
+        """Redesenha as linhas visíveis (após alterar algum item)"""
+        self._schedule_render()
+
+    def show_message(self, text):
+        """Exibe uma mensagem no lugar das linhas (ex.: carregando)"""
+        self.items = []
+        self._message = text
+        self._offset = 0
+        self._render()
+
+    def scroll_to_top(self):
+        """Rola a lista para o início"""
+        self._set_offset(0)
+
+    # Rolagem
+
+    def _viewport_height(self):
+        # winfo_height está em pixels reais; place() aplica a escala do CustomTkinter
+        return self.viewport.winfo_height() / self._get_widget_scaling()
+
+    def _content_height(self):
+        return len(self.items) * self.row_stride
+
+    def _max_offset(self):
+        return max(0, self._content_height() - self._viewport_height())
+
+    def _set_offset(self, offset):
+        offset = min(max(0, int(offset)), self._max_offset())
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        """Trata os comandos do scrollbar (moveto/scroll)"""
+        if action == "moveto":
+            self._set_offset(float(args[0]) * self._content_height())
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            step = self._viewport_height() if unit == "pages" else self.row_stride
+            self._set_offset(self._offset + amount * step)
+
+    def _on_mousewheel(self, event):
+        """Rola com a roda do mouse (Windows/macOS usam delta, Linux usa Button-4/5)"""
+        if getattr(event, "num", None) == 4:
+            direction = -1
+        elif getattr(event, "num", None) == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self._set_offset(self._offset + direction * self.row_stride)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_mousewheel, add="+")
+        widget.bind("<Button-4>", self._on_mousewheel, add="+")
+        widget.bind("<Button-5>", self._on_mousewheel, add="+")
+
+    # Renderização
+
+    def _schedule_render(self):
+        """Agrupa várias alterações em uma única renderização"""
+        if not self._render_pending:
+            self._render_pending = True
+            self.after_idle(self._render)
+
+    def _ensure_pool(self, size):
+        """Cria botões até o tamanho necessário para cobrir a área visível"""
+        while len(self._pool) < size:
+            slot = len(self._pool)
+            button = ctk.CTkButton(
+                self.viewport,
+                text="",
+                height=self.row_height,
+                anchor="w",
+                command=lambda s=slot: self._on_slot_click(s)
+            )
+            self._bind_wheel(button)
+            self._pool.append(button)
+
+    def _render(self):
+        """Posiciona e preenche os botões do pool para a janela visível"""
+        self._render_pending = False
+
+        viewport_height = max(self._viewport_height(), self.row_stride)
+        self._offset = int(min(self._offset, self._max_offset()))
+
+        self._first_index = self._offset // self.row_stride
+        shift = self._offset % self.row_stride
+        visible = math.ceil((viewport_height + shift) / self.row_stride)
+
+        self._ensure_pool(min(visible, len(self.items)))
+
+        for slot, button in enumerate(self._pool):
+            index = self._first_index + slot
+            if slot < visible and index < len(self.items):
+                button.configure(**self.render_row(self.items[index]))
+                button.place(x=0, y=slot * self.row_stride - shift, relwidth=1.0)
+            else:
+                button.place_forget()
+
+        if self.items:
+            self.message_label.place_forget()
+        else:
+            self.message_label.configure(text=self._message or self.empty_text)
+            self.message_label.place(relx=0.5, y=20, anchor="n")
+
+        content_height = self._content_height()
+        if content_height > viewport_height:
+            self.scrollbar.set(self._offset / content_height, (self._offset + viewport_height) / content_height)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_slot_click(self, slot):
+        index = self._first_index + slot
+        if self.on_select and index < len(self.items):
+            self.on_select(self.items[index])
@@ -0,0 +1 @@
+# Serviços de dados compartilhados entre as interfaces desktop e web
\ No newline at end of file
@@ -0,0 +1,106 @@
+import json
+import logging
+import multiprocessing
+import os
+import re
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from config import Config
+from ..database.rollups import to_day
+from .report_data import report_data_service
+from .report_pdf import pdf_report_renderer
+
+MANIFEST_NAME = "manifest.json"
+
+# Resultado de um lote: pasta, caminho do manifesto e as entradas do manifesto
+BatchResult = namedtuple('BatchResult', ['folder', 'manifest_path', 'invoices', 'failed'])
+
+def _slug(text):
+    """Nome de arquivo seguro a partir do nome do projeto"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower() or 'projeto'
+
+def _render_invoice(filename, invoice, start, end):
+    """Executado nos processos do pool: gera uma fatura a partir dos dados já carregados"""
+    pdf_report_renderer.render_invoice(filename, invoice, start, end)
+    return filename
+
+class BatchInvoiceService:
+    """Gera as faturas de todos os projetos com horas no período em um pool de processos"""
+
+    def __init__(self, data_service=None, output_folder=None, max_workers=None):
+        self.logger = logging.getLogger('devflow.services.batch_invoices')
+        self.data_service = data_service or report_data_service
+        self.output_folder = output_folder
+        self.max_workers = max_workers
+
+    def batch_folder(self, start, end):
+        """Pasta do lote dentro de REPORTS_FOLDER"""
+        start, end = to_day(start), to_day(end)
+        return os.path.join(self.output_folder or Config.REPORTS_FOLDER, f"faturas_{start:%Y%m%d}_{end:%Y%m%d}")
+
+    def generate(self, user_id, start, end, progress=None):
+        """Gera os PDFs e o manifesto do lote; progress(feitas, total) é chamado a cada fatura"""
+        start, end = to_day(start), to_day(end)
+
+        # Projetos e registros faturáveis de todos os projetos em uma única passada pelo banco
+        invoices = self.data_service.invoices(user_id, start, end)
+
+        folder = self.batch_folder(start, end)
+        os.makedirs(folder, exist_ok=True)
+
+        entries = []
+        if invoices:
+            workers = min(self.max_workers or os.cpu_count() or 1, len(invoices))
+
+            # spawn: os processos não herdam conexões do pool nem threads da interface
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = {}
+                for invoice in invoices:
+                    filename = os.path.join(folder, f"fatura_{invoice.project_id}_{_slug(invoice.project_name)}.pdf")
+                    futures[executor.submit(_render_invoice, filename, invoice, start, end)] = (invoice, filename)
+
+                for done, future in enumerate(as_completed(futures), 1):
+                    invoice, filename = futures[future]
+                    entries.append(self._manifest_entry(invoice, filename, future.exception()))
+                    if progress:
+                        progress(done, len(invoices))
+
+        entries.sort(key=lambda entry: (entry['project'], entry['project_id']))
+        failed = [entry for entry in entries if entry['status'] != 'ok']
+
+        manifest_path = os.path.join(folder, MANIFEST_NAME)
+        with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'period': {'start': start.isoformat(), 'end': end.isoformat()},
+                'invoices': len(entries),
+                'failed': len(failed),
+                'total_minutes': sum(entry['minutes'] for entry in entries),
+                'total_amount': sum(entry['amount'] or 0 for entry in entries if entry['status'] == 'ok'),
+                'items': entries
+            }, manifest_file, ensure_ascii=False, indent=2)
+
+        self.logger.info(f"Lote de faturas gerado: {len(entries) - len(failed)} ok, {len(failed)} com erro em {folder}")
+        return BatchResult(folder, manifest_path, entries, failed)
+
+    @staticmethod
+    def _manifest_entry(invoice, filename, error):
+        entry = {
+            'project_id': invoice.project_id,
+            'project': invoice.project_name,
+            'client': invoice.client_name,
+            'entries': len(invoice.entries),
+            'minutes': sum(row.duration_minutes or 0 for row in invoice.entries),
+            'amount': float(invoice.budget) if invoice.budget else None,
+            'file': os.path.basename(filename),
+            'status': 'ok'
+        }
+        if error is not None:
+            entry.update(status='erro', error=str(error), file=None)
+        return entry
+
+# Instância global do gerador de faturas em lote
+batch_invoice_service = BatchInvoiceService()
@@ -0,0 +1,171 @@
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case, and_
+from ..database.connection import db_manager
+from ..database.models import (
+    Client, Project, Transaction, TimeEntry, TransactionType, ProjectStatus,
+    TransactionMonthlyRollup, TimeEntryDailyRollup
+)
+from ..database.rollups import month_of, week_of
+
+# Linhas dos gráficos do dashboard: uma por período (e tipo), já agregadas no banco
+MonthlyCashflowRow = namedtuple('MonthlyCashflowRow', ['month', 'type', 'amount'])
+WeeklyHoursRow = namedtuple('WeeklyHoursRow', ['week', 'minutes'])
+
+class DashboardStatsService:
+    """Calcula as métricas principais do dashboard em uma única ida ao banco"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.dashboard')
+        self._session_factory = session_factory
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    def build_statement(self, user_id, month_start):
+        """Monta o SELECT com agregação condicional de todas as métricas"""
+        # Cada tabela é agregada uma única vez; os filtros ficam dentro do CASE
+        budget_subquery = select(
+            func.coalesce(func.sum(Project.budget), 0)
+        ).where(
+            Project.user_id == user_id,
+            Project.status.in_([ProjectStatus.ATIVO, ProjectStatus.PROPOSTA])
+        ).scalar_subquery()
+
+        active_projects_subquery = select(
+            func.count(Project.id)
+        ).where(
+            Project.user_id == user_id,
+            Project.status == ProjectStatus.ATIVO
+        ).scalar_subquery()
+
+        active_clients_subquery = select(
+            func.count(Client.id)
+        ).where(
+            Client.user_id == user_id,
+            Client.is_active == True
+        ).scalar_subquery()
+
+        # Transações e horas são lidas dos rollups mensais/diários, não das tabelas brutas
+        month = month_start.date()
+        is_income = TransactionMonthlyRollup.type == TransactionType.RECEITA
+        is_expense = TransactionMonthlyRollup.type == TransactionType.DESPESA
+        in_month = TransactionMonthlyRollup.month >= month
+        amount = TransactionMonthlyRollup.total_amount
+
+        transactions_subquery = select(
+            func.coalesce(func.sum(case((is_income, amount), else_=0)), 0).label("total_received"),
+            func.coalesce(func.sum(case((and_(is_income, in_month), amount), else_=0)), 0).label("monthly_income"),
+            func.coalesce(func.sum(case((and_(is_expense, in_month), amount), else_=0)), 0).label("monthly_expenses")
+        ).where(
+            TransactionMonthlyRollup.user_id == user_id
+        ).subquery()
+
+        minutes_subquery = select(
+            func.coalesce(func.sum(TimeEntryDailyRollup.total_minutes), 0)
+        ).where(
+            TimeEntryDailyRollup.user_id == user_id,
+            TimeEntryDailyRollup.day >= month
+        ).scalar_subquery()
+
+        return select(
+            budget_subquery.label("total_budget"),
+            transactions_subquery.c.total_received,
+            transactions_subquery.c.monthly_income,
+            transactions_subquery.c.monthly_expenses,
+            minutes_subquery.label("monthly_minutes"),
+            active_projects_subquery.label("active_projects"),
+            active_clients_subquery.label("active_clients")
+        ).select_from(transactions_subquery)
+
+    @staticmethod
+    def stats_from_row(row):
+        """Converte a linha do SELECT de métricas no dicionário do dashboard"""
+        total_budget = row.total_budget or 0
+        total_received = row.total_received or 0
+        monthly_income = row.monthly_income or 0
+        monthly_expenses = row.monthly_expenses or 0
+        monthly_minutes = row.monthly_minutes or 0
+
+        return {
+            "total_budget": total_budget,
+            "total_received": total_received,
+            "total_receivable": total_budget - total_received,
+            "monthly_income": monthly_income,
+            "monthly_expenses": monthly_expenses,
+            "monthly_balance": monthly_income - monthly_expenses,
+            "monthly_minutes": monthly_minutes,
+            "monthly_hours": monthly_minutes / 60 if monthly_minutes else 0,
+            "active_projects": row.active_projects or 0,
+            "active_clients": row.active_clients or 0
+        }
+
+    @staticmethod
+    def month_start(now=None):
+        now = now or datetime.now()
+        return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def get_stats(self, user_id, now=None):
+        """Retorna um dicionário com todas as métricas do dashboard"""
+        session = self._get_session()
+        try:
+            # Resultado em cache até um commit alterar alguma das tabelas lidas
+            statement = self.build_statement(user_id, self.month_start(now))
+            return self.stats_from_row(db_manager.cached_execute(session, statement)[0])
+        finally:
+            session.close()
+
+    def monthly_cashflow_statement(self, user_id, days=180, now=None):
+        """SELECT de receitas e despesas por mês e tipo (despesas negativas), agrupadas com date_trunc"""
+        since = (now or datetime.now()) - timedelta(days=days)
+        month = month_of(Transaction.date)
+
+        return select(
+            month,
+            Transaction.type,
+            func.sum(case(
+                (Transaction.type == TransactionType.DESPESA, -Transaction.amount),
+                else_=Transaction.amount
+            ))
+        ).where(
+            Transaction.user_id == user_id,
+            Transaction.date >= since
+        ).group_by(month, Transaction.type).order_by(month, Transaction.type)
+
+    def weekly_hours_statement(self, user_id, weeks=4, now=None):
+        """SELECT dos minutos trabalhados por semana (segunda a domingo), agrupados com date_trunc"""
+        since = (now or datetime.now()) - timedelta(weeks=weeks)
+        week = week_of(TimeEntry.date)
+
+        return select(
+            week,
+            func.coalesce(func.sum(TimeEntry.duration_minutes), 0)
+        ).where(
+            TimeEntry.user_id == user_id,
+            TimeEntry.date >= since
+        ).group_by(week).order_by(week)
+
+    def monthly_cashflow(self, user_id, days=180, now=None):
+        """Receitas e despesas por mês e tipo, uma linha por período"""
+        session = self._get_session()
+        try:
+            rows = session.execute(self.monthly_cashflow_statement(user_id, days, now)).all()
+            return [MonthlyCashflowRow(*row) for row in rows]
+        finally:
+            session.close()
+
+    def weekly_hours(self, user_id, weeks=4, now=None):
+        """Minutos trabalhados por semana, uma linha por período"""
+        session = self._get_session()
+        try:
+            rows = session.execute(self.weekly_hours_statement(user_id, weeks, now)).all()
+            return [WeeklyHoursRow(*row) for row in rows]
+        finally:
+            session.close()
+
+# Instância global do serviço de estatísticas
+dashboard_stats_service = DashboardStatsService()
@@ -0,0 +1,270 @@
+import csv
+import enum
+import importlib.util
+import logging
+import os
+from collections import namedtuple
+from sqlalchemy import select, func, Integer, Numeric, DateTime, Date, Enum
+from config import config
+from ..database.connection import db_manager
+from ..database.models import Project, Transaction, TimeEntry, Task, BoardColumn, Board
+from .report_data import period_bounds
+
+# Resultado de uma exportação: arquivo gravado, conjunto de dados e linhas escritas
+ExportResult = namedtuple('ExportResult', ['filename', 'dataset', 'rows'])
+
+# Conjuntos exportáveis e o nome exibido na interface
+EXPORT_DATASETS = {
+    'transactions': "Transações",
+    'time_entries': "Registros de Tempo",
+    'tasks': "Tarefas"
+}
+
+# Formatos por extensão do arquivo e a dependência opcional de cada um
+EXPORT_FORMATS = {
+    '.csv': ('csv', None),
+    '.parquet': ('parquet', 'pyarrow'),
+    '.xlsx': ('xlsx', 'openpyxl')
+}
+
+def _naive(value):
+    """Datetime no horário local, sem fuso (o XLSX não aceita fuso e o Parquet fica com um tipo só)"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def _enum_value(value):
+    return value.value if isinstance(value, enum.Enum) else value
+
+def _converter(sql_type):
+    """Conversão aplicada a cada valor da coluna antes de escrever (None se nenhuma)"""
+    if isinstance(sql_type, Enum):
+        return _enum_value
+    if isinstance(sql_type, DateTime):
+        return _naive
+    return None
+
+def dependency_available(module):
+    """Indica se a biblioteca opcional de um formato está instalada (sem importá-la)"""
+    return module is None or importlib.util.find_spec(module) is not None
+
+def export_format(filename):
+    """Formato de exportação pela extensão do arquivo"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Formato não suportado: {extension or filename}. Use .csv, .parquet ou .xlsx")
+    return EXPORT_FORMATS[extension]
+
+def _require(module):
+    """Importa a biblioteca opcional de um formato com uma mensagem clara se faltar"""
+    try:
+        return __import__(module)
+    except ImportError:
+        raise RuntimeError(f"{module} não está instalado. Instale com: pip install {module}")
+
+class CsvExportWriter:
+    """CSV em UTF-8 com BOM (abre com acentos no Excel); datas em ISO e decimais com ponto"""
+
+    def __init__(self, filename, columns):
+        self.stream = open(filename, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow([column.name for column in columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.stream.close()
+
+class ParquetExportWriter:
+    """Parquet tipado: cada bloco lido do banco vira um row group"""
+
+    def __init__(self, filename, columns):
+        _require('pyarrow')
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([pa.field(column.name, self._arrow_type(column.type)) for column in columns])
+        self.writer = pq.ParquetWriter(filename, self.schema, compression='snappy')
+
+    def _arrow_type(self, sql_type):
+        pa = self.pa
+        if isinstance(sql_type, Integer):
+            return pa.int64()
+        if isinstance(sql_type, Numeric):
+            return pa.decimal128(sql_type.precision or 18, sql_type.scale or 2)
+        if isinstance(sql_type, DateTime):
+            return pa.timestamp('us')
+        if isinstance(sql_type, Date):
+            return pa.date32()
+        return pa.string()
+
+    def write(self, rows):
+        values = list(zip(*rows))
+        arrays = [self.pa.array(column, type=field.type) for column, field in zip(values, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+class XlsxExportWriter:
+    """Planilha em modo write-only do openpyxl: as linhas vão para o disco conforme são escritas"""
+
+    def __init__(self, filename, columns):
+        openpyxl = _require('openpyxl')
+
+        self.filename = filename
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.sheet.append([column.name for column in columns])
+
+    def write(self, rows):
+        for row in rows:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.filename)
+
+EXPORT_WRITERS = {
+    'csv': CsvExportWriter,
+    'parquet': ParquetExportWriter,
+    'xlsx': XlsxExportWriter
+}
+
+class DataExportService:
+    """Exporta transações, registros de tempo e tarefas em streaming (CSV, Parquet ou XLSX)
+
+    As linhas são lidas em blocos com yield_per (cursor do lado do servidor no PostgreSQL)
+    e escritas bloco a bloco: a memória usada não depende do número de linhas.
+    """
+
+    def __init__(self, session_factory=None, chunk_size=None):
+        self.logger = logging.getLogger('devflow.services.data_export')
+        self._session_factory = session_factory
+        self.chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    def _statement(self, dataset, user_id, start, end, project_id):
+        """Consulta do conjunto com os filtros; o período (inclusivo) vale para transações e registros de tempo"""
+        if dataset == 'transactions':
+            statement = select(
+                Transaction.id,
+                Transaction.date,
+                Transaction.type,
+                Transaction.amount,
+                Transaction.description,
+                Transaction.category,
+                Transaction.project_id,
+                Project.name.label('project'),
+                Transaction.notes,
+                Transaction.created_at
+            ).outerjoin(Project, Transaction.project_id == Project.id).where(Transaction.user_id == user_id)
+            model, date_column, order = Transaction, Transaction.date, (Transaction.date, Transaction.id)
+
+        elif dataset == 'time_entries':
+            statement = select(
+                TimeEntry.id,
+                TimeEntry.date,
+                TimeEntry.project_id,
+                Project.name.label('project'),
+                TimeEntry.description,
+                TimeEntry.start_time,
+                TimeEntry.end_time,
+                TimeEntry.duration_minutes,
+                TimeEntry.hourly_rate,
+                TimeEntry.created_at
+            ).outerjoin(Project, TimeEntry.project_id == Project.id).where(TimeEntry.user_id == user_id)
+            model, date_column = TimeEntry, TimeEntry.date
+            order = (TimeEntry.date, TimeEntry.start_time, TimeEntry.id)
+
+        elif dataset == 'tasks':
+            # Tarefas não têm data de lançamento: o período não se aplica
+            statement = select(
+                Task.id,
+                Board.project_id,
+                Project.name.label('project'),
+                Board.name.label('board'),
+                BoardColumn.name.label('column'),
+                Task.position,
+                Task.title,
+                Task.description,
+                Task.priority,
+                Task.estimated_hours,
+                Task.assigned_to,
+                Task.due_date,
+                Task.created_at,
+                Task.updated_at
+            ).join(BoardColumn, Task.column_id == BoardColumn.id).join(
+                Board, BoardColumn.board_id == Board.id
+            ).outerjoin(Project, Board.project_id == Project.id).where(Board.user_id == user_id)
+            model, date_column = Board, None
+            order = (Board.id, BoardColumn.position, Task.position, Task.id)
+
+        else:
+            raise ValueError(f"Conjunto de dados desconhecido: {dataset}")
+
+        if project_id is not None:
+            statement = statement.where(model.project_id == project_id)
+        if date_column is not None and start is not None and end is not None:
+            period_start, period_end = period_bounds(start, end)
+            statement = statement.where(date_column >= period_start, date_column < period_end)
+
+        return statement.order_by(*order)
+
+    def count(self, dataset, user_id, start=None, end=None, project_id=None):
+        """Quantas linhas a exportação vai escrever (para a barra de progresso)"""
+        statement = self._statement(dataset, user_id, start, end, project_id).order_by(None)
+        session = self._get_session()
+        try:
+            return session.execute(select(func.count()).select_from(statement.subquery())).scalar() or 0
+        finally:
+            session.close()
+
+    def export(self, filename, dataset, user_id, start=None, end=None, project_id=None, progress=None):
+        """Escreve o conjunto em filename no formato da extensão; progress(escritas, total) a cada bloco"""
+        file_format, module = export_format(filename)
+        if not dependency_available(module):
+            raise RuntimeError(f"{module} não está instalado. Instale com: pip install {module}")
+
+        total = self.count(dataset, user_id, start, end, project_id) if progress else 0
+        statement = self._statement(dataset, user_id, start, end, project_id)
+        columns = list(statement.selected_columns)
+        converters = [(index, _converter(column.type)) for index, column in enumerate(columns)]
+        converters = [(index, convert) for index, convert in converters if convert is not None]
+
+        rows = 0
+        writer = EXPORT_WRITERS[file_format](filename, columns)
+        session = self._get_session()
+        try:
+            result = session.execute(statement.execution_options(yield_per=self.chunk_size))
+            for partition in result.partitions():
+                chunk = [list(row) for row in partition]
+                for row in chunk:
+                    for index, convert in converters:
+                        row[index] = convert(row[index])
+
+                writer.write(chunk)
+                rows += len(chunk)
+                if progress:
+                    progress(rows, max(total, rows))
+        except Exception:
+            writer.close()
+            os.remove(filename)
+            raise
+        finally:
+            session.close()
+
+        writer.close()
+        if progress:
+            progress(rows, rows)
+        self.logger.info(f"Exportação de {EXPORT_DATASETS[dataset]} ({file_format}, {rows} linhas): {filename}")
+        return ExportResult(filename, dataset, rows)
+
+# Instância global do serviço de exportação de dados
+data_export_service = DataExportService()
@@ -0,0 +1,167 @@
+import codecs
+import csv
+import functools
+import hashlib
+import unicodedata
+from collections import namedtuple
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+# Resultado de uma importação: linhas lidas, inseridas, já existentes, inválidas, as primeiras
+# mensagens de erro e os registros auxiliares criados (ex.: projetos que ainda não existiam)
+ImportResult = namedtuple('ImportResult', ['read', 'inserted', 'duplicates', 'invalid', 'errors', 'created'], defaults=(0,))
+
+# Mensagens de erro guardadas no resultado (as demais só são contadas)
+MAX_REPORTED_ERRORS = 20
+
+# Bytes lidos para detectar a codificação e o separador; também o tamanho dos blocos de leitura
+SAMPLE_SIZE = 64 * 1024
+
+# Linhas procuradas até o cabeçalho (alguns sistemas põem um resumo antes)
+MAX_PREAMBLE_ROWS = 20
+
+DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d', '%d/%m/%y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d')
+TIME_FORMATS = ('%H:%M:%S', '%H:%M', '%I:%M:%S %p', '%I:%M %p')
+
+class ImportErrors:
+    """Conta as linhas inválidas e guarda as primeiras mensagens (usado como on_error dos leitores)"""
+
+    def __init__(self):
+        self.count = 0
+        self.messages = []
+
+    def __call__(self, line, message):
+        self.count += 1
+        if len(self.messages) < MAX_REPORTED_ERRORS:
+            self.messages.append(f"Linha {line}: {message}")
+
+@functools.lru_cache(maxsize=65536)
+def normalize_text(text):
+    """Texto sem acentos, em minúsculas e com espaços simples (comparações e hash; nomes se repetem muito)"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(text.lower().split())
+
+def content_hash(*parts):
+    """Hash do conteúdo de uma linha importada (coluna import_hash)"""
+    return hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+def parse_amount(text):
+    """Valor nos formatos 1.234,56 / 1,234.56 / -1234.56 / (123,45) / 123,45- / R$ 10,00"""
+    value = (text or '').replace('R$', '').replace('\xa0', '').replace(' ', '')
+    negative = False
+    if value.startswith('(') and value.endswith(')'):
+        negative, value = True, value[1:-1]
+    elif value.endswith('-'):
+        negative, value = True, value[:-1]
+
+    if ',' in value and '.' in value:
+        # O último separador é o decimal
+        if value.rfind(',') > value.rfind('.'):
+            value = value.replace('.', '').replace(',', '.')
+        else:
+            value = value.replace(',', '')
+    elif ',' in value:
+        value = value.replace(',', '.')
+
+    try:
+        amount = Decimal(value).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f"valor inválido: {text!r}")
+    return -amount if negative else amount
+
+class DateParser:
+    """Converte as datas do arquivo; o formato que funcionou é tentado primeiro nas linhas seguintes"""
+
+    def __init__(self, formats=DATE_FORMATS):
+        self.formats = list(formats)
+        # Um arquivo repete poucas datas distintas e o strptime é caro
+        self.parsed = {}
+
+    def __call__(self, text):
+        parsed = self.parsed.get(text)
+        if parsed is None:
+            parsed = self.parsed[text] = self._parse(text)
+        return parsed
+
+    @staticmethod
+    def _clean(text):
+        # Descarta a hora que alguns sistemas acrescentam à data
+        return (text or '').strip().split(' ')[0].split('T')[0]
+
+    def _parse(self, text):
+        value = self._clean(text)
+        for index, date_format in enumerate(self.formats):
+            try:
+                parsed = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            if index:
+                self.formats.insert(0, self.formats.pop(index))
+            return parsed
+        raise ValueError(f"data ou hora inválida: {text!r}")
+
+class TimeParser(DateParser):
+    """Converte os horários do arquivo (24 horas ou AM/PM) em time"""
+
+    def __init__(self, formats=TIME_FORMATS):
+        super().__init__(formats)
+
+    @staticmethod
+    def _clean(text):
+        return (text or '').strip().upper()
+
+    def _parse(self, text):
+        return super()._parse(text).time()
+
+def open_text(path):
+    """Abre o arquivo como texto: UTF-8 (com ou sem BOM) se a amostra for válida, senão Windows-1252"""
+    with open(path, 'rb') as raw:
+        sample = raw.read(SAMPLE_SIZE)
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'cp1252'
+    return open(path, encoding=encoding, errors='replace', newline='')
+
+def match_columns(row, accepted_columns):
+    """Índices das colunas reconhecidas em uma linha: {campo: índice}
+
+    Os nomes são comparados com normalize_text, com e sem o sufixo entre parênteses
+    (ex.: "Billable Rate (USD)" também vale como "billable rate").
+    """
+    names = [normalize_text(cell) for cell in row]
+    columns = {}
+    for field, accepted in accepted_columns.items():
+        for index, name in enumerate(names):
+            if name in accepted or name.split(' (')[0] in accepted:
+                columns[field] = index
+                break
+    return columns
+
+def csv_rows(path, accepted_columns, is_header):
+    """Lê um CSV em streaming: (número da linha, células, {campo: índice}) após o cabeçalho detectado
+
+    is_header(colunas) decide se a linha com essas colunas reconhecidas é o cabeçalho.
+    """
+    with open_text(path) as stream:
+        # O separador mais frequente nas primeiras linhas (o resumo antes do cabeçalho não tem separadores)
+        sample = ''.join(stream.readline() for _ in range(MAX_PREAMBLE_ROWS))
+        stream.seek(0)
+        delimiter = max(';,\t|', key=sample.count)
+
+        reader = csv.reader(stream, delimiter=delimiter)
+        columns = None
+        for row in reader:
+            found = match_columns(row, accepted_columns)
+            if is_header(found):
+                columns = found
+                break
+            if reader.line_num >= MAX_PREAMBLE_ROWS:
+                break
+        if columns is None:
+            raise ValueError("Cabeçalho do arquivo não reconhecido")
+
+        for row in reader:
+            if any(cell.strip() for cell in row):
+                yield reader.line_num, row, columns
@@ -0,0 +1,147 @@
+import logging
+from collections import namedtuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import joinedload
+from ..database.connection import db_manager
+from ..database.models import Board, BoardColumn, Task
+
+# Distância entre posições consecutivas; movimentos usam o ponto médio entre os vizinhos
+POSITION_GAP = 1024
+
+# Limites da coluna Integer de posição
+MAX_POSITION = 2 ** 31 - 1
+MIN_POSITION = -MAX_POSITION
+
+# Resultado de um movimento; needs_rebalance indica que o espaço entre vizinhos acabou
+MoveResult = namedtuple('MoveResult', ['position', 'rebalanced', 'needs_rebalance'])
+
+def position_between(above, below):
+    """Posição esparsa entre dois vizinhos (None quando não há espaço)"""
+    if above is None and below is None:
+        position = 0
+    elif above is None:
+        position = below - POSITION_GAP
+    elif below is None:
+        position = above + POSITION_GAP
+    elif below - above > 1:
+        position = (above + below) // 2
+    else:
+        return None
+
+    if not MIN_POSITION <= position <= MAX_POSITION:
+        return None
+    return position
+
+def _gap_exhausted(position, above, below):
+    """Indica se não sobrou posição livre ao lado da posição escolhida"""
+    return (above is not None and position - above <= 1) or (below is not None and below - position <= 1)
+
+class KanbanService:
+    """Carga dos quadros kanban e ordenação das tarefas por posições esparsas"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.kanban')
+        self._session_factory = session_factory
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    def load_board(self, board_id):
+        """Carrega o quadro com projeto, colunas e tarefas em um único SELECT"""
+        session = self._get_session()
+        try:
+            # Colunas e tarefas já vêm ordenadas por position (order_by dos relacionamentos)
+            return session.query(Board).options(
+                joinedload(Board.project),
+                joinedload(Board.columns).joinedload(BoardColumn.tasks)
+            ).filter(Board.id == board_id).one_or_none()
+
+        finally:
+            session.close()
+
+    def append_position(self, session, column_id):
+        """Posição para uma nova tarefa no fim da coluna (MAX pelo índice column_id, position)"""
+        last = session.query(func.max(Task.position)).filter(Task.column_id == column_id).scalar()
+        position = position_between(last, None)
+
+        if position is None:
+            self.rebalance_with(session, column_id)
+            last = session.query(func.max(Task.position)).filter(Task.column_id == column_id).scalar()
+            position = position_between(last, None)
+
+        return position
+
+    def move_task(self, task_id, column_id, above_id=None, below_id=None):
+        """Move a tarefa para a coluna entre os vizinhos informados atualizando uma única linha"""
+        session = self._get_session()
+        try:
+            result = self.move_task_with(session, task_id, column_id, above_id, below_id)
+            session.commit()
+            return result
+
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def move_task_with(self, session, task_id, column_id, above_id=None, below_id=None):
+        """Move a tarefa na sessão informada, sem commit (a fila de gravações aplica o arraste assim)"""
+        above, below = self._neighbor_positions(session, above_id, below_id)
+        position = position_between(above, below)
+
+        # Sem espaço entre os vizinhos: renumera a coluna na mesma transação
+        rebalanced = position is None
+        if rebalanced:
+            self.rebalance_with(session, column_id)
+            above, below = self._neighbor_positions(session, above_id, below_id)
+            position = position_between(above, below)
+
+        session.query(Task).filter(Task.id == task_id).update(
+            {Task.column_id: column_id, Task.position: position},
+            synchronize_session=False
+        )
+        return MoveResult(position, rebalanced, _gap_exhausted(position, above, below))
+
+    def rebalance_column(self, column_id):
+        """Redistribui as posições da coluna com POSITION_GAP entre as tarefas"""
+        session = self._get_session()
+        try:
+            updated = self.rebalance_with(session, column_id)
+            session.commit()
+            return updated
+
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _neighbor_positions(session, above_id, below_id):
+        ids = [task_id for task_id in (above_id, below_id) if task_id is not None]
+        positions = dict(session.query(Task.id, Task.position).filter(Task.id.in_(ids)).all()) if ids else {}
+        return positions.get(above_id), positions.get(below_id)
+
+    def rebalance_with(self, session, column_id):
+        """Renumera a coluna em um único UPDATE mantendo a ordem atual (sem commit)"""
+        ranked = select(
+            Task.id,
+            func.row_number().over(order_by=(Task.position, Task.id)).label('rank')
+        ).where(Task.column_id == column_id).subquery()
+
+        # UPDATE ... FROM (PostgreSQL e SQLite 3.33+): cada linha recebe a posição do seu rank
+        result = session.execute(
+            update(Task).where(Task.id == ranked.c.id).values(
+                position=ranked.c.rank * POSITION_GAP
+            ).execution_options(synchronize_session=False)
+        )
+
+        self.logger.info(f"Coluna {column_id} rebalanceada: {result.rowcount} tarefas")
+        return result.rowcount
+
+# Instância global do serviço de kanban
+kanban_service = KanbanService()
@@ -0,0 +1,131 @@
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import joinedload
+from ..database.connection import db_manager
+from ..database.models import Transaction, TimeEntry
+from ..database.rollups import NO_PROJECT, to_day
+
+# Tamanho padrão de página das listagens
+PAGE_SIZE = 50
+
+# Página de uma listagem; next_cursor é (date, id) do último item ou None no fim
+Page = namedtuple('Page', ['items', 'next_cursor', 'has_more'])
+
+def month_range(year, month):
+    """Primeiro e último dia de um mês"""
+    start = datetime(year, month, 1)
+    next_month = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start.date(), (next_month - timedelta(days=1)).date()
+
+def _as_datetime(day):
+    return datetime(day.year, day.month, day.day)
+
+class ListingService:
+    """Listagens paginadas por keyset (date, id) de transações e registros de tempo"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.listings')
+        self._session_factory = session_factory
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    @staticmethod
+    def _page_statement(statement, model, cursor, limit):
+        """Aplica o cursor e a ordenação e limita a limit + 1 linhas"""
+        if cursor is not None:
+            # Ordem decrescente: próxima página começa logo abaixo do último (date, id) exibido
+            statement = statement.where(tuple_(model.date, model.id) < tuple_(*cursor))
+
+        return statement.order_by(model.date.desc(), model.id.desc()).limit(limit + 1)
+
+    @staticmethod
+    def make_page(rows, limit):
+        """Monta a página a partir das limit + 1 linhas buscadas"""
+        has_more = len(rows) > limit
+        items = rows[:limit]
+        next_cursor = (items[-1].date, items[-1].id) if has_more and items else None
+        return Page(items, next_cursor, has_more)
+
+    @staticmethod
+    def _filter_period(statement, model, start, end):
+        """Filtra o período com datas inclusivas"""
+        if start is not None:
+            statement = statement.where(model.date >= _as_datetime(to_day(start)))
+        if end is not None:
+            statement = statement.where(model.date < _as_datetime(to_day(end) + timedelta(days=1)))
+        return statement
+
+    def transactions_statement(self, user_id, cursor=None, limit=PAGE_SIZE, transaction_type=None,
+                               project_id=None, start=None, end=None):
+        """SELECT de uma página de transações (compartilhado com as consultas assíncronas)"""
+        statement = select(Transaction).options(
+            joinedload(Transaction.project)
+        ).where(Transaction.user_id == user_id)
+
+        if transaction_type is not None:
+            statement = statement.where(Transaction.type == transaction_type)
+        if project_id == NO_PROJECT:
+            statement = statement.where(Transaction.project_id.is_(None))
+        elif project_id is not None:
+            statement = statement.where(Transaction.project_id == project_id)
+
+        statement = self._filter_period(statement, Transaction, start, end)
+        return self._page_statement(statement, Transaction, cursor, limit)
+
+    def time_entries_statement(self, user_id, cursor=None, limit=PAGE_SIZE, project_id=None, start=None, end=None):
+        """SELECT de uma página de registros de tempo"""
+        statement = select(TimeEntry).options(
+            joinedload(TimeEntry.project)
+        ).where(TimeEntry.user_id == user_id)
+
+        if project_id is not None:
+            statement = statement.where(TimeEntry.project_id == project_id)
+
+        statement = self._filter_period(statement, TimeEntry, start, end)
+        return self._page_statement(statement, TimeEntry, cursor, limit)
+
+    def _fetch_page(self, statement, limit):
+        session = self._get_session()
+        try:
+            return self.make_page(session.execute(statement).scalars().all(), limit)
+
+        finally:
+            session.close()
+
+    def transactions_page(self, user_id, cursor=None, limit=PAGE_SIZE, transaction_type=None,
+                          project_id=None, start=None, end=None):
+        """Página de transações; project_id=NO_PROJECT lista apenas as transações gerais"""
+        statement = self.transactions_statement(
+            user_id, cursor, limit, transaction_type=transaction_type, project_id=project_id, start=start, end=end
+        )
+        return self._fetch_page(statement, limit)
+
+    def time_entries_page(self, user_id, cursor=None, limit=PAGE_SIZE, project_id=None, start=None, end=None):
+        """Página de registros de tempo"""
+        statement = self.time_entries_statement(user_id, cursor, limit, project_id=project_id, start=start, end=end)
+        return self._fetch_page(statement, limit)
+
+    def time_entry(self, user_id, entry_id):
+        """Um registro de tempo com o projeto carregado (None se não existir)"""
+        return self._fetch_entry(self._entry_statement(user_id).where(TimeEntry.id == entry_id))
+
+    @staticmethod
+    def _entry_statement(user_id):
+        return select(TimeEntry).options(joinedload(TimeEntry.project)).where(TimeEntry.user_id == user_id)
+
+    def _fetch_entry(self, statement):
+        session = self._get_session()
+        try:
+            return session.execute(statement).scalars().first()
+
+        finally:
+            session.close()
+
+# Instância global do serviço de listagens
+listing_service = ListingService()
@@ -0,0 +1,479 @@
+import json
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+from config import config
+from ..database.connection import db_manager
+from ..database.models import User, Transaction, TimeEntry
+from ..database.replica import (
+    SYNCED_MODELS, MODELS_BY_TABLE, SERVER_COLUMNS,
+    replica_changes, replica_state, replica_conflicts,
+    user_scope, pull_statement, row_version
+)
+from ..database.rollups import RollupDeltas, collect_row_deltas, apply_deltas
+
+# Resultado de uma sincronização
+SyncResult = namedtuple('SyncResult', ['pushed', 'pulled', 'deleted', 'conflicts', 'failed'])
+
+# Estado exibido na interface; online é None antes da primeira tentativa
+SyncStatus = namedtuple('SyncStatus', ['online', 'last_sync_at', 'pending', 'conflicts', 'error', 'syncing'])
+
+# Linhas por lote no pull
+PULL_BATCH_SIZE = 1000
+
+# Ordem de envio: inserções de pais para filhos, exclusões de filhos para pais
+_TABLE_ORDER = {model.__tablename__: position for position, model in enumerate(SYNCED_MODELS)}
+
+# Modelos com rollups: as gravações em Core na réplica não passam pelos eventos da sessão
+_ROLLUP_MODELS = (Transaction, TimeEntry)
+
+def _push_order(change):
+    position = _TABLE_ORDER[change.table_name]
+    if change.operation == 'insert':
+        return (0, position, change.id)
+    if change.operation == 'update':
+        return (1, position, change.id)
+    return (2, -position, change.id)
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, 'value'):  # Enum
+        return value.value
+    return value if isinstance(value, (int, float, str, bool, type(None))) else str(value)
+
+class ReplicaSyncService:
+    """Sincroniza a réplica local com o banco remoto: envia as alterações pendentes e traz os deltas
+
+    Pull: linhas do usuário com versão (updated_at ou created_at) acima da marca d'água de cada
+    tabela, mais a conferência dos ids para remover o que foi excluído no remoto.
+    Push: cada alteração local é aplicada se o registro remoto ainda está na versão base;
+    caso contrário o remoto prevalece e a versão local fica registrada em replica_conflicts.
+    """
+
+    def __init__(self, remote_session_factory=None, replica=None):
+        self.logger = logging.getLogger('devflow.services.replica_sync')
+        self._remote_session_factory = remote_session_factory
+        self._replica = replica
+        self._sync_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._listeners = []
+        self.syncing = False
+        self.user_id = None
+        self.online = None
+        self.last_sync_at = None
+        self.last_error = None
+        self.conflict_count = 0
+
+    @property
+    def replica(self):
+        return self._replica or db_manager.replica
+
+    def _get_remote_session(self):
+        """Retorna uma sessão do banco remoto"""
+        if self._remote_session_factory:
+            return self._remote_session_factory()
+        return db_manager.get_remote_session()
+
+    # Sincronização
+
+    def sync(self, user_id):
+        """Envia as alterações pendentes e traz os deltas do usuário; retorna um SyncResult"""
+        with self._sync_lock:
+            self.syncing = True
+            self._status_changed()
+            try:
+                return self._sync(user_id)
+            finally:
+                self.syncing = False
+                self._status_changed()
+
+    def _sync(self, user_id):
+        """Corpo de sync (chamado com o lock adquirido)"""
+        try:
+            pushed, conflicts, failed = self.push()
+            pulled, deleted = self.pull(user_id)
+        except OperationalError as e:
+            self.online = False
+            self.last_error = str(e.orig)
+            self.logger.warning(f"Banco remoto indisponível; réplica segue offline: {e.orig}")
+            raise
+
+        self.online = True
+        self.last_error = None
+        self.last_sync_at = datetime.now()
+        self.conflict_count += conflicts
+        self.logger.info(
+            f"Réplica sincronizada: {pushed} enviados, {pulled} recebidos, {deleted} removidos, "
+            f"{conflicts} conflitos, {failed} falhas"
+        )
+        return SyncResult(pushed, pulled, deleted, conflicts, failed)
+
+    def pull_user(self, username):
+        """Copia o usuário do banco remoto para a réplica (primeiro login nesta máquina)"""
+        remote = self._get_remote_session()
+        try:
+            row = remote.execute(
+                select(User.__table__).where((User.username == username) | (User.email == username))
+            ).mappings().first()
+        finally:
+            remote.close()
+
+        if row is None:
+            return False
+        with self.replica.engine.begin() as local:
+            self._upsert(local, User.__table__, [dict(row)])
+        return True
+
+    def pull(self, user_id):
+        """Traz as linhas novas ou alteradas do usuário; retorna (recebidas, removidas)"""
+        local_engine = self.replica.open().engine
+        overlap = timedelta(seconds=config.REPLICA_PULL_OVERLAP)
+        pulled = deleted = 0
+
+        remote = self._get_remote_session()
+        try:
+            for model in SYNCED_MODELS:
+                table = model.__table__
+                with local_engine.begin() as local:
+                    pending = self._pending_ids(local, table.name)
+                    watermark = local.execute(select(replica_state.c.pulled_until).where(
+                        replica_state.c.user_id == user_id,
+                        replica_state.c.table_name == table.name
+                    )).scalar()
+
+                    # Relê um intervalo antes da marca: transações longas podem gravar versões antigas
+                    statement = pull_statement(model, user_id, None if watermark is None else watermark - overlap)
+
+                    newest = watermark
+                    result = remote.execute(statement.execution_options(yield_per=PULL_BATCH_SIZE)).mappings()
+                    for batch in result.partitions():
+                        # Linhas com alteração local pendente são resolvidas no push (detecção de conflito)
+                        rows = [dict(row) for row in batch if row['id'] not in pending]
+                        for row in batch:
+                            version = row_version(model, row)
+                            if version is not None and (newest is None or version > newest):
+                                newest = version
+                        if rows:
+                            previous = self._rollup_rows(local, model, table.c.id.in_([row['id'] for row in rows]))
+                            self._upsert(local, table, rows)
+                            self._update_rollups(local, model, previous, rows)
+                            pulled += len(rows)
+
+                    # Excluídas no remoto: ids locais positivos que não existem mais lá
+                    remote_ids = set(remote.execute(select(table.c.id).where(user_scope(model, user_id))).scalars())
+                    local_ids = set(local.execute(
+                        select(table.c.id).where(user_scope(model, user_id), table.c.id > 0)
+                    ).scalars())
+                    gone = sorted(local_ids - remote_ids - pending)
+                    if gone:
+                        previous = self._rollup_rows(local, model, table.c.id.in_(gone))
+                        local.execute(delete(table).where(table.c.id.in_(gone)))
+                        self._update_rollups(local, model, previous, [])
+                        deleted += len(gone)
+
+                    self._save_watermark(local, user_id, table.name, newest)
+        finally:
+            remote.close()
+
+        return pulled, deleted
+
+    def push(self):
+        """Envia as alterações locais; retorna (enviadas, conflitos, falhas)"""
+        local_engine = self.replica.open().engine
+        with local_engine.connect() as local:
+            changes = sorted(local.execute(select(replica_changes)).all(), key=_push_order)
+
+        pushed = conflicts = failed = 0
+        # Inserções com id remoto: ids locais seguintes são trocados antes do envio
+        for change in changes:
+            model = MODELS_BY_TABLE[change.table_name]
+            try:
+                outcome = getattr(self, f"_push_{change.operation}")(model, change)
+            except OperationalError:
+                raise
+            except SQLAlchemyError as e:
+                failed += 1
+                self.logger.error(f"Erro ao enviar {change.operation} de {change.table_name} {change.row_id}: {e}")
+                continue
+
+            if outcome == 'conflict':
+                conflicts += 1
+            else:
+                pushed += 1
+
+        return pushed, conflicts, failed
+
+    def _push_insert(self, model, change):
+        table = model.__table__
+        with self.replica.engine.connect() as local:
+            row = local.execute(select(table).where(table.c.id == change.row_id)).mappings().first()
+        if row is None:
+            self._forget_change(change)
+            return 'gone'
+
+        remote = self._get_remote_session()
+        try:
+            obj = model(**self._client_values(table, row))
+            remote.add(obj)
+            remote.commit()
+            remote_row = self._remote_row(remote, table, obj.id)
+        except Exception:
+            remote.rollback()
+            raise
+        finally:
+            remote.close()
+
+        with self.replica.engine.begin() as local:
+            self._remap_id(local, model, change.row_id, remote_row)
+            # Edições feitas durante o envio viram um update sobre a versão recém-criada
+            self._finish_change(local, change, row_version(model, remote_row), remote_row['id'])
+        return 'pushed'
+
+    def _push_update(self, model, change):
+        table = model.__table__
+        with self.replica.engine.connect() as local:
+            row = local.execute(select(table).where(table.c.id == change.row_id)).mappings().first()
+        if row is None:
+            self._forget_change(change)
+            return 'gone'
+
+        remote = self._get_remote_session()
+        try:
+            obj = remote.get(model, change.row_id, with_for_update=True)
+            remote_version = row_version(model, obj) if obj is not None else None
+            if obj is None or remote_version != change.base_version:
+                remote.rollback()
+                self._resolve_conflict(model, change, row, remote_version)
+                return 'conflict'
+
+            for key, value in self._client_values(table, row).items():
+                setattr(obj, key, value)
+            remote.commit()
+            remote_row = self._remote_row(remote, table, change.row_id)
+        except Exception:
+            remote.rollback()
+            raise
+        finally:
+            remote.close()
+
+        with self.replica.engine.begin() as local:
+            local.execute(update(table).where(table.c.id == change.row_id).values(self._version_values(table, remote_row)))
+            self._finish_change(local, change, row_version(model, remote_row))
+        return 'pushed'
+
+    def _push_delete(self, model, change):
+        remote = self._get_remote_session()
+        try:
+            obj = remote.get(model, change.row_id, with_for_update=True)
+            if obj is None:
+                remote.rollback()
+                self._forget_change(change)
+                return 'gone'
+
+            remote_version = row_version(model, obj)
+            if remote_version != change.base_version:
+                remote.rollback()
+                self._resolve_conflict(model, change, None, remote_version)
+                return 'conflict'
+
+            remote.delete(obj)
+            remote.commit()
+        except Exception:
+            remote.rollback()
+            raise
+        finally:
+            remote.close()
+
+        self._forget_change(change)
+        return 'pushed'
+
+    def _resolve_conflict(self, model, change, local_row, remote_version):
+        """O remoto prevalece: guarda a versão local e restaura a linha remota na réplica"""
+        table = model.__table__
+        remote = self._get_remote_session()
+        try:
+            remote_row = self._remote_row(remote, table, change.row_id)
+        finally:
+            remote.close()
+
+        local_values = json.dumps({key: _json_value(value) for key, value in local_row.items()}) if local_row else None
+        with self.replica.engine.begin() as local:
+            local.execute(insert(replica_conflicts).values(
+                table_name=change.table_name, row_id=change.row_id, operation=change.operation,
+                local_values=local_values, remote_version=remote_version, detected_at=datetime.now()
+            ))
+            previous = self._rollup_rows(local, model, table.c.id == change.row_id)
+            if remote_row is None:
+                local.execute(delete(table).where(table.c.id == change.row_id))
+            else:
+                self._upsert(local, table, [remote_row])
+            self._update_rollups(local, model, previous, [remote_row] if remote_row else [])
+            local.execute(delete(replica_changes).where(replica_changes.c.id == change.id))
+
+        self.logger.warning(
+            f"Conflito em {change.table_name} {change.row_id} ({change.operation}): "
+            f"o registro mudou no banco remoto; a versão local foi guardada em replica_conflicts"
+        )
+
+    # Auxiliares
+
+    @staticmethod
+    def _client_values(table, row):
+        """Colunas enviadas ao remoto (sem id e sem as versões preenchidas pelo banco)"""
+        return {key: value for key, value in row.items() if key not in SERVER_COLUMNS and key in table.c}
+
+    @staticmethod
+    def _version_values(table, row):
+        return {key: row[key] for key in SERVER_COLUMNS[1:] if key in table.c}
+
+    @staticmethod
+    def _remote_row(remote, table, row_id):
+        row = remote.execute(select(table).where(table.c.id == row_id)).mappings().first()
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    def _pending_ids(local, table_name):
+        return set(local.execute(
+            select(replica_changes.c.row_id).where(replica_changes.c.table_name == table_name)
+        ).scalars())
+
+    @staticmethod
+    def _upsert(local, table, rows):
+        """Grava as linhas remotas na réplica (INSERT ... ON CONFLICT DO UPDATE em lote)"""
+        statement = sqlite_insert(table)
+        columns = {column.name: statement.excluded[column.name] for column in table.c if column.name != 'id'}
+        local.execute(statement.on_conflict_do_update(index_elements=['id'], set_=columns), rows)
+
+    @staticmethod
+    def _rollup_rows(local, model, condition):
+        """Linhas atuais da réplica que entram nos rollups (vazio nos modelos sem rollup)"""
+        if model not in _ROLLUP_MODELS:
+            return []
+        table = model.__table__
+        return [dict(row) for row in local.execute(select(table).where(condition)).mappings()]
+
+    @staticmethod
+    def _update_rollups(local, model, previous, current):
+        """Aplica nos rollups da réplica a troca das linhas anteriores pelas atuais (só as chaves afetadas)"""
+        if model not in _ROLLUP_MODELS:
+            return
+        deltas = RollupDeltas()
+        collect_row_deltas(deltas, model, previous, -1)
+        collect_row_deltas(deltas, model, current, 1)
+        if deltas:
+            apply_deltas(local, deltas)
+
+    @staticmethod
+    def _save_watermark(local, user_id, table_name, pulled_until):
+        if pulled_until is None:
+            return
+        statement = sqlite_insert(replica_state).values(user_id=user_id, table_name=table_name, pulled_until=pulled_until)
+        local.execute(statement.on_conflict_do_update(
+            index_elements=['user_id', 'table_name'], set_={'pulled_until': pulled_until}
+        ))
+
+    def _remap_id(self, local, model, local_id, remote_row):
+        """Troca o id negativo pelo id remoto na linha e nas chaves estrangeiras que apontam para ela"""
+        table = model.__table__
+        local.execute(update(table).where(table.c.id == local_id).values(
+            id=remote_row['id'], **self._version_values(table, remote_row)
+        ))
+        for child in SYNCED_MODELS:
+            for foreign_key in child.__table__.foreign_keys:
+                if foreign_key.column.table is not table:
+                    continue
+                column = foreign_key.parent
+                # Mantém a versão do filho: o onupdate marcaria uma edição local que não existiu
+                values = {column.name: remote_row['id']}
+                if 'updated_at' in child.__table__.c:
+                    values['updated_at'] = child.__table__.c.updated_at
+                previous = self._rollup_rows(local, child, column == local_id)
+                local.execute(update(child.__table__).where(column == local_id).values(values))
+                self._update_rollups(local, child, previous, [
+                    dict(row, **{column.name: remote_row['id']}) for row in previous
+                ])
+
+    def _finish_change(self, local, change, remote_version, new_row_id=None):
+        """Remove a alteração enviada, ou a mantém como update se o registro foi editado durante o envio"""
+        removed = local.execute(delete(replica_changes).where(
+            replica_changes.c.id == change.id, replica_changes.c.revision == change.revision
+        )).rowcount
+        if not removed:
+            local.execute(update(replica_changes).where(replica_changes.c.id == change.id).values(
+                operation='update' if change.operation == 'insert' else replica_changes.c.operation,
+                row_id=new_row_id if new_row_id is not None else replica_changes.c.row_id,
+                base_version=remote_version
+            ))
+
+    def _forget_change(self, change):
+        with self.replica.engine.begin() as local:
+            local.execute(delete(replica_changes).where(replica_changes.c.id == change.id))
+
+    # Mudanças de estado (barra de status da interface)
+
+    def add_listener(self, callback):
+        """Registra callback() chamado quando uma sincronização começa ou termina (na thread dela)"""
+        self._listeners.append(callback)
+
+    def _status_changed(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"Erro no aviso de mudança da réplica: {e}")
+
+    # Sincronização em segundo plano
+
+    def start(self, user_id, interval=None):
+        """Inicia a sincronização periódica do usuário em uma thread própria"""
+        self.stop()
+        self.user_id = user_id
+        self._stop.clear()
+        interval = interval or config.REPLICA_SYNC_INTERVAL
+
+        def _loop():
+            while not self._stop.is_set():
+                try:
+                    self.sync(user_id)
+                except OperationalError:
+                    pass  # Offline: tenta de novo no próximo ciclo
+                except Exception as e:
+                    self.last_error = str(e)
+                    self.logger.error(f"Erro na sincronização da réplica: {e}")
+                self._wake.wait(interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=_loop, name='devflow-replica-sync', daemon=True)
+        self._thread.start()
+
+    def sync_soon(self):
+        """Antecipa o próximo ciclo da sincronização em segundo plano"""
+        self._wake.set()
+
+    def stop(self, timeout=5):
+        """Encerra a sincronização em segundo plano (espera o ciclo em andamento até timeout)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+        self._wake.clear()
+
+    def status(self):
+        """Estado atual para a interface"""
+        try:
+            pending = self.replica.pending_count()
+        except SQLAlchemyError:
+            pending = None
+        return SyncStatus(self.online, self.last_sync_at, pending, self.conflict_count, self.last_error, self.syncing)
+
+# Instância global do serviço de sincronização da réplica
+replica_sync_service = ReplicaSyncService()
@@ -0,0 +1,326 @@
+import logging
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from ..database.connection import db_manager
+from ..database.models import Project, Transaction, TimeEntry, TransactionType
+from ..database.rollups import to_day
+from .rollups import rollup_service
+
+# Linhas buscadas por vez nas leituras em streaming (cursor do lado do servidor no PostgreSQL)
+STREAM_CHUNK_SIZE = 500
+
+# Dados de uma fatura já carregados (podem ser enviados a outro processo para gerar o PDF)
+InvoiceData = namedtuple('InvoiceData', [
+    'project_id', 'project_name', 'client_name', 'client_email', 'client_phone', 'budget', 'entries'
+])
+InvoiceEntry = namedtuple('InvoiceEntry', ['date', 'description', 'duration_minutes'])
+
+def period_bounds(start, end):
+    """Converte um período de datas inclusivas em [início, fim) de datetime"""
+    start_day, end_day = to_day(start), to_day(end)
+    return (
+        datetime(start_day.year, start_day.month, start_day.day),
+        datetime(end_day.year, end_day.month, end_day.day) + timedelta(days=1)
+    )
+
+class ProjectReportData:
+    """Dados de um projeto no período, já agrupados para os relatórios"""
+
+    def __init__(self, project):
+        self.project = project
+        self.client = project.client
+        self.transactions = []
+        self.time_entries = []
+        self.income = Decimal('0')
+        self.expenses = Decimal('0')
+        self.minutes = 0
+
+    @property
+    def balance(self):
+        return self.income - self.expenses
+
+    @property
+    def has_activity(self):
+        return bool(self.transactions or self.time_entries)
+
+    def add_transaction(self, transaction):
+        self.transactions.append(transaction)
+        if transaction.type == TransactionType.RECEITA:
+            self.income += transaction.amount
+        else:
+            self.expenses += transaction.amount
+
+    def add_time_entry(self, entry):
+        self.time_entries.append(entry)
+        self.minutes += entry.duration_minutes or 0
+
+class ReportData:
+    """Resultado da carga de um relatório: projetos com suas linhas e totais do período"""
+
+    def __init__(self, start, end, projects):
+        self.start = start
+        self.end = end
+        self.projects = [ProjectReportData(project) for project in projects]
+        self.by_project_id = {item.project.id: item for item in self.projects}
+
+        # Listas completas em ordem de data e as linhas sem projeto
+        self.transactions = []
+        self.time_entries = []
+        self.general_transactions = []
+        self.general_time_entries = []
+
+    def project_name(self, project_id):
+        """Nome do projeto de uma linha (ou "Geral" para transações sem projeto)"""
+        item = self.by_project_id.get(project_id)
+        return item.project.name if item else "Geral"
+
+    def transactions_of(self, transaction_type):
+        return [transaction for transaction in self.transactions if transaction.type == transaction_type]
+
+    @property
+    def income(self):
+        return sum((t.amount for t in self.transactions_of(TransactionType.RECEITA)), Decimal('0'))
+
+    @property
+    def expenses(self):
+        return sum((t.amount for t in self.transactions_of(TransactionType.DESPESA)), Decimal('0'))
+
+    @property
+    def minutes(self):
+        return sum(entry.duration_minutes or 0 for entry in self.time_entries)
+
+class ReportDataService:
+    """Carrega os dados de um relatório em um número fixo de consultas, independente do número de projetos"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.report_data')
+        self._session_factory = session_factory
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    def load(self, user_id, start, end, project_id=None, transactions=True, time_entries=True):
+        """Carrega projetos, transações e registros de tempo do período (até três consultas)"""
+        period_start, period_end = period_bounds(start, end)
+
+        session = self._get_session()
+        try:
+            # 1. Projetos com o cliente (joined eager load)
+            projects_query = session.query(Project).options(
+                joinedload(Project.client)
+            ).filter(Project.user_id == user_id)
+            if project_id is not None:
+                projects_query = projects_query.filter(Project.id == project_id)
+
+            data = ReportData(start, end, projects_query.order_by(Project.name, Project.id).all())
+
+            # 2. Todas as transações do período de uma vez, distribuídas por projeto em memória
+            if transactions:
+                query = session.query(Transaction).filter(
+                    Transaction.user_id == user_id,
+                    Transaction.date >= period_start,
+                    Transaction.date < period_end
+                )
+                if project_id is not None:
+                    query = query.filter(Transaction.project_id == project_id)
+
+                for transaction in query.order_by(Transaction.date, Transaction.id):
+                    data.transactions.append(transaction)
+                    item = data.by_project_id.get(transaction.project_id)
+                    if item:
+                        item.add_transaction(transaction)
+                    else:
+                        data.general_transactions.append(transaction)
+
+            # 3. Todos os registros de tempo do período
+            if time_entries:
+                query = session.query(TimeEntry).filter(
+                    TimeEntry.user_id == user_id,
+                    TimeEntry.date >= period_start,
+                    TimeEntry.date < period_end
+                )
+                if project_id is not None:
+                    query = query.filter(TimeEntry.project_id == project_id)
+
+                for entry in query.order_by(TimeEntry.date, TimeEntry.start_time, TimeEntry.id):
+                    data.time_entries.append(entry)
+                    item = data.by_project_id.get(entry.project_id)
+                    if item:
+                        item.add_time_entry(entry)
+                    else:
+                        data.general_time_entries.append(entry)
+
+            return data
+
+        finally:
+            session.close()
+
+    def iter_transactions(self, user_id, start, end, project_id=None, transaction_type=None,
+                          by_project=False, chunk_size=STREAM_CHUNK_SIZE):
+        """Percorre as transações do período em blocos com yield_per, sem materializar objetos ORM"""
+        period_start, period_end = period_bounds(start, end)
+
+        session = self._get_session()
+        try:
+            query = session.query(
+                Transaction.id,
+                Transaction.date,
+                Transaction.description,
+                Transaction.type,
+                Transaction.amount,
+                Transaction.category,
+                Transaction.project_id,
+                Project.name.label('project_name')
+            ).outerjoin(Project, Transaction.project_id == Project.id).filter(
+                Transaction.user_id == user_id,
+                Transaction.date >= period_start,
+                Transaction.date < period_end
+            )
+
+            if project_id is not None:
+                query = query.filter(Transaction.project_id == project_id)
+            if transaction_type is not None:
+                query = query.filter(Transaction.type == transaction_type)
+
+            if by_project:
+                # Mesma ordem de projetos de load(); linhas sem projeto ficam no fim
+                query = query.order_by(
+                    Transaction.project_id.is_(None), Project.name, Transaction.project_id,
+                    Transaction.date, Transaction.id
+                )
+            else:
+                query = query.order_by(Transaction.date, Transaction.id)
+
+            yield from query.yield_per(chunk_size)
+
+        finally:
+            session.close()
+
+    def iter_time_entries(self, user_id, start, end, project_id=None, by_project=False,
+                          billable=False, chunk_size=STREAM_CHUNK_SIZE):
+        """Percorre os registros de tempo do período em blocos com yield_per"""
+        period_start, period_end = period_bounds(start, end)
+
+        session = self._get_session()
+        try:
+            query = session.query(
+                TimeEntry.id,
+                TimeEntry.date,
+                TimeEntry.description,
+                TimeEntry.start_time,
+                TimeEntry.end_time,
+                TimeEntry.duration_minutes,
+                TimeEntry.project_id,
+                Project.name.label('project_name')
+            ).outerjoin(Project, TimeEntry.project_id == Project.id).filter(
+                TimeEntry.user_id == user_id,
+                TimeEntry.date >= period_start,
+                TimeEntry.date < period_end
+            )
+
+            if project_id is not None:
+                query = query.filter(TimeEntry.project_id == project_id)
+            if billable:
+                # Apenas registros encerrados (timers em andamento ainda não têm duração)
+                query = query.filter(TimeEntry.duration_minutes > 0)
+
+            if by_project:
+                query = query.order_by(
+                    TimeEntry.project_id.is_(None), Project.name, TimeEntry.project_id,
+                    TimeEntry.date, TimeEntry.start_time, TimeEntry.id
+                )
+            else:
+                query = query.order_by(TimeEntry.date, TimeEntry.start_time, TimeEntry.id)
+
+            yield from query.yield_per(chunk_size)
+
+        finally:
+            session.close()
+
+    def invoices(self, user_id, start, end, project_id=None):
+        """Dados de fatura dos projetos com horas faturáveis no período (projetos e registros em uma passada)"""
+        data = self.load(user_id, start, end, project_id=project_id, transactions=False, time_entries=False)
+
+        entries = {}
+        for row in self.iter_time_entries(user_id, start, end, project_id=project_id, by_project=True, billable=True):
+            entries.setdefault(row.project_id, []).append(
+                InvoiceEntry(to_day(row.date), row.description, row.duration_minutes)
+            )
+
+        return [
+            InvoiceData(
+                item.project.id,
+                item.project.name,
+                item.client.name,
+                item.client.email,
+                item.client.phone,
+                item.project.budget,
+                entries[item.project.id]
+            )
+            for item in data.projects if item.project.id in entries
+        ]
+
+    def count_rows(self, user_id, start, end, project_id=None):
+        """Quantidade de transações e registros de tempo do período (para o progresso das exportações)"""
+        period_start, period_end = period_bounds(start, end)
+
+        session = self._get_session()
+        try:
+            counts = []
+            for model in (Transaction, TimeEntry):
+                query = session.query(func.count(model.id)).filter(
+                    model.user_id == user_id,
+                    model.date >= period_start,
+                    model.date < period_end
+                )
+                if project_id is not None:
+                    query = query.filter(model.project_id == project_id)
+                counts.append(query.scalar() or 0)
+            return tuple(counts)
+
+        finally:
+            session.close()
+
+    def summary(self, user_id, start, end, project_id=None):
+        """Números do resumo geral: projetos por status e totais do período pelos rollups"""
+        session = self._get_session()
+        try:
+            query = session.query(Project.status, func.count(Project.id)).filter(Project.user_id == user_id)
+            if project_id is not None:
+                query = query.filter(Project.id == project_id)
+            status_count = {status.value.title(): count for status, count in query.group_by(Project.status).all()}
+
+        finally:
+            session.close()
+
+        totals = rollup_service.transaction_totals(user_id, start=start, end=end, project_id=project_id)
+        time_totals = rollup_service.time_totals(user_id, start=start, end=end, project_id=project_id)
+
+        income = totals[TransactionType.RECEITA]
+        expenses = totals[TransactionType.DESPESA]
+        minutes = time_totals['minutes']
+        days_worked = time_totals['days_worked']
+        days_in_period = (to_day(end) - to_day(start)).days + 1
+
+        return {
+            'projects_total': sum(status_count.values()),
+            'status_count': status_count,
+            'income': income,
+            'expenses': expenses,
+            'balance': income - expenses,
+            'minutes': minutes,
+            'entries': time_totals['entries'],
+            'days_worked': days_worked,
+            'avg_minutes_per_day': minutes / days_in_period if minutes else 0,
+            'hourly_income': float(income) / (minutes / 60) if minutes and income > 0 else None,
+            'avg_hours_per_workday': minutes / (days_worked * 60) if days_worked else None
+        }
+
+# Instância global do serviço de dados de relatórios
+report_data_service = ReportDataService()
@@ -0,0 +1,538 @@
+import logging
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from itertools import chain, groupby
+from operator import attrgetter
+from xml.sax.saxutils import escape
+from ..database.models import TransactionType
+from ..database.rollups import to_day
+from .report_data import report_data_service, InvoiceData
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+# Linhas por tabela: relatórios longos viram várias tabelas seguidas, desenhadas e descartadas uma a uma
+TABLE_CHUNK_ROWS = 100
+
+# Flowables mantidos à frente do que já foi desenhado (keepWithNext dos títulos)
+STORY_LOOKAHEAD = 3
+
+# Fonte das células; o texto é quebrado na largura da coluna com simpleSplit (sem Paragraph por célula)
+CELL_FONT = 'Helvetica'
+CELL_FONT_SIZE = 8
+CELL_PADDING = 12
+
+# Tipos de relatório da tela de relatórios
+REPORT_TYPES = {
+    "Relatório de Projeto": 'project',
+    "Relatório Financeiro": 'financial',
+    "Relatório de Horas": 'hours',
+    "Fatura de Projeto": 'invoice',
+    "Resumo Geral": 'summary'
+}
+
+def format_currency(value):
+    """Formata um valor como R$ 1.234,56"""
+    return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+
+def format_minutes(minutes):
+    """Formata minutos como 2h 30m"""
+    minutes = int(minutes or 0)
+    return f"{minutes // 60}h {minutes % 60}m"
+
+def format_date(value):
+    return value.strftime('%d/%m/%Y') if value else "-"
+
+class PdfStyles:
+    """Estilos de parágrafo e de tabela compilados uma única vez por processo"""
+
+    def __init__(self):
+        base = getSampleStyleSheet()
+
+        self.title = ParagraphStyle('DevFlowTitle', parent=base['Title'], fontName='Helvetica-Bold', fontSize=16, spaceAfter=4)
+        self.meta = ParagraphStyle('DevFlowMeta', parent=base['Normal'], fontSize=8, textColor=colors.grey, alignment=1, spaceAfter=14)
+        self.heading = ParagraphStyle('DevFlowHeading', parent=base['Heading2'], fontSize=13, spaceBefore=14, spaceAfter=6, keepWithNext=1)
+        self.section = ParagraphStyle('DevFlowSection', parent=base['Heading3'], fontSize=10, spaceBefore=8, spaceAfter=4, keepWithNext=1)
+        self.body = ParagraphStyle('DevFlowBody', parent=base['Normal'], fontSize=9, leading=12)
+
+        grid = [
+            ('FONTNAME', (0, 0), (-1, -1), CELL_FONT),
+            ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.HexColor('#DDDDDD')),
+            ('TOPPADDING', (0, 0), (-1, -1), 3),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ]
+
+        # Primeiro bloco de uma tabela (com cabeçalho) e blocos de continuação
+        self.table = TableStyle(grid + [
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1F6AA5')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F4F6F8')]),
+        ])
+        self.continuation = TableStyle(grid + [
+            ('ROWBACKGROUNDS', (0, 0), (-1, -1), [colors.HexColor('#F4F6F8'), colors.white]),
+        ])
+        self.totals = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('ALIGN', (-1, 0), (-1, -1), 'RIGHT'),
+            ('LINEABOVE', (0, 0), (-1, 0), 0.75, colors.HexColor('#1F6AA5')),
+        ])
+        self.key_value = TableStyle([
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+        ])
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Estilos compartilhados entre todas as exportações"""
+    return PdfStyles()
+
+class _LazyStory(list):
+    """Lista de flowables preenchida sob demanda a partir de um gerador
+
+    O build do ReportLab consome a lista pela frente; mantendo só alguns itens
+    à frente, linhas e tabelas já desenhadas são liberadas durante a exportação.
+    """
+
+    def __init__(self, flowables, lookahead=STORY_LOOKAHEAD):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+class _Progress:
+    """Conta as linhas desenhadas e repassa (feitas, total) ao callback a cada bloco"""
+
+    def __init__(self, total, callback=None, step=TABLE_CHUNK_ROWS):
+        self.total = max(total, 1)
+        self.done = 0
+        self.callback = callback
+        self.step = step
+        self._reported = 0
+
+    def advance(self, rows=1):
+        self.done += rows
+        if self.callback and self.done - self._reported >= self.step:
+            self._reported = self.done
+            self.callback(min(self.done, self.total), self.total)
+
+    def finish(self):
+        if self.callback:
+            self.callback(self.total, self.total)
+
+class _ProjectGroups:
+    """Percorre um stream ordenado por projeto entregando as linhas de um projeto por vez"""
+
+    def __init__(self, rows, project_ids):
+        self._rows = iter(rows)
+        self._project_ids = project_ids
+        self._next = None
+        self._advance()
+
+    def _advance(self):
+        # Linhas sem projeto (ou de projetos fora da lista) não entram no relatório de projeto
+        self._next = next(self._rows, None)
+        while self._next is not None and self._next.project_id not in self._project_ids:
+            self._next = next(self._rows, None)
+
+    def has(self, project_id):
+        return self._next is not None and self._next.project_id == project_id
+
+    def take(self, project_id):
+        while self.has(project_id):
+            row = self._next
+            self._advance()
+            yield row
+
+class PdfReportRenderer:
+    """Gera os relatórios em PDF com tabelas nativas a partir das linhas do banco em streaming"""
+
+    def __init__(self, data_service=None, page_size=None):
+        self.logger = logging.getLogger('devflow.services.report_pdf')
+        self.data_service = data_service or report_data_service
+        self.page_size = page_size
+
+    def render(self, filename, report_type, user_id, start, end, project_id=None, progress=None):
+        """Escreve o relatório em filename; progress(feitas, total) é chamado da thread que exporta"""
+        if not REPORTLAB_AVAILABLE:
+            raise RuntimeError("ReportLab não está instalado. Instale com: pip install reportlab")
+
+        builders = {
+            'project': self._project_story,
+            'financial': self._financial_story,
+            'hours': self._hours_story,
+            'invoice': self._invoice_story,
+            'summary': self._summary_story
+        }
+        if report_type not in builders:
+            raise ValueError(f"Tipo de relatório desconhecido: {report_type}")
+        if report_type == 'invoice' and project_id is None:
+            raise ValueError("Para gerar uma fatura, selecione um projeto específico.")
+
+        transactions, time_entries = self.data_service.count_rows(user_id, start, end, project_id=project_id)
+        tracker = _Progress(transactions + time_entries, progress)
+
+        self._build(filename, builders[report_type](user_id, to_day(start), to_day(end), project_id, tracker))
+
+        tracker.finish()
+        self.logger.info(f"PDF exportado ({report_type}, {tracker.done} linhas): {filename}")
+        return filename
+
+    def render_invoice(self, filename, invoice, start, end):
+        """Escreve a fatura de um InvoiceData já carregado (sem acessar o banco)"""
+        if not REPORTLAB_AVAILABLE:
+            raise RuntimeError("ReportLab não está instalado. Instale com: pip install reportlab")
+
+        self._build(filename, self._invoice_flowables(invoice, to_day(start), to_day(end), _Progress(len(invoice.entries))))
+        return filename
+
+    def _build(self, filename, story):
+        doc = SimpleDocTemplate(
+            filename,
+            pagesize=self.page_size or A4,
+            leftMargin=1.5 * cm,
+            rightMargin=1.5 * cm,
+            topMargin=1.5 * cm,
+            bottomMargin=1.5 * cm,
+            title="DevFlow"
+        )
+        doc.build(_LazyStory(story))
+
+    # Blocos comuns
+
+    def _header(self, title, start, end, project_label=None):
+        styles = get_styles()
+        meta = f"Período: {format_date(start)} a {format_date(end)} | Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}"
+        if project_label:
+            meta += f" | Projeto: {project_label}"
+
+        yield Paragraph(escape(title), styles.title)
+        yield Paragraph(escape(meta), styles.meta)
+
+    @staticmethod
+    def _cell(text, width):
+        """Texto da célula quebrado em linhas na largura da coluna"""
+        return "\n".join(simpleSplit(text or "", CELL_FONT, CELL_FONT_SIZE, width - CELL_PADDING))
+
+    def _key_values(self, pairs, widths=(5 * cm, 11 * cm)):
+        table = Table([[label, self._cell(str(value), widths[1])] for label, value in pairs], colWidths=widths, hAlign='LEFT')
+        table.setStyle(get_styles().key_value)
+        return table
+
+    def _table(self, header, rows, widths, tracker, right_columns=(), empty_text=None):
+        """Tabela em blocos de TABLE_CHUNK_ROWS linhas; o cabeçalho se repete nas quebras de página do primeiro bloco"""
+        styles = get_styles()
+        alignment = [('ALIGN', (column, 0), (column, -1), 'RIGHT') for column in right_columns]
+        chunk, first = [header], True
+
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= TABLE_CHUNK_ROWS:
+                yield self._chunk_table(chunk, widths, styles, alignment, first)
+                tracker.advance(len(chunk) - first)
+                chunk, first = [], False
+
+        if first and len(chunk) == 1 and empty_text:
+            yield Paragraph(escape(empty_text), styles.body)
+        elif len(chunk) > 1 or first:
+            yield self._chunk_table(chunk, widths, styles, alignment, first)
+            tracker.advance(len(chunk) - first)
+
+    @staticmethod
+    def _chunk_table(chunk, widths, styles, alignment, first):
+        table = Table(chunk, colWidths=widths, repeatRows=1 if first else 0, hAlign='LEFT')
+        table.setStyle(styles.table if first else styles.continuation)
+        if alignment:
+            table.setStyle(TableStyle(alignment))
+        return table
+
+    def _totals(self, pairs, widths):
+        """Linhas de total alinhadas à direita, abaixo de uma tabela"""
+        label_width = sum(widths[:-1])
+        table = Table([[label, value] for label, value in pairs], colWidths=(label_width, widths[-1]), hAlign='LEFT')
+        table.setStyle(get_styles().totals)
+        return table
+
+    # Relatórios
+
+    def _project_story(self, user_id, start, end, project_id, tracker):
+        styles = get_styles()
+        data = self.data_service.load(user_id, start, end, project_id=project_id, transactions=False, time_entries=False)
+        project_ids = set(data.by_project_id)
+
+        label = data.projects[0].project.name if project_id is not None and data.projects else "Todos os Projetos"
+        yield from self._header("Relatório de Projeto", start, end, label)
+
+        # Dois streams na mesma ordem de projetos da lista (nome, id)
+        transactions = _ProjectGroups(
+            self.data_service.iter_transactions(user_id, start, end, project_id=project_id, by_project=True),
+            project_ids
+        )
+        entries = _ProjectGroups(
+            self.data_service.iter_time_entries(user_id, start, end, project_id=project_id, by_project=True),
+            project_ids
+        )
+
+        transaction_widths = (2.2 * cm, 9 * cm, 2.3 * cm, 4.5 * cm)
+        entry_widths = (2.2 * cm, 12.8 * cm, 3 * cm)
+
+        for item in data.projects:
+            project = item.project
+            yield Paragraph(escape(project.name), styles.heading)
+
+            details = [("Cliente", item.client.name), ("Status", project.status.value.title())]
+            if project.description:
+                details.append(("Descrição", project.description))
+            if project.budget:
+                details.append(("Orçamento", format_currency(project.budget)))
+            if project.start_date:
+                details.append(("Data de Início", format_date(project.start_date)))
+            if project.end_date:
+                details.append(("Data de Fim", format_date(project.end_date)))
+            yield self._key_values(details)
+
+            if transactions.has(project.id):
+                totals = {TransactionType.RECEITA: Decimal('0'), TransactionType.DESPESA: Decimal('0')}
+
+                def transaction_rows():
+                    for row in transactions.take(project.id):
+                        totals[row.type] += row.amount
+                        yield [format_date(row.date), self._cell(row.description, transaction_widths[1]), row.type.value.title(), format_currency(row.amount)]
+
+                yield Paragraph("Transações", styles.section)
+                yield from self._table(["Data", "Descrição", "Tipo", "Valor"], transaction_rows(), transaction_widths, tracker, right_columns=(3,))
+                income, expenses = totals[TransactionType.RECEITA], totals[TransactionType.DESPESA]
+                yield self._totals([
+                    ("Total Receitas", format_currency(income)),
+                    ("Total Despesas", format_currency(expenses)),
+                    ("Saldo", format_currency(income - expenses))
+                ], transaction_widths)
+
+            if entries.has(project.id):
+                minutes = [0]
+
+                def entry_rows():
+                    for row in entries.take(project.id):
+                        minutes[0] += row.duration_minutes or 0
+                        yield [format_date(row.date), self._cell(row.description, entry_widths[1]), format_minutes(row.duration_minutes)]
+
+                yield Paragraph("Horas Trabalhadas", styles.section)
+                yield from self._table(["Data", "Descrição", "Duração"], entry_rows(), entry_widths, tracker, right_columns=(2,))
+                yield self._totals([("Total de Horas", format_minutes(minutes[0]))], entry_widths)
+
+    def _financial_story(self, user_id, start, end, project_id, tracker):
+        styles = get_styles()
+        label = self._project_label(user_id, start, end, project_id)
+        yield from self._header("Relatório Financeiro", start, end, label)
+
+        widths = (2.2 * cm, 8 * cm, 4 * cm, 3.8 * cm)
+        sections = [
+            ("Receitas", TransactionType.RECEITA, "Nenhuma receita no período", "Total de Receitas"),
+            ("Despesas", TransactionType.DESPESA, "Nenhuma despesa no período", "Total de Despesas")
+        ]
+        totals = {}
+
+        for title, transaction_type, empty_text, total_label in sections:
+            totals[transaction_type] = Decimal('0')
+
+            def rows(transaction_type=transaction_type):
+                for row in self.data_service.iter_transactions(user_id, start, end, project_id=project_id, transaction_type=transaction_type):
+                    totals[transaction_type] += row.amount
+                    yield [format_date(row.date), self._cell(row.description, widths[1]), self._cell(row.project_name or "Geral", widths[2]), format_currency(row.amount)]
+
+            yield Paragraph(title, styles.heading)
+            yield from self._table(
+                ["Data", "Descrição", "Projeto", "Valor"], rows(), widths, tracker,
+                right_columns=(3,), empty_text=empty_text
+            )
+            yield self._totals([(total_label, format_currency(totals[transaction_type]))], widths)
+
+        income, expenses = totals[TransactionType.RECEITA], totals[TransactionType.DESPESA]
+        yield Paragraph("Resumo", styles.heading)
+        yield self._key_values([
+            ("Total de Receitas", format_currency(income)),
+            ("Total de Despesas", format_currency(expenses)),
+            ("Saldo do Período", format_currency(income - expenses))
+        ])
+
+    def _hours_story(self, user_id, start, end, project_id, tracker):
+        styles = get_styles()
+        label = self._project_label(user_id, start, end, project_id)
+        yield from self._header("Relatório de Horas", start, end, label)
+
+        widths = (2.2 * cm, 10 * cm, 2.8 * cm, 3 * cm)
+        total_minutes, total_entries = 0, 0
+
+        # Registros agrupados por projeto (ordem de nome) e os sem projeto no fim
+        rows = self.data_service.iter_time_entries(user_id, start, end, project_id=project_id, by_project=True)
+        for _, group in groupby(rows, key=attrgetter('project_id')):
+            first = next(group)
+            counters = [0, 0]
+
+            def entry_rows(first=first, group=group, counters=counters):
+                for row in chain((first,), group):
+                    counters[0] += row.duration_minutes or 0
+                    counters[1] += 1
+                    interval = ""
+                    if row.start_time and row.end_time:
+                        interval = f"{row.start_time.strftime('%H:%M')} - {row.end_time.strftime('%H:%M')}"
+                    yield [format_date(row.date), self._cell(row.description, widths[1]), interval, format_minutes(row.duration_minutes)]
+
+            yield Paragraph(escape(first.project_name or "Sem projeto"), styles.heading)
+            yield from self._table(["Data", "Descrição", "Horário", "Duração"], entry_rows(), widths, tracker, right_columns=(3,))
+            yield self._totals([("Subtotal", format_minutes(counters[0]))], widths)
+
+            total_minutes += counters[0]
+            total_entries += counters[1]
+
+        yield Paragraph("Resumo", styles.heading)
+        if not total_entries:
+            yield Paragraph("Nenhuma entrada de tempo encontrada no período.", styles.body)
+            return
+
+        summary = [
+            ("Total de Horas Trabalhadas", format_minutes(total_minutes)),
+            ("Número de Registros", total_entries)
+        ]
+        if total_minutes > 0:
+            summary.append(("Média por Dia", format_minutes(total_minutes / max(1, (end - start).days + 1))))
+        yield self._key_values(summary)
+
+    def _invoice_story(self, user_id, start, end, project_id, tracker):
+        data = self.data_service.load(user_id, start, end, project_id=project_id, transactions=False, time_entries=False)
+        if not data.projects:
+            raise ValueError("Projeto não encontrado.")
+
+        item = data.projects[0]
+        project, client = item.project, item.client
+        invoice = InvoiceData(
+            project.id, project.name, client.name, client.email, client.phone, project.budget,
+            self.data_service.iter_time_entries(user_id, start, end, project_id=project_id)
+        )
+        yield from self._invoice_flowables(invoice, start, end, tracker)
+
+    def _invoice_flowables(self, invoice, start, end, tracker):
+        styles = get_styles()
+
+        yield Paragraph("Fatura", styles.title)
+        yield Paragraph(escape(
+            f"Data de Emissão: {datetime.now().strftime('%d/%m/%Y')} | "
+            f"Período de Serviços: {format_date(start)} a {format_date(end)}"
+        ), styles.meta)
+
+        yield Paragraph("Dados do Projeto", styles.heading)
+        details = [("Projeto", invoice.project_name), ("Cliente", invoice.client_name)]
+        if invoice.client_email:
+            details.append(("Email", invoice.client_email))
+        if invoice.client_phone:
+            details.append(("Telefone", invoice.client_phone))
+        yield self._key_values(details)
+
+        widths = (2.2 * cm, 12.8 * cm, 3 * cm)
+        minutes = [0]
+
+        def service_rows():
+            for row in invoice.entries:
+                minutes[0] += row.duration_minutes or 0
+                yield [format_date(row.date), self._cell(row.description, widths[1]), format_minutes(row.duration_minutes)]
+
+        yield Paragraph("Serviços Prestados", styles.heading)
+        yield from self._table(
+            ["Data", "Descrição", "Duração"], service_rows(), widths, tracker,
+            right_columns=(2,), empty_text="Nenhum serviço registrado no período"
+        )
+        yield self._totals([("Total de Horas", format_minutes(minutes[0]))], widths)
+
+        yield Paragraph("Valores", styles.heading)
+        if invoice.budget:
+            values = [("Valor do Projeto", format_currency(invoice.budget))]
+            if minutes[0] > 0:
+                hourly_rate = float(invoice.budget) / (minutes[0] / 60)
+                values.append(("Valor por Hora", format_currency(hourly_rate)))
+                values.append(("Valor Proporcional", format_currency((minutes[0] / 60) * hourly_rate)))
+            yield self._key_values(values)
+        else:
+            yield Paragraph("Valor do projeto não definido", styles.body)
+
+        yield Paragraph("Observações", styles.heading)
+        yield Paragraph("Esta fatura refere-se aos serviços de desenvolvimento prestados no período especificado.", styles.body)
+        yield Spacer(1, 6)
+        yield Paragraph("Prazo de pagamento: 30 dias", styles.body)
+        yield Spacer(1, 6)
+        yield Paragraph("Obrigado pela preferência!", styles.body)
+
+    def _summary_story(self, user_id, start, end, project_id, tracker):
+        styles = get_styles()
+        label = self._project_label(user_id, start, end, project_id)
+        yield from self._header("Resumo Geral", start, end, label)
+
+        summary = self.data_service.summary(user_id, start, end, project_id=project_id)
+
+        yield Paragraph("Projetos", styles.heading)
+        yield self._key_values(
+            [("Total de Projetos", summary['projects_total'])] + list(summary['status_count'].items())
+        )
+
+        yield Paragraph("Financeiro", styles.heading)
+        yield self._key_values([
+            ("Total de Receitas", format_currency(summary['income'])),
+            ("Total de Despesas", format_currency(summary['expenses'])),
+            ("Saldo", format_currency(summary['balance']))
+        ])
+
+        time_rows = [
+            ("Total de Horas", format_minutes(summary['minutes'])),
+            ("Número de Registros", summary['entries'])
+        ]
+        if summary['minutes'] > 0:
+            time_rows.append(("Média por Dia", format_minutes(summary['avg_minutes_per_day'])))
+        yield Paragraph("Tempo", styles.heading)
+        yield self._key_values(time_rows)
+
+        productivity = []
+        if summary['hourly_income'] is not None:
+            productivity.append(("Receita por Hora", format_currency(summary['hourly_income'])))
+        if summary['entries'] > 0:
+            productivity.append(("Dias Trabalhados", summary['days_worked']))
+            if summary['avg_hours_per_workday'] is not None:
+                productivity.append(("Média de Horas por Dia Trabalhado", f"{summary['avg_hours_per_workday']:.1f}h"))
+        yield Paragraph("Produtividade", styles.heading)
+        yield self._key_values(productivity or [("Sem registros no período", "")])
+
+    def _project_label(self, user_id, start, end, project_id):
+        if project_id is None:
+            return "Todos os Projetos"
+        data = self.data_service.load(user_id, start, end, project_id=project_id, transactions=False, time_entries=False)
+        return data.projects[0].project.name if data.projects else "Todos os Projetos"
+
+# Instância global do gerador de PDFs
+pdf_report_renderer = PdfReportRenderer()
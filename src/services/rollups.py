@@ -0,0 +1,259 @@
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select, insert, delete, func, and_, or_
+from ..database.connection import db_manager
+from ..database.models import Transaction, TimeEntry, TransactionType, TransactionMonthlyRollup, TimeEntryDailyRollup
+from ..database.rollups import NO_PROJECT, month_of, day_of, to_day
+
+def _next_month(day):
+    """Primeiro dia do mês seguinte"""
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+def _as_datetime(day):
+    return datetime(day.year, day.month, day.day)
+
+class RollupService:
+    """Leitura, reconstrução e verificação dos rollups de transações e tempo"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.rollups')
+        self._session_factory = session_factory
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    # Consultas de agregação a partir das tabelas brutas
+
+    def _transaction_source(self, user_id=None):
+        """SELECT que agrega as transações na granularidade do rollup"""
+        project_key = func.coalesce(Transaction.project_id, NO_PROJECT)
+        month = month_of(Transaction.date)
+        statement = select(
+            Transaction.user_id,
+            project_key.label('project_id'),
+            Transaction.type,
+            month.label('month'),
+            func.coalesce(func.sum(Transaction.amount), 0).label('total_amount'),
+            func.count(Transaction.id).label('entry_count')
+        ).group_by(Transaction.user_id, project_key, Transaction.type, month)
+
+        if user_id is not None:
+            statement = statement.where(Transaction.user_id == user_id)
+        return statement
+
+    def _time_entry_source(self, user_id=None):
+        """SELECT que agrega os registros de tempo na granularidade do rollup"""
+        day = day_of(TimeEntry.date)
+        statement = select(
+            TimeEntry.user_id,
+            TimeEntry.project_id,
+            day.label('day'),
+            func.coalesce(func.sum(TimeEntry.duration_minutes), 0).label('total_minutes'),
+            func.count(TimeEntry.id).label('entry_count')
+        ).group_by(TimeEntry.user_id, TimeEntry.project_id, day)
+
+        if user_id is not None:
+            statement = statement.where(TimeEntry.user_id == user_id)
+        return statement
+
+    # Manutenção
+
+    def rebuild_with(self, connection, user_id=None):
+        """Recalcula os rollups na conexão (ou sessão) dada, sem commit; retorna as linhas inseridas
+
+        Também usado pela migração que faz a carga inicial dos rollups em bancos existentes.
+        """
+        transaction_delete = delete(TransactionMonthlyRollup)
+        time_delete = delete(TimeEntryDailyRollup)
+        if user_id is not None:
+            transaction_delete = transaction_delete.where(TransactionMonthlyRollup.user_id == user_id)
+            time_delete = time_delete.where(TimeEntryDailyRollup.user_id == user_id)
+
+        connection.execute(transaction_delete)
+        connection.execute(time_delete)
+
+        transaction_rows = connection.execute(
+            insert(TransactionMonthlyRollup).from_select(
+                ['user_id', 'project_id', 'type', 'month', 'total_amount', 'entry_count'],
+                self._transaction_source(user_id)
+            )
+        ).rowcount
+        time_rows = connection.execute(
+            insert(TimeEntryDailyRollup).from_select(
+                ['user_id', 'project_id', 'day', 'total_minutes', 'entry_count'],
+                self._time_entry_source(user_id)
+            )
+        ).rowcount
+        return {'transactions': transaction_rows, 'time_entries': time_rows}
+
+    def rebuild(self, user_id=None):
+        """Recalcula os rollups a partir das tabelas brutas (de um usuário ou de todos)"""
+        session = self._get_session()
+        try:
+            counts = self.rebuild_with(session, user_id)
+            session.commit()
+            self.logger.info(
+                f"Rollups reconstruídos: {counts['transactions']} linhas de transações, {counts['time_entries']} linhas de tempo"
+            )
+            return counts
+
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Erro ao reconstruir rollups: {e}")
+            raise
+        finally:
+            session.close()
+
+    def verify(self, user_id=None):
+        """Compara os rollups com as tabelas brutas e retorna as divergências encontradas"""
+        session = self._get_session()
+        try:
+            mismatches = []
+
+            expected = {
+                (row.user_id, row.project_id, row.type, to_day(row.month)): (Decimal(str(row.total_amount)), row.entry_count)
+                for row in session.execute(self._transaction_source(user_id))
+            }
+            stored_query = session.query(TransactionMonthlyRollup).filter(TransactionMonthlyRollup.entry_count != 0)
+            if user_id is not None:
+                stored_query = stored_query.filter(TransactionMonthlyRollup.user_id == user_id)
+            stored = {
+                (row.user_id, row.project_id, row.type, row.month): (Decimal(str(row.total_amount)), row.entry_count)
+                for row in stored_query
+            }
+            for key in expected.keys() | stored.keys():
+                if expected.get(key) != stored.get(key):
+                    mismatches.append({'table': TransactionMonthlyRollup.__tablename__, 'key': key,
+                                       'expected': expected.get(key), 'stored': stored.get(key)})
+
+            expected = {
+                (row.user_id, row.project_id, to_day(row.day)): (row.total_minutes, row.entry_count)
+                for row in session.execute(self._time_entry_source(user_id))
+            }
+            stored_query = session.query(TimeEntryDailyRollup).filter(TimeEntryDailyRollup.entry_count != 0)
+            if user_id is not None:
+                stored_query = stored_query.filter(TimeEntryDailyRollup.user_id == user_id)
+            stored = {
+                (row.user_id, row.project_id, row.day): (row.total_minutes, row.entry_count)
+                for row in stored_query
+            }
+            for key in expected.keys() | stored.keys():
+                if expected.get(key) != stored.get(key):
+                    mismatches.append({'table': TimeEntryDailyRollup.__tablename__, 'key': key,
+                                       'expected': expected.get(key), 'stored': stored.get(key)})
+
+            if mismatches:
+                self.logger.warning(f"Rollups divergentes: {len(mismatches)} linhas")
+            return mismatches
+
+        finally:
+            session.close()
+
+    # Leitura
+
+    def transaction_totals(self, user_id, start=None, end=None, project_id=None):
+        """Soma receitas e despesas no período (datas inclusivas) usando os rollups mensais"""
+        start = to_day(start)
+        end = to_day(end)
+        totals = {TransactionType.RECEITA: Decimal('0'), TransactionType.DESPESA: Decimal('0')}
+
+        # Meses completos vêm do rollup; as bordas parciais do período vêm da tabela bruta
+        full_start = None if start is None else (start if start.day == 1 else _next_month(start))
+        full_end = None if end is None else (
+            _next_month(end) if (end + timedelta(days=1)).day == 1 else end.replace(day=1)
+        )
+
+        raw_ranges = []
+        has_full_months = full_start is None or full_end is None or full_start < full_end
+        if not has_full_months:
+            raw_ranges.append((start, end + timedelta(days=1)))
+        else:
+            if start is not None and full_start > start:
+                raw_ranges.append((start, full_start))
+            if end is not None and full_end <= end:
+                raw_ranges.append((full_end, end + timedelta(days=1)))
+
+        session = self._get_session()
+        try:
+            if has_full_months:
+                query = session.query(
+                    TransactionMonthlyRollup.type,
+                    func.sum(TransactionMonthlyRollup.total_amount)
+                ).filter(TransactionMonthlyRollup.user_id == user_id)
+
+                if full_start is not None:
+                    query = query.filter(TransactionMonthlyRollup.month >= full_start)
+                if full_end is not None:
+                    query = query.filter(TransactionMonthlyRollup.month < full_end)
+                if project_id is not None:
+                    query = query.filter(TransactionMonthlyRollup.project_id == project_id)
+
+                for type_, amount in query.group_by(TransactionMonthlyRollup.type):
+                    totals[type_] += Decimal(str(amount or 0))
+
+            if raw_ranges:
+                query = session.query(
+                    Transaction.type,
+                    func.sum(Transaction.amount)
+                ).filter(
+                    Transaction.user_id == user_id,
+                    or_(*[
+                        and_(Transaction.date >= _as_datetime(lower), Transaction.date < _as_datetime(upper))
+                        for lower, upper in raw_ranges
+                    ])
+                )
+
+                if project_id is not None:
+                    query = query.filter(Transaction.project_id == project_id)
+
+                for type_, amount in query.group_by(Transaction.type):
+                    totals[type_] += Decimal(str(amount or 0))
+
+            return totals
+
+        finally:
+            session.close()
+
+    def time_totals_statement(self, user_id, start=None, end=None, project_id=None):
+        """SELECT dos totais de tempo do período (compartilhado com as consultas assíncronas)"""
+        statement = select(
+            func.coalesce(func.sum(TimeEntryDailyRollup.total_minutes), 0),
+            func.coalesce(func.sum(TimeEntryDailyRollup.entry_count), 0),
+            func.count(func.distinct(TimeEntryDailyRollup.day))
+        ).where(
+            TimeEntryDailyRollup.user_id == user_id,
+            TimeEntryDailyRollup.entry_count > 0
+        )
+
+        if start is not None:
+            statement = statement.where(TimeEntryDailyRollup.day >= to_day(start))
+        if end is not None:
+            statement = statement.where(TimeEntryDailyRollup.day <= to_day(end))
+        if project_id is not None:
+            statement = statement.where(TimeEntryDailyRollup.project_id == project_id)
+
+        return statement
+
+    @staticmethod
+    def time_totals_from_row(row):
+        minutes, entries, days = row
+        return {'minutes': int(minutes or 0), 'entries': int(entries or 0), 'days_worked': int(days or 0)}
+
+    def time_totals(self, user_id, start=None, end=None, project_id=None):
+        """Minutos, número de registros e dias trabalhados no período (datas inclusivas)"""
+        session = self._get_session()
+        try:
+            statement = self.time_totals_statement(user_id, start=start, end=end, project_id=project_id)
+            return self.time_totals_from_row(session.execute(statement).one())
+
+        finally:
+            session.close()
+
+# Instância global do serviço de rollups
+rollup_service = RollupService()
@@ -0,0 +1,234 @@
+import html
+import logging
+import os
+import re
+from collections import namedtuple, defaultdict
+from datetime import datetime
+from decimal import Decimal
+from config import config
+from ..database.bulk import bulk_insert
+from ..database.connection import db_manager
+from ..database.models import Transaction, TransactionType
+from ..database.rollups import RollupDeltas, apply_deltas
+from .file_import import (
+    ImportResult, ImportErrors, DateParser, SAMPLE_SIZE, normalize_text, content_hash, parse_amount, open_text, csv_rows
+)
+
+# Linha lida do extrato; reference identifica a transação no banco emissor (conta e FITID do OFX)
+StatementLine = namedtuple('StatementLine', ['line', 'date', 'amount', 'description', 'reference'])
+
+# Limite da coluna DECIMAL(10, 2)
+MAX_AMOUNT = Decimal('99999999.99')
+
+# Cabeçalhos aceitos no CSV, comparados sem acentos e em minúsculas
+CSV_COLUMNS = {
+    'date': ('data', 'date', 'data lancamento', 'data do lancamento', 'data movimento', 'data da transacao'),
+    'description': ('descricao', 'historico', 'description', 'memo', 'lancamento', 'estabelecimento', 'detalhes', 'titulo'),
+    'amount': ('valor', 'amount', 'valor (r$)', 'valor r$', 'value', 'quantia'),
+    'credit': ('credito', 'entrada', 'credit'),
+    'debit': ('debito', 'saida', 'debit'),
+}
+
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+def _is_header(columns):
+    has_amount = 'amount' in columns or ('credit' in columns and 'debit' in columns)
+    return 'date' in columns and 'description' in columns and has_amount
+
+def read_csv_statement(path, on_error=None):
+    """Lê um extrato CSV linha a linha (codificação, separador e cabeçalho detectados)"""
+    parse_date = DateParser()
+    for line, row, columns in csv_rows(path, CSV_COLUMNS, _is_header):
+        try:
+            description = row[columns['description']].strip()
+            # Linhas de saldo não são lançamentos
+            if normalize_text(description).startswith('saldo'):
+                continue
+
+            if 'amount' in columns:
+                amount = parse_amount(row[columns['amount']])
+            else:
+                credit = row[columns['credit']].strip()
+                debit = row[columns['debit']].strip()
+                amount = (parse_amount(credit) if credit else Decimal('0')) - (abs(parse_amount(debit)) if debit else Decimal('0'))
+
+            yield StatementLine(line, parse_date(row[columns['date']]), amount, description, None)
+        except (ValueError, IndexError) as e:
+            if on_error:
+                on_error(line, str(e) if isinstance(e, ValueError) else "colunas faltando")
+
+def _ofx_elements(stream):
+    """Percorre as tags do OFX (SGML ou XML) lendo o arquivo em blocos: (fechamento, tag, texto)"""
+    buffer = ''
+    while True:
+        chunk = stream.read(SAMPLE_SIZE)
+        buffer += chunk
+        if chunk:
+            # Processa até o último '<': a tag seguinte pode continuar no próximo bloco
+            end = buffer.rfind('<')
+            if end <= 0:
+                continue
+        else:
+            end = len(buffer)
+
+        for match in _OFX_TAG.finditer(buffer, 0, end):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[end:]
+
+        if not chunk:
+            break
+
+def _ofx_transaction(number, account, fields):
+    """Converte os campos de um STMTTRN em StatementLine"""
+    posted = fields.get('DTPOSTED', '')
+    try:
+        date = datetime.strptime(posted[:8], '%Y%m%d')
+    except ValueError:
+        raise ValueError(f"data inválida: {posted!r}")
+
+    amount = parse_amount(fields.get('TRNAMT', '').replace(',', '.'))
+    parts = [fields.get('NAME', ''), fields.get('MEMO', '')]
+    description = ' - '.join(dict.fromkeys(part for part in parts if part))
+    reference = f"{account}:{fields['FITID']}" if fields.get('FITID') else None
+    return StatementLine(number, date, amount, description, reference)
+
+def read_ofx_statement(path, on_error=None):
+    """Lê as transações (STMTTRN) de um extrato OFX em streaming; line é o número da transação no arquivo"""
+    account = ''
+    fields = None
+    number = 0
+
+    with open_text(path) as stream:
+        for closing, tag, value in _ofx_elements(stream):
+            if tag == 'STMTTRN':
+                if not closing:
+                    number += 1
+                    fields = {}
+                    continue
+                if fields is not None:
+                    try:
+                        yield _ofx_transaction(number, account, fields)
+                    except ValueError as e:
+                        if on_error:
+                            on_error(number, str(e))
+                fields = None
+            elif closing:
+                continue
+            elif fields is not None:
+                fields[tag] = html.unescape(value)
+            elif tag == 'ACCTID':
+                account = value
+
+def line_hash(line, occurrence):
+    """Hash do conteúdo da linha: conta e FITID no OFX; no CSV data, valor, descrição e a ocorrência no arquivo"""
+    if line.reference:
+        return content_hash('ofx', line.reference)
+    return content_hash('csv', f"{line.date:%Y-%m-%d}", line.amount, normalize_text(line.description), occurrence)
+
+class StatementImportService:
+    """Importa extratos bancários (CSV ou OFX) para Transaction em blocos, sem passar pelo ORM
+
+    Cada linha recebe um hash do conteúdo gravado em import_hash, com índice único por
+    usuário: importar o mesmo extrato de novo (ou extratos com períodos sobrepostos)
+    não duplica lançamentos.
+    """
+
+    def __init__(self, session_factory=None, chunk_size=None):
+        self.logger = logging.getLogger('devflow.services.statement_import')
+        self._session_factory = session_factory
+        self.chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        # Inserções em massa não passam pelo rastreamento da réplica local: vão direto ao
+        # banco remoto e a réplica recebe as linhas no próximo pull
+        return db_manager.get_remote_session()
+
+    @staticmethod
+    def read_lines(path, on_error=None):
+        """Linhas do extrato conforme a extensão (.ofx/.qfx ou CSV)"""
+        if os.path.splitext(path)[1].lower() in ('.ofx', '.qfx'):
+            return read_ofx_statement(path, on_error)
+        return read_csv_statement(path, on_error)
+
+    def import_file(self, user_id, path, progress=None):
+        """Importa o extrato; progress(lidas, inseridas) é chamado a cada bloco gravado"""
+        read = inserted = 0
+        on_error = ImportErrors()
+
+        notes = f"Importado de {os.path.basename(path)}"
+        occurrences = defaultdict(int)
+        chunk = []
+
+        for line in self.read_lines(path, on_error):
+            if not line.amount or abs(line.amount) > MAX_AMOUNT:
+                on_error(line.line, f"valor fora do intervalo aceito: {line.amount}")
+                continue
+
+            occurrence = 0
+            if not line.reference:
+                # Lançamentos idênticos no mesmo arquivo (ex.: duas compras iguais no dia) são distintos
+                key = (line.date, line.amount, normalize_text(line.description))
+                occurrences[key] += 1
+                occurrence = occurrences[key]
+
+            read += 1
+            chunk.append({
+                'user_id': user_id,
+                'project_id': None,
+                'type': TransactionType.RECEITA if line.amount > 0 else TransactionType.DESPESA,
+                'amount': abs(line.amount),
+                'description': (line.description or 'Sem descrição')[:200],
+                'date': line.date,
+                'category': None,
+                'notes': notes,
+                'import_hash': line_hash(line, occurrence)
+            })
+
+            if len(chunk) >= self.chunk_size:
+                inserted += self._insert_chunk(user_id, chunk)
+                chunk = []
+                if progress:
+                    progress(read, inserted)
+
+        if chunk:
+            inserted += self._insert_chunk(user_id, chunk)
+            if progress:
+                progress(read, inserted)
+
+        result = ImportResult(read, inserted, read - inserted, on_error.count, on_error.messages)
+        self.logger.info(
+            f"Extrato {os.path.basename(path)} importado: {inserted} inseridas, "
+            f"{result.duplicates} já existentes, {result.invalid} inválidas"
+        )
+        return result
+
+    def _insert_chunk(self, user_id, rows):
+        """Grava um bloco em uma transação; retorna quantas linhas eram novas"""
+        session = self._get_session()
+        try:
+            connection = session.connection()
+            inserted = bulk_insert(
+                connection, Transaction.__table__, rows,
+                conflict_columns=('user_id', 'import_hash'),
+                returning=('project_id', 'type', 'date', 'amount')
+            )
+
+            # Inserções em massa não disparam o after_flush: os rollups são ajustados aqui, na mesma transação
+            deltas = RollupDeltas()
+            for project_id, type_, value, amount in inserted:
+                deltas.add_transaction(user_id, project_id, type_, value, amount, 1)
+            apply_deltas(connection, deltas)
+
+            session.commit()
+            return len(inserted)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+# Instância global do serviço de importação de extratos
+statement_import_service = StatementImportService()
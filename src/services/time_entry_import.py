@@ -0,0 +1,303 @@
+import logging
+import os
+from collections import namedtuple, defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import select
+from config import config
+from ..database.bulk import bulk_insert
+from ..database.connection import db_manager
+from ..database.models import Client, Project, ProjectStatus, TimeEntry
+from ..database.rollups import RollupDeltas, apply_deltas
+from .file_import import (
+    ImportResult, ImportErrors, DateParser, TimeParser, normalize_text, content_hash, parse_amount, csv_rows
+)
+
+# Entrada lida do arquivo, com o projeto ainda pelo nome
+TimeLine = namedtuple('TimeLine', ['line', 'project', 'client', 'description', 'start', 'end', 'rate'])
+
+# Nomes usados quando a entrada não tem projeto ou cliente no arquivo
+NO_PROJECT_NAME = "Sem projeto"
+NO_CLIENT_NAME = "Sem cliente"
+
+# Limite da coluna DECIMAL(8, 2)
+MAX_RATE = Decimal('999999.99')
+
+# Cabeçalhos aceitos: exportações detalhadas do Toggl Track e do Clockify e equivalentes em português
+CSV_COLUMNS = {
+    'project': ('project', 'projeto'),
+    'client': ('client', 'cliente'),
+    'description': ('description', 'descricao'),
+    'task': ('task', 'tarefa'),
+    'start_date': ('start date', 'data de inicio', 'data inicial', 'data'),
+    'start_time': ('start time', 'hora de inicio', 'hora inicial', 'inicio'),
+    'end_date': ('end date', 'data de fim', 'data final'),
+    'end_time': ('end time', 'hora de fim', 'hora final', 'fim'),
+    'duration': ('duration', 'duracao'),
+    'duration_decimal': ('duration (decimal)', 'duracao (decimal)', 'horas'),
+    'rate': ('billable rate', 'hourly rate', 'rate', 'valor hora', 'valor/hora'),
+}
+
+def _is_header(columns):
+    has_end = 'end_time' in columns or 'duration' in columns or 'duration_decimal' in columns
+    return 'start_date' in columns and has_end
+
+def parse_duration(text):
+    """Duração em segundos a partir de H:MM:SS, H:MM ou horas decimais (1.5 / 1,5)"""
+    value = (text or '').strip()
+    try:
+        if ':' in value:
+            parts = [int(part) for part in value.split(':')]
+            hours, minutes, seconds = (parts + [0])[:3] if len(parts) == 2 else parts
+            return hours * 3600 + minutes * 60 + seconds
+        return int(Decimal(value.replace(',', '.')) * 3600)
+    except (ValueError, InvalidOperation):
+        raise ValueError(f"duração inválida: {text!r}")
+
+def read_time_entries(path, on_error=None, date_format=None):
+    """Lê as entradas de um CSV exportado do Toggl/Clockify em streaming
+
+    date_format força o formato das datas (ex.: '%m/%d/%Y' em exportações americanas);
+    sem ele, o primeiro formato conhecido que funcionar é usado.
+    """
+    parse_date = DateParser((date_format,)) if date_format else DateParser()
+    parse_time = TimeParser()
+    fields = tuple(CSV_COLUMNS)
+    indexes = None
+
+    for line, row, columns in csv_rows(path, CSV_COLUMNS, _is_header):
+        if indexes is None:
+            indexes = [columns.get(field) for field in fields]
+        width = len(row)
+        cells = dict(zip(fields, (
+            row[index].strip() if index is not None and index < width else '' for index in indexes
+        )))
+
+        try:
+            start = parse_date(cells['start_date'])
+            if cells['start_time']:
+                start = datetime.combine(start.date(), parse_time(cells['start_time']))
+
+            if cells['end_time']:
+                end_day = parse_date(cells['end_date']) if cells['end_date'] else start
+                end = datetime.combine(end_day.date(), parse_time(cells['end_time']))
+                if end <= start:
+                    # Terminou no dia seguinte
+                    end += timedelta(days=1)
+            else:
+                end = start + timedelta(seconds=parse_duration(cells['duration'] or cells['duration_decimal']))
+
+            yield TimeLine(
+                line,
+                cells['project'],
+                cells['client'],
+                cells['description'] or cells['task'],
+                start,
+                end,
+                parse_amount(cells['rate']) if cells['rate'] else None
+            )
+        except ValueError as e:
+            if on_error:
+                on_error(line, str(e))
+
+class ProjectLookup:
+    """Nome do projeto (e do cliente) no arquivo -> Project.id, com os projetos do usuário em cache
+
+    Os projetos são lidos em uma única consulta; os que não existem são criados
+    (com o cliente, se necessário) quando create_missing está ativo.
+    """
+
+    def __init__(self, session_factory, user_id, create_missing=True):
+        self._session_factory = session_factory
+        self.user_id = user_id
+        self.create_missing = create_missing
+        self.by_client = {}
+        self.by_name = {}
+        self.clients = {}
+        # Pares (projeto, cliente) exatamente como vêm no arquivo, já resolvidos
+        self.resolved = {}
+        self.created = 0
+        self._loaded = False
+
+    def _load(self):
+        session = self._session_factory()
+        try:
+            rows = session.execute(
+                select(Project.id, Project.name, Client.id, Client.name)
+                .join(Client, Project.client_id == Client.id)
+                .where(Project.user_id == self.user_id)
+                .order_by(Project.id)
+            ).all()
+            clients = session.execute(
+                select(Client.id, Client.name).where(Client.user_id == self.user_id).order_by(Client.id)
+            ).all()
+        finally:
+            session.close()
+
+        for project_id, project_name, client_id, client_name in rows:
+            self.by_client.setdefault((normalize_text(client_name), normalize_text(project_name)), project_id)
+            self.by_name.setdefault(normalize_text(project_name), project_id)
+        for client_id, client_name in clients:
+            self.clients.setdefault(normalize_text(client_name), client_id)
+        self._loaded = True
+
+    def __call__(self, project_name, client_name=''):
+        project_id = self.resolved.get((project_name, client_name))
+        if project_id is None:
+            project_id = self.resolved[(project_name, client_name)] = self._resolve(project_name, client_name)
+        return project_id
+
+    def _resolve(self, project_name, client_name):
+        if not self._loaded:
+            self._load()
+
+        project_name = project_name or NO_PROJECT_NAME
+        project_key, client_key = normalize_text(project_name), normalize_text(client_name)
+
+        project_id = self.by_client.get((client_key, project_key)) if client_key else None
+        if project_id is None:
+            project_id = self.by_name.get(project_key)
+        if project_id is None:
+            if not self.create_missing:
+                raise ValueError(f"projeto não encontrado: {project_name!r}")
+            project_id = self._create(project_name, client_name or NO_CLIENT_NAME)
+        return project_id
+
+    def _create(self, project_name, client_name):
+        """Cria o projeto (e o cliente, se ainda não existir) e guarda no cache"""
+        client_key = normalize_text(client_name)
+        session = self._session_factory()
+        try:
+            client_id = self.clients.get(client_key)
+            if client_id is None:
+                client = Client(user_id=self.user_id, name=client_name[:100])
+                session.add(client)
+                session.flush()
+                client_id = client.id
+
+            project = Project(user_id=self.user_id, client_id=client_id, name=project_name[:100], status=ProjectStatus.ATIVO)
+            session.add(project)
+            session.flush()
+            # Lido antes do commit, que expira o objeto
+            project_id = project.id
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        self.clients[client_key] = client_id
+        self.by_client[(client_key, normalize_text(project_name))] = project_id
+        self.by_name.setdefault(normalize_text(project_name), project_id)
+        self.created += 1
+        return project_id
+
+class TimeEntryImportService:
+    """Importa entradas de tempo exportadas do Toggl/Clockify em blocos, sem passar pelo ORM
+
+    Como nos extratos, cada linha recebe um hash do conteúdo em import_hash (índice
+    único por usuário): importar o mesmo arquivo de novo não duplica horas.
+    """
+
+    def __init__(self, session_factory=None, chunk_size=None):
+        self.logger = logging.getLogger('devflow.services.time_entry_import')
+        self._session_factory = session_factory
+        self.chunk_size = chunk_size or config.IMPORT_CHUNK_SIZE
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        # Inserções em massa vão direto ao banco remoto; a réplica local recebe as linhas no próximo pull
+        return db_manager.get_remote_session()
+
+    def import_file(self, user_id, path, date_format=None, create_projects=True, progress=None):
+        """Importa o arquivo; progress(lidas, inseridas) é chamado a cada bloco gravado"""
+        read = inserted = 0
+        on_error = ImportErrors()
+        projects = ProjectLookup(self._get_session, user_id, create_missing=create_projects)
+        occurrences = defaultdict(int)
+        chunk = []
+
+        for line in read_time_entries(path, on_error, date_format):
+            minutes = int((line.end - line.start).total_seconds() // 60)
+            if minutes <= 0:
+                on_error(line.line, "duração menor que um minuto")
+                continue
+            if line.rate is not None and not 0 <= line.rate <= MAX_RATE:
+                on_error(line.line, f"valor por hora fora do intervalo aceito: {line.rate}")
+                continue
+
+            try:
+                project_id = projects(line.project, line.client)
+            except ValueError as e:
+                on_error(line.line, str(e))
+                continue
+
+            # Entradas idênticas no mesmo arquivo são distintas
+            description_key = normalize_text(line.description)
+            key = (project_id, line.start, line.end, description_key)
+            occurrences[key] += 1
+
+            read += 1
+            chunk.append({
+                'user_id': user_id,
+                'project_id': project_id,
+                'description': (line.description or 'Sem descrição')[:200],
+                'start_time': line.start,
+                'end_time': line.end,
+                'duration_minutes': minutes,
+                'hourly_rate': line.rate,
+                'date': line.start,
+                'import_hash': content_hash(
+                    'time', project_id, f"{line.start:%Y-%m-%dT%H:%M:%S}", f"{line.end:%Y-%m-%dT%H:%M:%S}",
+                    description_key, occurrences[key]
+                )
+            })
+
+            if len(chunk) >= self.chunk_size:
+                inserted += self._insert_chunk(user_id, chunk)
+                chunk = []
+                if progress:
+                    progress(read, inserted)
+
+        if chunk:
+            inserted += self._insert_chunk(user_id, chunk)
+            if progress:
+                progress(read, inserted)
+
+        result = ImportResult(read, inserted, read - inserted, on_error.count, on_error.messages, projects.created)
+        self.logger.info(
+            f"Entradas de {os.path.basename(path)} importadas: {inserted} inseridas, "
+            f"{result.duplicates} já existentes, {result.invalid} inválidas, {projects.created} projetos criados"
+        )
+        return result
+
+    def _insert_chunk(self, user_id, rows):
+        """Grava um bloco em uma transação; retorna quantas linhas eram novas"""
+        session = self._get_session()
+        try:
+            connection = session.connection()
+            inserted = bulk_insert(
+                connection, TimeEntry.__table__, rows,
+                conflict_columns=('user_id', 'import_hash'),
+                returning=('project_id', 'date', 'duration_minutes')
+            )
+
+            # Inserções em massa não disparam o after_flush: os rollups são ajustados aqui, na mesma transação
+            deltas = RollupDeltas()
+            for project_id, value, minutes in inserted:
+                deltas.add_time_entry(user_id, project_id, value, minutes, 1)
+            apply_deltas(connection, deltas)
+
+            session.commit()
+            return len(inserted)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+# Instância global do serviço de importação de entradas de tempo
+time_entry_import_service = TimeEntryImportService()
@@ -0,0 +1,86 @@
+import logging
+from datetime import date, timedelta
+from sqlalchemy import select, func, case, and_
+from ..database.connection import db_manager
+from ..database.models import TimeEntryDailyRollup
+from ..database.rollups import to_day
+from .listings import month_range
+
+class TimeStats:
+    """Minutos de hoje, da semana, do mês e no total, ajustados em memória pelo delta de cada gravação"""
+
+    def __init__(self, today, today_minutes=0, week_minutes=0, month_minutes=0, total_minutes=0):
+        self.today = today
+        self.week_start = today - timedelta(days=today.weekday())
+        self.week_end = self.week_start + timedelta(days=6)
+        self.month_start, self.month_end = month_range(today.year, today.month)
+
+        self.today_minutes = today_minutes
+        self.week_minutes = week_minutes
+        self.month_minutes = month_minutes
+        self.total_minutes = total_minutes
+
+    def is_current(self, today=None):
+        """Indica se os períodos ainda valem (depois da meia-noite os totais precisam ser relidos)"""
+        return self.today == (today or date.today())
+
+    def add(self, day, minutes):
+        """Soma os minutos de um registro aos períodos que contêm o dia (negativos para remover)"""
+        day, minutes = to_day(day), minutes or 0
+
+        self.total_minutes += minutes
+        if self.month_start <= day <= self.month_end:
+            self.month_minutes += minutes
+        if self.week_start <= day <= self.week_end:
+            self.week_minutes += minutes
+        if day == self.today:
+            self.today_minutes += minutes
+
+class TimeStatsService:
+    """Totais de tempo da tela de timesheet em uma única consulta agregada ao rollup diário"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.time_stats')
+        self._session_factory = session_factory
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    def build_statement(self, user_id, stats):
+        """SELECT com agregação condicional dos quatro períodos (os limites vêm de um TimeStats vazio)"""
+        day = TimeEntryDailyRollup.day
+        minutes = TimeEntryDailyRollup.total_minutes
+
+        def total_between(start, end):
+            return func.coalesce(func.sum(case((and_(day >= start, day <= end), minutes), else_=0)), 0)
+
+        return select(
+            total_between(stats.today, stats.today).label("today_minutes"),
+            total_between(stats.week_start, stats.week_end).label("week_minutes"),
+            total_between(stats.month_start, stats.month_end).label("month_minutes"),
+            func.coalesce(func.sum(minutes), 0).label("total_minutes")
+        ).where(
+            TimeEntryDailyRollup.user_id == user_id
+        )
+
+    def load(self, user_id, today=None):
+        """Carrega os totais de hoje, da semana, do mês e geral do usuário"""
+        stats = TimeStats(today or date.today())
+
+        session = self._get_session()
+        try:
+            row = session.execute(self.build_statement(user_id, stats)).one()
+        finally:
+            session.close()
+
+        stats.today_minutes = int(row.today_minutes or 0)
+        stats.week_minutes = int(row.week_minutes or 0)
+        stats.month_minutes = int(row.month_minutes or 0)
+        stats.total_minutes = int(row.total_minutes or 0)
+        return stats
+
+# Instância global do serviço de estatísticas de tempo
+time_stats_service = TimeStatsService()
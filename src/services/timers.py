@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from config import config
+from ..database.models import TimeEntry
+from .write_behind import write_queue
+
+# Timer em andamento (o tempo decorrido é sempre calculado a partir de started_at)
+RunningTimer = namedtuple('RunningTimer', ['id', 'user_id', 'project_id', 'description', 'started_at'])
+
+# Timer parado: a entrada de tempo já está na fila local de gravações
+StoppedTimer = namedtuple('StoppedTimer', ['timer', 'ended_at', 'duration_minutes'])
+
+def format_elapsed(seconds):
+    """Formata segundos como 01:02:03"""
+    seconds = max(int(seconds), 0)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def next_tick_delay(now=None):
+    """Milissegundos até a virada do próximo segundo (todos os displays mudam juntos em um único tick)"""
+    now = now or datetime.now()
+    return 1000 - now.microsecond // 1000
+
+class TimerService:
+    """Timers em andamento gravados em um arquivo local: sobrevivem ao fechamento do aplicativo
+
+    Vários projetos podem ter timers ao mesmo tempo (um por projeto). O arquivo é lido
+    na primeira consulta e regravado só ao iniciar ou parar um timer; nada é feito
+    enquanto os timers correm. Ao parar, a entrada vai para a fila local de gravações
+    antes de o timer sair do arquivo, então o tempo nunca se perde entre os dois.
+    """
+
+    def __init__(self, path=None, queue=None):
+        self.logger = logging.getLogger('devflow.services.timers')
+        self.path = path or config.TIMERS_FILE
+        self.queue = queue or write_queue
+        self._timers = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Timers do arquivo (chamado com o lock adquirido)"""
+        if self._timers is not None:
+            return self._timers
+
+        self._timers = {}
+        try:
+            with open(self.path, encoding='utf-8') as timers_file:
+                stored = json.load(timers_file)
+        except FileNotFoundError:
+            return self._timers
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Arquivo de timers ilegível, ignorado: {e}")
+            return self._timers
+
+        for item in stored:
+            try:
+                timer = RunningTimer(
+                    item['id'], item['user_id'], item['project_id'], item['description'],
+                    datetime.fromisoformat(item['started_at'])
+                )
+            except (KeyError, TypeError, ValueError):
+                self.logger.warning(f"Timer inválido no arquivo, ignorado: {item!r}")
+                continue
+            self._timers[timer.id] = timer
+        return self._timers
+
+    def _save(self):
+        # Grava em um arquivo temporário e troca, para nunca deixar um JSON pela metade
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as timers_file:
+            json.dump([
+                dict(timer._asdict(), started_at=timer.started_at.isoformat())
+                for timer in self._timers.values()
+            ], timers_file, indent=2)
+        os.replace(temporary, self.path)
+
+    def running(self, user_id):
+        """Timers em andamento do usuário, do mais antigo para o mais recente"""
+        with self._lock:
+            timers = [timer for timer in self._load().values() if timer.user_id == user_id]
+        return sorted(timers, key=lambda timer: timer.started_at)
+
+    def start(self, user_id, project_id, description, started_at=None):
+        """Inicia um timer para o projeto (ValueError se o projeto já tem um em andamento)"""
+        with self._lock:
+            timers = self._load()
+            if any(timer.user_id == user_id and timer.project_id == project_id for timer in timers.values()):
+                raise ValueError("Já existe um timer em andamento para este projeto.")
+
+            timer = RunningTimer(uuid.uuid4().hex, user_id, project_id, description, started_at or datetime.now())
+            timers[timer.id] = timer
+            self._save()
+
+        self.logger.info(f"Timer iniciado: projeto {project_id}")
+        return timer
+
+    def stop(self, timer_id, ended_at=None, on_applied=None):
+        """Para o timer e enfileira a entrada de tempo; on_applied(entry_id) roda quando ela chega ao banco"""
+        with self._lock:
+            timers = self._load()
+            timer = timers.get(timer_id)
+            if timer is None:
+                raise ValueError("Timer não encontrado (já foi parado?).")
+
+            ended_at = ended_at or datetime.now()
+            duration_minutes = int((ended_at - timer.started_at).total_seconds() // 60)
+
+            # Fila local: o tempo fica gravado no disco mesmo se o banco estiver lento ou fora do ar
+            self.queue.insert(TimeEntry, {
+                'user_id': timer.user_id,
+                'project_id': timer.project_id,
+                'description': timer.description,
+                'date': timer.started_at,
+                'start_time': timer.started_at,
+                'end_time': ended_at,
+                'duration_minutes': duration_minutes
+            }, on_applied=on_applied)
+
+            del timers[timer_id]
+            self._save()
+
+        self.logger.info(f"Timer parado: projeto {timer.project_id}, {duration_minutes} min")
+        return StoppedTimer(timer, ended_at, duration_minutes)
+
+    def discard(self, timer_id):
+        """Descarta o timer sem gravar a entrada de tempo"""
+        with self._lock:
+            if self._load().pop(timer_id, None) is not None:
+                self._save()
+
+# Instância global do serviço de timers
+timer_service = TimerService()
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from collections import namedtuple
+from datetime import timedelta
+from sqlalchemy import select
+from ..database.async_connection import async_db_manager
+from ..database.models import Client, Project, ProjectStatus
+from .dashboard_stats import DashboardStatsService, MonthlyCashflowRow, WeeklyHoursRow
+from .listings import ListingService
+from .rollups import RollupService
+
+# Dados de cada página da versão web, carregados com as consultas em paralelo
+DashboardPage = namedtuple('DashboardPage', ['stats', 'monthly_cashflow', 'weekly_hours', 'active_projects'])
+FinancesPage = namedtuple('FinancesPage', ['stats', 'transactions'])
+TimesheetPage = namedtuple('TimesheetPage', ['totals', 'entries'])
+
+class AsyncPageService:
+    """Consultas das páginas web em AsyncSessions independentes, executadas com asyncio.gather"""
+
+    def __init__(self, session_factory=None):
+        self.logger = logging.getLogger('devflow.services.web_pages')
+        self._session_factory = session_factory
+
+        # Os SELECTs são os mesmos dos serviços síncronos; só a execução muda
+        self.dashboard_stats = DashboardStatsService()
+        self.listings = ListingService()
+        self.rollups = RollupService()
+
+    def _get_session(self):
+        """Retorna uma AsyncSession do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return async_db_manager.get_session()
+
+    async def _all(self, statement):
+        # Uma sessão (e conexão) por consulta: uma AsyncSession não executa consultas em paralelo
+        async with self._get_session() as session:
+            return (await session.execute(statement)).all()
+
+    async def _scalars(self, statement):
+        async with self._get_session() as session:
+            return (await session.execute(statement)).scalars().all()
+
+    async def stats(self, user_id, now=None):
+        """Métricas do dashboard e das finanças"""
+        statement = self.dashboard_stats.build_statement(user_id, self.dashboard_stats.month_start(now))
+        return self.dashboard_stats.stats_from_row((await self._all(statement))[0])
+
+    async def monthly_cashflow(self, user_id, now=None):
+        rows = await self._all(self.dashboard_stats.monthly_cashflow_statement(user_id, now=now))
+        return [MonthlyCashflowRow(*row) for row in rows]
+
+    async def weekly_hours(self, user_id, now=None):
+        rows = await self._all(self.dashboard_stats.weekly_hours_statement(user_id, now=now))
+        return [WeeklyHoursRow(*row) for row in rows]
+
+    async def projects(self, user_id, status=None):
+        """Projetos com o nome do cliente como dicionários (mais recentes primeiro)"""
+        statement = select(
+            Project.id,
+            Project.name,
+            Client.name.label('client_name'),
+            Project.status,
+            Project.description,
+            Project.budget,
+            Project.start_date,
+            Project.end_date
+        ).join(Client, Project.client_id == Client.id).where(Project.user_id == user_id)
+
+        if status is not None:
+            statement = statement.where(Project.status == status)
+
+        rows = await self._all(statement.order_by(Project.created_at.desc()))
+        return [dict(row._mapping) for row in rows]
+
+    async def transactions_page(self, user_id, cursor=None, limit=20):
+        items = await self._scalars(self.listings.transactions_statement(user_id, cursor, limit))
+        return self.listings.make_page(items, limit)
+
+    async def time_entries_page(self, user_id, cursor=None, limit=15):
+        items = await self._scalars(self.listings.time_entries_statement(user_id, cursor, limit))
+        return self.listings.make_page(items, limit)
+
+    async def time_totals(self, user_id, start, end=None):
+        rows = await self._all(self.rollups.time_totals_statement(user_id, start=start, end=end))
+        return self.rollups.time_totals_from_row(rows[0])
+
+    async def hours_summary(self, user_id, today):
+        """Horas de hoje, da semana e do mês em três consultas concorrentes"""
+        week_start = today - timedelta(days=today.weekday())
+        day_totals, week_totals, month_totals = await asyncio.gather(
+            self.time_totals(user_id, today, today),
+            self.time_totals(user_id, week_start),
+            self.time_totals(user_id, today.replace(day=1))
+        )
+        return {
+            'today': day_totals['minutes'] / 60,
+            'week': week_totals['minutes'] / 60,
+            'month': month_totals['minutes'] / 60
+        }
+
+    async def dashboard(self, user_id, now=None):
+        """Métricas, gráficos e projetos ativos do dashboard (quatro consultas concorrentes)"""
+        return DashboardPage(*await asyncio.gather(
+            self.stats(user_id, now),
+            self.monthly_cashflow(user_id, now),
+            self.weekly_hours(user_id, now),
+            self.projects(user_id, status=ProjectStatus.ATIVO)
+        ))
+
+    async def finances(self, user_id, limit=20):
+        """Métricas financeiras e primeira página de transações"""
+        return FinancesPage(*await asyncio.gather(
+            self.stats(user_id),
+            self.transactions_page(user_id, limit=limit)
+        ))
+
+    async def timesheet(self, user_id, today, limit=15):
+        """Totais de horas e primeira página de registros de tempo"""
+        return TimesheetPage(*await asyncio.gather(
+            self.hours_summary(user_id, today),
+            self.time_entries_page(user_id, limit=limit)
+        ))
+
+# Instância global das consultas assíncronas das páginas web
+async_page_service = AsyncPageService()
@@ -0,0 +1,349 @@
+import logging
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, text
+from sqlalchemy.exc import DBAPIError, OperationalError, InterfaceError
+from config import config
+from ..database.connection import Base, db_manager
+from ..database.models import AppliedWrite, Task
+from ..database.outbox import WriteOutbox
+from .kanban import kanban_service
+
+# Estado exibido na barra de status
+WriteQueueStatus = namedtuple('WriteQueueStatus', ['pending', 'failed', 'last_error', 'last_flush_at'])
+
+# Espera máxima do flusher enquanto o banco está indisponível
+MAX_BACKOFF_SECONDS = 60
+
+# Dias mantidos na tabela de chaves de idempotência
+APPLIED_KEYS_DAYS = 30
+
+def _models_by_table():
+    return {mapper.class_.__tablename__: mapper.class_ for mapper in Base.registry.mappers}
+
+def _apply_insert(session, model, row_id, values):
+    obj = model(**values)
+    session.add(obj)
+    return obj
+
+def _apply_update(session, model, row_id, values):
+    obj = session.get(model, row_id)
+    if obj is None:
+        return False
+    for key, value in values.items():
+        setattr(obj, key, value)
+
+def _apply_delete(session, model, row_id, values):
+    obj = session.get(model, row_id)
+    if obj is None:
+        return False
+    session.delete(obj)
+
+def _apply_append_task(session, model, row_id, values):
+    # A posição no fim da coluna só é conhecida no banco, na hora de aplicar
+    position = kanban_service.append_position(session, values['column_id'])
+    task = Task(position=position, **values)
+    session.add(task)
+    return task
+
+def _apply_move_task(session, model, row_id, values):
+    # A posição é calculada na hora de aplicar, entre os vizinhos de destino (como no append_task)
+    if session.execute(select(Task.id).where(Task.id == row_id)).first() is None:
+        return False
+    column_id = values['column_id']
+    result = kanban_service.move_task_with(session, row_id, column_id, values.get('above_id'), values.get('below_id'))
+    # A fila já roda em segundo plano: renumera a coluna na mesma transação quando o espaço acaba
+    if result.needs_rebalance:
+        kanban_service.rebalance_with(session, column_id)
+    # Os UPDATEs em Core não atualizam objetos já carregados por gravações anteriores do lote
+    session.expire_all()
+
+# Operações aceitas pela fila; as inserções retornam o objeto criado (o id vai para o on_applied)
+# e as demais retornam False quando o registro não existe mais
+APPLIERS = {
+    'insert': _apply_insert,
+    'update': _apply_update,
+    'delete': _apply_delete,
+    'append_task': _apply_append_task,
+    'move_task': _apply_move_task
+}
+
+class WriteBehindQueue:
+    """Gravações da interface: aceitas na hora em uma fila local e aplicadas em lotes por uma thread
+
+    Cada gravação tem uma chave de idempotência registrada em applied_writes na mesma
+    transação do lote, então reenviar um lote já aplicado (queda entre o commit e a
+    limpeza da fila) não duplica nada.
+    """
+
+    def __init__(self, session_factory=None, outbox=None, batch_size=None):
+        self.logger = logging.getLogger('devflow.services.write_behind')
+        self._session_factory = session_factory
+        self.outbox = outbox or WriteOutbox()
+        self.batch_size = batch_size or config.OUTBOX_BATCH_SIZE
+        self._callbacks = {}
+        self._callbacks_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._backoff = 0
+        self._listeners = []
+        self.last_error = None
+        self.last_flush_at = None
+
+    def _get_session(self):
+        """Retorna uma sessão do gerenciador configurado"""
+        if self._session_factory:
+            return self._session_factory()
+        return db_manager.get_session()
+
+    # API da interface (retorna imediatamente; on_applied(row_id) roda na thread do flusher)
+
+    def insert(self, model, values, on_applied=None):
+        """Enfileira a criação de um registro; on_applied recebe o id gerado pelo banco"""
+        return self._submit('insert', model, None, values, on_applied)
+
+    def update(self, model, row_id, values, on_applied=None):
+        """Enfileira a alteração das colunas informadas de um registro"""
+        return self._submit('update', model, row_id, values, on_applied)
+
+    def delete(self, model, row_id, on_applied=None):
+        """Enfileira a exclusão de um registro"""
+        return self._submit('delete', model, row_id, None, on_applied)
+
+    def append_task(self, values, on_applied=None):
+        """Enfileira uma tarefa nova no fim da coluna (values sem position)"""
+        return self._submit('append_task', Task, None, values, on_applied)
+
+    def move_task(self, task_id, column_id, above_id=None, below_id=None, on_applied=None):
+        """Enfileira o arraste de uma tarefa para a coluna, entre os vizinhos informados"""
+        values = {'column_id': column_id, 'above_id': above_id, 'below_id': below_id}
+        return self._submit('move_task', Task, task_id, values, on_applied)
+
+    def _submit(self, operation, model, row_id, values, on_applied):
+        key = self.outbox.append(operation, model.__tablename__, row_id, values)
+        if on_applied:
+            with self._callbacks_lock:
+                self._callbacks[key] = on_applied
+        self._wake.set()
+        self._status_changed()
+        return key
+
+    def retry_failed(self):
+        """Devolve à fila as gravações marcadas como falha; retorna quantas"""
+        count = self.outbox.retry_failed()
+        if count:
+            self._wake.set()
+            self._status_changed()
+        return count
+
+    # Mudanças de estado (barra de status da interface)
+
+    def add_listener(self, callback):
+        """Registra callback() chamado quando o estado da fila muda (na thread de quem mudou)"""
+        self._listeners.append(callback)
+
+    def _status_changed(self):
+        for callback in list(self._listeners):
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"Erro no aviso de mudança da fila de gravações: {e}")
+
+    # Aplicação no banco
+
+    def flush(self):
+        """Aplica as gravações pendentes em lotes; retorna quantas foram aplicadas"""
+        tables = {name: model.__table__ for name, model in _models_by_table().items()}
+        applied = 0
+        with self._flush_lock:
+            while True:
+                writes = self.outbox.due(tables, self.batch_size)
+                if not writes:
+                    break
+
+                try:
+                    row_ids = self._apply(writes)
+                except Exception as e:
+                    if self._connection_lost(e):
+                        raise
+                    # Um erro de dados derruba o lote: aplica uma a uma para isolar a gravação com problema
+                    self.logger.warning(f"Lote da fila rejeitado, aplicando individualmente: {e}")
+                    applied += self._apply_individually(writes)
+                    continue
+
+                self.outbox.complete([write.id for write in writes])
+                self._notify(writes, row_ids)
+                applied += len(writes)
+
+        if applied:
+            self.last_flush_at = datetime.now()
+            self.logger.info(f"{applied} gravações aplicadas da fila local")
+            self._status_changed()
+        return applied
+
+    def _apply(self, writes):
+        """Aplica as gravações em uma única transação, pulando as chaves já aplicadas
+
+        Retorna o id do registro gravado por chave (None nas chaves já aplicadas antes:
+        o id de uma inserção reenviada não é conhecido).
+        """
+        models = _models_by_table()
+        session = self._get_session()
+        try:
+            done = set(session.execute(
+                select(AppliedWrite.key).where(AppliedWrite.key.in_([write.key for write in writes]))
+            ).scalars())
+            row_ids = {}
+
+            for write in writes:
+                if write.key in done:
+                    continue
+                result = APPLIERS[write.operation](session, models[write.table_name], write.row_id, write.values)
+                if result is False:
+                    self.logger.warning(f"{write.operation} ignorado: {write.table_name} {write.row_id} não existe mais")
+                session.add(AppliedWrite(key=write.key))
+                # Flush por gravação: a ordem de chegada vale também entre tabelas diferentes
+                session.flush()
+                row_ids[write.key] = result.id if isinstance(result, Base) else write.row_id
+
+            session.commit()
+            return row_ids
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _apply_individually(self, writes):
+        applied = 0
+        for write in writes:
+            try:
+                row_ids = self._apply([write])
+            except Exception as e:
+                if self._connection_lost(e):
+                    raise
+                attempts = self.outbox.reject(write, e)
+                self.last_error = str(e)
+                self._status_changed()
+                self.logger.error(
+                    f"Gravação {write.operation} em {write.table_name} falhou "
+                    f"(tentativa {attempts}/{config.OUTBOX_MAX_ATTEMPTS}): {e}"
+                )
+                continue
+
+            self.outbox.complete([write.id])
+            self._notify([write], row_ids)
+            applied += 1
+        return applied
+
+    def _connection_lost(self, error):
+        """Erro da conexão (repetido com o lote inteiro) e não da gravação (isolada e contada em attempts)"""
+        if isinstance(error, DBAPIError) and error.connection_invalidated:
+            return True
+        if not isinstance(error, (OperationalError, InterfaceError)):
+            return False
+
+        # OperationalError também cobre erros de uma gravação só ("no such column", "database is
+        # locked"): com o banco respondendo, ela é isolada e não trava a fila para sempre
+        session = self._get_session()
+        try:
+            session.execute(text("SELECT 1"))
+            return False
+        except DBAPIError:
+            return True
+        finally:
+            session.close()
+
+    def _notify(self, writes, row_ids):
+        with self._callbacks_lock:
+            callbacks = [(self._callbacks.pop(write.key, None), row_ids.get(write.key)) for write in writes]
+        for callback, row_id in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(row_id)
+            except Exception as e:
+                self.logger.error(f"Erro no callback da fila de gravações: {e}")
+
+    def prune_applied_keys(self, days=APPLIED_KEYS_DAYS):
+        """Remove chaves de idempotência antigas (uma gravação não fica tanto tempo na fila)"""
+        session = self._get_session()
+        try:
+            removed = session.execute(delete(AppliedWrite).where(
+                AppliedWrite.applied_at < datetime.now() - timedelta(days=days)
+            )).rowcount
+            session.commit()
+            return removed
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    # Flusher em segundo plano
+
+    def start(self):
+        """Inicia o flusher; gravações deixadas por uma execução anterior são aplicadas primeiro"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._wake.set()
+
+        def _loop():
+            try:
+                self.prune_applied_keys()
+            except Exception as e:
+                self.logger.warning(f"Não foi possível limpar as chaves de idempotência: {e}")
+
+            while not self._stop.is_set():
+                self._wake.wait(self._next_wait())
+                self._wake.clear()
+                previous_error = self.last_error
+                try:
+                    self.flush()
+                    self._backoff = 0
+                    self.last_error = None
+                except Exception as e:
+                    # Banco indisponível: as gravações continuam na fila e o intervalo dobra
+                    self._backoff = min(max(self._backoff * 2, config.OUTBOX_RETRY_SECONDS), MAX_BACKOFF_SECONDS)
+                    self.last_error = str(getattr(e, 'orig', None) or e)
+                    self.logger.warning(f"Fila de gravações aguardando o banco ({self._backoff}s): {self.last_error}")
+                if self.last_error != previous_error:
+                    self._status_changed()
+
+        self._thread = threading.Thread(target=_loop, name='devflow-write-behind', daemon=True)
+        self._thread.start()
+
+    def _next_wait(self):
+        """Segundos até o próximo ciclo: backoff após erro ou a próxima gravação adiada"""
+        if self._backoff:
+            return self._backoff
+        next_attempt = self.outbox.next_attempt_at()
+        if next_attempt is None:
+            return None
+        return max((next_attempt - datetime.now()).total_seconds(), 0)
+
+    def stop(self, timeout=5):
+        """Tenta aplicar o que falta e encerra o flusher; o restante fica na fila para a próxima execução"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+        try:
+            self.flush()
+        except Exception as e:
+            self.logger.warning(f"Gravações mantidas na fila local: {e}")
+
+    def status(self):
+        """Estado atual para a interface"""
+        counts = self.outbox.counts()
+        return WriteQueueStatus(counts['pending'], counts['failed'], self.last_error, self.last_flush_at)
+
+# Instância global da fila de gravações
+write_queue = WriteBehindQueue()
@@ -0,0 +1,61 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+# Linha da saída de "python -X importtime": self [us] | cumulativo [us] | módulo (indentado)
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+class StartupProfiler:
+    """Tempo de cada fase da inicialização, medido a partir de um instante inicial"""
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at or time.perf_counter()
+        self.phases = []  # (nome, segundos)
+        self._last = self.started_at
+
+    def mark(self, name):
+        """Fecha a fase que terminou agora (desde a marca anterior)"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @property
+    def total(self):
+        return self._last - self.started_at
+
+    def report(self):
+        """Linhas da tabela de fases com o percentual do total"""
+        total = self.total or 1
+        lines = [f"  {'Fase':<32} {'ms':>9} {'%':>6}"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<32} {seconds * 1000:>9.1f} {seconds / total * 100:>5.1f}%")
+        lines.append(f"  {'Total':<32} {self.total * 1000:>9.1f}")
+        return lines
+
+def import_times(module, top=15):
+    """Importa o módulo em um processo novo com -X importtime; retorna (total_ms, pacotes, módulos do projeto)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "falha ao importar")
+
+    by_package = Counter()
+    project_modules = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = int(match.group(1)), int(match.group(2)), match.group(4)
+        by_package[name.split('.')[0]] += self_us
+        if name == module or name.startswith('src.'):
+            project_modules.append((name, cumulative_us / 1000))
+
+    total_ms = sum(by_package.values()) / 1000
+    packages = [(name, us / 1000) for name, us in by_package.most_common(top)]
+    project_modules.sort(key=lambda item: item[1], reverse=True)
+    return total_ms, packages, project_modules[:top]
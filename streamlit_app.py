@@ -8,14 +8,20 @@ Versão Web com Streamlit
 import streamlit as st
 import sys
 import os
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from config import config
-from src.database.connection import DatabaseManager
+from src.database.connection import db_manager
+from src.database.query_cache import freeze
 from src.auth.auth_manager import AuthManager
-from src.database.models import User, Client, Project, Transaction, TimeEntry, ProjectStatus, TransactionType
+from src.database.models import User, Client, Project, ProjectStatus, TransactionType
+from src.services.dashboard_stats import DashboardStatsService
+from src.services.listings import ListingService
+from src.services.web_pages import async_page_service
+from src.database.async_connection import async_db_manager
 from src.utils.logger import setup_logger
 from sqlalchemy.orm import joinedload
 import bcrypt
@@ -53,38 +59,173 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_db_manager():
+    """Engine, pool e criação das tabelas uma única vez por processo (compartilhados por todas as sessões)"""
+    logger = setup_logger()
+    logger.info(f"Iniciando {config.APP_NAME} v{config.APP_VERSION} - Streamlit")
+    
+    # Valida configurações
+    config.validate_config()
+    
+    # O engine síncrono e o assíncrono (páginas) dividem o teto DB_MAX_CONNECTIONS; antes de criar o engine
+    db_manager.pool_engines = async_db_manager.pool_engines
+    
+    # Verifica conexão com o banco
+    if not db_manager.test_connection():
+        raise RuntimeError("Falha na conexão com o banco de dados")
+    
+    # Executa migrações se necessário
+    db_manager.run_migrations()
+    
+    # Abre DB_POOL_WARMUP conexões antes da primeira página
+    db_manager.warm_up()
+    return db_manager
+
+@st.cache_resource
+def get_auth_manager():
+    """Gerenciador de autenticação do processo; o usuário de cada sessão fica no session_state"""
+    return AuthManager()
+
+class UserDataVersions:
+    """Versão dos dados de cada usuário; faz parte da chave dos caches e é incrementada a cada escrita"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+    
+    def get(self, user_id):
+        with self._lock:
+            return self._versions.get(user_id, 0)
+    
+    def bump(self, user_id):
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+@st.cache_resource
+def get_data_versions():
+    return UserDataVersions()
+
+def data_version(user_id):
+    return get_data_versions().get(user_id)
+
+def invalidate_user_data(user_id):
+    """Descarta os dados em cache do usuário (chamar após cada escrita)"""
+    get_data_versions().bump(user_id)
+
 def init_app():
     """Inicializa a aplicação"""
-    if 'initialized' not in st.session_state:
-        try:
-            # Configura o logger
-            logger = setup_logger()
-            logger.info(f"Iniciando {config.APP_NAME} v{config.APP_VERSION} - Streamlit")
-            
-            # Valida configurações
-            config.validate_config()
-            
-            # Inicializa o gerenciador de banco de dados
-            db_manager = DatabaseManager()
-            
-            # Verifica conexão com o banco
-            if not db_manager.test_connection():
-                st.error("Falha na conexão com o banco de dados")
-                st.stop()
-            
-            # Executa migrações se necessário
-            db_manager.run_migrations()
-            
-            # Inicializa o gerenciador de autenticação
-            auth_manager = AuthManager()
-            
-            st.session_state.db_manager = db_manager
-            st.session_state.auth_manager = auth_manager
-            st.session_state.initialized = True
-            
-        except Exception as e:
-            st.error(f"Erro fatal: {e}")
-            st.stop()
+    try:
+        get_db_manager()
+    except Exception as e:
+        st.error(f"Erro fatal: {e}")
+        st.stop()
+
+# Cargas das páginas: cache por (usuário, versão dos dados) com TTL; retornam dados simples, sem objetos ORM
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_dashboard_stats(user_id, version):
+    """Métricas do dashboard e das finanças em um único SELECT"""
+    return DashboardStatsService(get_db_manager().get_session).get_stats(user_id)
+
+def monthly_cashflow_frame(rows):
+    """DataFrame tipado do gráfico mensal a partir das linhas já agregadas no banco"""
+    df_monthly = pd.DataFrame.from_records(rows, columns=['Data', 'Tipo', 'Valor'])
+    df_monthly['Tipo'] = df_monthly['Tipo'].map({
+        TransactionType.RECEITA: 'Receita',
+        TransactionType.DESPESA: 'Despesa'
+    })
+    return df_monthly.astype({
+        'Data': 'datetime64[ns]',
+        'Tipo': pd.CategoricalDtype(['Receita', 'Despesa']),
+        'Valor': 'float64'
+    })
+
+def weekly_hours_frame(rows):
+    """DataFrame tipado do gráfico semanal (minutos convertidos em horas)"""
+    df_weekly = pd.DataFrame.from_records(rows, columns=['Data', 'Horas'])
+    df_weekly = df_weekly.astype({'Data': 'datetime64[ns]', 'Horas': 'float64'})
+    df_weekly['Horas'] /= 60
+    return df_weekly
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_dashboard_page(user_id, version):
+    """Métricas, gráficos e projetos ativos do dashboard com as quatro consultas em paralelo"""
+    page = async_db_manager.run(async_page_service.dashboard(user_id))
+    return page._replace(
+        monthly_cashflow=monthly_cashflow_frame(page.monthly_cashflow),
+        weekly_hours=weekly_hours_frame(page.weekly_hours)
+    )
+
+def _project_row(project):
+    return {
+        'id': project.id,
+        'name': project.name,
+        'client_name': project.client.name,
+        'status': project.status,
+        'description': project.description,
+        'budget': project.budget,
+        'start_date': project.start_date,
+        'end_date': project.end_date
+    }
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_projects(user_id, version, status=None):
+    """Projetos do usuário com o nome do cliente (mais recentes primeiro)"""
+    session = get_db_manager().get_session()
+    try:
+        query = session.query(Project).options(
+            joinedload(Project.client)
+        ).filter(Project.user_id == user_id)
+        
+        if status is not None:
+            query = query.filter(Project.status == status)
+        
+        return [_project_row(project) for project in query.order_by(Project.created_at.desc())]
+    finally:
+        session.close()
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_clients(user_id, version):
+    """Clientes ativos do usuário em ordem alfabética"""
+    session = get_db_manager().get_session()
+    try:
+        clients = session.query(Client).filter(
+            Client.user_id == user_id,
+            Client.is_active == True
+        ).order_by(Client.name)
+        
+        return [
+            {
+                'id': client.id,
+                'name': client.name,
+                'email': client.email,
+                'phone': client.phone,
+                'company': client.company,
+                'address': client.address,
+                'notes': client.notes
+            }
+            for client in clients
+        ]
+    finally:
+        session.close()
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_time_totals(user_id, version, today):
+    """Horas de hoje, da semana e do mês pelo rollup diário, em consultas paralelas (o dia faz parte da chave)"""
+    return async_db_manager.run(async_page_service.hours_summary(user_id, today))
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_finances_page(user_id, version):
+    """Métricas financeiras e a primeira página de transações em consultas paralelas"""
+    stats, first_page = async_db_manager.run(async_page_service.finances(user_id, limit=20))
+    return stats, first_page._replace(items=freeze(first_page.items))
+
+@st.cache_data(ttl=config.WEB_CACHE_TTL, max_entries=config.WEB_CACHE_ENTRIES, show_spinner=False)
+def load_timesheet_page(user_id, version, today):
+    """Totais de horas e a primeira página de registros em consultas paralelas (o dia faz parte da chave)"""
+    totals, first_page = async_db_manager.run(async_page_service.timesheet(user_id, today, limit=15))
+    return totals, first_page._replace(items=freeze(first_page.items))
 
 def login_page():
     """Página de login"""
@@ -106,10 +247,11 @@ def login_page():
                 
                 if submit:
                     if email and password:
-                        token = st.session_state.auth_manager.login(email, password)
+                        auth_manager = get_auth_manager()
+                        token = auth_manager.login(email, password)
                         if token:
-                            # Carrega o usuário atual após login bem-sucedido
-                            user = st.session_state.auth_manager.get_current_user()
+                            # O AuthManager é compartilhado entre as sessões: o usuário vem do próprio token
+                            user = auth_manager.user_from_token(token)
                             if user:
                                 st.session_state.user = user
                                 st.session_state.user_id = user.id
@@ -141,7 +283,7 @@ def login_page():
                             st.error("A senha deve ter pelo menos 6 caracteres")
                         else:
                             try:
-                                session = st.session_state.db_manager.get_session()
+                                session = get_db_manager().get_session()
                                 
                                 # Verifica se o email já existe
                                 existing_user = session.query(User).filter(User.email == email).first()
@@ -171,536 +313,432 @@ def dashboard_page():
     st.markdown('<h1 class="main-header">📊 Dashboard</h1>', unsafe_allow_html=True)
     
     user = st.session_state.user
-    session = st.session_state.db_manager.get_session()
+    version = data_version(user.id)
     
-    try:
-        # Métricas principais
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # Total de clientes
-        total_clients = session.query(Client).filter(
-            Client.user_id == user.id,
-            Client.is_active == True
-        ).count()
-        
-        # Total de projetos ativos
-        active_projects = session.query(Project).filter(
-            Project.user_id == user.id,
-            Project.status == ProjectStatus.ATIVO
-        ).count()
-        
-        # Receitas do mês
-        current_month = datetime.now().replace(day=1)
-        monthly_income = session.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.type == TransactionType.RECEITA,
-            Transaction.date >= current_month
-        ).with_entities(Transaction.amount).all()
-        monthly_income_total = sum([t.amount for t in monthly_income]) if monthly_income else 0
-        
-        # Horas trabalhadas no mês
-        monthly_hours = session.query(TimeEntry).filter(
-            TimeEntry.user_id == user.id,
-            TimeEntry.date >= current_month
-        ).with_entities(TimeEntry.duration_minutes).all()
-        monthly_hours_total = sum([t.duration_minutes/60 for t in monthly_hours]) if monthly_hours else 0
-        
-        with col1:
-            st.metric("Clientes Ativos", total_clients)
-        
-        with col2:
-            st.metric("Projetos Ativos", active_projects)
-        
-        with col3:
-            st.metric("Receita do Mês", f"R$ {monthly_income_total:,.2f}")
-        
-        with col4:
-            st.metric("Horas do Mês", f"{monthly_hours_total:.1f}h")
-        
-        st.divider()
-        
-        # Gráficos
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("📈 Receitas vs Despesas (Últimos 6 meses)")
-            
-            # Dados dos últimos 6 meses
-            six_months_ago = datetime.now() - timedelta(days=180)
-            transactions = session.query(Transaction).filter(
-                Transaction.user_id == user.id,
-                Transaction.date >= six_months_ago
-            ).all()
-            
-            if transactions:
-                df_transactions = pd.DataFrame([
-                    {
-                        'Data': t.date,
-                        'Tipo': 'Receita' if t.type == TransactionType.RECEITA else 'Despesa',
-                        'Valor': t.amount if t.type == TransactionType.RECEITA else -t.amount
-                    }
-                    for t in transactions
-                ])
-                
-                df_monthly = df_transactions.groupby([df_transactions['Data'].dt.to_period('M'), 'Tipo'])['Valor'].sum().reset_index()
-                df_monthly['Data'] = df_monthly['Data'].astype(str)
-                
-                fig = px.bar(df_monthly, x='Data', y='Valor', color='Tipo',
-                           title="Receitas vs Despesas por Mês")
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("Nenhuma transação encontrada")
-        
-        with col2:
-            st.subheader("🕒 Horas Trabalhadas (Últimas 4 semanas)")
-            
-            # Dados das últimas 4 semanas
-            four_weeks_ago = datetime.now() - timedelta(weeks=4)
-            time_entries = session.query(TimeEntry).filter(
-                TimeEntry.user_id == user.id,
-                TimeEntry.date >= four_weeks_ago
-            ).all()
-            
-            if time_entries:
-                df_time = pd.DataFrame([
-                    {
-                        'Data': t.date,
-                        'Horas': t.duration_minutes/60 if t.duration_minutes else 0
-                    }
-                    for t in time_entries
-                ])
-                
-                df_weekly = df_time.groupby(df_time['Data'].dt.to_period('W'))['Horas'].sum().reset_index()
-                df_weekly['Data'] = df_weekly['Data'].astype(str)
-                
-                fig = px.line(df_weekly, x='Data', y='Horas',
-                            title="Horas Trabalhadas por Semana")
-                st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("Nenhum registro de tempo encontrado")
+    # Métricas principais
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # Métricas, gráficos e projetos ativos carregados em paralelo (a página espera só a consulta mais lenta)
+    page = load_dashboard_page(user.id, version)
+    stats = page.stats
+    
+    with col1:
+        st.metric("Clientes Ativos", stats["active_clients"])
+    
+    with col2:
+        st.metric("Projetos Ativos", stats["active_projects"])
+    
+    with col3:
+        st.metric("Receita do Mês", f"R$ {stats['monthly_income']:,.2f}")
+    
+    with col4:
+        st.metric("Horas do Mês", f"{stats['monthly_hours']:.1f}h")
+    
+    st.divider()
+    
+    # Gráficos
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📈 Receitas vs Despesas (Últimos 6 meses)")
         
-        # Projetos ativos
-        st.subheader("🚀 Projetos Ativos")
-        active_projects_list = session.query(Project).options(
-            joinedload(Project.client)
-        ).filter(
-            Project.user_id == user.id,
-            Project.status == ProjectStatus.ATIVO
-        ).all()
+        df_monthly = page.monthly_cashflow
+        if not df_monthly.empty:
+            fig = px.bar(df_monthly, x='Data', y='Valor', color='Tipo',
+                       title="Receitas vs Despesas por Mês")
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Nenhuma transação encontrada")
+    
+    with col2:
+        st.subheader("🕒 Horas Trabalhadas (Últimas 4 semanas)")
         
-        if active_projects_list:
-            for project in active_projects_list:
-                with st.expander(f"📁 {project.name} - {project.client.name}"):
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.write(f"**Status:** {project.status.value.title()}")
-                    with col2:
-                        if project.budget:
-                            st.write(f"**Orçamento:** R$ {project.budget:,.2f}")
-                    with col3:
-                        if project.start_date:
-                            st.write(f"**Início:** {project.start_date.strftime('%d/%m/%Y')}")
-                    
-                    if project.description:
-                        st.write(f"**Descrição:** {project.description}")
+        df_weekly = page.weekly_hours
+        if not df_weekly.empty:
+            fig = px.line(df_weekly, x='Data', y='Horas',
+                        title="Horas Trabalhadas por Semana")
+            st.plotly_chart(fig, use_container_width=True)
         else:
-            st.info("Nenhum projeto ativo encontrado")
+            st.info("Nenhum registro de tempo encontrado")
     
-    finally:
-        session.close()
+    # Projetos ativos
+    st.subheader("🚀 Projetos Ativos")
+    active_projects_list = page.active_projects
+    
+    if active_projects_list:
+        for project in active_projects_list:
+            with st.expander(f"📁 {project['name']} - {project['client_name']}"):
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.write(f"**Status:** {project['status'].value.title()}")
+                with col2:
+                    if project['budget']:
+                        st.write(f"**Orçamento:** R$ {project['budget']:,.2f}")
+                with col3:
+                    if project['start_date']:
+                        st.write(f"**Início:** {project['start_date'].strftime('%d/%m/%Y')}")
+                
+                if project['description']:
+                    st.write(f"**Descrição:** {project['description']}")
+    else:
+        st.info("Nenhum projeto ativo encontrado")
 
 def clients_page():
     """Página de gestão de clientes"""
     st.markdown('<h1 class="main-header">👥 Gestão de Clientes</h1>', unsafe_allow_html=True)
     
     user = st.session_state.user
-    session = st.session_state.db_manager.get_session()
     
-    try:
-        # Sidebar para ações
-        with st.sidebar:
-            st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
-            if st.button("➕ Novo Cliente", use_container_width=True):
-                st.session_state.show_client_form = True
-                st.session_state.edit_client = None
-        
-        # Lista de clientes
-        clients = session.query(Client).filter(
-            Client.user_id == user.id,
-            Client.is_active == True
-        ).order_by(Client.name).all()
-        
-        if clients:
-            st.subheader(f"📋 Clientes Cadastrados ({len(clients)})")
-            
-            for client in clients:
-                with st.expander(f"👤 {client.name}"):
-                    col1, col2, col3 = st.columns([2, 2, 1])
-                    
-                    with col1:
-                        st.write(f"**Email:** {client.email or 'Não informado'}")
-                        st.write(f"**Telefone:** {client.phone or 'Não informado'}")
-                    
-                    with col2:
-                        st.write(f"**Empresa:** {client.company or 'Não informado'}")
-                        if client.address:
-                            st.write(f"**Endereço:** {client.address}")
-                    
-                    with col3:
-                        if st.button("✏️ Editar", key=f"edit_{client.id}"):
-                            st.session_state.show_client_form = True
-                            st.session_state.edit_client = client
-                            st.rerun()
-                    
-                    if client.notes:
-                        st.write(f"**Observações:** {client.notes}")
-        else:
-            st.info("Nenhum cliente cadastrado")
+    # Sidebar para ações
+    with st.sidebar:
+        st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
+        if st.button("➕ Novo Cliente", use_container_width=True):
+            st.session_state.show_client_form = True
+            st.session_state.edit_client = None
+    
+    # Lista de clientes
+    clients = load_clients(user.id, data_version(user.id))
+    
+    if clients:
+        st.subheader(f"📋 Clientes Cadastrados ({len(clients)})")
         
-        # Formulário de cliente
-        if st.session_state.get('show_client_form', False):
-            edit_client = st.session_state.get('edit_client')
-            
-            st.subheader("✏️ Editar Cliente" if edit_client else "➕ Novo Cliente")
-            
-            with st.form("client_form"):
-                col1, col2 = st.columns(2)
+        for client in clients:
+            with st.expander(f"👤 {client['name']}"):
+                col1, col2, col3 = st.columns([2, 2, 1])
                 
                 with col1:
-                    name = st.text_input("Nome *", value=edit_client.name if edit_client else "")
-                    email = st.text_input("Email", value=edit_client.email if edit_client else "")
-                    phone = st.text_input("Telefone", value=edit_client.phone if edit_client else "")
+                    st.write(f"**Email:** {client['email'] or 'Não informado'}")
+                    st.write(f"**Telefone:** {client['phone'] or 'Não informado'}")
                 
                 with col2:
-                    company = st.text_input("Empresa", value=edit_client.company if edit_client else "")
-                    address = st.text_area("Endereço", value=edit_client.address if edit_client else "")
-                
-                notes = st.text_area("Observações", value=edit_client.notes if edit_client else "")
-                
-                col1, col2, col3 = st.columns([1, 1, 2])
+                    st.write(f"**Empresa:** {client['company'] or 'Não informado'}")
+                    if client['address']:
+                        st.write(f"**Endereço:** {client['address']}")
                 
-                with col1:
-                    submit = st.form_submit_button("💾 Salvar")
-                
-                with col2:
-                    cancel = st.form_submit_button("❌ Cancelar")
+                with col3:
+                    if st.button("✏️ Editar", key=f"edit_{client['id']}"):
+                        st.session_state.show_client_form = True
+                        st.session_state.edit_client = client
+                        st.rerun()
                 
-                if submit:
-                    if name.strip():
-                        try:
-                            if edit_client:
-                                # Atualizar cliente existente
-                                edit_client.name = name.strip()
-                                edit_client.email = email.strip() or None
-                                edit_client.phone = phone.strip() or None
-                                edit_client.company = company.strip() or None
-                                edit_client.address = address.strip() or None
-                                edit_client.notes = notes.strip() or None
-                            else:
-                                # Criar novo cliente
-                                client = Client(
-                                    user_id=user.id,
-                                    name=name.strip(),
-                                    email=email.strip() or None,
-                                    phone=phone.strip() or None,
-                                    company=company.strip() or None,
-                                    address=address.strip() or None,
-                                    notes=notes.strip() or None
-                                )
-                                session.add(client)
-                            
-                            session.commit()
-                            st.success("Cliente salvo com sucesso!")
-                            st.session_state.show_client_form = False
-                            st.session_state.edit_client = None
-                            st.rerun()
-                            
-                        except Exception as e:
-                            session.rollback()
-                            st.error(f"Erro ao salvar cliente: {e}")
-                    else:
-                        st.error("O nome do cliente é obrigatório")
-                
-                if cancel:
-                    st.session_state.show_client_form = False
-                    st.session_state.edit_client = None
-                    st.rerun()
+                if client['notes']:
+                    st.write(f"**Observações:** {client['notes']}")
+    else:
+        st.info("Nenhum cliente cadastrado")
     
-    finally:
-        session.close()
+    # Formulário de cliente
+    if st.session_state.get('show_client_form', False):
+        edit_client = st.session_state.get('edit_client') or {}
+        
+        st.subheader("✏️ Editar Cliente" if edit_client else "➕ Novo Cliente")
+        
+        with st.form("client_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                name = st.text_input("Nome *", value=edit_client.get('name') or "")
+                email = st.text_input("Email", value=edit_client.get('email') or "")
+                phone = st.text_input("Telefone", value=edit_client.get('phone') or "")
+            
+            with col2:
+                company = st.text_input("Empresa", value=edit_client.get('company') or "")
+                address = st.text_area("Endereço", value=edit_client.get('address') or "")
+            
+            notes = st.text_area("Observações", value=edit_client.get('notes') or "")
+            
+            col1, col2, col3 = st.columns([1, 1, 2])
+            
+            with col1:
+                submit = st.form_submit_button("💾 Salvar")
+            
+            with col2:
+                cancel = st.form_submit_button("❌ Cancelar")
+            
+            if submit:
+                if name.strip():
+                    session = get_db_manager().get_session()
+                    try:
+                        if edit_client:
+                            # Atualizar cliente existente
+                            client = session.query(Client).filter(
+                                Client.id == edit_client['id'],
+                                Client.user_id == user.id
+                            ).one()
+                        else:
+                            # Criar novo cliente
+                            client = Client(user_id=user.id)
+                            session.add(client)
+                        
+                        client.name = name.strip()
+                        client.email = email.strip() or None
+                        client.phone = phone.strip() or None
+                        client.company = company.strip() or None
+                        client.address = address.strip() or None
+                        client.notes = notes.strip() or None
+                        
+                        session.commit()
+                        invalidate_user_data(user.id)
+                        
+                        st.success("Cliente salvo com sucesso!")
+                        st.session_state.show_client_form = False
+                        st.session_state.edit_client = None
+                        st.rerun()
+                        
+                    except Exception as e:
+                        session.rollback()
+                        st.error(f"Erro ao salvar cliente: {e}")
+                    finally:
+                        session.close()
+                else:
+                    st.error("O nome do cliente é obrigatório")
+            
+            if cancel:
+                st.session_state.show_client_form = False
+                st.session_state.edit_client = None
+                st.rerun()
 
 def projects_page():
     """Página de gestão de projetos"""
     st.markdown('<h1 class="main-header">📁 Gestão de Projetos</h1>', unsafe_allow_html=True)
     
     user = st.session_state.user
-    session = st.session_state.db_manager.get_session()
     
-    try:
-        # Sidebar para ações
-        with st.sidebar:
-            st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
-            if st.button("➕ Novo Projeto", use_container_width=True):
-                st.session_state.show_project_form = True
-                st.session_state.edit_project = None
-        
-        # Lista de projetos
-        projects = session.query(Project).options(
-            joinedload(Project.client)
-        ).filter(
-            Project.user_id == user.id
-        ).order_by(Project.created_at.desc()).all()
+    # Sidebar para ações
+    with st.sidebar:
+        st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
+        if st.button("➕ Novo Projeto", use_container_width=True):
+            st.session_state.show_project_form = True
+            st.session_state.edit_project = None
+    
+    # Lista de projetos
+    projects = load_projects(user.id, data_version(user.id))
+    
+    if projects:
+        st.subheader(f"📋 Projetos ({len(projects)})")
         
-        if projects:
-            st.subheader(f"📋 Projetos ({len(projects)})")
-            
-            # Filtros
-            col1, col2 = st.columns(2)
-            with col1:
-                status_filter = st.selectbox(
-                    "Filtrar por Status",
-                    ["Todos", "Ativo", "Pausado", "Concluído", "Cancelado"]
-                )
-            
-            # Aplicar filtro
-            if status_filter != "Todos":
-                status_map = {
-                    "Ativo": ProjectStatus.ATIVO,
-                    "Pausado": ProjectStatus.PAUSADO,
-                    "Concluído": ProjectStatus.CONCLUIDO,
-                    "Cancelado": ProjectStatus.CANCELADO
-                }
-                filtered_projects = [p for p in projects if p.status == status_map[status_filter]]
-            else:
-                filtered_projects = projects
+        # Filtros
+        col1, col2 = st.columns(2)
+        with col1:
+            status_filter = st.selectbox(
+                "Filtrar por Status",
+                ["Todos", "Ativo", "Pausado", "Concluído", "Cancelado"]
+            )
+        
+        # Aplicar filtro
+        if status_filter != "Todos":
+            status_map = {
+                "Ativo": ProjectStatus.ATIVO,
+                "Pausado": ProjectStatus.PAUSADO,
+                "Concluído": ProjectStatus.CONCLUIDO,
+                "Cancelado": ProjectStatus.CANCELADO
+            }
+            filtered_projects = [p for p in projects if p['status'] == status_map[status_filter]]
+        else:
+            filtered_projects = projects
+        
+        for project in filtered_projects:
+            status_color = {
+                ProjectStatus.ATIVO: "🟢",
+                ProjectStatus.PAUSADO: "🟡",
+                ProjectStatus.CONCLUIDO: "🔵",
+                ProjectStatus.CANCELADO: "🔴"
+            }.get(project['status'], "⚪")
             
-            for project in filtered_projects:
-                status_color = {
-                    ProjectStatus.ATIVO: "🟢",
-                    ProjectStatus.PAUSADO: "🟡",
-                    ProjectStatus.CONCLUIDO: "🔵",
-                    ProjectStatus.CANCELADO: "🔴"
-                }.get(project.status, "⚪")
+            with st.expander(f"{status_color} {project['name']} - {project['client_name']}"):
+                col1, col2, col3 = st.columns([2, 2, 1])
                 
-                with st.expander(f"{status_color} {project.name} - {project.client.name}"):
-                    col1, col2, col3 = st.columns([2, 2, 1])
-                    
-                    with col1:
-                        st.write(f"**Status:** {project.status.value.title()}")
-                        if project.start_date:
-                            st.write(f"**Início:** {project.start_date.strftime('%d/%m/%Y')}")
-                        if project.end_date:
-                            st.write(f"**Fim:** {project.end_date.strftime('%d/%m/%Y')}")
-                    
-                    with col2:
-                        if project.budget:
-                            st.write(f"**Orçamento:** R$ {project.budget:,.2f}")
-                        if project.hourly_rate:
-                            st.write(f"**Valor/Hora:** R$ {project.hourly_rate:,.2f}")
-                    
-                    with col3:
-                        if st.button("✏️ Editar", key=f"edit_proj_{project.id}"):
-                            st.session_state.show_project_form = True
-                            st.session_state.edit_project = project
-                            st.rerun()
-                    
-                    if project.description:
-                        st.write(f"**Descrição:** {project.description}")
-        else:
-            st.info("Nenhum projeto cadastrado")
-        
-        # Formulário de projeto (implementação básica)
-        if st.session_state.get('show_project_form', False):
-            st.subheader("➕ Novo Projeto")
-            st.info("Formulário de projeto em desenvolvimento...")
-            if st.button("❌ Cancelar"):
-                st.session_state.show_project_form = False
-                st.rerun()
-    
-    finally:
-        session.close()
+                with col1:
+                    st.write(f"**Status:** {project['status'].value.title()}")
+                    if project['start_date']:
+                        st.write(f"**Início:** {project['start_date'].strftime('%d/%m/%Y')}")
+                    if project['end_date']:
+                        st.write(f"**Fim:** {project['end_date'].strftime('%d/%m/%Y')}")
+                
+                with col2:
+                    if project['budget']:
+                        st.write(f"**Orçamento:** R$ {project['budget']:,.2f}")
+                
+                with col3:
+                    if st.button("✏️ Editar", key=f"edit_proj_{project['id']}"):
+                        st.session_state.show_project_form = True
+                        st.session_state.edit_project = project
+                        st.rerun()
+                
+                if project['description']:
+                    st.write(f"**Descrição:** {project['description']}")
+    else:
+        st.info("Nenhum projeto cadastrado")
+    
+    # Formulário de projeto (implementação básica)
+    if st.session_state.get('show_project_form', False):
+        st.subheader("➕ Novo Projeto")
+        st.info("Formulário de projeto em desenvolvimento...")
+        if st.button("❌ Cancelar"):
+            st.session_state.show_project_form = False
+            st.rerun()
+
+LISTING_STATES = ('transactions_listing', 'time_entries_listing')
+
+def paged_listing(state_key, fetch_page, first_page=None):
+    """Acumula as páginas de uma listagem keyset no session_state"""
+    if state_key not in st.session_state:
+        page = first_page or fetch_page(None)
+        st.session_state[state_key] = {'items': list(page.items), 'cursor': page.next_cursor, 'has_more': page.has_more}
+    return st.session_state[state_key]
+
+def load_more_button(state_key, fetch_page):
+    """Botão que busca a próxima página da listagem e recarrega a página"""
+    listing = st.session_state[state_key]
+    if listing['has_more'] and st.button("Carregar mais", key=f"{state_key}_more", use_container_width=True):
+        page = fetch_page(listing['cursor'])
+        listing['items'].extend(page.items)
+        listing['cursor'] = page.next_cursor
+        listing['has_more'] = page.has_more
+        st.rerun()
 
 def finances_page():
     """Página de gestão financeira"""
     st.markdown('<h1 class="main-header">💰 Gestão Financeira</h1>', unsafe_allow_html=True)
     
     user = st.session_state.user
-    session = st.session_state.db_manager.get_session()
     
-    try:
-        # Métricas financeiras
-        col1, col2, col3, col4 = st.columns(4)
-        
-        # Receitas do mês
-        current_month = datetime.now().replace(day=1)
-        monthly_income = session.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.type == TransactionType.RECEITA,
-            Transaction.date >= current_month
-        ).with_entities(Transaction.amount).all()
-        monthly_income_total = sum([t.amount for t in monthly_income]) if monthly_income else 0
-        
-        # Despesas do mês
-        monthly_expenses = session.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.type == TransactionType.DESPESA,
-            Transaction.date >= current_month
-        ).with_entities(Transaction.amount).all()
-        monthly_expenses_total = sum([t.amount for t in monthly_expenses]) if monthly_expenses else 0
-        
-        # Saldo do mês
-        monthly_balance = monthly_income_total - monthly_expenses_total
-        
-        # Total geral
-        all_income = session.query(Transaction).filter(
-            Transaction.user_id == user.id,
-            Transaction.type == TransactionType.RECEITA
-        ).with_entities(Transaction.amount).all()
-        total_income = sum([t.amount for t in all_income]) if all_income else 0
-        
-        with col1:
-            st.metric("Receitas do Mês", f"R$ {monthly_income_total:,.2f}")
-        
-        with col2:
-            st.metric("Despesas do Mês", f"R$ {monthly_expenses_total:,.2f}")
-        
-        with col3:
-            delta_color = "normal" if monthly_balance >= 0 else "inverse"
-            st.metric("Saldo do Mês", f"R$ {monthly_balance:,.2f}")
-        
-        with col4:
-            st.metric("Total Receitas", f"R$ {total_income:,.2f}")
-        
-        st.divider()
-        
-        # Sidebar para ações
-        with st.sidebar:
-            st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
-            if st.button("➕ Nova Transação", use_container_width=True):
-                st.session_state.show_transaction_form = True
-        
-        # Lista de transações recentes
-        st.subheader("💳 Transações Recentes")
-        
-        recent_transactions = session.query(Transaction).filter(
-            Transaction.user_id == user.id
-        ).order_by(Transaction.date.desc()).limit(20).all()
-        
-        if recent_transactions:
-            for transaction in recent_transactions:
-                type_icon = "💰" if transaction.type == TransactionType.RECEITA else "💸"
-                type_color = "green" if transaction.type == TransactionType.RECEITA else "red"
-                
-                with st.expander(f"{type_icon} {transaction.description} - R$ {transaction.amount:,.2f}"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(f"**Data:** {transaction.date.strftime('%d/%m/%Y')}")
-                        st.write(f"**Tipo:** {transaction.type.value.title()}")
-                    with col2:
-                        st.write(f"**Valor:** R$ {transaction.amount:,.2f}")
-                        if transaction.category:
-                            st.write(f"**Categoria:** {transaction.category}")
-        else:
-            st.info("Nenhuma transação encontrada")
-        
-        # Formulário de transação (implementação básica)
-        if st.session_state.get('show_transaction_form', False):
-            st.subheader("➕ Nova Transação")
-            st.info("Formulário de transação em desenvolvimento...")
-            if st.button("❌ Cancelar"):
-                st.session_state.show_transaction_form = False
-                st.rerun()
+    # Métricas financeiras
+    col1, col2, col3, col4 = st.columns(4)
     
-    finally:
-        session.close()
+    # Na primeira visita as métricas e a primeira página de transações são buscadas em paralelo
+    first_page = None
+    if 'transactions_listing' in st.session_state:
+        stats = load_dashboard_stats(user.id, data_version(user.id))
+    else:
+        stats, first_page = load_finances_page(user.id, data_version(user.id))
+    monthly_income_total = stats["monthly_income"]
+    monthly_expenses_total = stats["monthly_expenses"]
+    monthly_balance = stats["monthly_balance"]
+    total_income = stats["total_received"]
+    
+    with col1:
+        st.metric("Receitas do Mês", f"R$ {monthly_income_total:,.2f}")
+    
+    with col2:
+        st.metric("Despesas do Mês", f"R$ {monthly_expenses_total:,.2f}")
+    
+    with col3:
+        delta_color = "normal" if monthly_balance >= 0 else "inverse"
+        st.metric("Saldo do Mês", f"R$ {monthly_balance:,.2f}")
+    
+    with col4:
+        st.metric("Total Receitas", f"R$ {total_income:,.2f}")
+    
+    st.divider()
+    
+    # Sidebar para ações
+    with st.sidebar:
+        st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
+        if st.button("➕ Nova Transação", use_container_width=True):
+            st.session_state.show_transaction_form = True
+    
+    # Lista de transações recentes
+    st.subheader("💳 Transações Recentes")
+    
+    listings = ListingService(get_db_manager().get_session)
+    fetch_page = lambda cursor: listings.transactions_page(user.id, cursor=cursor, limit=20)
+    recent_transactions = paged_listing('transactions_listing', fetch_page, first_page)['items']
+    
+    if recent_transactions:
+        for transaction in recent_transactions:
+            type_icon = "💰" if transaction.type == TransactionType.RECEITA else "💸"
+            type_color = "green" if transaction.type == TransactionType.RECEITA else "red"
+            
+            with st.expander(f"{type_icon} {transaction.description} - R$ {transaction.amount:,.2f}"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(f"**Data:** {transaction.date.strftime('%d/%m/%Y')}")
+                    st.write(f"**Tipo:** {transaction.type.value.title()}")
+                with col2:
+                    st.write(f"**Valor:** R$ {transaction.amount:,.2f}")
+                    if transaction.category:
+                        st.write(f"**Categoria:** {transaction.category}")
+        
+        load_more_button('transactions_listing', fetch_page)
+    else:
+        st.info("Nenhuma transação encontrada")
+    
+    # Formulário de transação (implementação básica)
+    if st.session_state.get('show_transaction_form', False):
+        st.subheader("➕ Nova Transação")
+        st.info("Formulário de transação em desenvolvimento...")
+        if st.button("❌ Cancelar"):
+            st.session_state.show_transaction_form = False
+            st.rerun()
 
 def timesheet_page():
     """Página de controle de tempo"""
     st.markdown('<h1 class="main-header">⏰ Controle de Tempo</h1>', unsafe_allow_html=True)
     
     user = st.session_state.user
-    session = st.session_state.db_manager.get_session()
     
-    try:
-        # Métricas de tempo
-        col1, col2, col3 = st.columns(3)
-        
-        # Horas hoje
-        today = datetime.now().date()
-        today_hours = session.query(TimeEntry).filter(
-            TimeEntry.user_id == user.id,
-            TimeEntry.date == today
-        ).with_entities(TimeEntry.duration_minutes).all()
-        today_hours_total = sum([t.duration_minutes/60 for t in today_hours]) if today_hours else 0
-        
-        # Horas esta semana
-        week_start = today - timedelta(days=today.weekday())
-        week_hours = session.query(TimeEntry).filter(
-            TimeEntry.user_id == user.id,
-            TimeEntry.date >= week_start
-        ).with_entities(TimeEntry.duration_minutes).all()
-        week_hours_total = sum([t.duration_minutes/60 for t in week_hours]) if week_hours else 0
-        
-        # Horas este mês
-        month_start = today.replace(day=1)
-        month_hours = session.query(TimeEntry).filter(
-            TimeEntry.user_id == user.id,
-            TimeEntry.date >= month_start
-        ).with_entities(TimeEntry.duration_minutes).all()
-        month_hours_total = sum([t.duration_minutes/60 for t in month_hours]) if month_hours else 0
-        
-        with col1:
-            st.metric("Horas Hoje", f"{today_hours_total:.1f}h")
-        
-        with col2:
-            st.metric("Horas na Semana", f"{week_hours_total:.1f}h")
-        
-        with col3:
-            st.metric("Horas no Mês", f"{month_hours_total:.1f}h")
-        
-        st.divider()
-        
-        # Sidebar para ações
-        with st.sidebar:
-            st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
-            if st.button("➕ Registrar Tempo", use_container_width=True):
-                st.session_state.show_time_form = True
-        
-        # Lista de registros recentes
-        st.subheader("📝 Registros Recentes")
-        
-        recent_entries = session.query(TimeEntry).options(
-            joinedload(TimeEntry.project)
-        ).filter(
-            TimeEntry.user_id == user.id
-        ).order_by(TimeEntry.date.desc()).limit(15).all()
-        
-        if recent_entries:
-            for entry in recent_entries:
-                project_name = entry.project.name if entry.project else "Sem projeto"
-                with st.expander(f"⏱️ {entry.date.strftime('%d/%m/%Y')} - {project_name} - {entry.duration_minutes/60:.1f}h"):
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.write(f"**Projeto:** {project_name}")
-                        st.write(f"**Horas:** {entry.duration_minutes/60:.1f}h")
-                    with col2:
-                        st.write(f"**Data:** {entry.date.strftime('%d/%m/%Y')}")
-                    
-                    if entry.description:
-                        st.write(f"**Descrição:** {entry.description}")
-        else:
-            st.info("Nenhum registro de tempo encontrado")
-        
-        # Formulário de registro de tempo (implementação básica)
-        if st.session_state.get('show_time_form', False):
-            st.subheader("➕ Registrar Tempo")
-            st.info("Formulário de registro de tempo em desenvolvimento...")
-            if st.button("❌ Cancelar"):
-                st.session_state.show_time_form = False
-                st.rerun()
+    # Métricas de tempo
+    col1, col2, col3 = st.columns(3)
     
-    finally:
-        session.close()
+    # Totais lidos do rollup diário de tempo (hoje, semana e mês); na primeira visita junto com os registros
+    first_page = None
+    if 'time_entries_listing' in st.session_state:
+        totals = load_time_totals(user.id, data_version(user.id), datetime.now().date())
+    else:
+        totals, first_page = load_timesheet_page(user.id, data_version(user.id), datetime.now().date())
+    today_hours_total = totals['today']
+    week_hours_total = totals['week']
+    month_hours_total = totals['month']
+    
+    with col1:
+        st.metric("Horas Hoje", f"{today_hours_total:.1f}h")
+    
+    with col2:
+        st.metric("Horas na Semana", f"{week_hours_total:.1f}h")
+    
+    with col3:
+        st.metric("Horas no Mês", f"{month_hours_total:.1f}h")
+    
+    st.divider()
+    
+    # Sidebar para ações
+    with st.sidebar:
+        st.markdown('<div class="sidebar-header">Ações</div>', unsafe_allow_html=True)
+        if st.button("➕ Registrar Tempo", use_container_width=True):
+            st.session_state.show_time_form = True
+    
+    # Lista de registros recentes
+    st.subheader("📝 Registros Recentes")
+    
+    listings = ListingService(get_db_manager().get_session)
+    fetch_page = lambda cursor: listings.time_entries_page(user.id, cursor=cursor, limit=15)
+    recent_entries = paged_listing('time_entries_listing', fetch_page, first_page)['items']
+    
+    if recent_entries:
+        for entry in recent_entries:
+            project_name = entry.project.name if entry.project else "Sem projeto"
+            with st.expander(f"⏱️ {entry.date.strftime('%d/%m/%Y')} - {project_name} - {entry.duration_minutes/60:.1f}h"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write(f"**Projeto:** {project_name}")
+                    st.write(f"**Horas:** {entry.duration_minutes/60:.1f}h")
+                with col2:
+                    st.write(f"**Data:** {entry.date.strftime('%d/%m/%Y')}")
+                
+                if entry.description:
+                    st.write(f"**Descrição:** {entry.description}")
+        
+        load_more_button('time_entries_listing', fetch_page)
+    else:
+        st.info("Nenhum registro de tempo encontrado")
+    
+    # Formulário de registro de tempo (implementação básica)
+    if st.session_state.get('show_time_form', False):
+        st.subheader("➕ Registrar Tempo")
+        st.info("Formulário de registro de tempo em desenvolvimento...")
+        if st.button("❌ Cancelar"):
+            st.session_state.show_time_form = False
+            st.rerun()
 
 def help_page():
     """Página de ajuda"""
@@ -841,6 +879,18 @@ def help_page():
         - Dispositivos: Desktop, Tablet, Mobile
         - Sistemas: Windows, macOS, Linux
         """)
+    
+    # Métricas do pool de conexões do processo (compartilhado por todas as sessões)
+    with st.expander("🔌 Pool de Conexões"):
+        sync_col, async_col = st.columns(2)
+        with sync_col:
+            st.write("**Engine síncrono**")
+            st.json(get_db_manager().pool_stats())
+            st.bar_chart(pd.Series(get_db_manager().pool_metrics.histogram(), name="Checkouts"))
+        with async_col:
+            st.write("**Engine assíncrono (páginas)**")
+            st.json(async_db_manager.pool_metrics.stats())
+            st.bar_chart(pd.Series(async_db_manager.pool_metrics.histogram(), name="Checkouts"))
 
 def main():
     """Função principal do Streamlit"""
@@ -866,10 +916,18 @@ def main():
             ["📊 Dashboard", "👥 Clientes", "📁 Projetos", "💰 Finanças", "⏰ Timesheet", "📊 Relatórios", "❓ Ajuda"]
         )
         
+        # Listagens paginadas recomeçam da primeira página ao trocar de tela
+        if st.session_state.get('current_page') != page:
+            st.session_state.current_page = page
+            for state_key in LISTING_STATES:
+                st.session_state.pop(state_key, None)
+        
         st.divider()
         
         if st.button("🚪 Logout", use_container_width=True):
             del st.session_state.user
+            for state_key in LISTING_STATES:
+                st.session_state.pop(state_key, None)
             st.rerun()
     
     # Roteamento de páginas
@@ -0,0 +1,63 @@
+import os
+import sys
+import tempfile
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Raiz do projeto no path (os testes importam config e src como a aplicação)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dados locais (cache do esquema, réplica, fila) fora da pasta do usuário; antes de importar o config
+os.environ.setdefault('DEVFLOW_DATA_FOLDER', tempfile.mkdtemp(prefix='devflow-tests-'))
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessões de um banco SQLite novo com todas as tabelas"""
+    from src.database.connection import Base
+    from src.database import models  # noqa: F401 (registra as tabelas e os eventos dos rollups)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'devflow.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    engine.dispose()
+
+@pytest.fixture
+def user_id(session_factory):
+    """Usuário com um cliente, sem projetos"""
+    from src.database.models import User, Client
+
+    session = session_factory()
+    try:
+        user = User(username='teste', email='teste@devflow.local', password_hash='x', full_name='Teste')
+        session.add(Client(user=user, name='Cliente'))
+        session.commit()
+        return user.id
+    finally:
+        session.close()
+
+@pytest.fixture
+def queue(tmp_path, session_factory):
+    """Fila de gravações com o arquivo em tmp_path, aplicada com flush() (sem a thread do flusher)"""
+    from src.database.outbox import WriteOutbox
+    from src.services.write_behind import WriteBehindQueue
+
+    outbox = WriteOutbox(str(tmp_path / 'outbox.db')).open()
+    yield WriteBehindQueue(session_factory=session_factory, outbox=outbox)
+    outbox.engine.dispose()
+
+@pytest.fixture
+def project_id(session_factory, user_id):
+    """Projeto ativo do cliente do usuário"""
+    from sqlalchemy import select
+    from src.database.models import Client, Project, ProjectStatus
+
+    session = session_factory()
+    try:
+        client = session.execute(select(Client).where(Client.user_id == user_id)).scalar_one()
+        project = Project(user_id=user_id, client=client, name='Projeto', status=ProjectStatus.ATIVO)
+        session.add(project)
+        session.commit()
+        return project.id
+    finally:
+        session.close()
@@ -0,0 +1,162 @@
+"""Exportação de transações, registros de tempo e tarefas em CSV, Parquet e XLSX"""
+import csv
+from datetime import datetime, date
+from decimal import Decimal
+import pytest
+from sqlalchemy import select
+from src.database.models import (
+    Client, Project, Transaction, TimeEntry, Board, BoardColumn, Task, TransactionType, TaskPriority, ProjectStatus
+)
+from src.services.data_export import DataExportService
+
+TRANSACTION_COLUMNS = [
+    'id', 'date', 'type', 'amount', 'description', 'category', 'project_id', 'project', 'notes', 'created_at'
+]
+TIME_ENTRY_COLUMNS = [
+    'id', 'date', 'project_id', 'project', 'description', 'start_time', 'end_time', 'duration_minutes',
+    'hourly_rate', 'created_at'
+]
+TASK_COLUMNS = [
+    'id', 'project_id', 'project', 'board', 'column', 'position', 'title', 'description', 'priority',
+    'estimated_hours', 'assigned_to', 'due_date', 'created_at', 'updated_at'
+]
+
+@pytest.fixture
+def projects(session_factory, user_id):
+    """Dois projetos com lançamentos em março e abril e um quadro com três tarefas"""
+    session = session_factory()
+    try:
+        client = session.execute(select(Client).where(Client.user_id == user_id)).scalar_one()
+        site = Project(user_id=user_id, client=client, name='Site', status=ProjectStatus.ATIVO)
+        app = Project(user_id=user_id, client=client, name='App', status=ProjectStatus.ATIVO)
+
+        session.add_all([
+            Transaction(user_id=user_id, project=site, type=TransactionType.RECEITA, amount=Decimal('1500.00'),
+                        description='Entrada', date=datetime(2026, 3, 5), category='Pagamento Cliente'),
+            Transaction(user_id=user_id, project=app, type=TransactionType.DESPESA, amount=Decimal('89.90'),
+                        description='Hospedagem', date=datetime(2026, 3, 31, 23, 59)),
+            Transaction(user_id=user_id, type=TransactionType.DESPESA, amount=Decimal('15.00'),
+                        description='Café', date=datetime(2026, 3, 20)),
+            Transaction(user_id=user_id, project=site, type=TransactionType.RECEITA, amount=Decimal('700.00'),
+                        description='Saldo', date=datetime(2026, 4, 1)),
+        ])
+        session.add_all([
+            TimeEntry(user_id=user_id, project=project, description=description, start_time=start,
+                      end_time=start.replace(hour=start.hour + 1), duration_minutes=60, date=start,
+                      hourly_rate=Decimal('120.00'))
+            for project, description, start in (
+                (site, 'Layout', datetime(2026, 3, 10, 9)),
+                (app, 'API', datetime(2026, 3, 10, 14)),
+                (site, 'Revisão', datetime(2026, 3, 11, 9)),
+                (site, 'Deploy', datetime(2026, 4, 2, 9)),
+            )
+        ])
+
+        board = Board(user_id=user_id, project=site, name='Sprint')
+        todo = BoardColumn(board=board, name='A fazer', position=0)
+        done = BoardColumn(board=board, name='Concluído', position=1)
+        session.add_all([
+            Task(column=done, title='Entregue', position=1000, priority=TaskPriority.LOW),
+            Task(column=todo, title='Segunda', position=2000, priority=TaskPriority.HIGH,
+                 estimated_hours=Decimal('2.50'), due_date=datetime(2026, 4, 30)),
+            Task(column=todo, title='Primeira', position=1000),
+        ])
+        session.commit()
+        return {'site': site.id, 'app': app.id}
+    finally:
+        session.close()
+
+@pytest.fixture
+def service(session_factory):
+    # Blocos pequenos: a exportação passa por vários yield_per/row groups
+    return DataExportService(session_factory=session_factory, chunk_size=2)
+
+def read_csv(filename):
+    with open(filename, encoding='utf-8-sig', newline='') as stream:
+        return list(csv.reader(stream))
+
+def test_csv_columns_and_values(tmp_path, service, user_id, projects):
+    filename = str(tmp_path / 'transacoes.csv')
+    progress = []
+
+    result = service.export(filename, 'transactions', user_id, progress=lambda done, total: progress.append((done, total)))
+
+    assert (result.dataset, result.rows) == ('transactions', 4)
+    assert progress == [(2, 4), (4, 4), (4, 4)]
+    header, *rows = read_csv(filename)
+    assert header == TRANSACTION_COLUMNS
+    # Enums pelo valor, datas em ISO e transações sem projeto com as colunas do projeto vazias
+    assert [row[1:8] for row in rows] == [
+        ['2026-03-05 00:00:00', 'receita', '1500.00', 'Entrada', 'Pagamento Cliente', str(projects['site']), 'Site'],
+        ['2026-03-20 00:00:00', 'despesa', '15.00', 'Café', '', '', ''],
+        ['2026-03-31 23:59:00', 'despesa', '89.90', 'Hospedagem', '', str(projects['app']), 'App'],
+        ['2026-04-01 00:00:00', 'receita', '700.00', 'Saldo', '', str(projects['site']), 'Site'],
+    ]
+
+def test_parquet_schema_and_types(tmp_path, service, user_id, projects):
+    pa = pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    filename = str(tmp_path / 'horas.parquet')
+
+    assert service.export(filename, 'time_entries', user_id).rows == 4
+
+    parquet = pq.ParquetFile(filename)
+    assert parquet.metadata.num_row_groups == 2
+    schema = parquet.schema_arrow
+    assert schema.names == TIME_ENTRY_COLUMNS
+    assert [schema.field(name).type for name in ('id', 'date', 'project', 'duration_minutes', 'hourly_rate')] == [
+        pa.int64(), pa.timestamp('us'), pa.string(), pa.int64(), pa.decimal128(8, 2)
+    ]
+    table = parquet.read()
+    assert table.column('description').to_pylist() == ['Layout', 'API', 'Revisão', 'Deploy']
+    assert table.column('hourly_rate').to_pylist() == [Decimal('120.00')] * 4
+    assert table.column('start_time').to_pylist()[0] == datetime(2026, 3, 10, 9)
+
+def test_xlsx_columns_and_types(tmp_path, service, user_id, projects):
+    openpyxl = pytest.importorskip('openpyxl')
+    filename = str(tmp_path / 'tarefas.xlsx')
+
+    assert service.export(filename, 'tasks', user_id).rows == 3
+
+    sheet = openpyxl.load_workbook(filename, read_only=True).active
+    header, *rows = [list(row) for row in sheet.iter_rows(values_only=True)]
+    assert header == TASK_COLUMNS
+    # Pela coluna do quadro e pela posição da tarefa
+    assert [(row[4], row[6], row[8]) for row in rows] == [
+        ('A fazer', 'Primeira', 'medium'), ('A fazer', 'Segunda', 'high'), ('Concluído', 'Entregue', 'low')
+    ]
+    second = rows[1]
+    assert isinstance(second[0], int) and second[5] == 2000
+    assert second[9] == 2.5
+    assert second[11] == datetime(2026, 4, 30)
+
+def test_period_export_is_inclusive(tmp_path, service, user_id, projects):
+    filename = str(tmp_path / 'marco.csv')
+
+    result = service.export(filename, 'transactions', user_id, start=date(2026, 3, 1), end=date(2026, 3, 31))
+
+    # O último dia entra inteiro; 1º de abril fica de fora
+    assert result.rows == 3
+    assert [row[4] for row in read_csv(filename)[1:]] == ['Entrada', 'Café', 'Hospedagem']
+    assert service.count('transactions', user_id, date(2026, 3, 1), date(2026, 3, 31)) == 3
+
+def test_project_and_period_filters(tmp_path, service, user_id, projects):
+    filename = str(tmp_path / 'site.csv')
+
+    result = service.export(filename, 'time_entries', user_id, start=date(2026, 3, 1), end=date(2026, 3, 31),
+                            project_id=projects['site'])
+
+    assert result.rows == 2
+    assert [(row[3], row[4]) for row in read_csv(filename)[1:]] == [('Site', 'Layout'), ('Site', 'Revisão')]
+
+    # O período não se aplica às tarefas; o projeto sim
+    assert service.export(str(tmp_path / 'tarefas.csv'), 'tasks', user_id, start=date(2026, 3, 1),
+                          end=date(2026, 3, 31), project_id=projects['site']).rows == 3
+    assert service.export(str(tmp_path / 'vazio.csv'), 'tasks', user_id, project_id=projects['app']).rows == 0
+    assert read_csv(str(tmp_path / 'vazio.csv')) == [TASK_COLUMNS]
+
+def test_unknown_format_and_dataset(tmp_path, service, user_id):
+    with pytest.raises(ValueError):
+        service.export(str(tmp_path / 'dados.json'), 'transactions', user_id)
+    with pytest.raises(ValueError):
+        service.export(str(tmp_path / 'dados.csv'), 'clientes', user_id)
@@ -0,0 +1,115 @@
+"""Planos das consultas principais no PostgreSQL: nenhuma pode ler as tabelas grandes com Seq Scan
+
+Roda contra o banco de DATABASE_URL dentro de uma transação desfeita no final (nada fica gravado).
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from src.database.connection import Base
+from src.database.models import (
+    User, Client, Project, Transaction, TimeEntry, TransactionType, ProjectStatus
+)
+from src.database.index_check import hot_queries, seq_scans, sample_ids
+from src.services.rollups import RollupService
+
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith('postgresql'),
+    reason="requer DATABASE_URL de um PostgreSQL"
+)
+
+# O usuário verificado é um entre USERS com o mesmo volume: suas linhas são ~1/USERS de cada tabela
+USERS = 30
+PROJECTS_PER_USER = 4
+ROWS_PER_USER = 1500
+DAYS = 730
+NOW = datetime(2026, 6, 30, 18, 0)
+
+# Tabelas semeadas; nas pequenas (usuários, projetos) um Seq Scan é a escolha certa do planejador
+LARGE_TABLES = {
+    Transaction.__tablename__, TimeEntry.__tablename__,
+    'transaction_monthly_rollups', 'time_entry_daily_rollups'
+}
+
+def seed(connection):
+    """Cria USERS usuários com projetos, transações e registros de tempo; retorna o id do primeiro"""
+    tag = uuid.uuid4().hex[:8]
+    rollups = RollupService()
+    user_ids = []
+
+    for number in range(USERS):
+        user_id = connection.execute(insert(User).values(
+            username=f'idx{tag}{number}', email=f'idx{tag}{number}@devflow.local',
+            password_hash='x', full_name='Índices'
+        ).returning(User.id)).scalar()
+        client_id = connection.execute(insert(Client).values(
+            user_id=user_id, name='Cliente'
+        ).returning(Client.id)).scalar()
+        project_ids = connection.execute(insert(Project).returning(Project.id), [
+            {'user_id': user_id, 'client_id': client_id, 'name': f'Projeto {index}', 'status': ProjectStatus.ATIVO}
+            for index in range(PROJECTS_PER_USER)
+        ]).scalars().all()
+
+        moments = [NOW - timedelta(days=DAYS * index / ROWS_PER_USER) for index in range(ROWS_PER_USER)]
+        connection.execute(insert(Transaction), [
+            {
+                'user_id': user_id,
+                'project_id': project_ids[index % PROJECTS_PER_USER] if index % 5 else None,
+                'type': TransactionType.RECEITA if index % 3 else TransactionType.DESPESA,
+                'amount': 100 + index % 900,
+                'description': f'Transação {index}',
+                'date': moment
+            }
+            for index, moment in enumerate(moments)
+        ])
+        connection.execute(insert(TimeEntry), [
+            {
+                'user_id': user_id,
+                'project_id': project_ids[index % PROJECTS_PER_USER],
+                'description': f'Tarefa {index}',
+                'start_time': moment,
+                'end_time': moment + timedelta(minutes=45),
+                'duration_minutes': 45,
+                'date': moment
+            }
+            for index, moment in enumerate(moments)
+        ])
+
+        # Inserções em Core não passam pelos eventos da sessão que mantêm os rollups
+        rollups.rebuild_with(connection, user_id)
+        user_ids.append(user_id)
+
+    return user_ids[0]
+
+@pytest.fixture(scope='module')
+def seeded():
+    """Conexão com os dados semeados e os ids do usuário verificado"""
+    engine = create_engine(DATABASE_URL)
+    connection = engine.connect()
+    transaction = connection.begin()
+    try:
+        Base.metadata.create_all(connection)
+        user_id = seed(connection)
+        for table in LARGE_TABLES:
+            connection.execute(text(f"ANALYZE {table}"))
+        yield connection, sample_ids(connection, user_id)
+    finally:
+        transaction.rollback()
+        connection.close()
+        engine.dispose()
+
+def test_seed_covers_the_checked_user(seeded):
+    connection, ids = seeded
+    assert ids['project_id']
+    assert connection.execute(
+        select(TimeEntry.id).where(TimeEntry.user_id == ids['user_id']).limit(1)
+    ).first() is not None
+
+@pytest.mark.parametrize('name', list(hot_queries(0)))
+def test_hot_query_avoids_seq_scan(seeded, name):
+    connection, ids = seeded
+    statement = hot_queries(**ids, now=NOW)[name]
+    assert not set(seq_scans(connection, statement)) & LARGE_TABLES
@@ -0,0 +1,170 @@
+"""Sincronização da réplica local com um banco remoto simulado por um segundo arquivo SQLite"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from src.database.connection import Base
+from src.database.models import (
+    User, Client, Project, Transaction, TimeEntry, TimeEntryDailyRollup, TransactionType, ProjectStatus
+)
+from src.database.replica import LocalReplica
+from src.services.replica_sync import ReplicaSyncService
+from src.services.rollups import RollupService
+
+# Datas fixas: as versões remotas (created_at/updated_at) são comparadas na detecção de conflitos
+WORKDAY = datetime(2026, 3, 10, 9, 0)
+CREATED = datetime(2026, 3, 10, 18, 0)
+
+@pytest.fixture
+def remote(tmp_path):
+    """Sessões do banco "remoto" com um usuário, um cliente, um projeto e alguns lançamentos"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'remote.db'}")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+
+    session = factory()
+    user = User(username='sync', email='sync@devflow.local', password_hash='x', full_name='Sincronização',
+                created_at=CREATED)
+    client = Client(user=user, name='Cliente', created_at=CREATED)
+    project = Project(user=user, client=client, name='Projeto', status=ProjectStatus.ATIVO, created_at=CREATED)
+    session.add_all([
+        TimeEntry(user=user, project=project, description=f'Tarefa {index}', start_time=WORKDAY,
+                  end_time=WORKDAY + timedelta(minutes=30), duration_minutes=30, date=WORKDAY, created_at=CREATED)
+        for index in range(2)
+    ])
+    session.add(Transaction(user=user, project=project, type=TransactionType.RECEITA, amount=Decimal('150.00'),
+                            description='Pagamento', date=WORKDAY, created_at=CREATED))
+    session.commit()
+    session.close()
+
+    yield factory
+    engine.dispose()
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = LocalReplica(f"sqlite:///{tmp_path / 'remote.db'}", str(tmp_path / 'replica.db')).open()
+    yield replica
+    replica.engine.dispose()
+
+@pytest.fixture
+def service(remote, replica):
+    return ReplicaSyncService(remote_session_factory=remote, replica=replica)
+
+@pytest.fixture
+def ids(remote):
+    session = remote()
+    try:
+        user = session.execute(select(User)).scalar_one()
+        return {'user_id': user.id, 'client_id': user.clients[0].id, 'project_id': user.projects[0].id}
+    finally:
+        session.close()
+
+def rows(session_factory, model, *conditions):
+    session = session_factory()
+    try:
+        statement = select(model).where(*conditions).order_by(*model.__table__.primary_key.columns)
+        return session.execute(statement).scalars().all()
+    finally:
+        session.close()
+
+def assert_rollups_match(replica, user_id):
+    assert RollupService(session_factory=replica.get_session).verify(user_id) == []
+    # Nenhum total pode ficar preso a um id local (negativo) depois do envio
+    assert all(row.project_id > 0 for row in rows(replica.get_session, TimeEntryDailyRollup)
+               if row.entry_count)
+
+def test_pull_copies_remote_rows_and_rollups(service, replica, ids):
+    result = service.sync(ids['user_id'])
+
+    assert result.pulled == 6 and result.failed == 0
+    assert [entry.description for entry in rows(replica.get_session, TimeEntry)] == ['Tarefa 0', 'Tarefa 1']
+    assert_rollups_match(replica, ids['user_id'])
+    totals = RollupService(session_factory=replica.get_session).time_totals(ids['user_id'])
+    assert totals['minutes'] == 60
+
+def test_push_insert_remaps_negative_local_ids(service, remote, replica, ids):
+    service.sync(ids['user_id'])
+
+    session = replica.get_session()
+    project = Project(user_id=ids['user_id'], client_id=ids['client_id'], name='Offline', status=ProjectStatus.ATIVO)
+    session.add(project)
+    session.flush()
+    session.add(TimeEntry(user_id=ids['user_id'], project_id=project.id, description='Sem rede',
+                          start_time=WORKDAY, duration_minutes=45, date=WORKDAY))
+    session.commit()
+    local_project_id = project.id
+    session.close()
+    assert local_project_id < 0
+
+    result = service.sync(ids['user_id'])
+
+    assert result.pushed == 2 and result.conflicts == 0
+    assert replica.pending_count() == 0
+    remote_project = rows(remote, Project, Project.name == 'Offline')[0]
+    assert [project.id for project in rows(replica.get_session, Project, Project.name == 'Offline')] == [remote_project.id]
+    local_entry = rows(replica.get_session, TimeEntry, TimeEntry.description == 'Sem rede')[0]
+    remote_entry = rows(remote, TimeEntry, TimeEntry.description == 'Sem rede')[0]
+    assert local_entry.id == remote_entry.id > 0
+    assert local_entry.project_id == remote_entry.project_id == remote_project.id
+    assert_rollups_match(replica, ids['user_id'])
+
+def test_push_update_reaches_remote(service, remote, replica, ids):
+    service.sync(ids['user_id'])
+
+    session = replica.get_session()
+    entry = session.get(TimeEntry, rows(replica.get_session, TimeEntry)[0].id)
+    entry.duration_minutes = 90
+    session.commit()
+    session.close()
+
+    result = service.sync(ids['user_id'])
+
+    assert result.pushed == 1 and result.conflicts == 0
+    assert rows(remote, TimeEntry)[0].duration_minutes == 90
+    assert_rollups_match(replica, ids['user_id'])
+
+def test_conflict_keeps_remote_version(service, remote, replica, ids):
+    service.sync(ids['user_id'])
+    entry_id = rows(replica.get_session, TimeEntry)[0].id
+
+    session = replica.get_session()
+    session.get(TimeEntry, entry_id).duration_minutes = 15
+    session.commit()
+    session.close()
+
+    # O registro muda no remoto depois do pull: a versão base da alteração local fica antiga
+    session = remote()
+    entry = session.get(TimeEntry, entry_id)
+    entry.duration_minutes = 120
+    entry.updated_at = CREATED + timedelta(hours=1)
+    session.commit()
+    session.close()
+
+    result = service.sync(ids['user_id'])
+
+    assert result.conflicts == 1 and result.pushed == 0
+    assert rows(replica.get_session, TimeEntry, TimeEntry.id == entry_id)[0].duration_minutes == 120
+    assert rows(remote, TimeEntry, TimeEntry.id == entry_id)[0].duration_minutes == 120
+    conflicts = replica.conflicts()
+    assert [(conflict['row_id'], conflict['operation']) for conflict in conflicts] == [(entry_id, 'update')]
+    assert '"duration_minutes": 15' in conflicts[0]['local_values']
+    assert replica.pending_count() == 0
+    assert_rollups_match(replica, ids['user_id'])
+
+def test_remote_delete_removes_local_row(service, remote, replica, ids):
+    service.sync(ids['user_id'])
+    entry_id = rows(replica.get_session, TimeEntry)[0].id
+
+    session = remote()
+    session.delete(session.get(TimeEntry, entry_id))
+    session.commit()
+    session.close()
+
+    result = service.sync(ids['user_id'])
+
+    assert result.deleted == 1
+    assert rows(replica.get_session, TimeEntry, TimeEntry.id == entry_id) == []
+    assert_rollups_match(replica, ids['user_id'])
+    totals = RollupService(session_factory=replica.get_session).time_totals(ids['user_id'])
+    assert totals['minutes'] == 30
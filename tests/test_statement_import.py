@@ -0,0 +1,105 @@
+"""Importação de extratos (CSV e OFX) em blocos pelo caminho do SQLite"""
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, func
+from src.database.models import Transaction, TransactionMonthlyRollup, TransactionType
+from src.services.rollups import RollupService
+from src.services.statement_import import StatementImportService, read_csv_statement, read_ofx_statement
+
+CSV_STATEMENT = """Extrato de conta corrente
+Agência 0001 Conta 12345-6
+
+Data;Histórico;Valor (R$)
+01/03/2026;Saldo anterior;1.000,00
+02/03/2026;PIX recebido Cliente;1.234,56
+03/03/2026;Padaria Pão Quente;-15,90
+03/03/2026;Padaria Pão Quente;-15,90
+05/03/2026;Tarifa;(12,00)
+xx/03/2026;Linha com data errada;10,00
+"""
+
+CREDIT_DEBIT_STATEMENT = """date,description,credit,debit
+2026-04-01,Invoice 42,500.00,
+2026-04-02,Hosting,,29.99
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<BANKMSGSRSV1><STMTTRNRS><STMTRS>
+<BANKACCTFROM><BANKID>341<ACCTID>98765<ACCTTYPE>CHECKING</BANKACCTFROM>
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260310120000[-3:BRT]<TRNAMT>2500.00<FITID>A1<NAME>Cliente &amp; Cia<MEMO>Projeto site</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260311<TRNAMT>-89.90<FITID>A2<NAME>Internet<MEMO>Internet</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>2026xx11<TRNAMT>-1.00<FITID>A3<NAME>Inválida</STMTTRN>
+</BANKTRANLIST>
+</STMTRS></STMTTRNRS></BANKMSGSRSV1>
+</OFX>
+"""
+
+def write(tmp_path, name, content, encoding='utf-8'):
+    path = tmp_path / name
+    path.write_text(content, encoding=encoding)
+    return str(path)
+
+def test_csv_statement_parsing(tmp_path):
+    errors = []
+    lines = list(read_csv_statement(
+        write(tmp_path, 'extrato.csv', CSV_STATEMENT, encoding='cp1252'),
+        on_error=lambda line, message: errors.append(line)
+    ))
+
+    assert [(line.date, line.amount, line.description) for line in lines] == [
+        (datetime(2026, 3, 2), Decimal('1234.56'), 'PIX recebido Cliente'),
+        (datetime(2026, 3, 3), Decimal('-15.90'), 'Padaria Pão Quente'),
+        (datetime(2026, 3, 3), Decimal('-15.90'), 'Padaria Pão Quente'),
+        (datetime(2026, 3, 5), Decimal('-12.00'), 'Tarifa'),
+    ]
+    assert errors == [10]
+
+def test_csv_credit_and_debit_columns(tmp_path):
+    lines = list(read_csv_statement(write(tmp_path, 'extrato.csv', CREDIT_DEBIT_STATEMENT)))
+
+    assert [line.amount for line in lines] == [Decimal('500.00'), Decimal('-29.99')]
+
+def test_ofx_statement_parsing(tmp_path):
+    errors = []
+    lines = list(read_ofx_statement(
+        write(tmp_path, 'extrato.ofx', OFX_STATEMENT),
+        on_error=lambda line, message: errors.append(line)
+    ))
+
+    assert [(line.date, line.amount, line.description, line.reference) for line in lines] == [
+        (datetime(2026, 3, 10), Decimal('2500.00'), 'Cliente & Cia - Projeto site', '98765:A1'),
+        (datetime(2026, 3, 11), Decimal('-89.90'), 'Internet', '98765:A2'),
+    ]
+    assert errors == [3]
+
+def test_import_inserts_once_and_keeps_rollups(tmp_path, session_factory, user_id):
+    service = StatementImportService(session_factory=session_factory, chunk_size=2)
+    csv_path = write(tmp_path, 'extrato.csv', CSV_STATEMENT)
+    ofx_path = write(tmp_path, 'extrato.ofx', OFX_STATEMENT)
+
+    first = service.import_file(user_id, csv_path)
+    assert (first.read, first.inserted, first.duplicates, first.invalid) == (4, 4, 0, 1)
+    assert service.import_file(user_id, ofx_path).inserted == 2
+
+    # Mesmos arquivos de novo: o hash do conteúdo (import_hash) barra todas as linhas
+    again = service.import_file(user_id, csv_path)
+    assert (again.inserted, again.duplicates) == (0, 4)
+    assert service.import_file(user_id, ofx_path).inserted == 0
+
+    session = session_factory()
+    try:
+        assert session.execute(select(func.count()).select_from(Transaction)).scalar() == 6
+        expenses = session.execute(
+            select(TransactionMonthlyRollup.total_amount, TransactionMonthlyRollup.entry_count).where(
+                TransactionMonthlyRollup.type == TransactionType.DESPESA
+            )
+        ).one()
+        assert (Decimal(str(expenses.total_amount)), expenses.entry_count) == (Decimal('133.70'), 4)
+    finally:
+        session.close()
+
+    assert RollupService(session_factory=session_factory).verify(user_id) == []
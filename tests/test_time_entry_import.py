@@ -0,0 +1,143 @@
+"""Importação de entradas de tempo do Toggl/Clockify em blocos pelo caminho do SQLite"""
+from datetime import datetime, date
+from sqlalchemy import select
+from src.database.bulk import bulk_insert
+from src.database.models import Client, Project, TimeEntry, TimeEntryDailyRollup
+from src.database.rollups import RollupDeltas, collect_row_deltas, apply_deltas
+from src.services.rollups import RollupService
+from src.services.time_entry_import import (
+    TimeEntryImportService, ProjectLookup, read_time_entries, NO_PROJECT_NAME, NO_CLIENT_NAME
+)
+
+# Exportação detalhada do Toggl Track (datas ISO, duração H:MM:SS)
+TOGGL_EXPORT = """User,Email,Client,Project,Task,Description,Billable,Start date,Start time,End date,End time,Duration,Tags,Amount ()
+Ana,ana@example.com,Cliente,Site,,Layout da home,Yes,2026-03-10,09:00:00,2026-03-10,10:30:00,01:30:00,,
+Ana,ana@example.com,Acme,App,Revisão,,No,2026-03-10,23:30:00,2026-03-11,00:15:00,00:45:00,,
+Ana,ana@example.com,Cliente,Site,,Layout da home,Yes,2026-03-10,09:00:00,2026-03-10,10:30:00,01:30:00,,
+Ana,ana@example.com,Cliente,Site,,Sem horário,Yes,2026-03-12,,,,,,
+"""
+
+# Exportação detalhada do Clockify (datas americanas, AM/PM, sem hora de fim mas com a duração decimal)
+CLOCKIFY_EXPORT = """Project,Client,Description,Task,User,Group,Email,Tags,Billable,Start Date,Start Time,End Date,End Time,Duration (h),Duration (decimal),Billable Rate (USD),Billable Amount (USD)
+Site,Cliente,Reunião,,Ana,,ana@example.com,,Yes,03/13/2026,02:00 PM,,,,"1,5",120.00,180.00
+,,Estudo,,Ana,,ana@example.com,,No,03/14/2026,08:00 AM,03/14/2026,08:00 AM,,,,
+"""
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+def rows(session_factory, model, *conditions):
+    session = session_factory()
+    try:
+        statement = select(model).where(*conditions).order_by(*model.__table__.primary_key.columns)
+        return session.execute(statement).scalars().all()
+    finally:
+        session.close()
+
+def test_toggl_columns(tmp_path):
+    errors = []
+    lines = list(read_time_entries(
+        write(tmp_path, 'toggl.csv', TOGGL_EXPORT), on_error=lambda line, message: errors.append(line)
+    ))
+
+    assert [(line.project, line.client, line.description, line.start, line.end, line.rate) for line in lines] == [
+        ('Site', 'Cliente', 'Layout da home', datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10, 30), None),
+        # Sem descrição: vale o nome da tarefa
+        ('App', 'Acme', 'Revisão', datetime(2026, 3, 10, 23, 30), datetime(2026, 3, 11, 0, 15), None),
+        ('Site', 'Cliente', 'Layout da home', datetime(2026, 3, 10, 9), datetime(2026, 3, 10, 10, 30), None),
+    ]
+    # Linha sem hora de fim nem duração
+    assert errors == [5]
+
+def test_clockify_columns(tmp_path):
+    lines = list(read_time_entries(write(tmp_path, 'clockify.csv', CLOCKIFY_EXPORT), date_format='%m/%d/%Y'))
+
+    first = lines[0]
+    assert (first.project, first.client, first.description) == ('Site', 'Cliente', 'Reunião')
+    # Sem hora de fim: início + "Duration (decimal)"; "Billable Rate (USD)" vale como valor por hora
+    assert (first.start, first.end) == (datetime(2026, 3, 13, 14), datetime(2026, 3, 13, 15, 30))
+    assert str(first.rate) == '120.00'
+    # Fim igual ao início é lido como o dia seguinte
+    assert lines[1].end == datetime(2026, 3, 15, 8)
+
+def test_missing_projects_are_created(session_factory, user_id):
+    projects = ProjectLookup(session_factory, user_id)
+
+    site = projects('Site', 'Cliente')
+    assert projects('site', '') == site
+    assert projects('Site', 'Cliente') == site
+    orphan = projects('', '')
+
+    assert projects.created == 2
+    created = {project.id: (project.name, project.client_id) for project in rows(session_factory, Project)}
+    clients = {client.name: client.id for client in rows(session_factory, Client)}
+    # O cliente existente é reaproveitado; entradas sem projeto ganham projeto e cliente padrão
+    assert created == {site: ('Site', clients['Cliente']), orphan: (NO_PROJECT_NAME, clients[NO_CLIENT_NAME])}
+
+def test_missing_project_is_an_error_without_create(tmp_path, session_factory, user_id):
+    service = TimeEntryImportService(session_factory=session_factory)
+
+    result = service.import_file(user_id, write(tmp_path, 'toggl.csv', TOGGL_EXPORT), create_projects=False)
+
+    assert (result.inserted, result.invalid, result.created) == (0, 4, 0)
+    assert rows(session_factory, Project) == []
+
+def test_reimport_is_a_no_op(tmp_path, session_factory, user_id):
+    service = TimeEntryImportService(session_factory=session_factory, chunk_size=2)
+    path = write(tmp_path, 'toggl.csv', TOGGL_EXPORT)
+    progress = []
+
+    first = service.import_file(user_id, path, progress=lambda read, inserted: progress.append((read, inserted)))
+    # As duas linhas iguais do arquivo são entradas distintas
+    assert (first.read, first.inserted, first.invalid, first.created) == (3, 3, 1, 2)
+    assert progress == [(2, 2), (3, 3)]
+
+    again = service.import_file(user_id, path)
+    assert (again.inserted, again.duplicates, again.created) == (0, 3, 0)
+    assert len(rows(session_factory, TimeEntry)) == 3
+    assert len(rows(session_factory, Project)) == 2
+
+def test_import_keeps_rollups(tmp_path, session_factory, user_id):
+    service = TimeEntryImportService(session_factory=session_factory, chunk_size=2)
+    service.import_file(user_id, write(tmp_path, 'toggl.csv', TOGGL_EXPORT))
+    service.import_file(user_id, write(tmp_path, 'toggl.csv', TOGGL_EXPORT))
+
+    assert RollupService(session_factory=session_factory).verify(user_id) == []
+    site = rows(session_factory, Project, Project.name == 'Site')[0]
+    day = rows(session_factory, TimeEntryDailyRollup, TimeEntryDailyRollup.project_id == site.id)
+    assert [(rollup.day, rollup.total_minutes, rollup.entry_count) for rollup in day] == [(date(2026, 3, 10), 180, 2)]
+
+def test_row_deltas_of_core_inserts(session_factory, user_id):
+    project_id = ProjectLookup(session_factory, user_id)('Site', 'Cliente')
+    entries = [
+        {'user_id': user_id, 'project_id': project_id, 'description': f'Tarefa {index}',
+         'start_time': datetime(2026, 3, day, 9), 'duration_minutes': minutes, 'date': datetime(2026, 3, day)}
+        for index, (day, minutes) in enumerate(((10, 30), (10, 45), (11, 60)))
+    ]
+
+    # Linhas gravadas em Core (executemany) não passam pelo after_flush: as variações vêm dos mappings
+    session = session_factory()
+    try:
+        connection = session.connection()
+        bulk_insert(connection, TimeEntry.__table__, entries)
+        deltas = RollupDeltas()
+        collect_row_deltas(deltas, TimeEntry, entries, 1)
+        collect_row_deltas(deltas, TimeEntry, entries[2:], -1)
+        collect_row_deltas(deltas, TimeEntry, [dict(entries[2], duration_minutes=90)], 1)
+        assert dict(deltas.time_entries) == {
+            (user_id, project_id, date(2026, 3, 10)): [75, 2],
+            (user_id, project_id, date(2026, 3, 11)): [90, 1],
+        }
+
+        connection.execute(
+            TimeEntry.__table__.update().where(TimeEntry.description == 'Tarefa 2').values(duration_minutes=90)
+        )
+        apply_deltas(connection, deltas)
+        session.commit()
+    finally:
+        session.close()
+
+    assert RollupService(session_factory=session_factory).verify(user_id) == []
+    assert RollupService(session_factory=session_factory).time_totals(user_id)['minutes'] == 165
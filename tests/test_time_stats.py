@@ -0,0 +1,146 @@
+"""Totais de tempo da timesheet: consulta ao rollup e ajuste em memória a cada gravação da fila"""
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+import pytest
+from src.database.models import TimeEntry
+from src.services.listings import ListingService
+from src.services.time_stats import TimeStats, TimeStatsService
+
+STAT_FIELDS = ('today_minutes', 'week_minutes', 'month_minutes', 'total_minutes')
+
+def totals(stats):
+    return tuple(getattr(stats, name) for name in STAT_FIELDS)
+
+def test_add_counts_each_period():
+    # Quarta-feira, 11/03/2026: a semana vai de 09/03 a 15/03
+    stats = TimeStats(date(2026, 3, 11))
+
+    stats.add(datetime(2026, 3, 11, 9), 30)
+    stats.add(date(2026, 3, 9), 60)
+    stats.add(date(2026, 3, 1), 45)
+    stats.add(date(2026, 2, 28), 15)
+    stats.add(date(2026, 3, 16), None)
+    assert totals(stats) == (30, 90, 135, 150)
+
+    stats.add(date(2026, 3, 9), -60)
+    assert totals(stats) == (30, 30, 75, 90)
+    assert stats.is_current(date(2026, 3, 11)) and not stats.is_current(date(2026, 3, 12))
+
+class FakeWidget:
+    def configure(self, text=None):
+        self.text = text
+
+class FakeList:
+    """VirtualList só com os itens (sem Tk)"""
+
+    def __init__(self):
+        self.items = []
+
+    def insert_item(self, index, item):
+        self.items.insert(index, item)
+
+    def remove_item(self, index):
+        del self.items[index]
+
+class ImmediateRunner:
+    """task_runner que roda o callback na hora e registra os argumentos"""
+
+    def __init__(self):
+        self.posted = []
+
+    def post(self, widget, callback, *args):
+        self.posted.append((callback.__name__, args))
+        callback(*args)
+
+@pytest.fixture
+def runner(monkeypatch, session_factory, user_id):
+    pytest.importorskip('customtkinter')
+    from src.gui import timesheet_frame
+
+    runner = ImmediateRunner()
+    monkeypatch.setattr(timesheet_frame, 'task_runner', runner)
+    monkeypatch.setattr(timesheet_frame, 'listing_service', ListingService(session_factory=session_factory))
+    monkeypatch.setattr(timesheet_frame, 'time_stats_service', TimeStatsService(session_factory=session_factory))
+    monkeypatch.setattr(timesheet_frame.auth_manager, 'current_user', SimpleNamespace(id=user_id))
+    return runner
+
+@pytest.fixture
+def timesheet(runner):
+    """TimesheetFrame sem os widgets: só a lista e os totais"""
+    from src.gui.timesheet_frame import TimesheetFrame
+
+    frame = TimesheetFrame.__new__(TimesheetFrame)
+    frame.frame = None
+    frame.entries_list = FakeList()
+    frame.current_filters = {}
+    frame.next_cursor = None
+    frame.selected_entry = None
+    frame.time_stats = None
+    for name in ('today_hours_label', 'week_hours_label', 'month_hours_label', 'total_hours_label'):
+        setattr(frame, name, FakeWidget())
+    return frame
+
+def entry_values(user_id, project_id, day, minutes, description):
+    start = datetime.combine(day, time(9))
+    return {
+        'user_id': user_id, 'project_id': project_id, 'description': description, 'date': start,
+        'start_time': start, 'end_time': start + timedelta(minutes=minutes), 'duration_minutes': minutes
+    }
+
+def assert_matches_recomputation(timesheet, session_factory, user_id):
+    recomputed = TimeStatsService(session_factory=session_factory).load(user_id)
+    assert totals(timesheet.time_stats) == totals(recomputed)
+
+def test_deltas_match_recomputation(timesheet, runner, queue, session_factory, user_id, project_id):
+    today = date.today()
+    timesheet._update_stats()
+    assert totals(timesheet.time_stats) == (0, 0, 0, 0)
+    loaded = timesheet.time_stats
+
+    # Inserções: o on_applied recebe o id gerado e a timesheet soma a linha lida por esse id
+    for day, minutes, description in ((today, 90, 'Hoje'), (today - timedelta(days=1), 30, 'Ontem'),
+                                      (today - timedelta(days=40), 45, 'Antiga')):
+        queue.insert(TimeEntry, entry_values(user_id, project_id, day, minutes, description),
+                     on_applied=timesheet._after_insert)
+    queue.flush()
+
+    ids = [args[0] for name, args in runner.posted]
+    assert all(isinstance(entry_id, int) for entry_id in ids) and len(set(ids)) == 3
+    assert [item.id for item in timesheet.entries_list.items] == ids
+    # Os totais foram ajustados, não relidos
+    assert timesheet.time_stats is loaded and loaded.total_minutes == 165
+    assert_matches_recomputation(timesheet, session_factory, user_id)
+
+    # Alteração: sai o valor exibido e entra o gravado (muda de dia e de duração)
+    today_entry, yesterday_entry, old_entry = timesheet.entries_list.items
+    queue.update(TimeEntry, today_entry.id, {'duration_minutes': 120, 'date': datetime.combine(today, time(8))},
+                 on_applied=timesheet._after_write(timesheet._on_entry_updated, today_entry))
+    queue.update(TimeEntry, old_entry.id, entry_values(user_id, project_id, today, 15, 'Movida'),
+                 on_applied=timesheet._after_write(timesheet._on_entry_updated, old_entry))
+    queue.flush()
+    assert totals(loaded)[0] == 135 and loaded.total_minutes == 165
+    assert_matches_recomputation(timesheet, session_factory, user_id)
+
+    # Exclusão
+    queue.delete(TimeEntry, yesterday_entry.id,
+                 on_applied=timesheet._after_write(timesheet._on_entry_deleted, yesterday_entry))
+    queue.flush()
+    assert yesterday_entry.id not in [item.id for item in timesheet.entries_list.items]
+    assert loaded.total_minutes == 135 and timesheet.time_stats is loaded
+    assert_matches_recomputation(timesheet, session_factory, user_id)
+
+def test_unknown_entry_id_reloads_stats(timesheet, queue, session_factory, user_id, project_id):
+    timesheet._update_stats()
+    session = session_factory()
+    try:
+        session.add(TimeEntry(**entry_values(user_id, project_id, date.today(), 60, 'Reenviada')))
+        session.commit()
+    finally:
+        session.close()
+    timesheet._load_entries = lambda: None
+
+    # Gravação reenviada: a fila não conhece o id e a timesheet relê os totais
+    timesheet._after_insert(None)
+
+    assert timesheet.time_stats.today_minutes == 60
+    assert_matches_recomputation(timesheet, session_factory, user_id)
@@ -0,0 +1,145 @@
+"""Timers em andamento: arquivo local, vários projetos ao mesmo tempo e o tick do display"""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from src.database.models import Client, Project, TimeEntry, ProjectStatus
+from src.services.timers import TimerService, RunningTimer, format_elapsed, next_tick_delay
+
+START = datetime(2026, 3, 10, 9, 0)
+
+@pytest.fixture
+def timers_path(tmp_path):
+    return str(tmp_path / 'timers.json')
+
+@pytest.fixture
+def second_project_id(session_factory, user_id):
+    session = session_factory()
+    try:
+        client = session.execute(select(Client).where(Client.user_id == user_id)).scalar_one()
+        project = Project(user_id=user_id, client=client, name='Outro', status=ProjectStatus.ATIVO)
+        session.add(project)
+        session.commit()
+        return project.id
+    finally:
+        session.close()
+
+def entries(session_factory):
+    session = session_factory()
+    try:
+        return session.execute(select(TimeEntry).order_by(TimeEntry.id)).scalars().all()
+    finally:
+        session.close()
+
+def test_running_timer_survives_a_new_instance(timers_path, queue, session_factory, user_id, project_id):
+    timer = TimerService(timers_path, queue).start(user_id, project_id, 'Layout', started_at=START)
+
+    # Outra instância (o aplicativo foi fechado e aberto de novo) lê o timer do arquivo
+    reopened = TimerService(timers_path, queue)
+    assert reopened.running(user_id) == [timer]
+    assert reopened.running(user_id + 1) == []
+
+    applied = []
+    stopped = reopened.stop(timer.id, ended_at=START + timedelta(minutes=95, seconds=59), on_applied=applied.append)
+    assert stopped.duration_minutes == 95
+    assert TimerService(timers_path, queue).running(user_id) == []
+
+    # A entrada está na fila local até o flush
+    assert entries(session_factory) == []
+    assert queue.flush() == 1
+    [entry] = entries(session_factory)
+    assert applied == [entry.id]
+    assert (entry.project_id, entry.description, entry.start_time, entry.duration_minutes) == (
+        project_id, 'Layout', START, 95
+    )
+
+def test_concurrent_timers_per_project(timers_path, queue, session_factory, user_id, project_id, second_project_id):
+    service = TimerService(timers_path, queue)
+    first = service.start(user_id, project_id, 'Layout', started_at=START)
+    second = service.start(user_id, second_project_id, 'Reunião', started_at=START + timedelta(minutes=10))
+
+    # Um timer por projeto
+    with pytest.raises(ValueError):
+        service.start(user_id, project_id, 'De novo')
+    assert service.running(user_id) == [first, second]
+
+    service.stop(first.id, ended_at=START + timedelta(hours=1))
+    assert TimerService(timers_path, queue).running(user_id) == [second]
+    with pytest.raises(ValueError):
+        service.stop(first.id)
+
+    service.discard(second.id)
+    assert TimerService(timers_path, queue).running(user_id) == []
+    queue.flush()
+    assert [(entry.project_id, entry.duration_minutes) for entry in entries(session_factory)] == [(project_id, 60)]
+
+def test_unreadable_file_is_ignored(timers_path, queue, user_id):
+    with open(timers_path, 'w', encoding='utf-8') as timers_file:
+        timers_file.write('{meio arquivo')
+
+    assert TimerService(timers_path, queue).running(user_id) == []
+
+def test_elapsed_and_tick_delay():
+    assert format_elapsed(3723) == '01:02:03'
+    assert format_elapsed(-5) == '00:00:00'
+    assert next_tick_delay(datetime(2026, 3, 10, 9, 0, 0, 250000)) == 750
+    assert next_tick_delay(datetime(2026, 3, 10, 9, 0, 0)) == 1000
+
+class FakeWidget:
+    """Widget com after/after_cancel e configure registrados (sem Tk)"""
+
+    def __init__(self):
+        self.jobs = {}
+        self.text = None
+
+    def after(self, delay, callback):
+        job = f"after#{len(self.jobs)}"
+        self.jobs[job] = (delay, callback)
+        return job
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+    def configure(self, text=None):
+        self.text = text
+
+    def pack_forget(self):
+        pass
+
+@pytest.fixture
+def timesheet():
+    """TimesheetFrame sem os widgets: só o estado usado pelo tick"""
+    pytest.importorskip('customtkinter')
+    from src.gui.timesheet_frame import TimesheetFrame
+
+    frame = TimesheetFrame.__new__(TimesheetFrame)
+    frame.frame = FakeWidget()
+    frame.timer_label = FakeWidget()
+    frame.timer_rows = {}
+    frame.visible = True
+    frame._tick_job = None
+    return frame
+
+def test_tick_is_scheduled_only_while_a_timer_runs(timesheet):
+    timesheet._tick()
+    assert timesheet._tick_job is None and timesheet.frame.jobs == {}
+    assert timesheet.timer_label.text == '00:00:00'
+
+    started_at = datetime.now() - timedelta(minutes=5)
+    label = FakeWidget()
+    timesheet.timer_rows = {'a': (RunningTimer('a', 1, 1, 'Layout', started_at), label)}
+    timesheet._tick()
+    [(delay, callback)] = timesheet.frame.jobs.values()
+    assert timesheet._tick_job is not None and 0 < delay <= 1000
+    assert label.text.startswith('00:05:') and timesheet.timer_label.text == label.text
+
+    # Escondido: o tick em andamento não se reagenda e hide() cancela o agendado
+    timesheet.hide()
+    assert timesheet.frame.jobs == {}
+    callback()
+    assert timesheet._tick_job is None and timesheet.frame.jobs == {}
+
+    # Último timer parado: o tick roda uma vez (zera o display) e não se reagenda
+    timesheet.visible = True
+    timesheet.timer_rows = {}
+    timesheet._tick()
+    assert timesheet._tick_job is None and timesheet.frame.jobs == {}